@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+BOM structural reduction: single-child chains and symmetric sibling subtrees
+
+Parallel and multi-level BOMs contain single-child chains and sibling subtrees that
+are structurally identical (same node attributes, same eligible suppliers, same
+shape). Identical siblings make the MIP symmetric: swapping their decisions gives
+another solution with the same objective. This module finds them with canonical
+subtree hashing and emits OPL constraints that remove the symmetry without cutting
+off every optimum:
+
+- EMISTAXE: sibling subtrees only interact through their parent's decoupled lead
+  time and the separable objective, so identical siblings share an optimal decision.
+  Their x, a, z and q are tied to the representative subtree, which also makes
+  expanding a representative solution back to every original node id exact.
+- EMISCAP / EMISHYBRID / multi-objective: the emissions ceiling couples the
+  subtrees, so only the lexicographic order x[r1] >= x[r2] >= ... on the roots of
+  identical siblings is imposed.
+
+An equivalent reduced BOM file is not produced: dlts counts every node and supplier
+capacity is per node-supplier pair, so merged twins cannot be expressed through the
+BOM columns alone. Single-child chains are reported; the only chain reduction that
+is exact for every strategy is fixing the buffer of a zero-cost root (x[0] == 0).
+
+Usage:
+    python BomStructureReducer.py [output_dir] [--instances bom_par2 bom_ml4_30] [--oplrun PATH]
+
+output_dir defaults to logs/bom_reduction.
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from SupplierDominancePruner import (
+    DATA_DIR,
+    DEFAULT_NB_SUPP,
+    REPO_DIR,
+    instance_files,
+    read_bom,
+    read_supplier_list,
+    registry_instances,
+    run_model,
+)
+
+# Node columns that enter the PLM objective or constraints; ind/parent are structure.
+NODE_ATTRIBUTES = [
+    't_process', 'unit_price', 'rqtf', 'aih_cost', 'var_factor', 'lt_factor',
+    'cycle', 'minOrder', 'facility_emis', 'inventory_emis', 'trsp_emis',
+]
+COST_ATTRIBUTES = ['unit_price', 'facility_emis', 'inventory_emis', 'trsp_emis']
+STRATEGIES = ('EMISTAXE', 'EMISCAP', 'EMISHYBRID')
+TIED_STRATEGIES = ('EMISTAXE',)
+
+REPORT_COLUMNS = [
+    'instance_id', 'nodes', 'chains', 'chain_nodes', 'symmetric_groups', 'symmetric_subtrees',
+    'tied_nodes', 'strategy', 'constraints',
+    'objective_original', 'objective_reduced', 'objective_match',
+    'runtime_sec_original', 'runtime_sec_reduced',
+]
+
+
+class BomStructure:
+    """Tree view of a BOM with canonical subtree hashes."""
+
+    def __init__(self, bom: pd.DataFrame, eligibility: dict = None, nb_supp: int = DEFAULT_NB_SUPP):
+        self.bom = bom.set_index('ind', drop=False)
+        self.nodes = self.bom['ind'].astype(int).tolist()
+        self.children = {node: [] for node in self.nodes}
+        # A parent id missing from the file (e.g. bom_50 node 45 -> 67) leaves an
+        # orphan subtree; the models treat it as disconnected, so it is hashed as its own root.
+        self.roots = []
+        for node, parent in zip(self.nodes, self.bom['parent'].astype(int)):
+            if parent in self.children:
+                self.children[parent].append(node)
+            else:
+                self.roots.append(node)
+        self.root = int(self.bom.loc[self.bom['parent'] < 0, 'ind'].iloc[0])
+        eligibility = eligibility or {}
+        self.suppliers = {node: tuple(sorted(s for s in eligibility.get(node, []) if 1 <= s <= nb_supp))
+                          for node in self.nodes}
+        self.hashes = {}
+        for root in self.roots:
+            self._hash(root)
+
+    def _hash(self, node: int) -> str:
+        # Children are hashed first and sorted, so sibling order never matters.
+        child_hashes = sorted(self._hash(child) for child in self.children[node])
+        attributes = self.bom.loc[node, NODE_ATTRIBUTES].to_numpy(dtype=float)
+        signature = repr((np.round(attributes, 9).tolist(), self.suppliers[node], child_hashes))
+        self.hashes[node] = hashlib.sha1(signature.encode('utf-8')).hexdigest()
+        return self.hashes[node]
+
+    def chains(self) -> list:
+        """Maximal single-child chains, each listed from its top node downwards."""
+        single = {node for node, kids in self.children.items() if len(kids) == 1}
+        parent_of = {child: node for node, kids in self.children.items() for child in kids}
+        chains = []
+        for node in sorted(single):
+            if parent_of.get(node) in single:
+                continue
+            chain = [node]
+            while chain[-1] in single:
+                chain.append(self.children[chain[-1]][0])
+            chains.append(chain)
+        return chains
+
+    def symmetric_groups(self) -> list:
+        """Groups of identical sibling subtrees, as lists of their root ids."""
+        groups = []
+        for node in self.nodes:
+            by_hash = {}
+            for child in self.children[node]:
+                by_hash.setdefault(self.hashes[child], []).append(child)
+            groups.extend(sorted(group) for group in by_hash.values() if len(group) > 1)
+        return sorted(groups)
+
+    def isomorphism(self, source: int, target: int) -> dict:
+        """Node mapping between two subtrees with the same canonical hash."""
+        mapping = {source: target}
+        source_kids = sorted(self.children[source], key=lambda n: (self.hashes[n], n))
+        target_kids = sorted(self.children[target], key=lambda n: (self.hashes[n], n))
+        for left, right in zip(source_kids, target_kids):
+            mapping.update(self.isomorphism(left, right))
+        return mapping
+
+    def index_ordered(self) -> bool:
+        """The PLM lead-time constraints only see children with a larger index."""
+        return all(child > node for node, kids in self.children.items() for child in kids)
+
+    def zero_cost_root(self) -> bool:
+        return bool((self.bom.loc[self.root, COST_ATTRIBUTES].to_numpy(dtype=float) == 0).all())
+
+
+def twin_mapping(structure: BomStructure) -> dict:
+    """Map every node of a non-representative twin subtree to its representative node."""
+    mapping = {}
+    for group in structure.symmetric_groups():
+        representative = group[0]
+        for twin in group[1:]:
+            for rep_node, twin_node in structure.isomorphism(representative, twin).items():
+                mapping[twin_node] = rep_node
+    return mapping
+
+
+def symmetry_constraints(structure: BomStructure, strategy: str) -> list:
+    """OPL constraint lines (without the enclosing subject to block)."""
+    lines = []
+    if structure.zero_cost_root():
+        lines.append(f"ct_sym_root: x[{structure.root}] == 0;")
+    if not structure.index_ordered():
+        return lines
+    if strategy in TIED_STRATEGIES:
+        for twin, rep in sorted(twin_mapping(structure).items()):
+            lines.append(f"ct_sym_x_{twin}: x[{twin}] == x[{rep}];")
+            lines.append(f"ct_sym_a_{twin}: a[{twin}] == a[{rep}];")
+            lines.append(f"forall (j in S) {{ ct_sym_z_{twin}: z[{twin}][j] == z[{rep}][j]; "
+                         f"ct_sym_q_{twin}: q[{twin}][j] == q[{rep}][j]; }}")
+    else:
+        for group in structure.symmetric_groups():
+            for left, right in zip(group, group[1:]):
+                lines.append(f"ct_sym_order_{right}: x[{left}] >= x[{right}];")
+    return lines
+
+
+def apply_constraints(content: str, lines: list) -> str:
+    """Insert constraint lines at the top of the model's subject to block."""
+    if not lines:
+        return content
+    block = ''.join(f"\n \t{line}" for line in lines)
+    marker = 'subject to {'
+    if marker not in content:
+        raise ValueError('Could not locate the PLM constraint block')
+    return content.replace(marker, marker + block, 1)
+
+
+def expand_solution(values, mapping: dict, nb_supp: int = None) -> list:
+    """Copy representative decisions onto twin nodes in a node-indexed vector.
+
+    values is an X/A vector, or a flattened N x nb_supp Z/Q vector when nb_supp is
+    given. Only exact for the tied (EMISTAXE) constraints.
+    """
+    array = np.asarray(values, dtype=float)
+    if nb_supp is not None:
+        array = array.reshape(-1, nb_supp)
+    array = array.copy()
+    for twin, rep in mapping.items():
+        array[twin] = array[rep]
+    return array.ravel().tolist()
+
+
+class BomStructureReducer:
+    def __init__(self, output_dir: str, data_dir: str = None, nb_supp: int = DEFAULT_NB_SUPP):
+        self.output_dir = Path(output_dir)
+        self.data_dir = Path(data_dir) if data_dir else DATA_DIR
+        self.nb_supp = nb_supp
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def structure(self, instance: dict) -> BomStructure:
+        bom_file, supp_list_file, _ = instance_files(instance)
+        _, _, _, eligibility = read_supplier_list(self.data_dir / supp_list_file)
+        return BomStructure(read_bom(self.data_dir / bom_file), eligibility, self.nb_supp)
+
+    def reduce(self, instance: dict, oplrun: str = None) -> list:
+        structure = self.structure(instance)
+        chains = structure.chains()
+        groups = structure.symmetric_groups()
+        mapping = twin_mapping(structure)
+        summary = {
+            'instance_id': instance['id'],
+            'chains': chains,
+            'symmetric_groups': groups,
+            'twin_mapping': {str(k): v for k, v in sorted(mapping.items())},
+            'index_ordered': structure.index_ordered(),
+            'constraints': {},
+        }
+        rows = []
+        for strategy in STRATEGIES:
+            lines = symmetry_constraints(structure, strategy)
+            summary['constraints'][strategy] = lines
+            row = {
+                'instance_id': instance['id'],
+                'nodes': len(structure.nodes),
+                'chains': len(chains),
+                'chain_nodes': sum(len(chain) for chain in chains),
+                'symmetric_groups': len(groups),
+                'symmetric_subtrees': sum(len(group) for group in groups),
+                'tied_nodes': len(mapping),
+                'strategy': strategy,
+                'constraints': len(lines),
+            }
+            if oplrun and lines:
+                row.update(self.validate(instance, strategy, lines, oplrun))
+            rows.append(row)
+        (self.output_dir / f"{instance['id']}_structure.json").write_text(
+            json.dumps(summary, indent=2), encoding='utf-8')
+        return rows
+
+    def validate(self, instance: dict, strategy: str, lines: list, oplrun: str) -> dict:
+        """Solve the strategy model with and without the constraints and compare objectives."""
+        bom_file, supp_list_file, supp_details_file = instance_files(instance)
+        model_file = {'EMISTAXE': 'RUNS_SupEmis_Cplex_PLM_Tax.mod',
+                      'EMISCAP': 'RUNS_SupEmis_Cplex_PLM_Cap.mod',
+                      'EMISHYBRID': 'RUNS_SupEmis_Cplex_PLM_Hybrid.mod'}[strategy]
+        substitutions = {
+            '_NODE_FILE_': (self.data_dir / bom_file).as_posix(),
+            '_NODE_SUPP_FILE_': (self.data_dir / supp_list_file).as_posix(),
+            '_SUPP_DETAILS_FILE_': (self.data_dir / supp_details_file).as_posix(),
+            '_NBSUPP_': self.nb_supp,
+            '_SERVICE_T_': 1,
+            '_EMISTAXE_': 0.0 if strategy == 'EMISCAP' else 50.0,
+            '_EMISCAP_': 0,
+        }
+        if strategy != 'EMISTAXE':
+            # A binding cap: 90% of the unconstrained tax-0 emissions (the #Result value
+            # when #E hit the int32 clamp, see RunOutput.run_emissions).
+            free = run_model(oplrun, 'RUNS_SupEmis_Cplex_PLM_Tax.mod',
+                             dict(substitutions, _EMISTAXE_=0.0),
+                             self.output_dir, f"SYM-{instance['id']}-FREE")
+            substitutions['_EMISCAP_'] = 0.9 * (free['emissions'] or 0.0)
+        prefix = f"SYM-{instance['id']}-{strategy}"
+        original = run_model(oplrun, model_file, substitutions, self.output_dir, prefix + '-ORIG')
+        reduced = run_model(oplrun, model_file, substitutions, self.output_dir, prefix + '-RED',
+                            transform=lambda content: apply_constraints(content, lines))
+        match = (original['objective'] is not None and reduced['objective'] is not None
+                 and abs(original['objective'] - reduced['objective'])
+                 <= 1e-6 * max(1.0, abs(original['objective'])))
+        return {
+            'objective_original': original['objective'],
+            'objective_reduced': reduced['objective'],
+            'objective_match': int(match),
+            'runtime_sec_original': original['runtime_sec'],
+            'runtime_sec_reduced': reduced['runtime_sec'],
+        }
+
+    def run(self, instance_ids, oplrun: str = None) -> pd.DataFrame:
+        instances = registry_instances()
+        rows = []
+        for instance_id in instance_ids:
+            instance = instances.get(instance_id)
+            if instance is None or not (self.data_dir / instance['file']).exists():
+                print(f"  Skipping {instance_id} - instance not found")
+                continue
+            instance_rows = self.reduce(instance, oplrun)
+            rows.extend(instance_rows)
+            first = instance_rows[0]
+            print(f"  {instance_id}: {first['chains']} chains ({first['chain_nodes']} nodes), "
+                  f"{first['symmetric_groups']} symmetric sibling groups, "
+                  f"{first['tied_nodes']} tied nodes")
+        report = pd.DataFrame(rows).reindex(columns=REPORT_COLUMNS)
+        report.to_csv(self.output_dir / 'bom_reduction_report.csv', index=False)
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BOM chain and symmetric-subtree detection')
+    parser.add_argument('output_dir', nargs='?', default=str(REPO_DIR / 'logs' / 'bom_reduction'))
+    parser.add_argument('--instances', nargs='+', default=sorted(registry_instances()))
+    parser.add_argument('--suppliers', type=int, default=DEFAULT_NB_SUPP)
+    parser.add_argument('--oplrun', help='validate objectives with this oplrun executable')
+    args = parser.parse_args()
+
+    reducer = BomStructureReducer(args.output_dir, nb_supp=args.suppliers)
+    report = reducer.run(args.instances, args.oplrun)
+    if args.oplrun and (report['objective_match'] == 0).any():
+        print("Objective mismatch after symmetry breaking - see bom_reduction_report.csv")
+        return 1
+    print(f"Wrote {len(report)} rows to {Path(args.output_dir) / 'bom_reduction_report.csv'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+DDMRP zone sizing of every positioned buffer of a campaign
+
+The models decide where the buffers go (X) and the decoupled lead time a of every
+node, and cost a buffer by its average on-hand inventory. This tool sizes the
+zones of every buffered node of every logged run with the usual DDMRP rules:
+
+    ADU          = rqtf * adup                      (daily usage of the node)
+    red_base     = ADU * a * lt_factor
+    red_safety   = red_base * var_factor
+    yellow       = ADU * a
+    green        = max(ADU * a * lt_factor, minOrder, ADU * cycle)
+    top_of_green = red_base + red_safety + yellow + green
+    avg_on_hand  = red_base + red_safety + green / 2
+
+When the lead-time term sets the green zone, avg_on_hand is the model's holding
+base (1.5 + var_factor) * lt_factor * rqtf * adup * a; minOrder and the order cycle
+can only make it larger, which model_gap reports per run.
+
+The decisions of all runs of an instance configuration are stacked into (runs x
+nodes) arrays (SolutionEvaluator.batches), so all zones come out of one array
+expression per configuration. buffer_zones.csv has one row per buffer and
+buffer_working_capital.csv one row per run with the zone values at unit_price and
+the working capital tied up on average (avg_on_hand value). Both are written next
+to consolidated_results.csv (next to the unpacked directory of an archive).
+
+Usage:
+    python BufferZoneSizer.py logs/final_campaign_YYYYMMDD_HHMMSS [--output-dir DIR]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from SolutionEvaluator import InstanceCoefficients, SolutionEvaluator
+from SupplierDominancePruner import DATA_DIR
+
+ZONES = ('red_base', 'red_safety', 'yellow', 'green', 'top_of_green', 'avg_on_hand')
+RUN_COLUMNS = ['run_id', 'experiment', 'instance_id', 'strategy', 'model_type', 'service_time_promised',
+               'suppliers_available']
+
+
+def size_zones(model: InstanceCoefficients, a, x) -> dict:
+    """Zone sizes in units, as (runs, nodes) arrays; nodes without a buffer are zero."""
+    a, x = np.asarray(a, dtype=np.float64), np.asarray(x, dtype=np.float64)
+    buffered = x > 0.5
+    adu = model.daily_usage
+    red_base = adu * a * model.lt_factor
+    red_safety = red_base * model.var_factor
+    yellow = adu * a
+    green = np.maximum(np.maximum(red_base, model.min_order), adu * model.order_cycle)
+    zones = {
+        'red_base': red_base,
+        'red_safety': red_safety,
+        'yellow': yellow,
+        'green': green,
+        'top_of_green': red_base + red_safety + yellow + green,
+        'avg_on_hand': red_base + red_safety + green / 2.0,
+    }
+    return {key: np.where(buffered, value, 0.0) for key, value in zones.items()}
+
+
+class BufferZoneSizer:
+    """Zone tables and working capital of every logged run of a campaign."""
+
+    def __init__(self, campaign, data_dir: Path = DATA_DIR):
+        self.evaluator = SolutionEvaluator(campaign, data_dir)
+
+    def tables(self) -> tuple:
+        """(per-buffer zones, per-run working capital)."""
+        buffers, runs = [], []
+        for model, frame, a, x, _, _, _ in self.evaluator.batches():
+            zones = size_zones(model, a, x)
+            value = {key: zones[key] * model.unit_price for key in ZONES}
+            model_holding = np.where(x > 0.5, model.buffer_scale * a, 0.0) * model.unit_price
+            summary = frame[RUN_COLUMNS].reset_index(drop=True)
+            summary['supp_details_file'] = model.supp_details_file
+            summary['buffers'] = (x > 0.5).sum(axis=1)
+            for key in ZONES[:-1]:
+                summary[f'{key}_value'] = value[key].sum(axis=1)
+            summary['avg_on_hand_units'] = zones['avg_on_hand'].sum(axis=1)
+            summary['working_capital'] = value['avg_on_hand'].sum(axis=1)
+            summary['model_holding_value'] = model_holding.sum(axis=1)
+            summary['model_gap'] = summary['working_capital'] - summary['model_holding_value']
+            runs.append(summary)
+
+            run_idx, nodes = np.nonzero(x > 0.5)
+            table = pd.DataFrame({'run_id': frame['run_id'].to_numpy()[run_idx], 'node': nodes,
+                                  'ADU': model.daily_usage[nodes], 'DLT': a[run_idx, nodes],
+                                  'unit_price': model.unit_price[nodes]})
+            for key in ZONES:
+                table[key] = zones[key][run_idx, nodes]
+            table['avg_on_hand_value'] = value['avg_on_hand'][run_idx, nodes]
+            buffers.append(table)
+        buffers = pd.concat(buffers, ignore_index=True) if buffers else pd.DataFrame(columns=['run_id', 'node'])
+        runs = pd.concat(runs, ignore_index=True) if runs else pd.DataFrame(columns=RUN_COLUMNS)
+        return (buffers.sort_values(['run_id', 'node'], kind='stable').reset_index(drop=True),
+                runs.sort_values('run_id', kind='stable').reset_index(drop=True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='DDMRP zone sizing of the buffers of every logged run')
+    parser.add_argument('campaign', help='results directory or campaign archive')
+    parser.add_argument('--output-dir', help='defaults to the campaign directory (or next to an archive)')
+    args = parser.parse_args()
+
+    sizer = BufferZoneSizer(args.campaign)
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
+    elif sizer.evaluator.campaign.archive:
+        from CampaignArchive import unpacked_dir
+        output_dir = unpacked_dir(args.campaign)
+    else:
+        output_dir = Path(args.campaign)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    buffers, runs = sizer.tables()
+    if runs.empty:
+        print("No logged run with decision vectors", file=sys.stderr)
+        return 1
+    buffers.to_csv(output_dir / 'buffer_zones.csv', index=False)
+    runs.to_csv(output_dir / 'buffer_working_capital.csv', index=False)
+    print(f"Sized {len(buffers)} buffers of {len(runs)} runs; "
+          f"working capital {runs['working_capital'].min():.6g} .. {runs['working_capital'].max():.6g}")
+    print(f"Wrote buffer_zones.csv and buffer_working_capital.csv to {output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
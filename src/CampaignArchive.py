@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Compact a final-campaign results directory into a single indexed archive
+
+A campaign directory (logs/final_campaign_*) is dominated by the print_r run logs
+(~400 files, ~19 MB for the June 2026 campaign) which repeat the same layout and
+oplrun output run after run. pack stores it as one zip file (<campaign>.campaign.zip):
+
+- manifest.json: every original file with its size and sha256, the run_id index
+  (log file, consolidated_results.csv row, decision-vector slot) and the layout;
+- blocks/NNNNN.xz: the text files, sorted by path and concatenated into LZMA
+  blocks of a few MB, so similar runs compress against each other while one file
+  is still reachable by decompressing a single block;
+- files/...: figures, which are already compressed and kept as plain members;
+- columns.npz: consolidated_results.csv and tables/*.csv stored column by column;
+- vectors.npz: the A, X, Z and Q vectors of every log, concatenated per key with
+  run offsets (CSR layout), so a decision vector is an O(1) slice.
+
+Every original file is reconstructed byte for byte (cat / unpack), and pack checks
+this before it returns. PNG figures are rasters of the PDFs, which GraphGenerator
+rebuilds from the archive, so pack omits them unless --figures all is given; the
+omitted files stay listed in the manifest.
+
+GraphGenerator.py and generate_article_tables.py accept an archive in place of the
+results directory; their outputs go to the sibling directory named after the
+campaign (logs/final_campaign_X.campaign.zip -> logs/final_campaign_X/).
+
+Usage:
+    python CampaignArchive.py pack logs/final_campaign_YYYYMMDD_HHMMSS [--figures vector]
+    python CampaignArchive.py info logs/final_campaign_YYYYMMDD_HHMMSS.campaign.zip
+    python CampaignArchive.py cat <archive> consolidated_results.csv|<run_id>
+    python CampaignArchive.py unpack <archive> [target_dir]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import io
+import json
+import lzma
+import re
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+ARCHIVE_SUFFIX = '.campaign.zip'
+FORMAT_VERSION = 1
+BLOCK_BYTES = 4 << 20
+VECTOR_KEYS = ('A', 'X', 'Z', 'Q')
+COLUMNAR_PATTERNS = ('consolidated_results.csv', 'tables/*.csv')
+BINARY_SUFFIXES = {'.png', '.pdf', '.jpg', '.jpeg', '.gz', '.zip'}
+FIGURE_MODES = {'all': (), 'vector': ('.png',), 'none': ('.png', '.pdf')}
+CACHED_BLOCKS = 4
+
+
+def is_archive(path) -> bool:
+    """True for a packed campaign file (as opposed to a results directory)."""
+    path = Path(path)
+    return path.is_file() and zipfile.is_zipfile(path)
+
+
+def archive_path(results_dir) -> Path:
+    return Path(results_dir).with_name(Path(results_dir).name + ARCHIVE_SUFFIX)
+
+
+def unpacked_dir(path) -> Path:
+    """Directory that outputs derived from an archive (figures, tables_tex) go to."""
+    path = Path(path)
+    name = path.name[:-len(ARCHIVE_SUFFIX)] if path.name.endswith(ARCHIVE_SUFFIX) else path.stem
+    return path.with_name(name)
+
+
+def parse_vectors(text: str) -> dict:
+    """Top-level numeric print_r arrays of a run log, e.g. {'A': [0.0, 2.0, ...]}."""
+    vectors = {}
+    for key in VECTOR_KEYS:
+        match = re.search(r'^    \[' + key + r'\] => Array\s*\(\n(.*?)^\s*\)', text, re.M | re.S)
+        if not match:
+            continue
+        values = re.findall(r'^\s+\[\d+\] => (.*)$', match.group(1), re.M)
+        try:
+            vectors[key] = [float(value.strip().replace(',', '.')) for value in values]
+        except ValueError:
+            continue
+    return vectors
+
+
+def frame_columns(frame: pd.DataFrame) -> tuple:
+    """Split a DataFrame into plain NumPy arrays plus the dtypes to restore it."""
+    arrays, layout = {}, []
+    for i, name in enumerate(frame.columns):
+        column = frame[name]
+        if pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column):
+            arrays[f'c{i}'] = column.to_numpy()
+        else:
+            mask = column.isna().to_numpy()
+            arrays[f'c{i}'] = np.array(['' if m else str(v) for v, m in zip(column, mask)], dtype=str)
+            arrays[f'm{i}'] = mask
+        layout.append({'name': str(name), 'dtype': str(column.dtype)})
+    return arrays, layout
+
+
+def columns_frame(arrays, prefix: str, layout: list) -> pd.DataFrame:
+    data = {}
+    for i, column in enumerate(layout):
+        values = arrays[f'{prefix}c{i}']
+        if f'{prefix}m{i}' in arrays:
+            series = pd.Series(values.astype(object))
+            series[arrays[f'{prefix}m{i}']] = np.nan
+            data[column['name']] = series.astype(column['dtype'])
+        else:
+            data[column['name']] = pd.Series(values, dtype=column['dtype'])
+    return pd.DataFrame(data)
+
+
+class CampaignArchive:
+    """Read access to a packed campaign; paths are relative to the results directory."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.zip = zipfile.ZipFile(self.path)
+        self.manifest = json.loads(self.zip.read('manifest.json'))
+        if self.manifest.get('format', 0) > FORMAT_VERSION:
+            raise ValueError(f"{self.path} uses archive format {self.manifest['format']}")
+        self.files = self.manifest['files']
+        self.runs = self.manifest['runs']
+        self._blocks = {}
+        self._columns = None
+        self._vectors = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.zip.close()
+
+    @property
+    def name(self) -> str:
+        return self.manifest['campaign']
+
+    def names(self) -> list:
+        """Stored files (omitted figures excluded)."""
+        return sorted(name for name, entry in self.files.items() if not entry.get('omitted'))
+
+    def exists(self, relpath) -> bool:
+        relpath = Path(relpath).as_posix().strip('/')
+        return any(name == relpath or name.startswith(relpath + '/') for name in self.names())
+
+    def glob(self, pattern: str) -> list:
+        """Stored files matching a pattern such as 'pareto/*_pareto.csv'."""
+        return [name for name in self.names()
+                if fnmatch.fnmatch(name, pattern) and name.count('/') == pattern.count('/')]
+
+    def _block(self, index: int) -> bytes:
+        if index not in self._blocks:
+            if len(self._blocks) >= CACHED_BLOCKS:
+                self._blocks.pop(next(iter(self._blocks)))
+            self._blocks[index] = lzma.decompress(self.zip.read(self.manifest['blocks'][index]))
+        return self._blocks[index]
+
+    def read_bytes(self, relpath) -> bytes:
+        entry = self.files.get(Path(relpath).as_posix())
+        if entry is None or entry.get('omitted'):
+            raise FileNotFoundError(f"{relpath} is not stored in {self.path}")
+        if 'member' in entry:
+            return self.zip.read(entry['member'])
+        return self._block(entry['block'])[entry['offset']:entry['offset'] + entry['size']]
+
+    def read_text(self, relpath, encoding: str = 'utf-8', errors: str = 'replace') -> str:
+        return self.read_bytes(relpath).decode(encoding, errors)
+
+    def frame(self, relpath):
+        """Columnar copy of a CSV as a DataFrame, or None if it was not stored that way."""
+        layout = self.manifest['columns'].get(Path(relpath).as_posix())
+        if layout is None:
+            return None
+        if self._columns is None:
+            self._columns = np.load(io.BytesIO(self.zip.read('columns.npz')), allow_pickle=False)
+        return columns_frame(self._columns, layout['prefix'], layout['columns'])
+
+    def read_csv(self, relpath, **kwargs) -> pd.DataFrame:
+        """pd.read_csv on a stored file; default reads come from the columnar copy."""
+        frame = None if kwargs else self.frame(relpath)
+        if frame is not None:
+            return frame
+        return pd.read_csv(io.BytesIO(self.read_bytes(relpath)), **kwargs)
+
+    def run_ids(self) -> list:
+        return sorted(self.runs)
+
+    def log_text(self, run_id: str):
+        """Log of a run, or None for a consolidated row without one."""
+        relpath = self.runs[run_id]['log']
+        return None if relpath is None else self.read_text(relpath)
+
+    def vectors(self, run_id: str) -> dict:
+        """Decision vectors A, X, Z, Q of a run as NumPy arrays (missing keys omitted)."""
+        if self._vectors is None:
+            self._vectors = np.load(io.BytesIO(self.zip.read('vectors.npz')), allow_pickle=False)
+        slot = self.runs[run_id]['vector']
+        result = {}
+        if slot is None:
+            return result
+        for key in VECTOR_KEYS:
+            start, end = self._vectors[f'{key}_offsets'][slot:slot + 2]
+            if self._vectors[f'{key}_present'][slot]:
+                result[key] = self._vectors[f'{key}_values'][start:end]
+        return result
+
+    def row(self, run_id: str):
+        """consolidated_results.csv row of a run, or None for logs without one."""
+        index = self.runs[run_id]['row']
+        if index is None:
+            return None
+        return self.read_csv('consolidated_results.csv').iloc[index]
+
+    def extract(self, target_dir) -> int:
+        target_dir = Path(target_dir)
+        count = 0
+        for relpath, entry in self.files.items():
+            if entry.get('omitted'):
+                continue
+            target = target_dir / relpath
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(self.read_bytes(relpath))
+            count += 1
+        return count
+
+
+def pack_campaign(results_dir, output=None, figures: str = 'vector', block_bytes: int = BLOCK_BYTES) -> dict:
+    """Write the archive of a results directory and check that it reads back exactly."""
+    results_dir = Path(results_dir)
+    output = Path(output) if output else archive_path(results_dir)
+    omit_suffixes = FIGURE_MODES[figures]
+    paths = sorted(p for p in results_dir.rglob('*') if p.is_file())
+    relpaths = [p.relative_to(results_dir).as_posix() for p in paths]
+
+    files, blocks, runs = {}, [], {}
+    vectors = {key: ([], [0], []) for key in VECTOR_KEYS}
+    column_arrays, column_layout = {}, {}
+    consolidated = None
+    block, block_size = [], 0
+
+    def flush(zf):
+        nonlocal block, block_size
+        if block:
+            name = f'blocks/{len(blocks):05d}.xz'
+            zf.writestr(name, lzma.compress(b''.join(block), preset=9),
+                        compress_type=zipfile.ZIP_STORED)
+            blocks.append(name)
+        block, block_size = [], 0
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with zipfile.ZipFile(output, 'w') as zf:
+        for path, relpath in zip(paths, relpaths):
+            data = path.read_bytes()
+            entry = {'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+            files[relpath] = entry
+            suffix = path.suffix.lower()
+            if relpath.startswith('figures/') and suffix in omit_suffixes:
+                entry['omitted'] = True
+                continue
+            if suffix in BINARY_SUFFIXES:
+                entry['member'] = 'files/' + relpath
+                zf.writestr(entry['member'], data, compress_type=zipfile.ZIP_DEFLATED)
+                continue
+            if block_size and block_size + len(data) > block_bytes:
+                flush(zf)
+            entry['block'], entry['offset'] = len(blocks), block_size
+            block.append(data)
+            block_size += len(data)
+
+            if relpath.startswith('logs/') and suffix == '.log':
+                parsed = parse_vectors(data.decode('utf-8', errors='replace'))
+                for key, (values, offsets, present) in vectors.items():
+                    values.extend(parsed.get(key, []))
+                    offsets.append(len(values))
+                    present.append(key in parsed)
+                runs[path.stem] = {'log': relpath, 'row': None, 'vector': len(runs)}
+            if any(fnmatch.fnmatch(relpath, pattern) for pattern in COLUMNAR_PATTERNS):
+                frame = pd.read_csv(io.BytesIO(data))
+                arrays, layout = frame_columns(frame)
+                prefix = f'f{len(column_layout)}_'
+                restored = columns_frame({prefix + k: v for k, v in arrays.items()}, prefix, layout)
+                try:
+                    pd.testing.assert_frame_equal(restored, frame)
+                except AssertionError:
+                    continue
+                column_arrays.update({prefix + k: v for k, v in arrays.items()})
+                column_layout[relpath] = {'prefix': prefix, 'columns': layout}
+                if relpath == 'consolidated_results.csv':
+                    consolidated = frame
+        flush(zf)
+
+        if consolidated is not None and 'run_id' in consolidated.columns:
+            for index, run_id in enumerate(consolidated['run_id'].astype(str)):
+                runs.setdefault(run_id, {'log': None, 'row': None, 'vector': None})['row'] = index
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer, **column_arrays)
+        zf.writestr('columns.npz', buffer.getvalue(), compress_type=zipfile.ZIP_STORED)
+        buffer = io.BytesIO()
+        vector_arrays = {}
+        for key, (values, offsets, present) in vectors.items():
+            vector_arrays[f'{key}_values'] = np.asarray(values, dtype=np.float64)
+            vector_arrays[f'{key}_offsets'] = np.asarray(offsets, dtype=np.int64)
+            vector_arrays[f'{key}_present'] = np.asarray(present, dtype=bool)
+        np.savez_compressed(buffer, **vector_arrays)
+        zf.writestr('vectors.npz', buffer.getvalue(), compress_type=zipfile.ZIP_STORED)
+
+        manifest = {
+            'format': FORMAT_VERSION,
+            'campaign': results_dir.name,
+            'packed_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'figures': figures,
+            'files': files,
+            'blocks': blocks,
+            'columns': column_layout,
+            'runs': runs,
+        }
+        zf.writestr('manifest.json', json.dumps(manifest, indent=1), compress_type=zipfile.ZIP_DEFLATED)
+
+    with CampaignArchive(output) as archive:
+        for relpath, entry in files.items():
+            if not entry.get('omitted'):
+                if hashlib.sha256(archive.read_bytes(relpath)).hexdigest() != entry['sha256']:
+                    raise RuntimeError(f"{relpath} does not round-trip through {output}")
+
+    original = sum(entry['size'] for entry in files.values())
+    return {'archive': output, 'files': len(files), 'runs': len(runs),
+            'omitted': sum(1 for entry in files.values() if entry.get('omitted')),
+            'original_bytes': original, 'archive_bytes': output.stat().st_size}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack and read campaign results archives')
+    sub = parser.add_subparsers(dest='command', required=True)
+    pack = sub.add_parser('pack', help='compact a results directory into one archive')
+    pack.add_argument('results_dir')
+    pack.add_argument('--output', help=f'archive path (default: <results_dir>{ARCHIVE_SUFFIX})')
+    pack.add_argument('--figures', choices=sorted(FIGURE_MODES), default='vector',
+                      help='figures to keep: all, vector (PDF only) or none')
+    pack.add_argument('--block-mb', type=float, default=BLOCK_BYTES / (1 << 20),
+                      help='uncompressed size of a text block')
+    info = sub.add_parser('info', help='summarise an archive')
+    info.add_argument('archive')
+    cat = sub.add_parser('cat', help='print a stored file or the log of a run_id')
+    cat.add_argument('archive')
+    cat.add_argument('name')
+    unpack = sub.add_parser('unpack', help='restore the original results directory')
+    unpack.add_argument('archive')
+    unpack.add_argument('target_dir', nargs='?')
+    args = parser.parse_args()
+
+    if args.command == 'pack':
+        started = time.time()
+        summary = pack_campaign(args.results_dir, args.output, args.figures, int(args.block_mb * (1 << 20)))
+        ratio = summary['original_bytes'] / max(summary['archive_bytes'], 1)
+        print(f"Packed {summary['files']} files ({summary['runs']} runs, {summary['omitted']} omitted) "
+              f"in {time.time() - started:.1f}s")
+        print(f"  {summary['original_bytes'] / 1e6:.1f} MB -> {summary['archive_bytes'] / 1e6:.2f} MB "
+              f"({ratio:.1f}x): {summary['archive']}")
+        return 0
+
+    with CampaignArchive(args.archive) as archive:
+        if args.command == 'info':
+            stored = [e for e in archive.files.values() if not e.get('omitted')]
+            print(f"{archive.name}: format {archive.manifest['format']}, packed {archive.manifest['packed_at']}")
+            print(f"  {len(stored)} files ({sum(e['size'] for e in stored) / 1e6:.1f} MB), "
+                  f"{len(archive.files) - len(stored)} omitted, {len(archive.manifest['blocks'])} blocks")
+            print(f"  {len(archive.runs)} runs, columnar: {', '.join(archive.manifest['columns'])}")
+            return 0
+        if args.command == 'cat':
+            if args.name in archive.names():
+                data = archive.read_bytes(args.name)
+            elif args.name in archive.runs and archive.runs[args.name]['log']:
+                data = archive.read_bytes(archive.runs[args.name]['log'])
+            else:
+                print(f"{args.name}: no such file or run in {archive.path}", file=sys.stderr)
+                return 1
+            sys.stdout.buffer.write(data)
+            return 0
+        target = Path(args.target_dir) if args.target_dir else unpacked_dir(archive.path)
+        count = archive.extract(target)
+        print(f"Restored {count} files to {target}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Regression diff between final campaigns
+
+Joins the consolidated_results.csv of two or more campaigns (results directories
+or CampaignArchive files) on run_id and flags, for each consecutive pair:
+
+- OBJECTIVE_CHANGED   both runs solved and |delta| > abs_tol + rel_tol * |baseline|
+- RUNTIME_REGRESSION  runtime ratio above --runtime-ratio and slower by more than
+                      --runtime-min-sec (small runs jitter by fractions of a second)
+- STATUS_CHANGED      solver_status differs
+- ADMISSIBILITY_LOST / ADMISSIBILITY_GAINED   comparison_admissible flips
+- DECISION_CHANGED    A, X, Z or Q differ between the run logs (when both have them)
+- RUN_MISSING / RUN_ADDED   run_id only in the baseline / only in the candidate
+
+All checks are vectorised merges over the result tables; only the decision check
+reads logs, and it reads the vectors.npz of an archive directly. The report is
+JSON (thresholds, counts per flag, flagged runs); --csv also writes every joined
+run. The exit code is 1 when a gating flag (--fail-on) is raised, so the diff can
+gate a model or solver-setting change in CI.
+
+Usage:
+    python CampaignDiff.py logs/final_campaign_A logs/final_campaign_B [more ...]
+        [--runtime-ratio 1.5] [--runtime-min-sec 1] [--objective-rel-tol 1e-4]
+        [--output campaign_diff.json] [--csv campaign_diff.csv] [--no-decisions]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from CampaignArchive import VECTOR_KEYS, CampaignArchive, is_archive, parse_vectors
+from RunOutput import COMPARISON_GAP_THRESHOLD_PCT, admissible_status
+
+
+SOLVED_STATUSES = {'OPTIMAL', 'FEASIBLE'}
+FLAGS = ('OBJECTIVE_CHANGED', 'RUNTIME_REGRESSION', 'STATUS_CHANGED', 'ADMISSIBILITY_LOST',
+         'ADMISSIBILITY_GAINED', 'DECISION_CHANGED', 'RUN_MISSING', 'RUN_ADDED')
+DEFAULT_FAIL_ON = ('OBJECTIVE_CHANGED', 'RUNTIME_REGRESSION', 'STATUS_CHANGED',
+                   'ADMISSIBILITY_LOST', 'RUN_MISSING')
+KEY_COLUMNS = ('experiment', 'instance_id', 'strategy', 'model_type')
+COMPARED_COLUMNS = ('solver_status', 'objective_value', 'runtime_sec', 'mip_gap', 'admissible')
+
+
+def admissible_mask(frame: pd.DataFrame, gap_threshold: float = COMPARISON_GAP_THRESHOLD_PCT) -> pd.Series:
+    """comparison_admissible, or admissible_status of the solver status and gap for older campaigns."""
+    if 'comparison_admissible' in frame.columns:
+        values = frame['comparison_admissible'].astype(str).str.strip().str.lower()
+        return values.isin(['1', '1.0', 'true', 'yes'])
+    status = frame['solver_status'].astype(str).str.strip().str.upper()
+    gap = pd.to_numeric(frame.get('mip_gap', pd.Series(np.nan, index=frame.index)), errors='coerce')
+    return admissible_status(status, gap, gap_threshold)
+
+
+class CampaignResults:
+    """consolidated_results.csv of a campaign plus on-demand access to run decisions."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.archive = CampaignArchive(self.path) if is_archive(self.path) else None
+        if self.archive:
+            frame = self.archive.read_csv('consolidated_results.csv')
+        else:
+            frame = pd.read_csv(self.path / 'consolidated_results.csv')
+        frame = frame.drop_duplicates('run_id', keep='last').copy()
+        frame['run_id'] = frame['run_id'].astype(str)
+        frame['solver_status'] = frame['solver_status'].astype(str).str.strip().str.upper()
+        for column in ('objective_value', 'runtime_sec', 'mip_gap'):
+            frame[column] = pd.to_numeric(frame.get(column), errors='coerce')
+        frame['admissible'] = admissible_mask(frame)
+        for column in KEY_COLUMNS:
+            if column not in frame.columns:
+                frame[column] = ''
+        self.frame = frame[['run_id', *KEY_COLUMNS, *COMPARED_COLUMNS]]
+
+    @property
+    def name(self) -> str:
+        return self.archive.name if self.archive else self.path.name
+
+    def logged_runs(self) -> set:
+        """run_ids whose decision vectors can be read."""
+        if self.archive:
+            return {run_id for run_id, entry in self.archive.runs.items() if entry['vector'] is not None}
+        logs = self.path / 'logs'
+        return {path.stem for path in logs.glob('*.log')} if logs.is_dir() else set()
+
+    def log_text(self, run_id: str) -> str:
+        """Run log of a run, or '' when it is not available."""
+        if self.archive:
+            return (self.archive.log_text(run_id) or '') if run_id in self.archive.runs else ''
+        log = self.path / 'logs' / f'{run_id}.log'
+        return log.read_text(encoding='utf-8', errors='replace') if log.exists() else ''
+
+    def decisions(self, run_id: str) -> dict:
+        """Decision vectors of a run, or {} when its log is not available."""
+        if self.archive:
+            return self.archive.vectors(run_id) if run_id in self.archive.runs else {}
+        return {key: np.asarray(values) for key, values in parse_vectors(self.log_text(run_id)).items()}
+
+
+def changed_decisions(base: dict, cand: dict) -> str:
+    changed = [key for key in VECTOR_KEYS if key in base and key in cand
+               and (len(base[key]) != len(cand[key]) or not np.allclose(base[key], cand[key]))]
+    return '|'.join(changed)
+
+
+def diff_results(baseline: CampaignResults, candidate: CampaignResults, objective_abs_tol: float = 1e-6,
+                 objective_rel_tol: float = 1e-4, runtime_ratio: float = 1.5, runtime_min_sec: float = 1.0,
+                 decisions: bool = True) -> pd.DataFrame:
+    """One row per run_id of either campaign with the comparison flags ('|'-separated)."""
+    base = baseline.frame.rename(columns={c: c + '_base' for c in COMPARED_COLUMNS})
+    cand = candidate.frame.rename(columns={c: c + '_cand' for c in COMPARED_COLUMNS})
+    joined = base.merge(cand, on='run_id', how='outer', suffixes=('', '_c'), indicator=True)
+    for column in KEY_COLUMNS:
+        joined[column] = joined[column].fillna(joined.pop(column + '_c'))
+    in_base = joined['_merge'] != 'right_only'
+    in_cand = joined['_merge'] != 'left_only'
+    both = in_base & in_cand
+
+    solved = (joined['solver_status_base'].isin(SOLVED_STATUSES)
+              & joined['solver_status_cand'].isin(SOLVED_STATUSES))
+    joined['objective_delta'] = joined['objective_value_cand'] - joined['objective_value_base']
+    tolerance = objective_abs_tol + objective_rel_tol * joined['objective_value_base'].abs()
+    joined['runtime_ratio'] = joined['runtime_sec_cand'] / joined['runtime_sec_base'].where(
+        joined['runtime_sec_base'] > 0)
+    runtime_delta = joined['runtime_sec_cand'] - joined['runtime_sec_base']
+    admissible_base = joined['admissible_base'].astype('boolean').fillna(False)
+    admissible_cand = joined['admissible_cand'].astype('boolean').fillna(False)
+
+    masks = {
+        'OBJECTIVE_CHANGED': both & solved & (joined['objective_delta'].abs() > tolerance),
+        'RUNTIME_REGRESSION': both & (joined['runtime_ratio'] > runtime_ratio) & (runtime_delta > runtime_min_sec),
+        'STATUS_CHANGED': both & (joined['solver_status_base'] != joined['solver_status_cand']),
+        'ADMISSIBILITY_LOST': both & admissible_base & ~admissible_cand,
+        'ADMISSIBILITY_GAINED': both & ~admissible_base & admissible_cand,
+        'RUN_MISSING': ~in_cand,
+        'RUN_ADDED': ~in_base,
+    }
+    changes = {}
+    if decisions:
+        logged = baseline.logged_runs() & candidate.logged_runs()
+        for run_id in joined.loc[both & solved & joined['run_id'].isin(logged), 'run_id']:
+            changes[run_id] = changed_decisions(baseline.decisions(run_id), candidate.decisions(run_id))
+    joined['decision_changes'] = joined['run_id'].map(changes).fillna('')
+    masks['DECISION_CHANGED'] = joined['decision_changes'] != ''
+
+    flags = pd.Series('', index=joined.index)
+    for flag in FLAGS:
+        flags = flags.mask(masks[flag].to_numpy(dtype=bool), flags + '|' + flag)
+    joined['flags'] = flags.str.lstrip('|')
+    joined.insert(0, 'baseline', baseline.name)
+    joined.insert(1, 'candidate', candidate.name)
+    return joined.drop(columns='_merge').sort_values('run_id', kind='stable').reset_index(drop=True)
+
+
+def summarize(diff: pd.DataFrame, fail_on) -> dict:
+    counts = {flag: int(diff['flags'].str.contains(flag, regex=False).sum()) for flag in FLAGS}
+    flagged = diff[diff['flags'] != '']
+    return {
+        'baseline': diff['baseline'].iloc[0] if len(diff) else None,
+        'candidate': diff['candidate'].iloc[0] if len(diff) else None,
+        'runs_compared': int((diff['solver_status_base'].notna() & diff['solver_status_cand'].notna()).sum()),
+        'counts': counts,
+        'failed': any(counts[flag] for flag in fail_on),
+        'runs': json.loads(flagged.drop(columns=['baseline', 'candidate']).to_json(orient='records')),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Regression diff between final campaigns')
+    parser.add_argument('campaigns', nargs='+', help='results directories or archives, oldest first')
+    parser.add_argument('--objective-abs-tol', type=float, default=1e-6)
+    parser.add_argument('--objective-rel-tol', type=float, default=1e-4,
+                        help='relative objective tolerance (CPLEX default relative MIP gap)')
+    parser.add_argument('--runtime-ratio', type=float, default=1.5)
+    parser.add_argument('--runtime-min-sec', type=float, default=1.0)
+    parser.add_argument('--no-decisions', action='store_true', help='skip the log-based decision check')
+    parser.add_argument('--fail-on', default=','.join(DEFAULT_FAIL_ON),
+                        help='comma-separated flags that make the exit code non-zero')
+    parser.add_argument('--output', default='campaign_diff.json')
+    parser.add_argument('--csv', help='also write every joined run to this CSV')
+    args = parser.parse_args()
+
+    if len(args.campaigns) < 2:
+        parser.error('at least two campaigns are needed')
+    fail_on = [flag.strip() for flag in args.fail_on.split(',') if flag.strip()]
+    unknown = set(fail_on) - set(FLAGS)
+    if unknown:
+        parser.error(f"unknown flags: {', '.join(sorted(unknown))}")
+
+    results = [CampaignResults(path) for path in args.campaigns]
+    comparisons, diffs = [], []
+    for baseline, candidate in zip(results, results[1:]):
+        diff = diff_results(baseline, candidate, args.objective_abs_tol, args.objective_rel_tol,
+                            args.runtime_ratio, args.runtime_min_sec, not args.no_decisions)
+        diffs.append(diff)
+        summary = summarize(diff, fail_on)
+        comparisons.append(summary)
+        counts = ', '.join(f'{flag}={count}' for flag, count in summary['counts'].items() if count)
+        print(f"{baseline.name} -> {candidate.name}: {summary['runs_compared']} runs, {counts or 'no changes'}")
+
+    report = {
+        'thresholds': {'objective_abs_tol': args.objective_abs_tol, 'objective_rel_tol': args.objective_rel_tol,
+                       'runtime_ratio': args.runtime_ratio, 'runtime_min_sec': args.runtime_min_sec,
+                       'decisions': not args.no_decisions, 'fail_on': fail_on},
+        'failed': any(summary['failed'] for summary in comparisons),
+        'comparisons': comparisons,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f"Wrote {args.output}")
+    if args.csv:
+        pd.concat(diffs, ignore_index=True).to_csv(args.csv, index=False)
+        print(f"Wrote {args.csv}")
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
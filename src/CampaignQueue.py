@@ -0,0 +1,878 @@
+#!/usr/bin/env python3
+"""
+Broker-less file queue for running a campaign on several solver nodes
+
+FinalCampaignRunner executes its runs one after the other on one machine. Here
+the runConfigs of a campaign (as built by FinalCampaignRunner, see
+ModelInstantiator) are turned into job files in a queue directory on a shared
+filesystem, and any number of workers on any node drain it:
+
+    queue/plan.json                          campaign plan (enqueue --manifest)
+
+    queue/pending/<run_id>.json              waiting jobs
+    queue/claimed/<run_id>@<worker>.json     running jobs; the file mtime is the lease
+    queue/done/<run_id>.json                 finished jobs with their table row
+    queue/failed/<run_id>.json               jobs whose lease expired max-attempts times
+    queue/lock/                              mkdir lock for tables/ and reclaims
+
+A worker claims a job with an atomic rename from pending/ to its own name in
+claimed/ (the loser of a race gets FileNotFoundError and tries the next job), and
+a heartbeat thread touches the claimed file while oplrun runs. An oplrun still
+running OPLRUN_TIMEOUT_MARGIN seconds past the time limit is killed and its run
+recorded as TIMEOUT. Any worker renames
+claimed files older than the lease TTL back to pending/ (or to failed/), so the
+runs of a dead node are picked up again. A worker that lost its lease notices it
+when its claimed file is gone and discards its result.
+
+Every run is instantiated with ModelInstantiator and run as `oplrun model dat`.
+The output is parsed like CplexRunner::parse (RunOutput) and written exactly as
+FinalCampaignRunner::executeSingleRun does, to logs/<run_id>.log (print_r of the
+parsed result), and its KPI row is appended to tables/<experiment>_results.csv
+with the KPICalculator headers. The baseline-relative columns (baseline
+emissions, reductions, improvements) stay empty: they need the instance baseline,
+which the sequential runner solves first. collect rewrites the tables in campaign
+order, writes consolidated_results.csv once the queue is drained and fills those
+columns with CampaignRebaseline.
+
+With --tree-dp a worker first hands every plain PLM run to TreeDPSolver: when the
+tree DP settles it exactly (status OPTIMAL, e.g. single-sourced baselines whose
+suppliers can each carry a whole leaf order) the DP plan is logged and tabulated
+through the same print_r / KPI path and oplrun is not started; any other run is
+solved by oplrun as usual.
+
+enqueue takes runConfigs, or with --manifest the run_manifest.json written by
+FinalCampaignRunner (--export-plan writes it without solving). CampaignPlan rebuilds
+the runConfigs of its consolidated runs as the run* phases of the runner do, from
+the campaign config. A run whose config needs a solved run (the cap values need the
+instance's lexicographic baseline) waits in the plan: whenever a worker finds no
+pending job it expands the plan with the runs that became buildable, so a single
+enqueue drains the whole campaign. The NLM runs of nlm_comparison likewise wait for
+their PLM twin and are seeded from its solution (NLMWarmStart, see
+ModelInstantiator.seed_nlm_run_config); one the PLM run certifies (skip_certified)
+is recorded as inferred without solving, as the runner does. Cap and hybrid cells
+are all solved (no monotone-cap inference), and the multi-objective and
+decision-stability runs, which need the runner's anchors, are not part of the plan.
+
+Leases are compared against the local clock, so keep the node clocks in sync
+(NTP) and the TTL well above the heartbeat interval.
+
+Usage:
+    python CampaignQueue.py enqueue QUEUE_DIR runs.json
+    python CampaignQueue.py enqueue QUEUE_DIR --manifest RESULTS_DIR/run_manifest.json [--config CONFIG]
+    python CampaignQueue.py work QUEUE_DIR RESULTS_DIR --oplrun PATH [--lease-ttl 600] [--heartbeat 30] [--tree-dp]
+    python CampaignQueue.py status QUEUE_DIR
+    python CampaignQueue.py collect QUEUE_DIR RESULTS_DIR
+
+Requires: pandas (plan data files, collect and --tree-dp; numpy too), the rest is standard library
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from ModelInstantiator import (
+    CERTIFIED_GAP_PCT, DEFAULT_TIME_LIMIT, OPLRUN_TIMEOUT_MARGIN, ModelInstantiator, read_run_configs,
+    seed_nlm_run_config,
+)
+from RunOutput import (
+    COMPARISON_GAP_THRESHOLD_PCT, admissible_status, csv_line, numeric, parse_output, print_r, run_emissions,
+    run_runtime, write_atomic,
+)
+from SupplierDominancePruner import (
+    ADUP, DATA_DIR, REGISTRY_FILE, REPO_DIR, instance_files, read_semicolon_csv, registry_instances,
+    run_details_file,
+)
+
+STATES = ('pending', 'claimed', 'done', 'failed')
+DEFAULT_LEASE_TTL = 600
+DEFAULT_HEARTBEAT = 30
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_POLL = 5
+PLAN_FILE = 'plan.json'
+CAMPAIGN_CONFIG_FILE = REPO_DIR / 'config' / 'final_campaign_config.json'
+# runFullCampaign's phases with consolidated runs, in campaign order.
+PLAN_EXPERIMENTS = ('scalability', 'topology_baseline', 'carbon_tax_sweep', 'carbon_cap_sweep', 'carbon_hybrid',
+                    'service_time_sensitivity', 'nlm_comparison')
+BASELINE_EXPERIMENTS = ('scalability', 'topology_baseline')
+NON_BINDING_CAP = 2500000
+NON_BINDING_BOUND_SAFETY = 4.0
+NUMERICALLY_SAFE_BOUND_MAX = 1e12
+KPI_COLUMNS = [
+    'run_id', 'instance_id', 'bom_file', 'strategy', 'model_type',
+    'service_time_promised', 'suppliers_available', 'tax_rate', 'cap_value', 'cap_level',
+    'objective_value', 'total_cost_with_tax', 'total_cost_without_tax',
+    'procurement_cost', 'inventory_holding_cost', 'carbon_cost',
+    'achieved_service_time', 'service_constraint_binding',
+    'total_emissions', 'baseline_emissions', 'emission_reduction_pct',
+    'WIP', 'WIP_reduction_pct', 'DIO', 'DIO_improvement_pct', 'ITR',
+    'buffer_count', 'avg_decoupled_lead_time',
+    'suppliers_used',
+    'solver_status', 'runtime_sec', 'mip_gap',
+    'comparison_admissible', 'comparison_exclusion_reason',
+    'inferred', 'inferred_from', 'inference_rule',
+]
+
+
+# ---------------------------------------------------------------- KPICalculator rows
+
+def run_strategy(model_file: str) -> str:
+    for marker, strategy in (('Hybrid', 'EMISHYBRID'), ('Cap', 'EMISCAP'), ('Tax', 'EMISTAXE')):
+        if marker in model_file:
+            return strategy
+    return 'UNKNOWN'
+
+
+def run_kpis(result: dict, config: dict, instance_id: str,
+             gap_threshold: float = COMPARISON_GAP_THRESHOLD_PCT) -> dict:
+    """Flat KPI row of a run (KPICalculator::flattenKPIs without the baseline columns)."""
+    emissions = run_emissions(result)
+
+    total_ts = numeric(result, 'TS', 'TotalCostTS')
+    total_cs = numeric(result, 'CS', 'TotalCostCS')
+    emis_cost = numeric(result, 'EmisCost', 'TaxCost')
+    objective = numeric(result, 'Result.fctObj', 'Result.Objective')
+    if isinstance(result.get('Result'), dict) and total_ts is None:
+        total_ts = result['Result'].get('StCosts', result['Result'].get('TotalCost'))
+    tax_rate = float(config.get('_EMISTAXE_', 0.0))
+    if emis_cost is None and emissions is not None and tax_rate > 0:
+        emis_cost = tax_rate * (emissions / 1000000.0)
+    if total_cs is None and total_ts is not None:
+        if emis_cost is not None:
+            total_cs = total_ts - emis_cost
+        elif tax_rate == 0:
+            total_cs = total_ts
+    if emis_cost is None and total_ts is not None and total_cs is not None:
+        emis_cost = total_ts - total_cs
+
+    a = result.get('A') if isinstance(result.get('A'), list) else []
+    promised = config.get('_SERVICE_T_', 1)
+    achieved = int(a[0]) if a else None
+    binding = achieved is not None and float(promised) - achieved <= 0
+
+    if 'DIO' in result:
+        dio = float(result['DIO'])
+    elif 'A' in result and isinstance(result['A'], list):
+        dio = sum(result['A'])
+    else:
+        dio = None
+    wip = numeric(result, 'WIP')
+    itr = total_cs / wip if numeric(result, 'CS', 'TotalCostCS') is not None and wip else None
+
+    x = result.get('X') if isinstance(result.get('X'), list) else []
+    buffers = sum(1 for value in x if int(value) == 1)
+    lead_times = [int(a[i]) if i < len(a) else 0 for i in range(len(x))]
+    if buffers == 0 and isinstance(result.get('DELIVER'), list):
+        buffers = len({match.group(1) for match in
+                       (re.search(r'P(\d+)', delivery) for delivery in result['DELIVER']) if match})
+    suppliers = set()
+    for delivery in result.get('DELIVER', []) if isinstance(result.get('DELIVER'), list) else []:
+        match = re.search(r'S(\d+)=>P(\d+)', delivery)
+        if match:
+            suppliers.add(int(match.group(1)))
+
+    runtime = run_runtime(result)
+    if 'status' in result:
+        status = result['status']
+    elif re.search(r'Infeasibility|no solution', result.get('_raw_output', ''), re.IGNORECASE):
+        status = 'INFEASIBLE'
+    elif any(key in result for key in ('E', 'TS', 'Result')):
+        status = 'OPTIMAL'
+    elif runtime >= 1795:
+        status = 'TIMEOUT'
+    else:
+        status = 'UNKNOWN'
+    gap = numeric(result, 'mip_gap')
+    admissible = admissible_status(status, gap, gap_threshold)
+    if admissible:
+        reason = None
+    elif status == 'FEASIBLE':
+        reason = 'FEASIBLE_WITHOUT_REPORTED_GAP' if gap is None else 'GAP_ABOVE_THRESHOLD'
+    else:
+        reason = 'STATUS_NOT_COMPARISON_ADMISSIBLE'
+
+    return {
+        'run_id': config.get('PREFIXE', 'unknown'),
+        'instance_id': instance_id,
+        'bom_file': config.get('_NODE_FILE_', ''),
+        'strategy': run_strategy(config.get('MODEL_FILE', '')),
+        'model_type': config.get('MODEL_TYPE', 'PLM'),
+        'service_time_promised': promised,
+        'suppliers_available': config.get('_NBSUPP_', 10),
+        'tax_rate': config.get('_EMISTAXE_', 0.0),
+        'cap_value': config.get('_EMISCAP_', 2500000),
+        'cap_level': config.get('CAP_LEVEL'),
+        'objective_value': objective,
+        'total_cost_with_tax': total_ts,
+        'total_cost_without_tax': total_cs,
+        'procurement_cost': numeric(result, 'RawMCost'),
+        'inventory_holding_cost': numeric(result, 'InventCost'),
+        'carbon_cost': emis_cost,
+        'achieved_service_time': achieved,
+        'service_constraint_binding': 1 if binding else 0,
+        'total_emissions': emissions,
+        'baseline_emissions': None,
+        'emission_reduction_pct': None,
+        'WIP': wip,
+        'WIP_reduction_pct': None,
+        'DIO': dio,
+        'DIO_improvement_pct': None,
+        'ITR': itr,
+        'buffer_count': buffers,
+        'avg_decoupled_lead_time': sum(lead_times) / len(lead_times) if lead_times else 0,
+        'suppliers_used': len(suppliers),
+        'solver_status': status,
+        'runtime_sec': runtime,
+        'mip_gap': gap,
+        'comparison_admissible': 1 if admissible else 0,
+        'comparison_exclusion_reason': reason,
+        'inferred': 1 if 'inferred_from' in result else 0,
+        'inferred_from': result.get('inferred_from'),
+        'inference_rule': result.get('inference_rule'),
+    }
+
+
+# ---------------------------------------------------------------- queue
+
+@contextmanager
+def directory_lock(path: Path, stale_after: float = 60.0, poll: float = 0.05):
+    """mkdir lock (atomic on NFS too); a lock older than stale_after is broken."""
+    while True:
+        try:
+            path.mkdir()
+            break
+        except FileExistsError:
+            try:
+                if time.time() - path.stat().st_mtime > stale_after:
+                    os.rename(path, path.with_name(f'{path.name}.stale-{uuid.uuid4().hex[:8]}'))
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(poll)
+    try:
+        yield
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def job_id(path: Path) -> str:
+    return path.stem.split('@', 1)[0]
+
+
+def jobs_from_configs(configs, experiment: str = None) -> list:
+    """Queue jobs of runConfigs; the instance comes from INSTANCE_ID or the registry by BOM file."""
+    by_file = {instance['file']: instance_id for instance_id, instance in registry_instances().items()}
+    jobs = []
+    for config in configs:
+        instance_id = config.get('INSTANCE_ID') or by_file.get(config.get('_NODE_FILE_'))
+        if instance_id is None:
+            raise KeyError(f"{config.get('PREFIXE', 'run')}: no INSTANCE_ID and unknown BOM "
+                           f"{config.get('_NODE_FILE_')}")
+        jobs.append({'run_id': config['PREFIXE'],
+                     'experiment': config.get('EXPERIMENT', experiment or 'unknown'),
+                     'instance_id': instance_id, 'config': config})
+    return jobs
+
+
+# ---------------------------------------------------------------- campaign plan
+
+def conditioned_bound(estimate: float) -> float:
+    return min(NUMERICALLY_SAFE_BOUND_MAX, max(1000.0, float(math.ceil(max(1.0, estimate) * NON_BINDING_BOUND_SAFETY))))
+
+
+def non_binding_bounds(bom_file: str, supp_details_file: str, supplier_count: int, data_dir=DATA_DIR) -> dict:
+    """FinalCampaignRunner::getNonBindingBounds (cost, dio, wip and emissions bounds of an instance)."""
+    nodes = read_semicolon_csv(Path(data_dir) / bom_file).fillna(0.0)
+    suppliers = read_semicolon_csv(Path(data_dir) / supp_details_file).fillna(0.0).head(supplier_count)
+    if nodes.empty or suppliers.empty:
+        raise ValueError(f'Cannot estimate non-binding bounds for {bom_file} / {supp_details_file}')
+
+    def largest(column):
+        return max([0.0] + [float(value) for value in suppliers[column]]) if column in suppliers else 0.0
+
+    def field(node, column):
+        return float(node.get(column, 0.0))
+
+    rows = nodes.to_dict('records')
+    sum_process = sum(field(node, 't_process') for node in rows)
+    total_rqtf = sum(field(node, 'rqtf') for node in rows)
+    big_m = max(1.0, sum_process + largest('delay'))
+    max_price = largest('price')
+    multiplier = 1.0 + max(1, supplier_count) * max(1.0, max_price)
+    raw_cost = cost = wip = emissions = 0.0
+    # Same operation order as the runner, so the bounds match it to the last bit.
+    for node in rows:
+        unit_price, rqtf = field(node, 'unit_price'), field(node, 'rqtf')
+        spread = max(0.0, 1.5 + field(node, 'var_factor'))
+        lt_factor = max(0.0, field(node, 'lt_factor'))
+        transport = max(0.0, field(node, 'trsp_emis'))
+        activity = spread * lt_factor * max(0.0, rqtf) * ADUP
+        raw_cost += unit_price * rqtf * ADUP * max(1.0, max_price)
+        wip += unit_price * rqtf * ADUP * big_m * multiplier
+        cost += field(node, 'aih_cost') * spread * lt_factor * unit_price * rqtf * ADUP * big_m * multiplier
+        emissions += (max(0.0, field(node, 'facility_emis'))
+                      + (max(0.0, field(node, 'inventory_emis')) + transport) * big_m
+                      + transport * big_m) * activity
+    supplier_emissions = ADUP * total_rqtf * max(1.0, largest('emissions'))
+    return {
+        'cost': conditioned_bound(raw_cost + cost),
+        'dio': conditioned_bound(len(rows) * big_m),
+        'wip': conditioned_bound(wip),
+        'emissions': conditioned_bound(supplier_emissions + emissions),
+    }
+
+
+def cap_levels_loose_to_tight(levels) -> list:
+    """FinalCampaignRunner::capLevelsLooseToTight ('none' first)."""
+    return sorted(levels, key=lambda level: (level != 'none', -float(level) if level != 'none' else 0.0))
+
+
+def php_format_g(value) -> str:
+    """sprintf('%g', value)."""
+    return '%g' % float(value)
+
+
+class CampaignPlan:
+    """runConfigs of the consolidated runs of a run_manifest.json, in campaign order.
+
+    Built as the run* phases of FinalCampaignRunner build them; runs whose BOM file is
+    missing are skipped like the runner skips them.
+    """
+
+    def __init__(self, manifest: dict, experiments: dict, data_dir=DATA_DIR):
+        self.manifest = manifest
+        self.experiments = experiments
+        self.data_dir = Path(data_dir)
+        self.run_ids = {run['run_id'] for run in manifest.get('consolidated_runs', [])}
+        self.registry = json.loads(REGISTRY_FILE.read_text(encoding='utf-8'))
+        self.instances = registry_instances()
+        self._bounds = {}
+
+    @classmethod
+    def from_files(cls, manifest_file, config_file=CAMPAIGN_CONFIG_FILE, data_dir=DATA_DIR):
+        manifest = json.loads(Path(manifest_file).read_text(encoding='utf-8'))
+        experiments = json.loads(Path(config_file).read_text(encoding='utf-8'))['experiments']
+        return cls(manifest, experiments, data_dir)
+
+    def payload(self) -> dict:
+        return {'manifest': self.manifest, 'experiments': self.experiments, 'data_dir': str(self.data_dir)}
+
+    @classmethod
+    def from_payload(cls, payload: dict):
+        return cls(payload['manifest'], payload['experiments'], payload['data_dir'])
+
+    def bounds(self, bom_file: str, details_file: str, suppliers) -> dict:
+        key = (bom_file, details_file, int(suppliers))
+        if key not in self._bounds:
+            self._bounds[key] = non_binding_bounds(bom_file, details_file, int(suppliers), self.data_dir)
+        return self._bounds[key]
+
+    def lexicographic(self, config: dict) -> dict:
+        """FinalCampaignRunner::executeLexicographicBaseline's staticLex run of a baseline config."""
+        bounds = self.bounds(config['_NODE_FILE_'], config['_SUPP_DETAILS_FILE_'], config['_NBSUPP_'])
+        return dict(config, MODEL_FILE='RUNS_SupEmis_MultiObj_PLM.mod', MODEL_TYPE='PLM',
+                    _EMISCAP_=bounds['emissions'], _EMISTAXE_=0.0, _OBJ_PRIMARY_=1,
+                    _EPSILON_COST_=bounds['cost'], _EPSILON_DIO_=bounds['dio'], _EPSILON_WIP_=bounds['wip'],
+                    _EPSILON_EMIS_=bounds['emissions'], _NONBINDING_COST_=bounds['cost'],
+                    _NONBINDING_DIO_=bounds['dio'], _NONBINDING_WIP_=bounds['wip'],
+                    _NONBINDING_EMIS_=bounds['emissions'], CAP_LEVEL='none', STATIC_LEX_BASELINE=True,
+                    BASELINE_METHOD='STATIC_LEX_COST_THEN_EMISSIONS',
+                    BASELINE_LEX_OBJECTIVE='staticLex(TotalCostCS, Emis)')
+
+    def phase_runs(self, experiment: str, settings: dict):
+        """(instance_id, config, needs_baseline) of a phase; config takes the baseline emissions."""
+        if experiment == 'scalability':
+            for size in settings['instances']:
+                bom_file, supp_list, details = instance_files({'file': f'bom_supemis_{size}.csv', 'nodes': size})
+                config = {'PREFIXE': 'SCAL-%03d' % size, '_NODE_FILE_': bom_file,
+                          '_NODE_SUPP_FILE_': supp_list, '_SUPP_DETAILS_FILE_': details,
+                          '_NBSUPP_': settings['suppliers'], '_SERVICE_T_': settings['service_time'],
+                          '_EMISCAP_': NON_BINDING_CAP, '_EMISTAXE_': settings['tax_rate'],
+                          'MODEL_FILE': 'RUNS_SupEmis_Cplex_PLM_Tax.mod', 'MODEL_TYPE': settings['model_type'],
+                          'EXPERIMENT': 'scalability'}
+                yield f'bom_{size}', lambda baseline, config=config: self.lexicographic(config), False
+            return
+        if experiment == 'topology_baseline':
+            for family in settings['instance_families']:
+                for instance in self.registry['bom_families'].get(family, {}).get('instances', []):
+                    bom_file, supp_list, details = instance_files(instance)
+                    config = {'PREFIXE': f"TOPO-{family}-{instance['id']}", '_NODE_FILE_': bom_file,
+                              '_NODE_SUPP_FILE_': supp_list, '_SUPP_DETAILS_FILE_': details,
+                              '_NBSUPP_': settings['suppliers'], '_SERVICE_T_': settings['service_time'],
+                              '_EMISCAP_': NON_BINDING_CAP, '_EMISTAXE_': settings['tax_rate'],
+                              'MODEL_FILE': 'RUNS_SupEmis_Cplex_PLM_Tax.mod', 'MODEL_TYPE': 'PLM',
+                              'EXPERIMENT': 'topology_baseline', 'TOPOLOGY': family}
+                    yield instance['id'], lambda baseline, config=config: self.lexicographic(config), False
+            return
+
+        for instance_id in settings['representative_instances']:
+            if instance_id not in self.instances:
+                continue
+            bom_file, supp_list, details = instance_files(self.instances[instance_id])
+            common = {'_NODE_FILE_': bom_file, '_NODE_SUPP_FILE_': supp_list, '_SUPP_DETAILS_FILE_': details,
+                      '_NBSUPP_': settings['suppliers'], '_SERVICE_T_': settings.get('service_time')}
+            if experiment == 'carbon_tax_sweep':
+                for tax in settings['tax_rates']:
+                    config = dict({'PREFIXE': 'TAX-%s-%.2f' % (instance_id, tax)}, **common,
+                                  _EMISCAP_=NON_BINDING_CAP, _EMISTAXE_=tax,
+                                  MODEL_FILE='RUNS_SupEmis_Cplex_PLM_Tax.mod', MODEL_TYPE='PLM',
+                                  EXPERIMENT='carbon_tax_sweep', TAX_RATE=tax, CAP_LEVEL='none')
+                    yield instance_id, lambda baseline, config=config: config, False
+            elif experiment == 'carbon_cap_sweep':
+                for pct in cap_levels_loose_to_tight(settings['cap_percentages']):
+                    def build(baseline, pct=pct):
+                        cap = int(baseline * pct)
+                        return dict({'PREFIXE': 'CAP-%s-%.0f' % (instance_id, pct * 100)}, **common,
+                                    _EMISCAP_=cap, _EMISTAXE_=0.0, MODEL_FILE='RUNS_SupEmis_Cplex_PLM_Cap.mod',
+                                    MODEL_TYPE='PLM', EXPERIMENT='carbon_cap_sweep', CAP_PERCENTAGE=pct,
+                                    CAP_LEVEL=php_format_g(pct * 100) + '%', CAP_VALUE=cap)
+                    yield instance_id, build, True
+            elif experiment == 'carbon_hybrid':
+                for tax in settings['tax_rates']:
+                    for level in cap_levels_loose_to_tight(settings['cap_levels']):
+                        has_cap = level != 'none'
+                        label = 'tax_%s_cap_%s' % (php_format_g(tax),
+                                                   php_format_g(float(level) * 100) if has_cap else 'none')
+
+                        def build(baseline, tax=tax, level=level, has_cap=has_cap, label=label):
+                            pct = float(level) if has_cap else None
+                            cap = (float(baseline * pct) if has_cap
+                                   else self.bounds(bom_file, details, settings['suppliers'])['emissions'])
+                            return dict({'PREFIXE': f'HYB-{instance_id}-{label}'}, **common,
+                                        _EMISCAP_=cap, _EMISTAXE_=tax,
+                                        MODEL_FILE='RUNS_SupEmis_Cplex_PLM_Hybrid.mod', MODEL_TYPE='PLM',
+                                        EXPERIMENT='carbon_hybrid', HYBRID_LABEL=label, TAX_RATE=tax,
+                                        CAP_PERCENTAGE=pct,
+                                        CAP_LEVEL=php_format_g(pct * 100) + '%' if has_cap else 'none', CAP_VALUE=cap)
+                        yield instance_id, build, has_cap
+            elif experiment == 'service_time_sensitivity':
+                for strategy in settings['strategies']:
+                    for svt in settings['service_times']:
+                        capped = strategy == 'EMISCAP'
+
+                        def build(baseline, strategy=strategy, svt=svt, capped=capped):
+                            cap = int(baseline * settings['cap_percentage']) if capped else NON_BINDING_CAP
+                            return dict({'PREFIXE': f'SVT-{instance_id}-{strategy}-SvT{svt}'},
+                                        **dict(common, _SERVICE_T_=svt), _EMISCAP_=cap,
+                                        _EMISTAXE_=settings['tax_rate'] if strategy == 'EMISTAXE' else 0.0,
+                                        MODEL_FILE='RUNS_SupEmis_Cplex_PLM_%s.mod' % ('Cap' if capped else 'Tax'),
+                                        MODEL_TYPE='PLM', EXPERIMENT='service_time_sensitivity',
+                                        STRATEGY=strategy, SERVICE_TIME=svt,
+                                        CAP_LEVEL=(php_format_g(settings['cap_percentage'] * 100) + '%'
+                                                   if capped else 'none'))
+                        yield instance_id, build, capped
+            elif experiment == 'nlm_comparison':
+                comparison = dict(common, _SUPP_DETAILS_FILE_=run_details_file(experiment, self.instances[instance_id]))
+                for strategy in settings['strategies']:
+                    for model_type in ('PLM', 'NLM'):
+                        capped = strategy == 'EMISCAP'
+                        family = 'Cap' if capped else 'Tax'
+                        model = (f'RUNS_SupEmis_Cplex_PLM_{family}.mod' if model_type == 'PLM'
+                                 else f'RUNS_SupEmis_CP_NLM_{family}.mod')
+
+                        def build(baseline, strategy=strategy, model_type=model_type, capped=capped, model=model):
+                            cap = int(baseline * settings['cap_percentage']) if capped else NON_BINDING_CAP
+                            return dict({'PREFIXE': f'COMP-{instance_id}-{strategy}-{model_type}'}, **comparison,
+                                        _EMISCAP_=cap, _EMISTAXE_=0.0 if capped else settings['tax_rate'],
+                                        MODEL_FILE=model, MODEL_TYPE=model_type, EXPERIMENT='nlm_comparison',
+                                        STRATEGY=strategy)
+                        yield instance_id, build, capped
+
+    def jobs(self, done: dict) -> tuple:
+        """(buildable jobs, {run_id: instance or PLM run} waiting, [run_id] skipped) given the done jobs.
+
+        A run waits for the baseline of its instance or, for a seeded NLM run, for its PLM twin.
+        """
+        baselines = {}
+        for experiment in BASELINE_EXPERIMENTS:
+            for job in sorted((job for job in done.values() if job['experiment'] == experiment),
+                              key=lambda job: job['sequence']):
+                row = job['row']
+                # runScalabilityExperiment only keeps the baselines of an untaxed sweep.
+                if experiment == 'scalability' and float(self.experiments[experiment].get('tax_rate') or 0.0) != 0.0:
+                    continue
+                # executeLexicographicBaseline stops the campaign unless the baseline is proven optimal.
+                if row.get('solver_status') == 'OPTIMAL' and row.get('total_emissions') is not None:
+                    baselines[job['instance_id']] = float(row['total_emissions'])
+
+        jobs, waiting, skipped, position = [], {}, [], 0
+        for experiment in PLAN_EXPERIMENTS:
+            settings = self.experiments.get(experiment, {})
+            if not settings.get('enabled', False):
+                continue
+            for instance_id, build, needs_baseline in self.phase_runs(experiment, settings):
+                position += 1
+                # The run ids never depend on the baseline.
+                config = build(baselines.get(instance_id, 0.0))
+                run_id = config['PREFIXE']
+                if run_id not in self.run_ids:
+                    continue
+                required = [config['_NODE_FILE_']]
+                if experiment == 'topology_baseline':
+                    required.append(config['_NODE_SUPP_FILE_'])
+                if not all((self.data_dir / name).exists() for name in required):
+                    skipped.append(run_id)
+                elif needs_baseline and instance_id not in baselines:
+                    waiting[run_id] = instance_id
+                else:
+                    job = {'run_id': run_id, 'experiment': experiment, 'instance_id': instance_id,
+                           'config': config, 'sequence': position}
+                    if experiment == 'nlm_comparison' and settings.get('seed_from_plm', True):
+                        twin = f"COMP-{instance_id}-{config['STRATEGY']}-PLM"
+                        if config['MODEL_TYPE'] == 'PLM':
+                            # Its parsed result seeds the NLM twin.
+                            job['keep_result'] = True
+                        elif twin in self.run_ids:
+                            if twin not in done:
+                                waiting[run_id] = twin
+                                continue
+                            job['config'] = seed_nlm_run_config(
+                                config, done[twin].get('result', {}),
+                                float(settings.get('certified_gap_pct', CERTIFIED_GAP_PCT)),
+                                bool(settings.get('skip_certified', False)))
+                            job['seeded_from'] = twin
+                    jobs.append(job)
+        return jobs, waiting, skipped
+
+
+class CampaignQueue:
+    """Job files of a campaign under a (shared) queue directory."""
+
+    def __init__(self, queue_dir):
+        self.root = Path(queue_dir)
+        for state in STATES:
+            (self.root / state).mkdir(parents=True, exist_ok=True)
+        self.lock_path = self.root / 'lock'
+
+    def lock(self):
+        return directory_lock(self.lock_path)
+
+    def known(self) -> set:
+        return {job_id(path) for state in STATES for path in (self.root / state).glob('*.json')}
+
+    def enqueue(self, jobs) -> int:
+        """Add jobs not queued before (in any state); returns the number added."""
+        known = self.known()
+        sequence = sum(1 for state in STATES for _ in (self.root / state).glob('*.json'))
+        added = 0
+        for job in jobs:
+            if job['run_id'] in known:
+                continue
+            known.add(job['run_id'])
+            job = dict(job, sequence=job.get('sequence', sequence + added), attempts=0)
+            write_atomic(self.root / 'pending' / f"{job['run_id']}.json", json.dumps(job, indent=2))
+            added += 1
+        return added
+
+    def plan(self):
+        path = self.root / PLAN_FILE
+        if not path.exists():
+            return None
+        return CampaignPlan.from_payload(json.loads(path.read_text(encoding='utf-8')))
+
+    def enqueue_plan(self, plan: CampaignPlan) -> int:
+        """Store a campaign plan and queue its runs that can already be built."""
+        with self.lock():
+            write_atomic(self.root / PLAN_FILE, json.dumps(plan.payload(), indent=2))
+        return self.expand()
+
+    def expand(self) -> int:
+        """Queue the plan runs whose baseline got solved since; returns the number added."""
+        plan = self.plan()
+        if plan is None:
+            return 0
+        with self.lock():
+            jobs, _, _ = plan.jobs({job['run_id']: job for job in self.done_jobs()})
+            return self.enqueue(jobs)
+
+    def waiting(self) -> tuple:
+        """({run_id: instance or PLM run} of the plan runs still waiting, [skipped run_id])."""
+        plan = self.plan()
+        if plan is None:
+            return {}, []
+        _, waiting, skipped = plan.jobs({job['run_id']: job for job in self.done_jobs()})
+        return waiting, skipped
+
+    def counts(self) -> dict:
+        return {state: sum(1 for _ in (self.root / state).glob('*.json')) for state in STATES}
+
+    def claim(self, worker_id: str):
+        """(claimed path, job) of the next pending job, or None when none is left."""
+        for pending in sorted((self.root / 'pending').glob('*.json')):
+            claimed = self.root / 'claimed' / f'{pending.stem}@{worker_id}.json'
+            try:
+                os.utime(pending)
+                os.rename(pending, claimed)
+            except FileNotFoundError:
+                continue
+            return claimed, json.loads(claimed.read_text(encoding='utf-8'))
+        return None
+
+    @staticmethod
+    def heartbeat(claimed: Path) -> bool:
+        """Renew a lease; False once the job was reclaimed."""
+        try:
+            os.utime(claimed)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def reclaim(self, lease_ttl: float = DEFAULT_LEASE_TTL, max_attempts: int = DEFAULT_MAX_ATTEMPTS) -> list:
+        """Move jobs with an expired lease back to pending/ (failed/ after max_attempts)."""
+        now = time.time()
+        expired = []
+        for claimed in (self.root / 'claimed').glob('*.json'):
+            try:
+                if now - claimed.stat().st_mtime > lease_ttl:
+                    expired.append(claimed)
+            except FileNotFoundError:
+                continue
+        if not expired:
+            return []
+        reclaimed = []
+        with self.lock():
+            for claimed in expired:
+                try:
+                    if time.time() - claimed.stat().st_mtime <= lease_ttl:
+                        continue
+                    job = json.loads(claimed.read_text(encoding='utf-8'))
+                except FileNotFoundError:
+                    continue
+                job['attempts'] = job.get('attempts', 0) + 1
+                job.setdefault('lost_leases', []).append(claimed.stem.split('@', 1)[1])
+                state = 'failed' if job['attempts'] >= max_attempts else 'pending'
+                write_atomic(claimed, json.dumps(job, indent=2))
+                os.rename(claimed, self.root / state / f"{job['run_id']}.json")
+                reclaimed.append((job['run_id'], state))
+        return reclaimed
+
+    def complete(self, claimed: Path, job: dict, log_text: str, row: dict, results_dir, result: dict = None) -> bool:
+        """Write the log and table row of a claimed job and mark it done; False if the lease was lost.
+
+        A result given is kept in the done job (the PLM runs that seed an NLM run).
+        """
+        results_dir = Path(results_dir)
+        with self.lock():
+            if not claimed.exists():
+                return False
+            write_atomic(results_dir / 'logs' / f"{job['run_id']}.log", log_text)
+            table = results_dir / 'tables' / f"{job['experiment']}_results.csv"
+            table.parent.mkdir(parents=True, exist_ok=True)
+            with open(table, 'a', encoding='utf-8', newline='') as stream:
+                if stream.tell() == 0:
+                    stream.write(csv_line(KPI_COLUMNS))
+                stream.write(csv_line(row[column] for column in KPI_COLUMNS))
+            job = dict(job, row=row, worker=claimed.stem.split('@', 1)[1], finished_at=time.time())
+            if result is not None:
+                job['result'] = {key: value for key, value in result.items() if key != '_raw_output'}
+            write_atomic(claimed, json.dumps(job, indent=2))
+            os.rename(claimed, self.root / 'done' / f"{job['run_id']}.json")
+        return True
+
+    def done_jobs(self) -> list:
+        jobs = [json.loads(path.read_text(encoding='utf-8')) for path in (self.root / 'done').glob('*.json')]
+        return sorted(jobs, key=lambda job: job['sequence'])
+
+    def collect(self, results_dir) -> int:
+        """Rewrite tables/ in campaign order and write consolidated_results.csv.
+
+        Once the queue is drained, the baseline-relative columns are filled with CampaignRebaseline.
+        """
+        results_dir = Path(results_dir)
+        jobs = self.done_jobs()
+        experiments = {}
+        for job in jobs:
+            experiments.setdefault(job['experiment'], []).append(job)
+        with self.lock():
+            for experiment, rows in experiments.items():
+                write_atomic(results_dir / 'tables' / f'{experiment}_results.csv',
+                             csv_line(KPI_COLUMNS) + ''.join(csv_line(job['row'][c] for c in KPI_COLUMNS)
+                                                             for job in rows))
+            write_atomic(results_dir / 'consolidated_results.csv',
+                         csv_line(['experiment'] + KPI_COLUMNS)
+                         + ''.join(csv_line([job['experiment']] + [job['row'][c] for c in KPI_COLUMNS])
+                                   for job in jobs))
+        counts = self.counts()
+        if jobs and not counts['pending'] + counts['claimed']:
+            from CampaignRebaseline import CampaignRebaseline
+            CampaignRebaseline(results_dir).run()
+        return len(jobs)
+
+
+class QueueWorker:
+    """Claims, solves and records jobs until the queue is drained."""
+
+    def __init__(self, queue: CampaignQueue, results_dir, oplrun: str, work_dir=None,
+                 time_limit: int = DEFAULT_TIME_LIMIT, lease_ttl: float = DEFAULT_LEASE_TTL,
+                 heartbeat: float = DEFAULT_HEARTBEAT, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                 poll: float = DEFAULT_POLL, worker_id: str = None,
+                 oplrun_margin: float = OPLRUN_TIMEOUT_MARGIN, tree_dp: bool = False):
+        self.queue = queue
+        self.results_dir = Path(results_dir)
+        self.oplrun = oplrun
+        self.instantiator = ModelInstantiator(work_dir or queue.root / 'work', time_limit)
+        self.lease_ttl = lease_ttl
+        self.heartbeat_interval = heartbeat
+        self.max_attempts = max_attempts
+        self.poll = poll
+        self.oplrun_timeout = time_limit + oplrun_margin
+        self.tree_dp = tree_dp
+        self.tree_instances = {}
+        self.worker_id = worker_id or f'{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}'
+
+    def execute(self, job: dict) -> dict:
+        """Parsed result of one run, as FinalCampaignRunner::executeSingleRun logs it."""
+        certified = job['config'].get('NLM_CERTIFIED_RESULT')
+        if certified is not None:
+            # FinalCampaignRunner::storeInferredRun: the PLM twin certifies this NLM run.
+            return dict(certified, inferred_from=job['seeded_from'], inference_rule='certified_by_plm')
+        if self.tree_dp:
+            result = self.tree_dp_result(job['config'])
+            if result is not None:
+                return result
+        model, dat = self.instantiator.instantiate(job['config'])
+        try:
+            output = subprocess.run([self.oplrun, str(model), str(dat)], capture_output=True,
+                                    timeout=self.oplrun_timeout).stdout
+            output = output.decode('utf-8', errors='surrogateescape')
+        except subprocess.TimeoutExpired:
+            # The heartbeat would otherwise renew the lease of a hung oplrun forever.
+            return {'status': 'TIMEOUT', 'termination_reason': 'TIME_LIMIT',
+                    'error': f'oplrun killed after {self.oplrun_timeout:g} s'}
+        except OSError as error:
+            return {'status': 'ERROR', 'error': str(error)}
+        if not output:
+            return {'status': 'ERROR', 'error': 'No output'}
+        result = parse_output(output)
+        result['_raw_output'] = output
+        return result
+
+    def tree_dp_result(self, run_config: dict):
+        """The TreeDPSolver plan of a run it settles exactly, None to run oplrun."""
+        from TreeDPSolver import INSTANCE_KEYS, run_config_instance, run_config_strategy, solve_run_config, \
+            to_campaign_result
+
+        if run_config_strategy(run_config) is None:
+            return None
+        key = tuple(str(run_config.get(name)) for name in INSTANCE_KEYS)
+        try:
+            if key not in self.tree_instances:
+                self.tree_instances[key] = run_config_instance(run_config)
+            result = solve_run_config(run_config, self.tree_instances[key])
+        except (OSError, KeyError, ValueError):
+            return None
+        return to_campaign_result(result) if result['status'] == 'OPTIMAL' else None
+
+    def solve(self, claimed: Path, job: dict) -> bool:
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(self.heartbeat_interval):
+                if not self.queue.heartbeat(claimed):
+                    return
+
+        thread = threading.Thread(target=beat, daemon=True)
+        thread.start()
+        try:
+            result = self.execute(job)
+        finally:
+            stop.set()
+            thread.join()
+        row = run_kpis(result, job['config'], job['instance_id'])
+        return self.queue.complete(claimed, job, print_r(result), row, self.results_dir,
+                                   result if job.get('keep_result') else None)
+
+    def run(self, max_runs: int = None) -> int:
+        """Number of runs this worker completed."""
+        completed = 0
+        while max_runs is None or completed < max_runs:
+            self.queue.reclaim(self.lease_ttl, self.max_attempts)
+            claim = self.queue.claim(self.worker_id)
+            if claim is None:
+                if self.queue.expand():
+                    continue
+                if not any((self.queue.root / 'claimed').glob('*.json')):
+                    break
+                time.sleep(self.poll)
+                continue
+            claimed, job = claim
+            if self.solve(claimed, job):
+                completed += 1
+                print(f"[{self.worker_id}] {job['run_id']} done")
+            else:
+                print(f"[{self.worker_id}] {job['run_id']}: lease lost, result discarded")
+        return completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='File-queue execution of campaign runs on several nodes')
+    sub = parser.add_subparsers(dest='command', required=True)
+    enqueue = sub.add_parser('enqueue', help='add runConfigs, or the runs of a run manifest, to the queue')
+    enqueue.add_argument('queue')
+    enqueue.add_argument('runs', nargs='?', help='runConfig object, list or JSON lines (see ModelInstantiator)')
+    enqueue.add_argument('--manifest', help='run_manifest.json of FinalCampaignRunner (--export-plan)')
+    enqueue.add_argument('--config', default=str(CAMPAIGN_CONFIG_FILE), help='campaign config of the manifest')
+    enqueue.add_argument('--data-dir', default=str(DATA_DIR))
+    work = sub.add_parser('work', help='claim and solve jobs until the queue is drained')
+    work.add_argument('queue')
+    work.add_argument('results_dir')
+    work.add_argument('--oplrun', required=True)
+    work.add_argument('--work-dir', help='model/.dat directory (default QUEUE/work)')
+    work.add_argument('--time-limit', type=int, default=DEFAULT_TIME_LIMIT)
+    work.add_argument('--lease-ttl', type=float, default=DEFAULT_LEASE_TTL)
+    work.add_argument('--heartbeat', type=float, default=DEFAULT_HEARTBEAT)
+    work.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS)
+    work.add_argument('--poll', type=float, default=DEFAULT_POLL)
+    work.add_argument('--max-runs', type=int)
+    work.add_argument('--tree-dp', action='store_true',
+                      help='settle single-sourced PLM runs with TreeDPSolver instead of oplrun when exact')
+    status = sub.add_parser('status', help='job counts per state')
+    status.add_argument('queue')
+    collect = sub.add_parser('collect', help='write tables/ in campaign order and consolidated_results.csv')
+    collect.add_argument('queue')
+    collect.add_argument('results_dir')
+    args = parser.parse_args()
+
+    if args.command == 'enqueue' and (args.runs is None) == (args.manifest is None):
+        parser.error('enqueue takes either runConfigs or --manifest')
+
+    queue = CampaignQueue(args.queue)
+    if args.command == 'enqueue':
+        if args.manifest:
+            added = queue.enqueue_plan(CampaignPlan.from_files(args.manifest, args.config, args.data_dir))
+        else:
+            added = queue.enqueue(jobs_from_configs(read_run_configs(args.runs)))
+        print(f"Queued {added} runs in {queue.root}")
+    elif args.command == 'work':
+        worker = QueueWorker(queue, args.results_dir, args.oplrun, args.work_dir, args.time_limit,
+                             args.lease_ttl, args.heartbeat, args.max_attempts, args.poll,
+                             tree_dp=args.tree_dp)
+        completed = worker.run(args.max_runs)
+        print(f"[{worker.worker_id}] completed {completed} runs")
+    elif args.command == 'collect':
+        print(f"Wrote {queue.collect(args.results_dir)} runs to {args.results_dir}")
+    counts = queue.counts()
+    print(', '.join(f'{state} {count}' for state, count in counts.items()))
+    waiting, skipped = queue.waiting()
+    if waiting:
+        instances = sorted({blocker for blocker in waiting.values() if not blocker.startswith('COMP-')})
+        twins = sorted({blocker for blocker in waiting.values() if blocker.startswith('COMP-')})
+        blockers = ([f"the baseline of {', '.join(instances)}"] if instances else []) + twins
+        print(f"waiting {len(waiting)} (for {'; '.join(blockers)})")
+    if skipped:
+        print(f"skipped {len(skipped)} (data files not found)")
+    return 1 if args.command == 'collect' and counts['pending'] + counts['claimed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
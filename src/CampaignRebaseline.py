@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Re-baselining of the derived KPI columns of a campaign, without re-solving
+
+KPICalculator fills baseline_emissions, emission_reduction_pct, WIP_reduction_pct,
+DIO_improvement_pct, comparison_admissible and comparison_exclusion_reason at solve
+time, from the baseline registered with setBaseline and the comparison gap
+threshold. This recomputes them for a whole consolidated_results.csv in one pass of
+column operations and rewrites the consolidated file and the per-experiment tables
+in the same schema (only these columns change; every other cell keeps its text).
+
+Baselines, per instance:
+
+- by default, as FinalCampaignRunner registers them: the lexicographic baseline rows
+  of the campaign itself (scalability rows at tax 0 and topology_baseline rows), each
+  row seeing the last baseline registered before it in campaign order and each
+  measure (emissions, DIO, WIP) kept from the last row that reported it. This also
+  fills the columns CampaignQueue leaves empty;
+- with --baseline, from a table: a CSV with instance_id and any of total_emissions,
+  DIO, WIP, or a results directory / consolidated file, whose rows of the baseline
+  experiments give the baselines the campaign ended with. Every row of an instance
+  in the table is measured against the measures it gives; the rest keep the
+  campaign baseline.
+
+Admissibility follows KPICalculator::computeComputationalKPIs with --gap-threshold.
+Recomputed values equal to the stored ones (to 1e-12, relative) keep their text, so
+an unchanged baseline rewrites the files byte for byte.
+
+Usage:
+    python CampaignRebaseline.py logs/final_campaign_YYYYMMDD_HHMMSS [--baseline FILE_OR_DIR]
+        [--gap-threshold 1.0] [--output DIR] [--dry-run]
+
+The files are rewritten in place unless --output names another directory.
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import csv
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from RunOutput import COMPARISON_GAP_THRESHOLD_PCT, admissible_status, csv_line, php_string, write_atomic
+
+CONSOLIDATED_FILE = 'consolidated_results.csv'
+MEASURES = ('total_emissions', 'DIO', 'WIP')
+DERIVED_COLUMNS = ('baseline_emissions', 'emission_reduction_pct', 'WIP_reduction_pct', 'DIO_improvement_pct',
+                   'comparison_admissible', 'comparison_exclusion_reason')
+RELATIVE_TOLERANCE = 1e-12
+
+
+def read_text_table(path: Path) -> pd.DataFrame:
+    """A results CSV with every cell as its text ('' for empty)."""
+    with open(path, newline='', encoding='utf-8') as stream:
+        rows = list(csv.reader(stream))
+    return pd.DataFrame(rows[1:], columns=rows[0])
+
+
+def write_text_table(path: Path, frame: pd.DataFrame):
+    write_atomic(path, csv_line(frame.columns) + ''.join(csv_line(row) for row in frame.itertuples(index=False)))
+
+
+def numbers(frame: pd.DataFrame, column: str) -> pd.Series:
+    if column not in frame:
+        return pd.Series(np.nan, index=frame.index)
+    return pd.to_numeric(frame[column].replace('', np.nan), errors='coerce')
+
+
+def baseline_rows(frame: pd.DataFrame) -> pd.Series:
+    """Rows that FinalCampaignRunner registers with setBaseline."""
+    experiment = frame['experiment']
+    scalability = (experiment == 'scalability') & (numbers(frame, 'tax_rate') == 0)
+    return (scalability | (experiment == 'topology_baseline')) & numbers(frame, 'total_emissions').notna()
+
+
+def registered_baselines(frame: pd.DataFrame) -> pd.DataFrame:
+    """Per row, the baseline measures registered before it (campaign order)."""
+    registered = baseline_rows(frame)
+    instance = frame['instance_id']
+    columns = {}
+    for measure in MEASURES:
+        values = numbers(frame, measure).where(registered)
+        columns[measure] = values.groupby(instance).shift().groupby(instance).ffill()
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def read_baseline_table(path: Path) -> pd.DataFrame:
+    """Baseline measures indexed by instance_id, from a table or a campaign."""
+    path = Path(path)
+    if path.is_dir():
+        path = path / CONSOLIDATED_FILE
+    table = read_text_table(path)
+    if 'experiment' in table:
+        table = table[baseline_rows(table)]
+        measures = pd.DataFrame({measure: numbers(table, measure) for measure in MEASURES})
+        # setBaseline keeps a measure the later baseline row did not report.
+        return measures.groupby(table['instance_id']).last()
+    if 'instance_id' not in table:
+        raise ValueError(f"{path}: a baseline table needs an instance_id column")
+    measures = pd.DataFrame({measure: numbers(table, measure) for measure in MEASURES})
+    return measures.groupby(table['instance_id']).last()
+
+
+def relative_change(base: pd.Series, value: pd.Series) -> pd.Series:
+    """((base - value) / base) * 100 where both exist and base > 0, as KPICalculator."""
+    valid = value.notna() & base.notna() & (base > 0)
+    return ((base - value) / base * 100).where(valid)
+
+
+def rebaseline(frame: pd.DataFrame, baselines: pd.DataFrame = None,
+               gap_threshold: float = COMPARISON_GAP_THRESHOLD_PCT) -> pd.DataFrame:
+    """The DERIVED_COLUMNS of every row, as numbers (admissibility as 0/1 and text)."""
+    base = registered_baselines(frame)
+    if baselines is not None:
+        # Like setBaseline, a measure the table does not give keeps its campaign baseline.
+        for measure in MEASURES:
+            base[measure] = frame['instance_id'].map(baselines[measure]).fillna(base[measure])
+
+    status = frame['solver_status']
+    gap = numbers(frame, 'mip_gap')
+    admissible = admissible_status(status, gap, gap_threshold)
+    reason = np.select([admissible, (status == 'FEASIBLE') & gap.isna(), status == 'FEASIBLE'],
+                       ['', 'FEASIBLE_WITHOUT_REPORTED_GAP', 'GAP_ABOVE_THRESHOLD'],
+                       'STATUS_NOT_COMPARISON_ADMISSIBLE')
+    return pd.DataFrame({
+        'baseline_emissions': base['total_emissions'],
+        'emission_reduction_pct': relative_change(base['total_emissions'], numbers(frame, 'total_emissions')),
+        'WIP_reduction_pct': relative_change(base['WIP'], numbers(frame, 'WIP')),
+        'DIO_improvement_pct': relative_change(base['DIO'], numbers(frame, 'DIO')),
+        'comparison_admissible': admissible.astype(int),
+        'comparison_exclusion_reason': reason,
+    }, index=frame.index)
+
+
+def updated_text(frame: pd.DataFrame, derived: pd.DataFrame) -> dict:
+    """New text of the derived columns; values equal to the stored ones keep their text."""
+    columns = {}
+    for column in DERIVED_COLUMNS:
+        if column not in frame:
+            continue
+        new = derived[column]
+        if column == 'comparison_exclusion_reason':
+            columns[column] = pd.Series(new, index=frame.index)
+            continue
+        if column == 'comparison_admissible':
+            columns[column] = new.astype(str)
+            continue
+        old = numbers(frame, column)
+        same = (old.isna() & new.isna()) | np.isclose(old, new, rtol=RELATIVE_TOLERANCE, atol=0)
+        formatted = new.map(lambda value: '' if pd.isna(value) else php_string(float(value)))
+        columns[column] = frame[column].where(same, formatted)
+    return columns
+
+
+def apply_text(frame: pd.DataFrame, columns: dict) -> tuple:
+    """(updated frame, changed cells per column)."""
+    updated = frame.copy()
+    changed = {}
+    for column, text in columns.items():
+        changed[column] = int((frame[column] != text).sum())
+        updated[column] = text
+    return updated, changed
+
+
+class CampaignRebaseline:
+    def __init__(self, results_dir, baseline=None, gap_threshold: float = COMPARISON_GAP_THRESHOLD_PCT):
+        self.results_dir = Path(results_dir)
+        self.consolidated = read_text_table(self.results_dir / CONSOLIDATED_FILE)
+        self.baselines = read_baseline_table(Path(baseline)) if baseline else None
+        self.gap_threshold = gap_threshold
+
+    def run(self, output_dir=None, dry_run: bool = False) -> dict:
+        """Rewrites the consolidated file and tables; returns the changed cells per file and column."""
+        output_dir = Path(output_dir) if output_dir else self.results_dir
+        frame = self.consolidated
+        derived = rebaseline(frame, self.baselines, self.gap_threshold)
+        columns = updated_text(frame, derived)
+        consolidated, changed = apply_text(frame, columns)
+        report = {CONSOLIDATED_FILE: changed}
+        files = {output_dir / CONSOLIDATED_FILE: consolidated}
+
+        for experiment, rows in consolidated.groupby('experiment', sort=False):
+            path = self.results_dir / 'tables' / f'{experiment}_results.csv'
+            if not path.exists():
+                continue
+            table = read_text_table(path)
+            if 'run_id' not in table:
+                continue
+            # Tables hold the rows of their experiment, keyed by run_id.
+            source = rows.drop_duplicates('run_id', keep='last').set_index('run_id')
+            matched = table['run_id'].isin(source.index)
+            table_columns = {column: table[column].where(~matched, table['run_id'].map(source[column]))
+                             for column in columns if column in table}
+            table, changed = apply_text(table, table_columns)
+            report[f'tables/{path.name}'] = changed
+            files[output_dir / 'tables' / path.name] = table
+
+        if not dry_run:
+            for path, table in files.items():
+                write_text_table(path, table)
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompute baseline-relative and admissibility columns')
+    parser.add_argument('results_dir')
+    parser.add_argument('--baseline', help='baseline CSV (instance_id, total_emissions, DIO, WIP) '
+                                           'or a results directory / consolidated file')
+    parser.add_argument('--gap-threshold', type=float, default=COMPARISON_GAP_THRESHOLD_PCT,
+                        help='largest final MIP gap (%%) of an admissible FEASIBLE run')
+    parser.add_argument('--output', help='directory for the rewritten files (default: in place)')
+    parser.add_argument('--dry-run', action='store_true', help='report the changes without writing')
+    args = parser.parse_args()
+
+    report = CampaignRebaseline(args.results_dir, args.baseline, args.gap_threshold).run(args.output, args.dry_run)
+    for name, changed in report.items():
+        cells = ', '.join(f'{column} {count}' for column, count in changed.items() if count) or 'unchanged'
+        print(f"{name}: {cells}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+Watch mode: live figures and LaTeX tables while a campaign runs
+
+FinalCampaignRunner writes tables/<experiment>_results.csv at the end of every
+experiment and the Pareto fronts to pareto/ as the multi-objective runs finish
+(CampaignQueue workers append their rows as they go); figures and .tex tables
+normally come only after the whole campaign. The watcher polls those files and
+reads only the bytes appended since its last look. A file is tailed by offset:
+complete lines are parsed with the header kept from the first read, a trailing
+partial line waits for the next poll. A file that shrank, or whose bytes just
+before the offset changed (rewritten by fopen 'w'), is read again from the start.
+
+Parsed rows stay in memory. The experiment rows are folded into a running
+ResultsSummary (the live stand-in for consolidated_results.csv), so the summary
+figures need no reload either. Changes are debounced: once no file changed for
+--debounce seconds (or --max-delay after the first change), only the figures
+fed by the changed files are redrawn by GraphGenerator from the in-memory rows,
+and the .tex tables whose declared inputs (TABLE_BUILDERS) changed are rebuilt
+in-process by generate_article_tables.build_tables from the same rows and summary.
+Only fragments whose text changed are copied to tables_tex/. watch_status.json in
+the campaign directory reports the rows seen per experiment against
+campaign_plan.json and the last refresh.
+
+Usage:
+    python CampaignWatcher.py logs/final_campaign_YYYYMMDD_HHMMSS [--interval 2] [--debounce 10]
+                              [--max-delay 120] [--no-tex] [--once] [--until-done]
+
+Requires: pandas, numpy, matplotlib, seaborn
+"""
+
+import argparse
+import fnmatch
+import io
+import json
+import math
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from StreamingAggregates import TABLE_EXPERIMENTS, ResultsSummary
+from generate_article_tables import CONSOLIDATED, HYBRID_ROWS, TABLE_BUILDERS, CampaignInputs, build_tables
+
+WATCHED = ('tables/*.csv', 'pareto/*_pareto.csv')
+SIGNATURE_BYTES = 64
+STATUS_FILE = 'watch_status.json'
+SUMMARY_FIGURES = ('plot_cost_emissions_pareto', 'plot_strategy_comparison', 'plot_inventory_kpis')
+FIGURES = {
+    'tables/scalability_results.csv': ('plot_scalability_runtime', 'plot_scalability_emissions',
+                                       'plot_scalability_buffers'),
+    'tables/carbon_tax_sweep_results.csv': ('plot_tax_sweep',),
+    'tables/carbon_cap_sweep_results.csv': ('plot_cap_sweep',),
+    'tables/carbon_hybrid_results.csv': ('plot_hybrid_strategy',),
+    'tables/service_time_sensitivity_results.csv': ('plot_service_time_sensitivity',),
+    'tables/topology_baseline_results.csv': ('plot_topology_comparison',),
+    'tables/nlm_comparison_results.csv': ('plot_plm_nlm_comparison',),
+}
+
+
+class TailedCSV:
+    """Rows of a CSV that is being written, read by offset."""
+
+    def __init__(self, path: Path, sep: str = ','):
+        self.path = path
+        self.sep = sep
+        self.reset()
+
+    def reset(self):
+        self.offset = 0
+        self.header = None
+        self.partial = b''
+        self.signature = b''
+        self.frames = []
+        self.rows = 0
+
+    def rewritten(self, size: int) -> bool:
+        if size < self.offset:
+            return True
+        if not self.signature:
+            return False
+        with open(self.path, 'rb') as stream:
+            stream.seek(self.offset - len(self.signature))
+            return stream.read(len(self.signature)) != self.signature
+
+    def poll(self):
+        """(appended rows, reset) since the last poll; rows is None when nothing complete was added."""
+        try:
+            size = self.path.stat().st_size
+            reset = self.rewritten(size)
+        except FileNotFoundError:
+            return None, False
+        if reset:
+            self.reset()
+        if size == self.offset:
+            return None, reset
+        with open(self.path, 'rb') as stream:
+            stream.seek(self.offset)
+            data = stream.read(size - self.offset)
+        self.offset += len(data)
+        self.signature = (self.signature + data)[-SIGNATURE_BYTES:]
+        tail = self.partial + data
+        end = tail.rfind(b'\n') + 1
+        complete, self.partial = tail[:end], tail[end:]
+        if self.header is None:
+            newline = complete.find(b'\n') + 1
+            if not newline:
+                return None, reset
+            self.header, complete = complete[:newline], complete[newline:]
+        if not complete.strip():
+            return None, reset
+        rows = pd.read_csv(io.BytesIO(self.header + complete), sep=self.sep)
+        self.frames.append(rows)
+        self.rows += len(rows)
+        return rows, reset
+
+    def frame(self) -> pd.DataFrame:
+        if len(self.frames) > 1:
+            self.frames = [pd.concat(self.frames, ignore_index=True)]
+        if self.frames:
+            return self.frames[0]
+        columns = self.header.decode('utf-8').strip().split(self.sep) if self.header else []
+        return pd.DataFrame(columns=columns)
+
+
+def experiment_of(relpath: str):
+    """Experiment name of a per-experiment KPI table, None for other files."""
+    name = Path(relpath).name
+    if relpath.startswith('tables/') and name.endswith('_results.csv'):
+        return name[:-len('_results.csv')]
+    return None
+
+
+def is_kpi_table(frame: pd.DataFrame) -> bool:
+    return {'run_id', 'strategy', 'solver_status'} <= set(frame.columns)
+
+
+class LiveTables:
+    """In-memory campaign source (exists/read_csv/glob, like a CampaignArchive)."""
+
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def names(self) -> list:
+        return [relpath for relpath, tail in self.watcher.files.items() if tail.header is not None]
+
+    def exists(self, relpath) -> bool:
+        relpath = Path(relpath).as_posix()
+        return any(name == relpath or name.startswith(relpath + '/') for name in self.names())
+
+    def read_csv(self, relpath, **kwargs) -> pd.DataFrame:
+        return self.watcher.files[Path(relpath).as_posix()].frame().copy()
+
+    def glob(self, pattern: str) -> list:
+        return sorted(name for name in self.names() if fnmatch.fnmatch(name, pattern))
+
+
+class CampaignWatcher:
+    """Tails the result files of a running campaign and refreshes what they feed."""
+
+    def __init__(self, campaign, tex: bool = True):
+        self.campaign = Path(campaign)
+        self.tex = tex
+        self.files = {}
+        self.summary = ResultsSummary()
+        self.refreshes = 0
+        self.errors = []
+        self.last_refresh = None
+        self.refreshed = []
+        plan = self.campaign / 'campaign_plan.json'
+        self.plan = {}
+        if plan.exists():
+            for experiment in json.loads(plan.read_text(encoding='utf-8')).get('experiments', []):
+                if experiment.get('enabled', True):
+                    self.plan[experiment['name']] = experiment.get('reported_rows')
+
+    def scan(self) -> set:
+        """Relative paths of the files that changed since the last scan."""
+        for pattern in WATCHED:
+            for path in sorted(self.campaign.glob(pattern)):
+                relpath = path.relative_to(self.campaign).as_posix()
+                if relpath not in self.files:
+                    self.files[relpath] = TailedCSV(path, ';' if relpath.startswith('pareto/') else ',')
+        changed, rebuild = set(), False
+        for relpath, tail in self.files.items():
+            rows, reset = tail.poll()
+            if rows is None and not reset:
+                continue
+            changed.add(relpath)
+            experiment = experiment_of(relpath)
+            if experiment is None or not is_kpi_table(tail.frame()):
+                continue
+            if reset:
+                rebuild = True
+            elif rows is not None and not rebuild:
+                self.summary.add(rows.assign(experiment=experiment))
+        if rebuild:
+            self.summary = ResultsSummary()
+            for relpath, tail in self.files.items():
+                experiment = experiment_of(relpath)
+                if experiment is not None and tail.rows and is_kpi_table(tail.frame()):
+                    self.summary.add(tail.frame().assign(experiment=experiment))
+        return changed
+
+    def figures_for(self, changed) -> list:
+        methods = []
+        for relpath in sorted(changed):
+            methods.extend(FIGURES.get(relpath, ()))
+            if relpath.startswith('pareto/'):
+                methods.append('plot_pareto_fronts')
+        if any(experiment_of(relpath) for relpath in changed) and self.summary.strategies:
+            methods.extend(SUMMARY_FIGURES)
+        return list(dict.fromkeys(methods))
+
+    def refresh_figures(self, changed) -> list:
+        from GraphGenerator import GraphGenerator
+
+        methods = self.figures_for(changed)
+        if not methods:
+            return []
+        generator = GraphGenerator(str(self.campaign), source=LiveTables(self), summary=self.summary)
+        drawn = []
+        for method in methods:
+            try:
+                getattr(generator, method)()
+                drawn.append(method)
+            except Exception as error:  # a half-finished experiment must not stop the watch
+                self.errors.append(f'{method}: {type(error).__name__}: {error}')
+        return drawn
+
+    @staticmethod
+    def feeds(relpath: str, dataset: str) -> bool:
+        """Whether a watched file is (part of) a dataset declared by a table builder."""
+        if dataset == CONSOLIDATED:
+            return TABLE_EXPERIMENTS.get(experiment_of(relpath)) in ('rows', 'series')
+        if dataset == HYBRID_ROWS:
+            return experiment_of(relpath) == 'carbon_hybrid'
+        return fnmatch.fnmatch(relpath, dataset)
+
+    def tex_tables_for(self, changed) -> list:
+        """Fragments with a declared input among the changed files, in registry order."""
+        return [name for name, (_, declared) in TABLE_BUILDERS.items()
+                if any(self.feeds(relpath, dataset) for relpath in changed for dataset in declared)]
+
+    def refresh_tex(self, changed) -> list:
+        """Rebuild the .tex fragments fed by the changed files; names of those whose text changed."""
+        names = self.tex_tables_for(changed) if self.tex else []
+        if not names:
+            return []
+        declared = {dataset for name in names for dataset in TABLE_BUILDERS[name][1]}
+        if declared & {CONSOLIDATED, HYBRID_ROWS} and not self.summary.rows:
+            return []
+        inputs = CampaignInputs(str(self.campaign), source=LiveTables(self), summary=self.summary)
+        written = []
+        output = self.campaign / 'tables_tex'
+        with tempfile.TemporaryDirectory(prefix='phpauto_tex_') as built:
+            try:
+                build_tables(inputs, built, names)
+            except Exception as error:  # a half-finished experiment must not stop the watch
+                self.errors.append(f'tables: {type(error).__name__}: {error}')
+            for name in names:
+                fragment = Path(built) / name
+                if not fragment.exists():
+                    continue
+                target = output / fragment.name
+                if not target.exists() or target.read_bytes() != fragment.read_bytes():
+                    output.mkdir(exist_ok=True)
+                    shutil.copyfile(fragment, target)
+                    written.append(fragment.name)
+        return written
+
+    def refresh(self, changed) -> dict:
+        self.errors = []
+        figures = self.refresh_figures(changed)
+        tex = self.refresh_tex(changed)
+        self.refreshes += 1
+        self.last_refresh = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.refreshed = figures + tex
+        self.write_status()
+        return {'figures': figures, 'tex': tex, 'errors': list(self.errors)}
+
+    def status(self) -> dict:
+        experiments = {}
+        for relpath, tail in sorted(self.files.items()):
+            experiment = experiment_of(relpath)
+            if experiment is not None and tail.header is not None:
+                experiments[experiment] = {'rows': tail.rows, 'planned': self.plan.get(experiment)}
+        for experiment, planned in self.plan.items():
+            experiments.setdefault(experiment, {'rows': 0, 'planned': planned})
+        planned = sum(entry['planned'] or 0 for name, entry in experiments.items() if name in self.plan)
+        seen = sum(min(entry['rows'], entry['planned'] or math.inf)
+                   for name, entry in experiments.items() if name in self.plan)
+        return {
+            'campaign': str(self.campaign),
+            'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'experiments': experiments,
+            'planned_rows': planned,
+            'progress_pct': round(100.0 * seen / planned, 1) if planned else None,
+            'pareto_files': sum(1 for relpath in self.files if relpath.startswith('pareto/')),
+            'summary_rows': self.summary.rows,
+            'refreshes': self.refreshes,
+            'last_refresh': self.last_refresh,
+            'last_refreshed': self.refreshed,
+            'errors': self.errors,
+            'finished': (self.campaign / 'campaign_metadata.json').exists(),
+        }
+
+    def write_status(self):
+        target = self.campaign / STATUS_FILE
+        temp = target.with_name(f'.{STATUS_FILE}.tmp')
+        temp.write_text(json.dumps(self.status(), indent=2), encoding='utf-8')
+        temp.replace(target)
+
+    def run(self, interval: float = 2.0, debounce: float = 10.0, max_delay: float = 120.0,
+            once: bool = False, until_done: bool = False):
+        pending, first_change, last_change = set(), None, None
+        while True:
+            changed = self.scan()
+            now = time.monotonic()
+            if changed:
+                pending |= changed
+                last_change = now
+                first_change = first_change or now
+            due = pending and (once or now - last_change >= debounce or now - first_change >= max_delay)
+            if due:
+                result = self.refresh(pending)
+                print(f"[{self.last_refresh}] {len(pending)} files changed: "
+                      f"{len(result['figures'])} figures, {len(result['tex'])} .tex tables refreshed"
+                      + (f", {len(result['errors'])} errors" if result['errors'] else ''))
+                pending, first_change = set(), None
+            if once or (until_done and not pending and (self.campaign / 'campaign_metadata.json').exists()):
+                self.write_status()
+                return
+            time.sleep(interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Live figures and LaTeX tables of a running campaign')
+    parser.add_argument('campaign', help='results directory the campaign runner writes to')
+    parser.add_argument('--interval', type=float, default=2.0, help='seconds between polls')
+    parser.add_argument('--debounce', type=float, default=10.0, help='quiet seconds before a refresh')
+    parser.add_argument('--max-delay', type=float, default=120.0, help='refresh at the latest this long after a change')
+    parser.add_argument('--no-tex', action='store_true', help='figures only')
+    parser.add_argument('--once', action='store_true', help='one scan and refresh, then exit')
+    parser.add_argument('--until-done', action='store_true', help='exit once campaign_metadata.json is written')
+    args = parser.parse_args()
+
+    campaign = Path(args.campaign)
+    if not campaign.is_dir():
+        print(f"Results directory not found: {campaign}", file=sys.stderr)
+        return 1
+    watcher = CampaignWatcher(campaign, tex=not args.no_tex)
+    try:
+        watcher.run(args.interval, args.debounce, args.max_delay, args.once, args.until_done)
+    except KeyboardInterrupt:
+        watcher.write_status()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
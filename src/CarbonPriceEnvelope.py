@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Lower envelope of known solutions over the carbon price
+
+Every solution stored for an instance (tax, cap and hybrid runs, decision-stability
+probes, Pareto points) is feasible for the tax model with the same service time and
+supplier data, where it costs
+
+    cost(t) = TotalCostCS + DIO + t * Emis / 1e6        (t in currency/tCO2)
+
+The lower envelope of these lines, computed with a convex-hull pass over the lines
+sorted by slope, is an upper bound on the optimal tax-model objective f(t), and its
+breakpoints are where the cheapest known operating point changes.
+
+For findCarbonPriceSwitchingThreshold this gives a bracket without any solve: with
+the optimal tax-0 run as baseline,
+- upper: the first envelope breakpoint after the baseline line. Beyond it a stored
+  solution is strictly cheaper, so the tax optimum can no longer be the baseline;
+- lower: the highest stored OPTIMAL tax run (or hybrid run without cap) whose
+  decisions X, Z, Q, tax-free cost and emissions equal the baseline's. The set of
+  prices where the baseline stays optimal is an interval containing 0.
+Both are as reliable as the solver's OPTIMAL status, which the diagnostic itself
+relies on. The remaining breakpoints are candidate switching rates for the sweeps.
+- probe: the rate the diagnostic solves to confirm the bracket. At upper itself the
+  baseline and the switch line tie, so the probe sits where the switch line is
+  cheaper by twice CPLEX's relative gap, and at most halfway to the next breakpoint.
+
+brackets writes envelope.csv (all segments per configuration), threshold_brackets.csv
+and threshold_brackets.json; FinalCampaignRunner reads the JSON through the
+initial_brackets_file option of carbon_price_switching_threshold and then starts the
+bisection from the bracket instead of the geometric probe. The JSON records the sha256
+of the tax model and of each instance's data files; the runner ignores a bracket whose
+files have changed since.
+
+Usage:
+    python CarbonPriceEnvelope.py logs/final_campaign_YYYYMMDD_HHMMSS [--output-dir DIR]
+        [--service-time 1] [--suppliers 10]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from CampaignDiff import CampaignResults
+from InstanceCatalog import file_sha256
+from SolutionEvaluator import INT32_SENTINEL, logged_values
+from SupplierDominancePruner import (
+    DATA_DIR,
+    DEFAULT_NB_SUPP,
+    MODELS_DIR,
+    REPO_DIR,
+    instance_files,
+    registry_instances,
+    run_details_file,
+)
+from TreeDPSolver import GRAMS_PER_TONNE
+
+CAMPAIGN_CONFIG_FILE = REPO_DIR / 'config' / 'final_campaign_config.json'
+GROUP_COLUMNS = ['instance_id', 'service_time', 'suppliers', 'supp_details_file']
+SOLVED_STATUSES = ('OPTIMAL', 'FEASIBLE')
+SIGNATURE_KEYS = ('X', 'Z', 'Q')
+# changedOperatingPointComponents compares tax-free cost and emissions to 1e-3.
+SIGNATURE_TOLERANCE = 1e-3
+# buildTaxRunConfig's model; the diagnostic's probe must beat CPLEX's default relative gap.
+TAX_MODEL_FILE = 'RUNS_SupEmis_Cplex_PLM_Tax.mod'
+PROBE_MARGIN = 2e-4
+
+
+def lower_envelope(intercepts, slopes, start: float = 0.0) -> pd.DataFrame:
+    """Segments (line, t_from, t_to) of min_k intercepts[k] + slopes[k] * t for t >= start.
+
+    Lines are swept by decreasing slope (the hull of the dual points); parallel lines
+    keep the lowest intercept and ties keep the first line.
+    """
+    intercepts = np.asarray(intercepts, dtype=np.float64)
+    slopes = np.asarray(slopes, dtype=np.float64)
+    order = np.lexsort((np.arange(len(slopes)), intercepts, -slopes))
+    hull = []
+    for k in order:
+        if hull and slopes[hull[-1]] == slopes[k]:
+            continue
+        while len(hull) >= 2:
+            i, j = hull[-2], hull[-1]
+            # j is useless if k overtakes i no later than j does.
+            if (intercepts[k] - intercepts[i]) * (slopes[i] - slopes[j]) <= \
+                    (intercepts[j] - intercepts[i]) * (slopes[i] - slopes[k]):
+                hull.pop()
+            else:
+                break
+        hull.append(k)
+    lines = np.array(hull, dtype=np.int64)
+    if not len(lines):
+        return pd.DataFrame({'line': lines, 't_from': [], 't_to': []})
+    breaks = ((intercepts[lines[1:]] - intercepts[lines[:-1]])
+              / (slopes[lines[:-1]] - slopes[lines[1:]]))
+    t_from = np.concatenate(([-np.inf], breaks))
+    t_to = np.concatenate((breaks, [np.inf]))
+    keep = t_to > start
+    t_from = np.maximum(t_from[keep], start)
+    return pd.DataFrame({'line': lines[keep], 't_from': t_from, 't_to': t_to[keep]})
+
+
+def campaign_config() -> dict:
+    if not CAMPAIGN_CONFIG_FILE.exists():
+        return {}
+    return json.loads(CAMPAIGN_CONFIG_FILE.read_text(encoding='utf-8')).get('experiments', {})
+
+
+class CampaignSolutions:
+    """(TotalCostCS, DIO, Emis) of every stored solution of a campaign, with its configuration."""
+
+    def __init__(self, campaign):
+        self.campaign = CampaignResults(campaign)
+        if self.campaign.archive:
+            frame = self.campaign.archive.read_csv('consolidated_results.csv')
+        else:
+            frame = pd.read_csv(self.campaign.path / 'consolidated_results.csv')
+        self.results = frame.drop_duplicates('run_id', keep='last').reset_index(drop=True)
+        self.results['run_id'] = self.results['run_id'].astype(str)
+        self.instances = registry_instances()
+
+    def details_file(self, run) -> str:
+        return run_details_file(run['experiment'], self.instances[run['instance_id']])
+
+    def run_rows(self) -> pd.DataFrame:
+        runs = self.results[self.results['instance_id'].isin(self.instances.keys())
+                            & self.results['solver_status'].isin(SOLVED_STATUSES)].copy()
+        frame = pd.DataFrame({
+            'source': runs['run_id'],
+            'kind': 'run',
+            'instance_id': runs['instance_id'],
+            'service_time': pd.to_numeric(runs['service_time_promised'], errors='coerce'),
+            'suppliers': pd.to_numeric(runs['suppliers_available'], errors='coerce'),
+            'supp_details_file': [self.details_file(run) for _, run in runs.iterrows()],
+            'strategy': runs['strategy'],
+            'tax_rate': pd.to_numeric(runs['tax_rate'], errors='coerce').fillna(0.0),
+            'uncapped': runs.get('cap_level', pd.Series('', index=runs.index)).astype(str) == 'none',
+            'solver_status': runs['solver_status'],
+            'TotalCostCS': pd.to_numeric(runs['total_cost_without_tax'], errors='coerce'),
+            'DIO': pd.to_numeric(runs['DIO'], errors='coerce'),
+            'Emis': pd.to_numeric(runs['total_emissions'], errors='coerce'),
+        })
+        return frame
+
+    def probe_rows(self) -> pd.DataFrame:
+        """Decision-stability probe logs (<run_id>-STAB-*), configured like their anchor run."""
+        anchors = self.results.set_index('run_id')
+        rows = []
+        for run_id in sorted(self.campaign.logged_runs()):
+            anchor_id, _, probe = run_id.partition('-STAB-')
+            if not probe or anchor_id not in anchors.index:
+                continue
+            anchor = anchors.loc[anchor_id]
+            if anchor['instance_id'] not in self.instances:
+                continue
+            text = self.campaign.log_text(run_id)
+            status = next((line.split('=>', 1)[1].strip() for line in text.splitlines()
+                           if line.startswith('    [status] =>')), '')
+            exact, _ = logged_values(text)
+            vectors = self.campaign.decisions(run_id)
+            if status not in SOLVED_STATUSES or 'E' not in exact or 'A' not in vectors:
+                continue
+            tax = pd.to_numeric(anchor['tax_rate'], errors='coerce')
+            tax = 0.0 if anchor['strategy'] == 'EMISCAP' or pd.isna(tax) else float(tax)
+            cost = exact.get('CS', exact.get('TS', np.nan) - tax * exact['E'] / GRAMS_PER_TONNE)
+            rows.append({
+                'source': run_id, 'kind': 'stability_probe', 'instance_id': anchor['instance_id'],
+                'service_time': anchor['service_time_promised'], 'suppliers': anchor['suppliers_available'],
+                'supp_details_file': self.details_file(anchor),
+                'strategy': anchor['strategy'], 'tax_rate': tax, 'uncapped': False,
+                'solver_status': status, 'TotalCostCS': cost, 'DIO': float(np.sum(vectors['A'])),
+                'Emis': exact['E'],
+            })
+        return pd.DataFrame(rows)
+
+    def pareto_rows(self) -> pd.DataFrame:
+        """Pareto CSV points (multi-objective PLM runs, Cost = TotalCostCS)."""
+        config = campaign_config().get('multi_objective', {})
+        if self.campaign.archive:
+            files = self.campaign.archive.glob('pareto/*_pareto.csv')
+            read = lambda name: self.campaign.archive.read_csv(name, sep=';')
+        else:
+            files = sorted(str(path) for path in (self.campaign.path / 'pareto').glob('*_pareto.csv'))
+            read = lambda name: pd.read_csv(name, sep=';')
+        frames = []
+        for name in files:
+            points = read(name)
+            stem = Path(name).name
+            instance_id = next((i for i in sorted(self.instances, key=len, reverse=True)
+                                if stem.startswith(i + '_cost_')), None)
+            if instance_id is None or points.empty:
+                continue
+            frames.append(pd.DataFrame({
+                'source': points['Prefix'].astype(str), 'kind': 'pareto', 'instance_id': instance_id,
+                'service_time': config.get('service_time', 1), 'suppliers': config.get('suppliers', DEFAULT_NB_SUPP),
+                'supp_details_file': instance_files(self.instances[instance_id])[2],
+                'strategy': 'PARETO', 'tax_rate': 0.0, 'uncapped': False, 'solver_status': 'FEASIBLE',
+                'TotalCostCS': pd.to_numeric(points['Cost'], errors='coerce'),
+                'DIO': pd.to_numeric(points['DIO'], errors='coerce'),
+                'Emis': pd.to_numeric(points['Emissions'], errors='coerce'),
+            }))
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+    def solutions(self) -> pd.DataFrame:
+        frame = pd.concat([self.run_rows(), self.probe_rows(), self.pareto_rows()], ignore_index=True)
+        frame = frame[frame[['TotalCostCS', 'DIO', 'Emis']].notna().all(axis=1)
+                      & (frame['Emis'] != INT32_SENTINEL)].copy()
+        frame['service_time'] = frame['service_time'].astype(int)
+        frame['suppliers'] = frame['suppliers'].astype(int)
+        frame['intercept'] = frame['TotalCostCS'] + frame['DIO']
+        frame['slope'] = frame['Emis'] / GRAMS_PER_TONNE
+        return frame.reset_index(drop=True)
+
+    def signature(self, run_id: str) -> dict:
+        vectors = self.campaign.decisions(run_id)
+        return {key: vectors[key] for key in SIGNATURE_KEYS if key in vectors}
+
+
+def same_operating_point(reference: dict, candidate: dict) -> bool:
+    for key in SIGNATURE_KEYS:
+        left, right = reference.get(key), candidate.get(key)
+        if left is None or right is None or len(left) != len(right) or np.abs(left - right).max(initial=0) > 1e-6:
+            return False
+    return True
+
+
+def envelope_tables(solutions: CampaignSolutions, max_rate: float = np.inf):
+    """(envelope segments, one bracket row per configuration)."""
+    frame = solutions.solutions()
+    segments, brackets = [], []
+    for key, group in frame.groupby(GROUP_COLUMNS, sort=True):
+        group = group.reset_index(drop=True)
+        envelope = lower_envelope(group['intercept'], group['slope'])
+        envelope = envelope[envelope['t_from'] <= max_rate]
+        table = group.loc[envelope['line'], ['source', 'kind', 'TotalCostCS', 'DIO', 'Emis']].reset_index(drop=True)
+        table.insert(0, 'segment', np.arange(len(table)))
+        table['t_from'] = envelope['t_from'].to_numpy()
+        table['t_to'] = envelope['t_to'].to_numpy()
+        for column, value in zip(GROUP_COLUMNS, key):
+            table.insert(GROUP_COLUMNS.index(column), column, value)
+        segments.append(table)
+        brackets.append(threshold_bracket(solutions, group, table, dict(zip(GROUP_COLUMNS, key))))
+    segments = pd.concat(segments, ignore_index=True) if segments else pd.DataFrame()
+    return segments, pd.DataFrame(brackets)
+
+
+def threshold_bracket(solutions: CampaignSolutions, group: pd.DataFrame, envelope: pd.DataFrame, key: dict) -> dict:
+    row = dict(key, baseline_run_id=None, lower=None, lower_run_id=None, upper=None, probe=None,
+               switch_source=None, candidate_rates='')
+    row['candidate_rates'] = '|'.join(f'{t:.6g}' for t in envelope['t_to'].iloc[:-1])
+    taxed = group[(group['kind'] == 'run') & (group['solver_status'] == 'OPTIMAL')
+                  & ((group['strategy'] == 'EMISTAXE') | ((group['strategy'] == 'EMISHYBRID') & group['uncapped']))]
+    baselines = taxed[taxed['tax_rate'] == 0]
+    if baselines.empty:
+        return row
+    # The diagnostic's own baseline is a tax run; hybrid runs without cap only stand in for it.
+    baseline = baselines.iloc[np.lexsort((baselines['source'], baselines['strategy'] != 'EMISTAXE'))[0]]
+    reference = solutions.signature(baseline['source'])
+    row['baseline_run_id'] = baseline['source']
+    # Upper: the baseline line leaves the envelope at the first breakpoint where it is not on it.
+    on_baseline = ((envelope['TotalCostCS'] - baseline['TotalCostCS']).abs() <= SIGNATURE_TOLERANCE) & \
+                  ((envelope['Emis'] - baseline['Emis']).abs() <= SIGNATURE_TOLERANCE) & \
+                  (envelope['DIO'] == baseline['DIO'])
+    if on_baseline.iloc[0] and len(envelope) > 1:
+        last = int(np.argmin(on_baseline.to_numpy())) - 1 if not on_baseline.all() else len(envelope) - 1
+        if last < len(envelope) - 1:
+            row['upper'] = float(envelope['t_to'].iloc[last])
+            row['switch_source'] = envelope['source'].iloc[last + 1]
+            row['probe'] = probe_rate(baseline, envelope.iloc[last + 1], row['upper'])
+    lower, lower_run = 0.0, baseline['source']
+    for _, run in taxed[taxed['tax_rate'] > 0].sort_values('tax_rate', ascending=False).iterrows():
+        if abs(run['TotalCostCS'] - baseline['TotalCostCS']) <= SIGNATURE_TOLERANCE \
+                and abs(run['Emis'] - baseline['Emis']) <= SIGNATURE_TOLERANCE \
+                and same_operating_point(reference, solutions.signature(run['source'])):
+            lower, lower_run = float(run['tax_rate']), run['source']
+            break
+    row['lower'], row['lower_run_id'] = lower, lower_run
+    return row
+
+
+def probe_rate(baseline: pd.Series, switch: pd.Series, upper: float) -> float:
+    """Rate past upper where the switch line undercuts the baseline by PROBE_MARGIN (relative)."""
+    s0 = baseline['Emis'] / GRAMS_PER_TONNE
+    b1, s1 = switch['TotalCostCS'] + switch['DIO'], switch['Emis'] / GRAMS_PER_TONNE
+    # (s0 - s1) * (t - upper) = PROBE_MARGIN * (b1 + s1 * t)
+    rate = ((s0 - s1) * upper + PROBE_MARGIN * b1) / max(s0 - s1 - PROBE_MARGIN * s1, 1e-12)
+    if np.isfinite(switch['t_to']):
+        rate = min(rate, (upper + switch['t_to']) / 2)
+    return float(max(rate, upper * (1 + 1e-6)))
+
+
+def bracket_json(brackets: pd.DataFrame, service_time: int, suppliers: int, data_dir: Path = DATA_DIR,
+                 models_dir: Path = MODELS_DIR) -> dict:
+    """Brackets of the threshold diagnostic's configuration, keyed by instance, with their provenance."""
+    selected = brackets[(brackets['service_time'] == service_time) & (brackets['suppliers'] == suppliers)
+                        & brackets['baseline_run_id'].notna()]
+    registry = registry_instances()
+    instances = {}
+    for _, row in selected.iterrows():
+        # buildTaxRunConfig uses the instance's default supplier file.
+        if row['supp_details_file'] != instance_files(registry[row['instance_id']])[2]:
+            continue
+        files = dict(zip(('bom', 'supp_list', 'supp_details'), instance_files(registry[row['instance_id']])))
+        instances[row['instance_id']] = {
+            'lower': row['lower'],
+            'upper': None if pd.isna(row['upper']) else row['upper'],
+            'probe': None if pd.isna(row['probe']) else row['probe'],
+            'baseline_run_id': row['baseline_run_id'],
+            'lower_run_id': row['lower_run_id'],
+            'switch_source': None if pd.isna(row['switch_source']) else row['switch_source'],
+            'candidate_rates': [float(t) for t in row['candidate_rates'].split('|') if t],
+            'data_files': {
+                name: {'file': file, 'sha256': file_sha256(data_dir / file) if (data_dir / file).exists() else None}
+                for name, file in files.items()
+            },
+        }
+    model = models_dir / TAX_MODEL_FILE
+    return {
+        'service_time': service_time, 'suppliers': suppliers,
+        'model_file': TAX_MODEL_FILE, 'model_sha256': file_sha256(model) if model.exists() else None,
+        'instances': instances,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lower envelope of known solutions over the carbon price')
+    parser.add_argument('campaign', help='results directory or campaign archive')
+    parser.add_argument('--output-dir', help='defaults to <campaign>/tables (or next to an archive)')
+    threshold = campaign_config().get('carbon_price_switching_threshold', {})
+    parser.add_argument('--service-time', type=int, default=threshold.get('service_time', 1))
+    parser.add_argument('--suppliers', type=int, default=threshold.get('suppliers', DEFAULT_NB_SUPP))
+    parser.add_argument('--max-rate', type=float, default=threshold.get('max_probe_rate', np.inf))
+    args = parser.parse_args()
+
+    solutions = CampaignSolutions(args.campaign)
+    segments, brackets = envelope_tables(solutions, args.max_rate)
+    if args.output_dir:
+        output_dir = Path(args.output_dir)
+    elif solutions.campaign.archive:
+        from CampaignArchive import unpacked_dir
+        output_dir = unpacked_dir(args.campaign) / 'tables'
+    else:
+        output_dir = Path(args.campaign) / 'tables'
+    output_dir.mkdir(parents=True, exist_ok=True)
+    segments.to_csv(output_dir / 'envelope.csv', index=False)
+    brackets.to_csv(output_dir / 'threshold_brackets.csv', index=False)
+    payload = bracket_json(brackets, args.service_time, args.suppliers)
+    (output_dir / 'threshold_brackets.json').write_text(json.dumps(payload, indent=2), encoding='utf-8')
+    diagnostic = output_dir / 'carbon_price_threshold_results.csv'
+    solved = pd.read_csv(diagnostic).set_index('instance_id') if diagnostic.exists() else None
+    for instance_id, bracket in payload['instances'].items():
+        upper = f"{bracket['upper']:.4g}" if bracket['upper'] is not None else 'none'
+        note = ''
+        if solved is not None and instance_id in solved.index:
+            low, high = solved.loc[instance_id, ['threshold_lower_eur_per_tco2', 'threshold_upper_eur_per_tco2']]
+            consistent = low >= bracket['lower'] - 1e-9 and (bracket['upper'] is None or low <= bracket['upper'])
+            note = f"; diagnostic [{low:.4g}, {high:.4g}] {'consistent' if consistent else 'INCONSISTENT'}"
+        print(f"{instance_id}: threshold in [{bracket['lower']:.4g}, {upper}] EUR/tCO2 "
+              f"({len(bracket['candidate_rates'])} envelope breakpoints{note})")
+    print(f"Wrote envelope.csv, threshold_brackets.csv and threshold_brackets.json to {output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Rendering decisions for dense figures: LTTB downsampling, rasterised layers, layouts
+
+The publication figures draw every point as a vector marker and every instance as
+its own line, which is right for the article campaigns (tens of instances, a few
+hundred rows) and wrong for generated instances and dense sweeps: the PDFs grow to
+tens of MB and savefig time with them. GraphGenerator asks this module, per figure,
+how to draw a layer:
+
+- point layers with more than RASTER_POINTS points are rasterised inside the
+  otherwise vector PDF (axes, labels and legends stay vector);
+- line series longer than SERIES_POINTS are reduced with Largest-Triangle-Three-
+  Buckets (Steinarsson 2013), which keeps the first and last points and, per bucket,
+  the point spanning the largest triangle, so peaks and kinks survive;
+- above the per-figure limits of DENSE_LIMITS (points drawn, or more series than
+  the black-and-white styles can tell apart) a figure switches to its dense layout:
+  bands of the relative change across instances for the tax sweep, one density
+  panel per strategy for the cost-emissions scatter, small multiples for the Pareto
+  fronts.
+
+Below every threshold the figures are drawn exactly as before. The decisions are
+plain functions of the point counts so they can be tested without matplotlib.
+
+Usage:
+    python DenseRendering.py logs/final_campaign_YYYYMMDD_HHMMSS
+
+prints the layout every figure would use.
+
+Requires: numpy, pandas
+"""
+
+import argparse
+import sys
+
+import numpy as np
+import pandas as pd
+
+RASTER_POINTS = 5_000
+SERIES_POINTS = 400
+MARKERS_PER_SERIES = 25
+# The BW_LINE_STYLES / BW_MARKERS / BW_GRAYS cycles of GraphGenerator.
+DISTINCT_SERIES = 7
+DENSE_LIMITS = {
+    'fig4_tax_sweep': 5_000,
+    'fig7_cost_emissions_pareto': 20_000,
+    'fig13_pareto_cost_emissions': 50_000,
+    'fig14_pareto_cost_dio': 50_000,
+}
+BAND_QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+RENDER_MODES = ('auto', 'vector')
+
+
+def lttb(x, y, threshold: int = SERIES_POINTS) -> np.ndarray:
+    """Positions of the Largest-Triangle-Three-Buckets subsample of a series.
+
+    The first and last points are kept; the points in between are cut into
+    threshold - 2 buckets and each bucket keeps the point forming the largest
+    triangle with the previously kept point and the mean of the next bucket.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    # Mean of every bucket (and of the last point, the bucket after the last one).
+    bounds = np.append(edges, n)
+    counts = np.diff(bounds)
+    mean_x = np.add.reduceat(x, bounds[:-1]) / counts
+    mean_y = np.add.reduceat(y, bounds[:-1]) / counts
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(frame: pd.DataFrame, x: str, y: str, threshold: int = SERIES_POINTS) -> pd.DataFrame:
+    """The LTTB rows of a series frame (all rows when it is short enough)."""
+    if len(frame) <= threshold:
+        return frame
+    return frame.iloc[lttb(frame[x].to_numpy(), frame[y].to_numpy(), threshold)]
+
+
+def marker_step(points: int) -> int:
+    """markevery for a series of `points` points, at most MARKERS_PER_SERIES markers."""
+    return max(1, -(-points // MARKERS_PER_SERIES))
+
+
+def rasterise(points: int, mode: str = 'auto') -> bool:
+    return mode == 'auto' and points > RASTER_POINTS
+
+
+def dense_layout(figure: str, points: int, series: int = 1, mode: str = 'auto') -> bool:
+    """True when `figure` should switch to its dense layout."""
+    if mode != 'auto' or figure not in DENSE_LIMITS:
+        return False
+    return points > DENSE_LIMITS[figure] or series > DISTINCT_SERIES
+
+
+def relative_bands(frame: pd.DataFrame, key: str, x: str, y: str) -> pd.DataFrame:
+    """Quantiles over `key` of y in % of its value at the smallest x, per x.
+
+    One row per x value with the BAND_QUANTILES as columns and the number of
+    series (`series`) that have a value there.
+    """
+    series = frame.pivot_table(index=x, columns=key, values=y, aggfunc='mean').sort_index()
+    reference = series.bfill().iloc[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative = series.to_numpy() / reference.to_numpy() * 100.0
+    relative[~np.isfinite(relative)] = np.nan
+    present = np.isfinite(relative).sum(axis=1)
+    bands = np.full((len(series), len(BAND_QUANTILES)), np.nan)
+    rows = present > 0
+    if rows.any():
+        bands[rows] = np.nanquantile(relative[rows], BAND_QUANTILES, axis=1).T
+    result = pd.DataFrame(bands, index=series.index, columns=list(BAND_QUANTILES))
+    result['series'] = present
+    return result
+
+
+def grid_shape(panels: int, columns: int = 4) -> tuple:
+    """(rows, columns) of a small-multiples grid."""
+    columns = max(1, min(columns, panels))
+    return -(-panels // columns), columns
+
+
+def figure_sizes(tables) -> dict:
+    """(points, series) of the figures in DENSE_LIMITS for a CampaignTables."""
+    sizes = {}
+    if tables.tax_sweep_df is not None:
+        index = tables.index('tax_sweep_df')
+        groups = index.groups('instance_id')
+        sizes['fig4_tax_sweep'] = (sum(len(p) for p in groups.values()), len(groups))
+    summary = tables.summary
+    if summary is not None and summary.admissible_rows and summary.has('strategy'):
+        sizes['fig7_cost_emissions_pareto'] = (sum(len(summary.points[s].points()[0]) for s in summary.strategies),
+                                               len(summary.strategies))
+    if tables._exists('pareto'):
+        files = tables._glob('pareto/*_pareto.csv')
+        for figure, front in (('fig13_pareto_cost_emissions', 'cost_emissions'), ('fig14_pareto_cost_dio', 'cost_dio')):
+            fronts = [f for f in files if front in f.name]
+            if fronts:
+                sizes[figure] = (sum(len(tables._read_csv(f, sep=';')) for f in fronts), len(fronts))
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Layouts the dense-capable figures of a campaign would use')
+    parser.add_argument('results_dir')
+    parser.add_argument('--render', choices=RENDER_MODES, default='auto')
+    args = parser.parse_args()
+
+    from ReportingCore import CampaignTables
+    tables = CampaignTables(args.results_dir)
+    for figure, (points, series) in figure_sizes(tables).items():
+        layout = 'dense' if dense_layout(figure, points, series, args.render) else 'standard'
+        raster = ', rasterised points' if rasterise(points, args.render) else ''
+        print(f"{figure}: {points} points in {series} series -> {layout}{raster}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
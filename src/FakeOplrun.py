@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Stand-in for oplrun with configurable latency distributions
+
+Prints what oplrun prints for a PLM solve (version line, CPLEX node log with
+"Elapsed time" stamps, "Total (root+branch&cut)", OBJECTIVE and the xxxx result
+block), so SolverBenchmark, CampaignQueue and the other oplrun drivers can be run
+offline. Nothing is solved: the solve time, the node count and the gap trajectory
+are drawn from the distributions of a JSON profile, named by FAKE_OPLRUN_PROFILE:
+
+    {
+      "seed": 7,                      optional; with a seed, draws depend only on it, the
+                                      model and data text and the -T<trial> suffix of the
+                                      model file name (as SolverBenchmark names it), so
+                                      reruns repeat
+      "sleep": false,                 optional; true sleeps the drawn solve time
+      "default": {"runtime": {"distribution": "lognormal", "median": 0.5, "sigma": 0.2},
+                  "nodes": {"distribution": "uniform", "low": 100, "high": 400},
+                  "gap_decay": 3.0, "objective": 1000000},
+      "rules": [{"model_contains": "EmisCap <= ", "node_file": "bom_supemis_13.csv",
+                 "runtime": {"distribution": "constant", "value": 2.0}}]
+    }
+
+A rule applies when every condition it gives holds (model_contains: substring of
+the model text, node_file: substring of the nodeFile path); the first applying rule
+overrides the default key by key. Distributions are lognormal (median, sigma),
+normal (mean, sd, truncated at 0), uniform (low, high) and constant (value). The gap
+closes as 100 * (1 - t / T) ** gap_decay over the solve; a solve time above the
+model's cplex.tilim stops at the limit with "Time limit exceeded" and the gap
+reached by then.
+
+Usage:
+    FAKE_OPLRUN_PROFILE=profile.json python FakeOplrun.py model.mod [data.dat]
+
+Requires: (standard library only)
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+PROFILE_VARIABLE = 'FAKE_OPLRUN_PROFILE'
+# SolverBenchmark names its model files <prefix>-T<trial>_<model>.mod.
+TRIAL_PATTERN = re.compile(r'-T(\d+)_')
+DEFAULT_PROFILE = {
+    'runtime': {'distribution': 'lognormal', 'median': 0.5, 'sigma': 0.2},
+    'nodes': {'distribution': 'lognormal', 'median': 200, 'sigma': 0.3},
+    'gap_decay': 3.0,
+    'objective': 1000000.0,
+}
+LOG_LINES = 12
+
+
+def draw(spec: dict, rng: random.Random) -> float:
+    kind = spec.get('distribution', 'constant')
+    if kind == 'lognormal':
+        return spec['median'] * rng.lognormvariate(0.0, spec.get('sigma', 0.0))
+    if kind == 'normal':
+        return max(0.0, rng.gauss(spec['mean'], spec.get('sd', 0.0)))
+    if kind == 'uniform':
+        return rng.uniform(spec['low'], spec['high'])
+    if kind == 'constant':
+        return float(spec['value'])
+    raise ValueError(f"unknown distribution {kind!r}")
+
+
+def applies(rule: dict, model_text: str, node_file: str) -> bool:
+    if 'model_contains' in rule and rule['model_contains'] not in model_text:
+        return False
+    return 'node_file' not in rule or rule['node_file'] in node_file
+
+
+def resolve(profile: dict, model_text: str, node_file: str) -> dict:
+    settings = dict(DEFAULT_PROFILE, **profile.get('default', {}))
+    for rule in profile.get('rules', []):
+        if applies(rule, model_text, node_file):
+            settings.update({key: value for key, value in rule.items() if key not in ('model_contains', 'node_file')})
+            break
+    return settings
+
+
+def cplex_number(value: float) -> str:
+    return f'{value:.4f}'
+
+
+def solve_log(runtime: float, nodes: int, decay: float, objective: float, limit: float) -> str:
+    """Node log of a solve of `runtime` seconds stopped at `limit`."""
+    stop = min(runtime, limit)
+    lines = ['', '        Nodes                                         Cuts/',
+             '   Node  Left     Objective  IInf  Best Integer    Best Bound    ItCnt     Gap', '']
+    for step in range(LOG_LINES + 1):
+        t = stop * step / LOG_LINES
+        gap = 100.0 * (1.0 - t / runtime) ** decay
+        node = int(nodes * t / runtime)
+        incumbent = objective / (1.0 - gap / 100.0) if gap < 100.0 else objective * 10
+        bound = objective if gap < 100.0 else 0.0
+        marker = '*' if step == 0 else ' '
+        lines.append(f'{marker}{node:6d}{max(0, nodes - node) // 4:6d}{cplex_number(bound):>14}{step:6d}'
+                     f'{cplex_number(incumbent):>16}{cplex_number(bound):>14}{10 * step:9d}{gap:9.2f}%')
+        lines.append(f'Elapsed time = {t:.2f} sec. ({100 * t:.2f} ticks, tree = 0.01 MB, solutions = {step + 1})')
+    lines.append('')
+    if runtime > limit:
+        lines.append(f'MIP - Time limit exceeded, integer feasible:  Objective = {cplex_number(incumbent)}')
+    lines.append(f'Total (root+branch&cut) = {stop:7.2f} sec. ({100 * stop:.2f} ticks)')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    if len(sys.argv) < 2:
+        print('usage: FakeOplrun.py model.mod [data.dat]', file=sys.stderr)
+        return 2
+    model_path = Path(sys.argv[1])
+    model_text = model_path.read_text(encoding='utf-8')
+    profile_path = os.environ.get(PROFILE_VARIABLE)
+    profile = json.loads(Path(profile_path).read_text(encoding='utf-8')) if profile_path else {}
+    match = re.search(r'string\s+nodeFile\s*=\s*"([^"]*)"', model_text)
+    node_file = match.group(1) if match else ''
+    settings = resolve(profile, model_text, node_file)
+
+    if 'seed' in profile:
+        trials = TRIAL_PATTERN.findall(model_path.name)
+        stream = hashlib.sha256(f"{profile['seed']}:{trials[-1] if trials else ''}:".encode('utf-8'))
+        stream.update(model_text.encode('utf-8'))
+        if len(sys.argv) > 2:
+            stream.update(Path(sys.argv[2]).read_bytes())
+        rng = random.Random(int(stream.hexdigest()[:16], 16))
+    else:
+        rng = random.Random()
+    runtime = max(draw(settings['runtime'], rng), 1e-3)
+    nodes = int(round(draw(settings['nodes'], rng)))
+    match = re.search(r'cplex\.tilim\s*=\s*([\d.]+)', model_text)
+    limit = float(match.group(1)) if match else float('inf')
+    objective = float(settings['objective'])
+    log = solve_log(runtime, nodes, float(settings['gap_decay']), objective, limit)
+    if profile.get('sleep'):
+        time.sleep(min(runtime, limit))
+
+    print('Version identifier: 20.1.0.0 | fake')
+    if limit != float('inf'):
+        print(f'CPXPARAM_TimeLimit                               {limit:g}')
+    print(log)
+    print('<<< solve\n\n')
+    print(f'OBJECTIVE: {objective:g}')
+    print('xxxx')
+    emissions = objective / 10
+    print(f'#Result <fct_obj, tot_cst, tot_ldt, Emiss>: <{objective:g} {objective:g} 1 {emissions:g}>'
+          f'#TS:{objective:g}#E: {emissions:g}#DELIVER:')
+    print('S1=>P2')
+    print('xxxx')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
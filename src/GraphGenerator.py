@@ -4,7 +4,24 @@ Graph Generator for DDMRP Buffer Positioning and Carbon Footprint Study
 Generates publication-ready figures for Journal of Cleaner Production article
 
 Usage:
-    python GraphGenerator.py <results_directory>
+    python GraphGenerator.py <results_directory | campaign archive> [--chunksize 50000]
+        [--render auto|vector]
+
+An archive written by CampaignArchive.py is read in place; figures then go to the
+sibling directory named after the campaign. With --chunksize the result CSVs are
+read in chunks and only the aggregates the figures need are kept
+(StreamingAggregates.py), for campaigns too large to load at once.
+
+Loading and the admissibility filter come from ReportingCore.py; every figure
+slices its rows from the table's ResultsIndex (admissible mask, instance metadata
+and group positions, built once). matplotlib and seaborn are only imported (and
+styled) when the first figure is drawn.
+
+With --render auto (the default) dense figures follow DenseRendering.py: large point
+layers are rasterised inside the PDF, long series are LTTB-downsampled, and the tax
+sweep, cost-emissions scatter and Pareto fronts switch to bands, density panels or
+small multiples above their point limits. --render vector draws every point as
+before. Render time and file sizes of every figure are kept in render_stats.
 
 Requires: pandas, matplotlib, seaborn, numpy
 """
@@ -12,18 +29,33 @@ Requires: pandas, matplotlib, seaborn, numpy
 import os
 import sys
 import json
+import argparse
+import functools
+import time
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
-from matplotlib.lines import Line2D
-import seaborn as sns
 from pathlib import Path
 from datetime import datetime
 
-# Set publication-ready style
-plt.style.use('seaborn-v0_8-whitegrid')
-plt.rcParams.update({
+from CampaignArchive import is_archive, unpacked_dir
+from DenseRendering import (
+    RENDER_MODES,
+    SERIES_POINTS,
+    dense_layout,
+    downsample,
+    grid_shape,
+    lttb,
+    marker_step,
+    rasterise,
+    relative_bands,
+)
+from ReportingCore import CampaignTables
+from StreamingAggregates import BOX_STRATEGIES
+
+# matplotlib and seaborn are imported and styled on the first plot (load_plotting).
+plt = mpatches = Line2D = sns = None
+
+PUBLICATION_STYLE = {
     'font.family': 'serif',
     'font.serif': ['Times New Roman', 'DejaVu Serif'],
     'font.size': 10,
@@ -36,7 +68,7 @@ plt.rcParams.update({
     'savefig.dpi': 300,
     'savefig.bbox': 'tight',
     'savefig.pad_inches': 0.1
-})
+}
 
 # Color palettes
 STRATEGY_COLORS = {
@@ -59,70 +91,55 @@ BW_MARKERS = ['o', 's', '^', 'D', 'v', 'P', 'X']
 BW_GRAYS = ['black', '0.25', '0.45', '0.6', '0.75', '0.15', '0.35']
 
 
-class GraphGenerator:
-    def __init__(self, results_dir: str):
-        self.results_dir = Path(results_dir)
-        self.figures_dir = self.results_dir / 'figures'
-        self.tables_dir = self.results_dir / 'tables'
+def load_plotting():
+    """Import matplotlib and seaborn and set the publication style (once)."""
+    global plt, mpatches, Line2D, sns
+    if plt is not None:
+        return
+    import matplotlib.pyplot as pyplot
+    import matplotlib.patches as patches
+    from matplotlib.lines import Line2D as line
+    import seaborn
+
+    # Set publication-ready style
+    pyplot.style.use('seaborn-v0_8-whitegrid')
+    pyplot.rcParams.update(PUBLICATION_STYLE)
+    plt, mpatches, Line2D, sns = pyplot, patches, line, seaborn
+
+
+def plotting(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        load_plotting()
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+class GraphGenerator(CampaignTables):
+    def __init__(self, results_dir: str, chunksize: int = None, source=None, summary=None,
+                 render: str = 'auto'):
+        super().__init__(results_dir, chunksize, source, summary)
+        output_dir = unpacked_dir(self.results_dir) if is_archive(self.results_dir) else self.results_dir
+        self.figures_dir = output_dir / 'figures'
+        self.render = render
+        self.render_stats = {}
         
         # Create figures directory if it doesn't exist
         self.figures_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Load data
-        self.consolidated_df = None
-        self.load_data()
-    
-    def load_data(self):
-        """Load all result CSV files"""
-        # Try to load consolidated results
-        consolidated_path = self.results_dir / 'consolidated_results.csv'
-        if consolidated_path.exists():
-            self.consolidated_df = pd.read_csv(consolidated_path)
-            print(f"Loaded consolidated results: {len(self.consolidated_df)} rows")
-        
-        # Load experiment-specific data
-        self.scalability_df = self._load_csv('scalability_results.csv')
-        self.tax_sweep_df = self._load_csv('carbon_tax_sweep_results.csv')
-        self.cap_sweep_df = self._load_csv('carbon_cap_sweep_results.csv')
-        self.hybrid_df = self._load_csv('carbon_hybrid_results.csv')
-        self.svt_df = self._load_csv('service_time_sensitivity_results.csv')
-        self.topology_df = self._load_csv('topology_baseline_results.csv')
-        self.nlm_comparison_df = self._load_csv('nlm_comparison_results.csv')
-    
-    def _load_csv(self, filename: str) -> pd.DataFrame:
-        """Load CSV file if it exists"""
-        filepath = self.tables_dir / filename
-        if filepath.exists():
-            df = pd.read_csv(filepath)
-            print(f"Loaded {filename}: {len(df)} rows")
-            return df
-        return None
 
-    @staticmethod
-    def comparison_admissible(df: pd.DataFrame) -> pd.DataFrame:
-        """Keep proven-optimal rows and feasible incumbents with a final gap <= 1%."""
-        if 'comparison_admissible' in df.columns:
-            values = df['comparison_admissible'].astype(str).str.strip().str.lower()
-            return df[values.isin(['1', '1.0', 'true', 'yes'])].copy()
-
-        status = df['solver_status'].astype(str).str.strip().str.upper()
-        if 'mip_gap' in df.columns:
-            gap = pd.to_numeric(df['mip_gap'], errors='coerce')
-        else:
-            gap = pd.Series(np.nan, index=df.index)
-        return df[(status == 'OPTIMAL') | ((status == 'FEASIBLE') & (gap <= 1.0))].copy()
-
-    @staticmethod
-    def display_instance_id(instance_id: str) -> str:
-        """Return article-facing instance labels for structural BOMs."""
-        parallel_components = {
-            'bom_par2': 'bom_par2_9',
-            'bom_par3': 'bom_par3_11',
-            'bom_par4': 'bom_par4_10',
-            'bom_par5': 'bom_par5_18',
-            'bom_par6': 'bom_par6_24',
+    def save_figure(self, name: str, layout: str = 'standard'):
+        """Save the current figure as PNG and PDF; render time and sizes go to render_stats."""
+        start = time.perf_counter()
+        plt.savefig(self.figures_dir / f'{name}.png')
+        plt.savefig(self.figures_dir / f'{name}.pdf')
+        plt.close()
+        self.render_stats[name] = {
+            'layout': layout,
+            'seconds': time.perf_counter() - start,
+            'png_bytes': (self.figures_dir / f'{name}.png').stat().st_size,
+            'pdf_bytes': (self.figures_dir / f'{name}.pdf').stat().st_size,
         }
-        return parallel_components.get(str(instance_id), str(instance_id))
+        print(f"Generated: {name}.png/pdf")
     
     def generate_all_figures(self):
         """Generate all publication figures"""
@@ -145,12 +162,12 @@ class GraphGenerator:
             self.plot_hybrid_strategy()
         
         # 3. Strategy comparison
-        if self.consolidated_df is not None:
+        if self.summary is not None:
             self.plot_cost_emissions_pareto()
             self.plot_strategy_comparison()
         
         # 4. Inventory KPIs
-        if self.consolidated_df is not None:
+        if self.summary is not None:
             self.plot_inventory_kpis()
         
         # 5. Service time sensitivity
@@ -170,19 +187,19 @@ class GraphGenerator:
         
         print(f"\nAll figures saved to: {self.figures_dir}")
     
+    @plotting
     def plot_scalability_runtime(self):
         """Figure 1: Runtime vs BOM Size"""
-        df = self.scalability_df.copy()
-        df = self.comparison_admissible(df)
+        index = self.index('scalability_df')
         
-        if df.empty:
+        if not index.admissible.any():
             print("No comparison-admissible solutions for scalability runtime plot")
             return
         
         fig, ax = plt.subplots(figsize=(8, 5))
         
-        # Extract numeric BOM size from instance_id
-        df['bom_size'] = df['instance_id'].str.extract(r'bom_(\d+)').astype(float)
+        # Registry size of the regular BOMs, from the instance catalog
+        df = index.rows(topology='Standard', columns=['N', 'runtime_sec']).rename(columns={'N': 'bom_size'})
         df = df.dropna(subset=['bom_size']).sort_values('bom_size')
         
         ax.scatter(df['bom_size'], df['runtime_sec'], c='#2E86AB', s=60, alpha=0.7, edgecolors='black', linewidths=0.5)
@@ -203,20 +220,17 @@ class GraphGenerator:
         ax.set_ylim(0, max(df['runtime_sec']) * 1.1)
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig1_scalability_runtime.png')
-        plt.savefig(self.figures_dir / 'fig1_scalability_runtime.pdf')
-        plt.close()
-        print("Generated: fig1_scalability_runtime.png/pdf")
+        self.save_figure('fig1_scalability_runtime')
     
+    @plotting
     def plot_scalability_emissions(self):
         """Figure 2: Baseline Emissions vs BOM Size, split by scale"""
-        df = self.scalability_df.copy()
-        df = self.comparison_admissible(df)
+        index = self.index('scalability_df')
         
-        if df.empty or 'total_emissions' not in df.columns:
+        if not index.admissible.any() or 'total_emissions' not in index.frame.columns:
             return
         
-        df['bom_size'] = df['instance_id'].str.extract(r'bom_(\d+)').astype(float)
+        df = index.rows(topology='Standard', columns=['N', 'total_emissions']).rename(columns={'N': 'bom_size'})
         df = df.dropna(subset=['bom_size', 'total_emissions']).sort_values('bom_size')
 
         small = df[df['bom_size'] <= 50]
@@ -243,22 +257,19 @@ class GraphGenerator:
             ax.tick_params(axis='x', rotation=45)
 
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig2_scalability_emissions.png')
-        plt.savefig(self.figures_dir / 'fig2_scalability_emissions.pdf')
-        plt.close()
-        print("Generated: fig2_scalability_emissions.png/pdf")
+        self.save_figure('fig2_scalability_emissions')
     
+    @plotting
     def plot_scalability_buffers(self):
         """Figure 3: Buffer Count vs BOM Size"""
-        df = self.scalability_df.copy()
-        df = self.comparison_admissible(df)
+        index = self.index('scalability_df')
         
-        if df.empty or 'buffer_count' not in df.columns:
+        if not index.admissible.any() or 'buffer_count' not in index.frame.columns:
             return
         
         fig, ax = plt.subplots(figsize=(8, 5))
         
-        df['bom_size'] = df['instance_id'].str.extract(r'bom_(\d+)').astype(float)
+        df = index.rows(topology='Standard', columns=['N', 'buffer_count']).rename(columns={'N': 'bom_size'})
         df = df.dropna(subset=['bom_size', 'buffer_count']).sort_values('bom_size')
         
         ax.scatter(df['bom_size'], df['buffer_count'], c='#2ecc71', s=80, alpha=0.7, edgecolors='black', linewidths=0.5)
@@ -274,71 +285,94 @@ class GraphGenerator:
         ax.legend()
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig3_scalability_buffers.png')
-        plt.savefig(self.figures_dir / 'fig3_scalability_buffers.pdf')
-        plt.close()
-        print("Generated: fig3_scalability_buffers.png/pdf")
+        self.save_figure('fig3_scalability_buffers')
     
+    @plotting
     def plot_tax_sweep(self):
         """Figure 4: Emissions and Cost vs Carbon Tax Rate"""
-        df = self.tax_sweep_df.copy()
-        df = self.comparison_admissible(df)
+        index = self.index('tax_sweep_df')
         
-        if df.empty:
+        if not index.admissible.any():
             return
         
         fig, axes = plt.subplots(1, 2, figsize=(12, 5))
         
-        instances = df['instance_id'].unique()
-
-        for i, instance in enumerate(instances):
-            inst_df = df[df['instance_id'] == instance].sort_values('tax_rate')
-
-            if len(inst_df) > 1:
-                style = BW_LINE_STYLES[i % len(BW_LINE_STYLES)]
-                marker = BW_MARKERS[i % len(BW_MARKERS)]
-                color = BW_GRAYS[i % len(BW_GRAYS)]
-
-                axes[0].plot(inst_df['tax_rate'], inst_df['total_emissions'] / 1e6,
-                           marker=marker, linestyle=style, label=self.display_instance_id(instance),
-                           color=color, linewidth=1.8, markersize=6,
-                           markerfacecolor='white', markeredgecolor=color)
-
-                axes[1].plot(inst_df['tax_rate'], inst_df['total_cost_with_tax'] / 1e3,
-                           marker=marker, linestyle=style, label=self.display_instance_id(instance),
-                           color=color, linewidth=1.8, markersize=6,
-                           markerfacecolor='white', markeredgecolor=color)
+        columns = ['tax_rate', 'total_emissions', 'total_cost_with_tax']
+        instances = index.groups('instance_id')
+        points = sum(len(positions) for positions in instances.values())
+
+        if dense_layout('fig4_tax_sweep', points, len(instances), self.render):
+            rows = index.rows(columns=['instance_id'] + columns)
+            for ax, column in zip(axes, columns[1:]):
+                self._draw_bands(ax, relative_bands(rows, 'instance_id', 'tax_rate', column), len(instances))
+            axes[0].set_ylabel('Total emissions (% of lowest-tax level)')
+            axes[1].set_ylabel('Total Cost (% of lowest-tax level)')
+            layout = 'bands'
+        else:
+            for i, (instance, positions) in enumerate(instances.items()):
+                inst_df = index.take(positions, columns).sort_values('tax_rate')
+
+                if len(inst_df) > 1:
+                    style = BW_LINE_STYLES[i % len(BW_LINE_STYLES)]
+                    marker = BW_MARKERS[i % len(BW_MARKERS)]
+                    color = BW_GRAYS[i % len(BW_GRAYS)]
+
+                    for ax, column, scale in ((axes[0], 'total_emissions', 1e6), (axes[1], 'total_cost_with_tax', 1e3)):
+                        series = self._series(inst_df, 'tax_rate', column)
+                        ax.plot(series['tax_rate'], series[column] / scale,
+                                marker=marker, linestyle=style, label=self.display_instance_id(instance),
+                                color=color, linewidth=1.8, markersize=6,
+                                markerfacecolor='white', markeredgecolor=color,
+                                **self._series_style(len(inst_df), len(series)))
+            axes[0].set_ylabel('Total emissions (tCO₂)')
+            axes[1].set_ylabel('Total Cost (Thousand $)')
+            layout = 'standard'
 
         axes[0].set_xlabel('EmisTax (EUR/tCO₂)')
-        axes[0].set_ylabel('Total emissions (tCO₂)')
         axes[0].set_title('Emissions Response to Carbon Tax')
         axes[0].legend(loc='best', fontsize=8)
 
         axes[1].set_xlabel('EmisTax (EUR/tCO₂)')
-        axes[1].set_ylabel('Total Cost (Thousand $)')
         axes[1].set_title('Cost Impact of Carbon Tax')
         axes[1].legend(loc='best', fontsize=8)
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig4_tax_sweep.png')
-        plt.savefig(self.figures_dir / 'fig4_tax_sweep.pdf')
-        plt.close()
-        print("Generated: fig4_tax_sweep.png/pdf")
+        self.save_figure('fig4_tax_sweep', layout)
+
+    def _series(self, frame: pd.DataFrame, x: str, y: str) -> pd.DataFrame:
+        """The rows of a line series to draw: LTTB-downsampled when long (render auto)."""
+        if self.render != 'auto':
+            return frame
+        return downsample(frame, x, y)
+
+    @staticmethod
+    def _series_style(points: int, drawn: int) -> dict:
+        """Extra line arguments of a downsampled series: markers on a few of its points."""
+        return {'markevery': marker_step(drawn)} if drawn < points else {}
+
+    @staticmethod
+    def _draw_bands(ax, bands: pd.DataFrame, count: int):
+        """Median line and 25-75 / 5-95 % bands of relative_bands over the x values."""
+        if len(bands) > SERIES_POINTS:
+            bands = bands.iloc[lttb(bands.index.to_numpy(dtype=float), bands[0.5].to_numpy(), SERIES_POINTS)]
+        x = bands.index.to_numpy(dtype=float)
+        ax.fill_between(x, bands[0.05], bands[0.95], color='0.88', linewidth=0, label='5-95th percentile')
+        ax.fill_between(x, bands[0.25], bands[0.75], color='0.65', linewidth=0, label='Interquartile range')
+        ax.plot(x, bands[0.5], color='black', linewidth=1.8, label=f'Median of {count} instances')
+        ax.axhline(100, color='0.4', linestyle=':', linewidth=0.8)
     
+    @plotting
     def plot_cap_sweep(self):
         """Figure 5: Cost vs Emission Cap Tightening"""
-        df = self.cap_sweep_df.copy()
-        df = self.comparison_admissible(df)
+        index = self.index('cap_sweep_df')
         
-        if df.empty:
+        if not index.admissible.any():
             return
         
         fig, ax = plt.subplots(figsize=(8, 5))
         
-        instances = df['instance_id'].unique()
-
-        for i, instance in enumerate(instances):
-            inst_df = df[df['instance_id'] == instance].sort_values('cap_value', ascending=False)
+        for i, (instance, positions) in enumerate(index.groups('instance_id').items()):
+            inst_df = index.take(positions).sort_values('cap_value', ascending=False)
 
             if len(inst_df) > 1 and 'emission_reduction_pct' in inst_df.columns:
                 baseline_emis = inst_df['baseline_emissions'].iloc[0] if 'baseline_emissions' in inst_df.columns else inst_df['cap_value'].max()
@@ -361,32 +395,29 @@ class GraphGenerator:
         ax.invert_xaxis()  # Lower cap = tighter constraint
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig5_cap_sweep.png')
-        plt.savefig(self.figures_dir / 'fig5_cap_sweep.pdf')
-        plt.close()
-        print("Generated: fig5_cap_sweep.png/pdf")
+        self.save_figure('fig5_cap_sweep')
     
+    @plotting
     def plot_hybrid_strategy(self):
         """Figure 6: Hybrid Tax+Cap Strategy Comparison"""
-        df = self.hybrid_df.copy()
-        df = self.comparison_admissible(df)
+        index = self.index('hybrid_df')
         
-        if df.empty:
+        if not index.admissible.any():
             return
         
         fig, axes = plt.subplots(1, 2, figsize=(12, 5))
 
-        instances = df['instance_id'].unique()
+        instances = index.groups('instance_id')
 
-        for i, instance in enumerate(instances[:2]):  # First two instances for clarity
-            inst_df = df[df['instance_id'] == instance]
+        for i, instance in enumerate(list(instances)[:2]):  # First two instances for clarity
+            positions = instances[instance]
 
-            if len(inst_df) > 1:
+            if len(positions) > 1:
                 ax = axes[i] if len(instances) > 1 else axes
 
                 cap_labels = ['none', '100%', '95%', '90%', '85%', '80%', '75%', '70%']
                 cap_positions = {label: pos for pos, label in enumerate(cap_labels)}
-                inst_df = inst_df.copy()
+                inst_df = index.take(positions, ['tax_rate', 'cap_level', 'total_cost_with_tax'])
                 inst_df['cap_label'] = inst_df['cap_level'].astype(str)
                 inst_df['cap_pos'] = inst_df['cap_label'].map(cap_positions)
                 inst_df = inst_df.dropna(subset=['cap_pos']).sort_values(['tax_rate', 'cap_pos'])
@@ -411,31 +442,50 @@ class GraphGenerator:
                 ax.legend(title='EmisTax', loc='best', fontsize=7)
 
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig6_hybrid_strategy.png')
-        plt.savefig(self.figures_dir / 'fig6_hybrid_strategy.pdf')
-        plt.close()
-        print("Generated: fig6_hybrid_strategy.png/pdf")
+        self.save_figure('fig6_hybrid_strategy')
     
+    @plotting
     def plot_cost_emissions_pareto(self):
         """Figure 7: Cost-Emissions Trade-off by Strategy"""
-        df = self.consolidated_df.copy()
-        df = self.comparison_admissible(df)
+        summary = self.summary
         
-        if df.empty or 'strategy' not in df.columns:
+        if not summary.admissible_rows or not summary.has('strategy'):
             return
         
+        points = {strategy: summary.points[strategy].points() for strategy in summary.strategies}
+        count = sum(len(emissions) for emissions, _ in points.values())
+
+        if dense_layout('fig7_cost_emissions_pareto', count, len(points), self.render):
+            # One run-density panel per strategy instead of overlapping markers.
+            rows, columns = grid_shape(len(points), 2)
+            fig, axes = plt.subplots(rows, columns, figsize=(5.5 * columns, 4.2 * rows),
+                                     sharex=True, sharey=True, squeeze=False)
+            for ax, (strategy, (emissions, costs)) in zip(axes.flat, points.items()):
+                if len(emissions):
+                    ax.hexbin(emissions / 1e6, costs / 1e3, gridsize=50, bins='log', mincnt=1,
+                              cmap='Greys', linewidths=0, rasterized=True)
+                ax.set_title(f'{strategy} ({summary.points[strategy].seen} runs)')
+            for ax in axes.flat[len(points):]:
+                ax.set_visible(False)
+            for ax in axes[-1]:
+                ax.set_xlabel('Total emissions (tCO₂)')
+            for ax in axes[:, 0]:
+                ax.set_ylabel('Total Cost (Thousand $)')
+            fig.suptitle('Cost-Emissions Trade-offs by Carbon Policy Strategy (run density)')
+            plt.tight_layout()
+            self.save_figure('fig7_cost_emissions_pareto', 'density')
+            return
+
         fig, ax = plt.subplots(figsize=(10, 6))
+        raster = {'rasterized': True} if rasterise(count, self.render) else {}
         
-        strategies = df['strategy'].unique()
-        
-        for strategy in strategies:
-            strat_df = df[df['strategy'] == strategy]
+        for strategy, (emissions, costs) in points.items():
             color = STRATEGY_COLORS.get(strategy, '#333333')
             
-            ax.scatter(strat_df['total_emissions'] / 1e6, 
-                      strat_df['total_cost_without_tax'] / 1e3,
+            ax.scatter(emissions / 1e6, 
+                      costs / 1e3,
                       c=color, s=60, alpha=0.6, label=strategy,
-                      edgecolors='black', linewidths=0.3)
+                      edgecolors='black', linewidths=0.3, **raster)
         
         ax.set_xlabel('Total emissions (tCO₂)')
         ax.set_ylabel('Total Cost (Thousand $)')
@@ -443,23 +493,19 @@ class GraphGenerator:
         ax.legend(title='Strategy', loc='best')
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig7_cost_emissions_pareto.png')
-        plt.savefig(self.figures_dir / 'fig7_cost_emissions_pareto.pdf')
-        plt.close()
-        print("Generated: fig7_cost_emissions_pareto.png/pdf")
+        self.save_figure('fig7_cost_emissions_pareto', 'rasterised' if raster else 'standard')
     
+    @plotting
     def plot_strategy_comparison(self):
         """Figure 8: Strategy Comparison Box Plots"""
-        df = self.consolidated_df.copy()
-        df = self.comparison_admissible(df)
+        summary = self.summary
         
-        if df.empty or 'strategy' not in df.columns:
+        if not summary.admissible_rows or not summary.has('strategy'):
             return
         
         fig, axes = plt.subplots(1, 3, figsize=(14, 5))
         
-        strategies = ['EMISTAXE', 'EMISCAP', 'EMISHYBRID']
-        existing_strategies = [s for s in strategies if s in df['strategy'].values]
+        existing_strategies = [s for s in BOX_STRATEGIES if s in summary.strategies]
         
         if len(existing_strategies) < 2:
             return
@@ -467,17 +513,16 @@ class GraphGenerator:
         colors = [STRATEGY_COLORS.get(s, '#333333') for s in existing_strategies]
         
         # Cost comparison - use total_cost_with_tax first, fallback to total_cost_without_tax
-        cost_data = []
+        cost_stats = []
         for s in existing_strategies:
-            strat_df = df[df['strategy'] == s]
             # Try total_cost_with_tax first (contains data for EMISTAXE)
-            costs = strat_df['total_cost_with_tax'].dropna()
-            if costs.empty:
+            costs = summary.digest('total_cost_with_tax', s)
+            if not costs.count:
                 # Fallback to total_cost_without_tax
-                costs = strat_df['total_cost_without_tax'].dropna()
-            cost_data.append(costs / 1e3)
+                costs = summary.digest('total_cost_without_tax', s)
+            cost_stats.append(costs.boxplot_stats(s, scale=1e3))
         
-        bp1 = axes[0].boxplot(cost_data, tick_labels=existing_strategies, patch_artist=True)
+        bp1 = axes[0].bxp(cost_stats, patch_artist=True)
         for patch, color in zip(bp1['boxes'], colors):
             patch.set_facecolor(color)
             patch.set_alpha(0.7)
@@ -485,8 +530,8 @@ class GraphGenerator:
         axes[0].set_title('Cost Distribution by Strategy')
         
         # Emissions comparison
-        emis_data = [df[df['strategy'] == s]['total_emissions'].dropna() / 1e6 for s in existing_strategies]
-        bp2 = axes[1].boxplot(emis_data, tick_labels=existing_strategies, patch_artist=True)
+        emis_stats = [summary.digest('total_emissions', s).boxplot_stats(s, scale=1e6) for s in existing_strategies]
+        bp2 = axes[1].bxp(emis_stats, patch_artist=True)
         for patch, color in zip(bp2['boxes'], colors):
             patch.set_facecolor(color)
             patch.set_alpha(0.7)
@@ -494,8 +539,8 @@ class GraphGenerator:
         axes[1].set_title('Emissions Distribution by Strategy')
         
         # Buffer count comparison
-        buffer_data = [df[df['strategy'] == s]['buffer_count'].dropna() for s in existing_strategies]
-        bp3 = axes[2].boxplot(buffer_data, tick_labels=existing_strategies, patch_artist=True)
+        buffer_stats = [summary.digest('buffer_count', s).boxplot_stats(s) for s in existing_strategies]
+        bp3 = axes[2].bxp(buffer_stats, patch_artist=True)
         for patch, color in zip(bp3['boxes'], colors):
             patch.set_facecolor(color)
             patch.set_alpha(0.7)
@@ -503,24 +548,21 @@ class GraphGenerator:
         axes[2].set_title('Buffer Positioning by Strategy')
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig8_strategy_comparison.png')
-        plt.savefig(self.figures_dir / 'fig8_strategy_comparison.pdf')
-        plt.close()
-        print("Generated: fig8_strategy_comparison.png/pdf")
+        self.save_figure('fig8_strategy_comparison')
     
+    @plotting
     def plot_inventory_kpis(self):
         """Figure 9: Inventory KPIs (DIO, WIP) by Strategy"""
-        df = self.consolidated_df.copy()
-        df = self.comparison_admissible(df)
+        summary = self.summary
         
-        if df.empty or 'DIO' not in df.columns:
+        if not summary.admissible_rows or not summary.has('DIO'):
             return
         
         fig, axes = plt.subplots(1, 2, figsize=(12, 5))
         
         # DIO by strategy
-        strategies = df['strategy'].unique()
-        dio_means = [df[df['strategy'] == s]['DIO'].mean() for s in strategies]
+        strategies = summary.strategies
+        dio_means = [summary.dio.mean(s) for s in strategies]
         colors = [STRATEGY_COLORS.get(s, '#333333') for s in strategies]
         
         axes[0].bar(strategies, dio_means, color=colors, alpha=0.7, edgecolor='black')
@@ -528,8 +570,8 @@ class GraphGenerator:
         axes[0].set_title('Average DIO by Carbon Policy Strategy')
         
         # DIO improvement (if available)
-        if 'DIO_improvement_pct' in df.columns:
-            dio_impr = [df[df['strategy'] == s]['DIO_improvement_pct'].mean() for s in strategies]
+        if summary.has('DIO_improvement_pct'):
+            dio_impr = [summary.dio_improvement.mean(s) for s in strategies]
             dio_impr = [x if pd.notna(x) else 0 for x in dio_impr]
             axes[1].bar(strategies, dio_impr, color=colors, alpha=0.7, edgecolor='black')
             axes[1].set_ylabel('DIO Improvement (%)')
@@ -537,66 +579,58 @@ class GraphGenerator:
             axes[1].axhline(y=0, color='gray', linestyle='--', alpha=0.5)
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig9_inventory_kpis.png')
-        plt.savefig(self.figures_dir / 'fig9_inventory_kpis.pdf')
-        plt.close()
-        print("Generated: fig9_inventory_kpis.png/pdf")
+        self.save_figure('fig9_inventory_kpis')
     
+    @plotting
     def plot_service_time_sensitivity(self):
         """Figure 10: Service Time Sensitivity Analysis"""
-        df = self.svt_df.copy()
-        df = self.comparison_admissible(df)
+        index = self.index('svt_df')
         
-        if df.empty:
+        if not index.admissible.any():
             return
         
         fig, axes = plt.subplots(1, 2, figsize=(12, 5))
         
         # Group by service time
-        svt_groups = df.groupby('service_time_promised')
+        svt_groups = index.groups('service_time_promised')
         
-        svt_values = sorted(df['service_time_promised'].unique())
+        svt_values = sorted(svt_groups)
         
         # Buffer count vs service time
-        buffer_means = [df[df['service_time_promised'] == svt]['buffer_count'].mean() for svt in svt_values]
+        buffer_means = [index.take(svt_groups[svt], ['buffer_count'])['buffer_count'].mean() for svt in svt_values]
         axes[0].bar([str(s) for s in svt_values], buffer_means, color='#3498db', alpha=0.7, edgecolor='black')
         axes[0].set_xlabel('Promised Service Time')
         axes[0].set_ylabel('Average Number of Buffers')
         axes[0].set_title('Buffer Positioning vs Service Time Constraint')
         
         # Cost vs service time
-        cost_means = [df[df['service_time_promised'] == svt]['total_cost_without_tax'].mean() / 1e3 for svt in svt_values]
+        cost_means = [index.take(svt_groups[svt], ['total_cost_without_tax'])['total_cost_without_tax'].mean() / 1e3
+                      for svt in svt_values]
         axes[1].bar([str(s) for s in svt_values], cost_means, color='#e74c3c', alpha=0.7, edgecolor='black')
         axes[1].set_xlabel('Promised Service Time')
         axes[1].set_ylabel('Average Total Cost (Thousand $)')
         axes[1].set_title('Cost Impact of Service Time Constraint')
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig10_service_time_sensitivity.png')
-        plt.savefig(self.figures_dir / 'fig10_service_time_sensitivity.pdf')
-        plt.close()
-        print("Generated: fig10_service_time_sensitivity.png/pdf")
+        self.save_figure('fig10_service_time_sensitivity')
     
+    @plotting
     def plot_topology_comparison(self):
         """Figure 11: Topology Comparison (ML vs PAR)"""
-        df = self.topology_df.copy()
-        df = self.comparison_admissible(df)
+        index = self.index('topology_df')
         
-        if df.empty:
+        if not index.admissible.any():
             return
         
         fig, axes = plt.subplots(1, 2, figsize=(12, 5))
         
-        # Identify topology from instance_id
-        df['topology'] = df['instance_id'].apply(
-            lambda x: 'Multi-Level' if 'ml' in x.lower() else ('Parallel' if 'par' in x.lower() else 'Standard')
-        )
-        
-        topologies = df['topology'].unique()
+        # Registry family of each instance, from the instance catalog
+        groups = index.groups('topology')
+        topologies = list(groups)
         colors = ['#9b59b6', '#f39c12', '#3498db'][:len(topologies)]
         
         # Emissions by topology
-        emis_data = [df[df['topology'] == t]['total_emissions'].dropna() / 1e6 for t in topologies]
+        emis_data = [index.take(groups[t], ['total_emissions'])['total_emissions'].dropna() / 1e6 for t in topologies]
         bp1 = axes[0].boxplot(emis_data, tick_labels=topologies, patch_artist=True)
         for patch, color in zip(bp1['boxes'], colors):
             patch.set_facecolor(color)
@@ -605,7 +639,7 @@ class GraphGenerator:
         axes[0].set_title('Emissions by BOM Topology')
         
         # Buffers by topology
-        buffer_data = [df[df['topology'] == t]['buffer_count'].dropna() for t in topologies]
+        buffer_data = [index.take(groups[t], ['buffer_count'])['buffer_count'].dropna() for t in topologies]
         bp2 = axes[1].boxplot(buffer_data, tick_labels=topologies, patch_artist=True)
         for patch, color in zip(bp2['boxes'], colors):
             patch.set_facecolor(color)
@@ -614,24 +648,22 @@ class GraphGenerator:
         axes[1].set_title('Buffer Positioning by BOM Topology')
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig11_topology_comparison.png')
-        plt.savefig(self.figures_dir / 'fig11_topology_comparison.pdf')
-        plt.close()
-        print("Generated: fig11_topology_comparison.png/pdf")
+        self.save_figure('fig11_topology_comparison')
     
+    @plotting
     def plot_plm_nlm_comparison(self):
         """Figure 12: PLM vs NLM Model Comparison"""
-        df = self.nlm_comparison_df.copy()
-        df = self.comparison_admissible(df)
+        index = self.index('nlm_comparison_df')
         
-        if df.empty or 'model_type' not in df.columns:
+        if not index.admissible.any() or 'model_type' not in index.frame.columns:
             return
         
         fig, axes = plt.subplots(1, 2, figsize=(12, 5))
         
         # Runtime comparison
-        model_types = df['model_type'].unique()
-        runtime_means = [df[df['model_type'] == mt]['runtime_sec'].mean() for mt in model_types]
+        groups = index.groups('model_type')
+        model_types = list(groups)
+        runtime_means = [index.take(groups[mt], ['runtime_sec'])['runtime_sec'].mean() for mt in model_types]
         
         colors = ['#2E86AB', '#E94F37']
         axes[0].bar(model_types, runtime_means, color=colors[:len(model_types)], alpha=0.7, edgecolor='black')
@@ -639,27 +671,24 @@ class GraphGenerator:
         axes[0].set_title('Computation Time: PLM vs NLM')
         
         # Cost comparison
-        cost_means = [df[df['model_type'] == mt]['total_cost_without_tax'].mean() / 1e3 for mt in model_types]
+        cost_means = [index.take(groups[mt], ['total_cost_without_tax'])['total_cost_without_tax'].mean() / 1e3
+                      for mt in model_types]
         axes[1].bar(model_types, cost_means, color=colors[:len(model_types)], alpha=0.7, edgecolor='black')
         axes[1].set_ylabel('Average Total Cost (Thousand $)')
         axes[1].set_title('Solution Quality: PLM vs NLM')
         
         plt.tight_layout()
-        plt.savefig(self.figures_dir / 'fig12_plm_nlm_comparison.png')
-        plt.savefig(self.figures_dir / 'fig12_plm_nlm_comparison.pdf')
-        plt.close()
-        print("Generated: fig12_plm_nlm_comparison.png/pdf")
+        self.save_figure('fig12_plm_nlm_comparison')
     
+    @plotting
     def plot_pareto_fronts(self):
         """Figure 13-15: Multi-objective Pareto Fronts"""
-        pareto_dir = self.results_dir / 'pareto'
-        
-        if not pareto_dir.exists():
+        if not self._exists('pareto'):
             print("No Pareto front data found")
             return
         
         # Find Pareto CSV files
-        pareto_files = list(pareto_dir.glob('*_pareto.csv'))
+        pareto_files = self._glob('pareto/*_pareto.csv')
         
         if not pareto_files:
             return
@@ -671,69 +700,77 @@ class GraphGenerator:
         
         # Plot Cost-Emissions Pareto
         if cost_emis_files:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            
-            for i, f in enumerate(cost_emis_files):
-                df = pd.read_csv(f, sep=';')
-                instance = f.stem.replace('_cost_emissions_pareto', '')
-                
-                if 'Cost' in df.columns and 'Emissions' in df.columns:
-                    df = df.dropna(subset=['Cost', 'Emissions'])
-                    ax.plot(df['Emissions'] / 1e6, df['Cost'] / 1e3, 
-                           marker=BW_MARKERS[i % len(BW_MARKERS)],
-                           linestyle=BW_LINE_STYLES[i % len(BW_LINE_STYLES)],
-                           color=BW_GRAYS[i % len(BW_GRAYS)],
-                           label=instance,
-                           linewidth=1.8,
-                           markersize=6,
-                           markerfacecolor='white',
-                           markeredgecolor=BW_GRAYS[i % len(BW_GRAYS)])
-            
-            ax.set_xlabel('Total emissions (tCO₂)')
-            ax.set_ylabel('Total Cost (Thousand $)')
-            ax.set_title('Cost-Emissions Pareto Front')
-            ax.legend(loc='best')
-            
-            plt.tight_layout()
-            plt.savefig(self.figures_dir / 'fig13_pareto_cost_emissions.png')
-            plt.savefig(self.figures_dir / 'fig13_pareto_cost_emissions.pdf')
-            plt.close()
-            print("Generated: fig13_pareto_cost_emissions.png/pdf")
+            self._plot_fronts(cost_emis_files, '_cost_emissions_pareto', 'Emissions', 1e6,
+                              'Total emissions (tCO₂)', 'Cost-Emissions Pareto Front', 'fig13_pareto_cost_emissions')
         
         # Plot Cost-DIO Pareto
         if cost_dio_files:
-            fig, ax = plt.subplots(figsize=(8, 6))
-            
-            for i, f in enumerate(cost_dio_files):
-                df = pd.read_csv(f, sep=';')
-                instance = f.stem.replace('_cost_dio_pareto', '')
-                
-                if 'Cost' in df.columns and 'DIO' in df.columns:
-                    df = df.dropna(subset=['Cost', 'DIO'])
-                    ax.plot(df['DIO'], df['Cost'] / 1e3, 
-                           marker=BW_MARKERS[i % len(BW_MARKERS)],
-                           linestyle=BW_LINE_STYLES[i % len(BW_LINE_STYLES)],
-                           color=BW_GRAYS[i % len(BW_GRAYS)],
-                           label=instance,
-                           linewidth=1.8,
-                           markersize=6,
-                           markerfacecolor='white',
-                           markeredgecolor=BW_GRAYS[i % len(BW_GRAYS)])
-            
-            ax.set_xlabel('Days Inventory Outstanding (DIO)')
-            ax.set_ylabel('Total Cost (Thousand $)')
-            ax.set_title('Cost-DIO Pareto Front')
-            ax.legend(loc='best')
-            
+            self._plot_fronts(cost_dio_files, '_cost_dio_pareto', 'DIO', 1,
+                              'Days Inventory Outstanding (DIO)', 'Cost-DIO Pareto Front', 'fig14_pareto_cost_dio')
+
+    def _plot_fronts(self, files, suffix: str, x: str, x_scale: float, xlabel: str, title: str, name: str):
+        """One Cost-vs-x line per front file; small multiples when dense_layout says so."""
+        fronts = []
+        for f in files:
+            df = self._read_csv(f, sep=';')
+            if 'Cost' in df.columns and x in df.columns:
+                fronts.append((f.stem.replace(suffix, ''), df.dropna(subset=['Cost', x])))
+            else:
+                fronts.append((f.stem.replace(suffix, ''), None))
+        points = sum(len(df) for _, df in fronts if df is not None)
+
+        if dense_layout(name, points, len(fronts), self.render):
+            drawn = [(instance, df) for instance, df in fronts if df is not None]
+            rows, columns = grid_shape(len(drawn))
+            fig, axes = plt.subplots(rows, columns, figsize=(3.2 * columns, 2.6 * rows), squeeze=False)
+            for ax, (instance, df) in zip(axes.flat, drawn):
+                series = self._series(df, x, 'Cost')
+                ax.plot(series[x] / x_scale, series['Cost'] / 1e3, color='black', linewidth=1.2,
+                        marker='o', markersize=3, markerfacecolor='white', markevery=marker_step(len(series)))
+                ax.set_title(instance, fontsize=9)
+            for ax in axes.flat[len(drawn):]:
+                ax.set_visible(False)
+            fig.supxlabel(xlabel)
+            fig.supylabel('Total Cost (Thousand $)')
+            fig.suptitle(title)
             plt.tight_layout()
-            plt.savefig(self.figures_dir / 'fig14_pareto_cost_dio.png')
-            plt.savefig(self.figures_dir / 'fig14_pareto_cost_dio.pdf')
-            plt.close()
-            print("Generated: fig14_pareto_cost_dio.png/pdf")
+            self.save_figure(name, 'small_multiples')
+            return
+
+        fig, ax = plt.subplots(figsize=(8, 6))
+        
+        for i, (instance, df) in enumerate(fronts):
+            if df is not None:
+                series = self._series(df, x, 'Cost')
+                ax.plot(series[x] / x_scale, series['Cost'] / 1e3, 
+                       marker=BW_MARKERS[i % len(BW_MARKERS)],
+                       linestyle=BW_LINE_STYLES[i % len(BW_LINE_STYLES)],
+                       color=BW_GRAYS[i % len(BW_GRAYS)],
+                       label=instance,
+                       linewidth=1.8,
+                       markersize=6,
+                       markerfacecolor='white',
+                       markeredgecolor=BW_GRAYS[i % len(BW_GRAYS)],
+                       **self._series_style(len(df), len(series)))
+        
+        ax.set_xlabel(xlabel)
+        ax.set_ylabel('Total Cost (Thousand $)')
+        ax.set_title(title)
+        ax.legend(loc='best')
+        
+        plt.tight_layout()
+        self.save_figure(name)
 
 
 def main():
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description='Publication figures of a final campaign')
+    parser.add_argument('results_dir', nargs='?', help='results directory or campaign archive (default: latest)')
+    parser.add_argument('--chunksize', type=int, help='read the result CSVs in chunks of this many rows')
+    parser.add_argument('--render', choices=RENDER_MODES, default='auto',
+                        help='auto: rasterise, downsample and aggregate dense figures; vector: draw every point')
+    args = parser.parse_args()
+
+    if not args.results_dir:
         # Try to find most recent results directory
         logs_dir = Path(__file__).parent.parent / 'logs'
         campaign_dirs = list(logs_dir.glob('final_campaign_*'))
@@ -746,13 +783,13 @@ def main():
             print("No campaign results found in logs directory")
             sys.exit(1)
     else:
-        results_dir = Path(sys.argv[1])
+        results_dir = Path(args.results_dir)
     
     if not results_dir.exists():
         print(f"Results directory not found: {results_dir}")
         sys.exit(1)
     
-    generator = GraphGenerator(str(results_dir))
+    generator = GraphGenerator(str(results_dir), chunksize=args.chunksize, render=args.render)
     generator.generate_all_figures()
 
 
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Instance catalog: structural features of every registered instance, cached on disk
+
+The reporting used to reverse-engineer instances from their ids: the size from the
+digits of the last token, multi-level and parallel BOMs from regexes or substrings,
+and the article label of the parallel BOMs from a hard-coded table. The catalog reads
+config/instance_registry.json and the instance files once and records, per instance:
+
+- from the registry: family, topology, nominal size (nodes), levels (depth) and the
+  position of the instance in its family;
+- from the BOM file: components (rows, end item included), depth (longest path
+  from the end item, in arcs), branches (children of the end item) and leaves;
+- from the supplier list: distinct eligible suppliers and node-supplier pairs;
+- the SHA-256 of the BOM, supplier-list and supplier-details files.
+
+The catalog is cached in logs/instance_catalog.json; an instance is read again only
+when its registry entry or the size or modification time of one of its files changed.
+catalog_frame() is indexed by instance_id, so results join to it directly.
+
+Usage:
+    python InstanceCatalog.py [--cache logs/instance_catalog.json] [--rebuild] [--csv catalog.csv]
+
+Requires: pandas
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+from SupplierDominancePruner import (
+    DATA_DIR,
+    REGISTRY_FILE,
+    REPO_DIR,
+    instance_files,
+    read_bom,
+    read_supplier_list,
+)
+
+CATALOG_FILE = REPO_DIR / 'logs' / 'instance_catalog.json'
+CATALOG_VERSION = 1
+CATALOG_COLUMNS = [
+    'family', 'topology', 'nodes', 'levels', 'position',
+    'components', 'depth', 'branches', 'leaves', 'suppliers', 'supplier_links',
+    'bom_file', 'supp_list_file', 'supp_details_file',
+    'bom_sha256', 'supp_list_sha256', 'supp_details_sha256',
+]
+FILE_KINDS = ('bom', 'supp_list', 'supp_details')
+
+
+def registry_entries(registry_file: Path = REGISTRY_FILE) -> dict:
+    """Registry instances by id, with their family name and position in the family."""
+    registry = json.loads(Path(registry_file).read_text(encoding='utf-8'))
+    return {
+        instance['id']: dict(instance, family=family, position=position)
+        for family, content in registry['bom_families'].items()
+        for position, instance in enumerate(content['instances'])
+    }
+
+
+def bom_structure(bom: pd.DataFrame) -> dict:
+    """Components, depth, branches and leaves of a BOM read by read_bom.
+
+    A node whose parent is not in the file starts a tree of its own.
+    """
+    parent = dict(zip(bom['ind'].tolist(), bom['parent'].tolist()))
+    depth = {}
+    for node in parent:
+        path = []
+        while node in parent and node not in depth:
+            path.append(node)
+            node = parent[node]
+        level = depth.get(node, -1)
+        for visited in reversed(path):
+            level += 1
+            depth[visited] = level
+    with_children = {p for p in parent.values() if p in parent}
+    end_items = {node for node, p in parent.items() if p == -1}
+    return {
+        'components': len(parent),
+        'depth': max(depth.values(), default=0),
+        'branches': sum(1 for p in parent.values() if p in end_items),
+        'leaves': sum(1 for node in parent if node not in with_children),
+    }
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as stream:
+        for block in iter(lambda: stream.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_signature(path: Path):
+    """(size, mtime_ns) of a file, or None when it is missing."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def catalog_entry(instance: dict, data_dir: Path = DATA_DIR) -> dict:
+    """Catalog record of one registry instance (registry_entries)."""
+    files = dict(zip(FILE_KINDS, instance_files(instance)))
+    entry = {
+        'family': instance['family'],
+        'topology': instance.get('topology'),
+        'nodes': instance.get('nodes'),
+        'levels': instance.get('depth'),
+        'position': instance['position'],
+        'components': None, 'depth': None, 'branches': None, 'leaves': None,
+        'suppliers': None, 'supplier_links': None,
+    }
+    for kind, name in files.items():
+        path = Path(data_dir) / name
+        entry[kind + '_file'] = name
+        entry[kind + '_sha256'] = file_sha256(path) if path.exists() else None
+    if entry['bom_sha256']:
+        entry.update(bom_structure(read_bom(Path(data_dir) / files['bom'])))
+    if entry['supp_list_sha256']:
+        _, _, _, eligibility = read_supplier_list(Path(data_dir) / files['supp_list'])
+        entry['suppliers'] = len({s for suppliers in eligibility.values() for s in suppliers})
+        entry['supplier_links'] = sum(len(suppliers) for suppliers in eligibility.values())
+    return entry
+
+
+def entry_key(instance: dict, data_dir: Path) -> dict:
+    """What a cached record depends on: the registry entry and the instance file stats."""
+    names = instance_files(instance)
+    return {'registry': instance,
+            'files': {name: file_signature(Path(data_dir) / name) for name in names}}
+
+
+def load_catalog(cache: Path = CATALOG_FILE, registry_file: Path = REGISTRY_FILE,
+                 data_dir: Path = DATA_DIR, rebuild: bool = False) -> dict:
+    """Catalog records by instance id, read from cache where still valid.
+
+    The cache is rewritten when a record changed; a cache that cannot be written
+    (read-only checkout) only costs the rebuild.
+    """
+    cache = Path(cache) if cache else None
+    cached = {}
+    if cache and cache.exists() and not rebuild:
+        try:
+            content = json.loads(cache.read_text(encoding='utf-8'))
+            if content.get('version') == CATALOG_VERSION:
+                cached = content['instances']
+        except (OSError, ValueError, KeyError):
+            cached = {}
+
+    records, changed = {}, False
+    for instance_id, instance in registry_entries(registry_file).items():
+        key = entry_key(instance, data_dir)
+        previous = cached.get(instance_id)
+        if previous and previous['key'] == key:
+            records[instance_id] = previous
+        else:
+            records[instance_id] = {'key': key, 'entry': catalog_entry(instance, data_dir)}
+            changed = True
+    changed = changed or set(records) != set(cached)
+
+    if cache and changed:
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            temporary = cache.with_name(f'.{cache.name}.{os.getpid()}')
+            temporary.write_text(json.dumps({'version': CATALOG_VERSION, 'instances': records}, indent=1),
+                                 encoding='utf-8')
+            os.replace(temporary, cache)
+        except OSError:
+            pass
+    return {instance_id: record['entry'] for instance_id, record in records.items()}
+
+
+def catalog_frame(catalog: dict = None, **kwargs) -> pd.DataFrame:
+    """The catalog as a frame indexed by instance_id (CATALOG_COLUMNS)."""
+    catalog = load_catalog(**kwargs) if catalog is None else catalog
+    frame = pd.DataFrame.from_dict(catalog, orient='index', columns=CATALOG_COLUMNS)
+    frame.index.name = 'instance_id'
+    return frame
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Structural catalog of the registered instances')
+    parser.add_argument('--cache', default=str(CATALOG_FILE), help='catalog cache (JSON)')
+    parser.add_argument('--rebuild', action='store_true', help='ignore the cache and read every instance again')
+    parser.add_argument('--csv', help='also write the catalog as CSV')
+    args = parser.parse_args()
+
+    frame = catalog_frame(cache=Path(args.cache), rebuild=args.rebuild)
+    columns = ['family', 'nodes', 'components', 'depth', 'branches', 'leaves', 'suppliers']
+    print(frame[columns].to_string())
+    if args.csv:
+        frame.to_csv(args.csv)
+        print(f"Wrote {args.csv}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -428,7 +428,11 @@ class KPICalculator {
             'runtime_sec' => $runtime,
             'mip_gap' => $mipGap,
             'comparison_admissible' => $comparisonAdmissible,
-            'comparison_exclusion_reason' => $comparisonExclusionReason
+            'comparison_exclusion_reason' => $comparisonExclusionReason,
+            // Set when the outcome was inferred from cap monotonicity instead of solved.
+            'inferred' => isset($result['inferred_from']),
+            'inferred_from' => $result['inferred_from'] ?? null,
+            'inference_rule' => $result['inference_rule'] ?? null
         ];
     }
     
@@ -533,7 +537,10 @@ class KPICalculator {
             'runtime_sec' => $kpis['computational']['runtime_sec'],
             'mip_gap' => $kpis['computational']['mip_gap'],
             'comparison_admissible' => $kpis['computational']['comparison_admissible'] ? 1 : 0,
-            'comparison_exclusion_reason' => $kpis['computational']['comparison_exclusion_reason']
+            'comparison_exclusion_reason' => $kpis['computational']['comparison_exclusion_reason'],
+            'inferred' => ($kpis['computational']['inferred'] ?? false) ? 1 : 0,
+            'inferred_from' => $kpis['computational']['inferred_from'] ?? null,
+            'inference_rule' => $kpis['computational']['inference_rule'] ?? null
         ];
         
         return $flat;
@@ -554,7 +561,8 @@ class KPICalculator {
             'buffer_count', 'avg_decoupled_lead_time',
             'suppliers_used',
             'solver_status', 'runtime_sec', 'mip_gap',
-            'comparison_admissible', 'comparison_exclusion_reason'
+            'comparison_admissible', 'comparison_exclusion_reason',
+            'inferred', 'inferred_from', 'inference_rule'
         ];
     }
     
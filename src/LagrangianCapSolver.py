@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+"""
+Experimental EMISCAP solver: Lagrangian relaxation of the emissions ceiling
+
+Under EMISCAP the global ceiling Emis <= EmisCap is the only constraint the tax
+model does not have. Dualising it with a carbon price lambda (currency/tCO2) gives
+
+    L(lambda) = min TotalCostCS + dlts + lambda * (Emis - EmisCap) / 1e6
+              = f_tax(lambda) - lambda * EmisCap / 1e6
+
+where f_tax(lambda) is the objective of RUNS_SupEmis_Cplex_PLM_Tax.mod solved at
+_EMISTAXE_ = lambda. Every L(lambda) is a lower (dual) bound on the cap optimum, and
+every tax solution with Emis <= EmisCap is a cap-feasible primal solution worth
+f_tax(lambda) - lambda * Emis / 1e6. The multiplier is searched by parallel
+k-section on the supergradient sign (Emis above or below the cap), starting from
+lambda = 0, the tax-0 baseline the campaign derives its caps from.
+
+When the root has several children that all have t_process > service_t -
+t_process[root] (the parallel BOMs at service time 1), every child is forced to hold a
+buffer, a[root] is fixed at t_process[root] and the priced problem separates by root
+subtree. Each tax evaluation then solves one small instance per subtree in parallel.
+Other structures are solved whole; evaluations at different multipliers still run
+in parallel.
+
+The result is accepted when the primal/dual gap is within the 1% admissibility
+threshold; otherwise the direct cap model is solved and reported instead.
+
+Usage:
+    python LagrangianCapSolver.py --oplrun PATH [output_dir] [--instances bom_26 bom_par4]
+        [--caps 0.9 0.8 0.7] [--workers 4] [--verify]
+
+output_dir defaults to logs/lagrangian_cap.
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from BomStructureReducer import BomStructure
+from RunOutput import EMISSIONS_CLAMP
+from SupplierDominancePruner import (
+    DATA_DIR,
+    DEFAULT_NB_SUPP,
+    REPO_DIR,
+    format_value,
+    instance_files,
+    read_bom,
+    read_supplier_list,
+    registry_instances,
+    run_model,
+)
+
+TAX_MODEL = 'RUNS_SupEmis_Cplex_PLM_Tax.mod'
+CAP_MODEL = 'RUNS_SupEmis_Cplex_PLM_Cap.mod'
+GRAMS_PER_TONNE = 1e6  # Emis is reported in gCO2, EmisTax is per tCO2
+GAP_THRESHOLD_PCT = 1.0
+DEFAULT_CAPS = [1.0, 0.95, 0.90, 0.85, 0.80, 0.75, 0.70]
+
+REPORT_COLUMNS = [
+    'instance_id', 'cap_pct', 'cap_value', 'method', 'objective', 'lower_bound', 'upper_bound',
+    'gap_pct', 'multiplier', 'emissions', 'tax_solves', 'rounds', 'subtrees',
+    'runtime_sec', 'wall_sec', 'fallback_status', 'fallback_runtime_sec',
+    'direct_objective', 'direct_status', 'direct_runtime_sec',
+]
+
+
+# ---------------------------------------------------------------- bounds
+def dual_bound(result: dict, tax: float, cap: float):
+    """Lagrangian lower bound from a tax solve, or None if the solve proves nothing."""
+    objective = result.get('objective')
+    if objective is None:
+        return None
+    if result.get('status') == 'OPTIMAL':
+        bound = objective
+    elif result.get('status') == 'FEASIBLE' and result.get('mip_gap') is not None:
+        bound = objective - abs(objective) * result['mip_gap'] / 100.0
+    else:
+        return None
+    return bound - tax * cap / GRAMS_PER_TONNE
+
+
+def known_emissions(result: dict):
+    """Emissions of a solve; None when missing or only known as the #E int32 clamp.
+
+    run_model already falls back to the #Result tuple when #E is clamped, so the
+    clamp only survives when the output has no #Result emissions either.
+    """
+    emissions = result.get('emissions')
+    if emissions is None or abs(emissions - EMISSIONS_CLAMP) <= 0.5:
+        return None
+    return emissions
+
+
+def primal_value(result: dict, tax: float, cap: float):
+    """Cap-model objective of a tax solution if it respects the cap, else None."""
+    if result.get('status') not in ('OPTIMAL', 'FEASIBLE'):
+        return None
+    objective, emissions = result.get('objective'), known_emissions(result)
+    if objective is None or emissions is None or emissions > cap:
+        return None
+    return objective - tax * emissions / GRAMS_PER_TONNE
+
+
+def relative_gap_pct(upper: float, lower: float):
+    if upper is None or lower is None:
+        return None
+    return max(0.0, upper - lower) / max(abs(upper), 1e-9) * 100.0
+
+
+class LagrangianCapSearch:
+    """Multiplier search over a tax-model oracle.
+
+    solve_tax(tax) and solve_cap(cap) return run_model-style dicts (status, mip_gap,
+    objective, emissions, runtime_sec); solve_cap is only called for the fallback.
+    Tax solves do not depend on the cap, so they are cached across solve() calls and
+    a sweep over caps reuses every multiplier already evaluated.
+    """
+
+    def __init__(self, solve_tax, solve_cap=None, workers: int = 4, max_rounds: int = 8,
+                 gap_threshold_pct: float = GAP_THRESHOLD_PCT, initial_tax: float = 50.0,
+                 growth: float = 4.0, max_tax: float = 1e7):
+        self.solve_tax = solve_tax
+        self.solve_cap = solve_cap
+        self.workers = max(1, workers)
+        self.max_rounds = max_rounds
+        self.gap_threshold_pct = gap_threshold_pct
+        self.initial_tax = initial_tax
+        self.growth = growth
+        self.max_tax = max_tax
+        self.cache = {}
+
+    def evaluate(self, taxes) -> list:
+        pending = [tax for tax in dict.fromkeys(taxes) if tax not in self.cache]
+        if pending:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                for tax, result in zip(pending, pool.map(self.solve_tax, pending)):
+                    self.cache[tax] = result
+        return [self.cache[tax] for tax in taxes]
+
+    def solve(self, cap: float) -> dict:
+        start = time.perf_counter()
+        cache = self.cache
+        solved_before = set(cache)
+        rounds = 0
+
+        def bounds():
+            lower = max((b for b in (dual_bound(r, t, cap) for t, r in cache.items()) if b is not None),
+                        default=None)
+            primal = [(p, t) for p, t in ((primal_value(r, t, cap), t) for t, r in cache.items())
+                      if p is not None]
+            upper, multiplier = min(primal) if primal else (None, None)
+            return lower, upper, multiplier
+
+        def feasible(tax):
+            emissions = known_emissions(cache[tax])
+            return emissions is not None and emissions <= cap
+
+        def converged():
+            lower, upper, _ = bounds()
+            gap = relative_gap_pct(upper, lower)
+            return gap is not None and gap <= self.gap_threshold_pct
+
+        # Bracket: lo prices emissions too little (Emis > cap), hi enough (Emis <= cap).
+        self.evaluate([0.0])
+        lo = max((t for t in cache if not feasible(t)), default=0.0)
+        hi = min((t for t in cache if feasible(t)), default=None)
+        tax = max(self.initial_tax, lo * self.growth)
+        while hi is None and tax <= self.max_tax and not converged():
+            batch = [tax * self.growth ** k for k in range(self.workers)]
+            self.evaluate(batch)
+            rounds += 1
+            for candidate in batch:
+                if feasible(candidate):
+                    hi = candidate
+                    break
+                lo = candidate
+            tax = batch[-1] * self.growth
+
+        # Parallel k-section: the dual optimum sits where the supergradient changes sign.
+        while (hi is not None and hi > 0 and rounds < self.max_rounds and not converged()
+               and hi - lo > 1e-6 * hi):
+            batch = [float(t) for t in np.linspace(lo, hi, self.workers + 2)[1:-1]]
+            self.evaluate(batch)
+            rounds += 1
+            for candidate in batch:
+                if feasible(candidate):
+                    hi = candidate
+                    break
+                lo = candidate
+
+        lower, upper, multiplier = bounds()
+        gap = relative_gap_pct(upper, lower)
+        result = {
+            'cap_value': cap,
+            'method': 'lagrangian',
+            'objective': upper,
+            'lower_bound': lower,
+            'upper_bound': upper,
+            'gap_pct': gap,
+            'multiplier': multiplier,
+            'emissions': cache[multiplier]['emissions'] if multiplier is not None else None,
+            'tax_solves': len(set(cache) - solved_before),
+            'rounds': rounds,
+            'runtime_sec': sum(cache[t].get('runtime_sec') or 0.0 for t in set(cache) - solved_before),
+        }
+        if (gap is None or gap > self.gap_threshold_pct) and self.solve_cap is not None:
+            direct = self.solve_cap(cap)
+            result.update({
+                'method': 'direct_cap',
+                'objective': direct.get('objective'),
+                'emissions': direct.get('emissions'),
+                'fallback_status': direct.get('status'),
+                'fallback_runtime_sec': direct.get('runtime_sec'),
+            })
+            result['runtime_sec'] += direct.get('runtime_sec') or 0.0
+        result['wall_sec'] = time.perf_counter() - start
+        return result
+
+
+# ---------------------------------------------------------------- subtree split
+def separable_subtrees(structure: BomStructure, service_t: int) -> list:
+    """Node lists of the root subtrees when the priced problem separates, else []."""
+    if len(structure.roots) != 1 or not structure.zero_cost_root():
+        return []
+    root = structure.root
+    children = structure.children[root]
+    slack = service_t - int(structure.bom.at[root, 't_process'])
+    if len(children) < 2 or any(int(structure.bom.at[c, 't_process']) <= slack for c in children):
+        return []
+    subtrees = []
+    for child in children:
+        nodes, stack = [], [child]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(structure.children[node])
+        subtrees.append(sorted(nodes))
+    return subtrees
+
+
+def write_subtree_instance(bom: pd.DataFrame, eligibility: dict, header_lines, root: int,
+                           nodes: list, nb_supp: int, out_dir: Path, stem: str) -> dict:
+    """Write the root plus one subtree as a renumbered BOM and supplier list."""
+    new_id = {old: new for new, old in enumerate([root] + nodes)}
+    sub = bom.set_index('ind', drop=False).loc[[root] + nodes].copy()
+    sub['parent'] = [new_id.get(int(p), -1) for p in sub['parent']]
+    sub['ind'] = [new_id[int(i)] for i in sub['ind']]
+    bom_path = out_dir / f'bom_supemis_{stem}.csv'
+    with bom_path.open('w', encoding='utf-8', newline='') as handle:
+        handle.write(';'.join(sub.columns) + ';\n')
+        for row in sub.itertuples(index=False):
+            handle.write(';'.join(format_value(v) for v in row) + ';\n')
+
+    supp_list_path = out_dir / f'supp_list_{stem}.csv'
+    lines = [header_lines[0], f"{len(nodes)};{nb_supp};", header_lines[2]]
+    for node in nodes:
+        if node in eligibility:
+            lines.append(f"{new_id[node]};" + ','.join(str(s) for s in eligibility[node]))
+    supp_list_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return {'bom': bom_path, 'supp_list': supp_list_path}
+
+
+def combine_subtree_results(results: list, root_lead_time: int) -> dict:
+    """Aggregate per-subtree tax solves; each one counts the fixed root lead time once."""
+    statuses = [r.get('status') for r in results]
+    emissions = [known_emissions(r) for r in results]
+    if any(r.get('objective') is None for r in results):
+        status = next((s for s in statuses if s != 'OPTIMAL'), 'UNKNOWN')
+        return {'status': status, 'mip_gap': None, 'objective': None, 'emissions': None,
+                'runtime_sec': max((r.get('runtime_sec') or 0.0 for r in results), default=0.0)}
+    if all(s == 'OPTIMAL' for s in statuses):
+        status, gap = 'OPTIMAL', 0.0
+    else:
+        status = 'FEASIBLE'
+        gaps = [0.0 if r.get('status') == 'OPTIMAL' else r.get('mip_gap') for r in results]
+        gap = None if any(g is None for g in gaps) else max(gaps)
+    return {
+        'status': status,
+        'mip_gap': gap,
+        'objective': sum(r['objective'] for r in results) - (len(results) - 1) * root_lead_time,
+        # One subtree without known emissions leaves the total unknown, not understated.
+        'emissions': None if None in emissions else sum(emissions),
+        'runtime_sec': max(r.get('runtime_sec') or 0.0 for r in results),
+    }
+
+
+class TaxModelOracle:
+    """solve_tax / solve_cap for one instance through oplrun."""
+
+    def __init__(self, instance: dict, oplrun: str, work_dir: Path, data_dir: Path = DATA_DIR,
+                 nb_supp: int = DEFAULT_NB_SUPP, service_t: int = 1, workers: int = 4):
+        self.instance_id = instance['id']
+        self.oplrun = oplrun
+        self.work_dir = work_dir
+        self.workers = workers
+        bom_file, supp_list_file, supp_details_file = instance_files(instance)
+        self.base = {
+            '_NODE_FILE_': (data_dir / bom_file).as_posix(),
+            '_NODE_SUPP_FILE_': (data_dir / supp_list_file).as_posix(),
+            '_SUPP_DETAILS_FILE_': (data_dir / supp_details_file).as_posix(),
+            '_NBSUPP_': nb_supp,
+            '_SERVICE_T_': service_t,
+            '_EMISCAP_': 0,
+            '_EMISTAXE_': 0.0,
+        }
+        bom = read_bom(data_dir / bom_file)
+        _, _, header_lines, eligibility = read_supplier_list(data_dir / supp_list_file)
+        structure = BomStructure(bom, eligibility, nb_supp)
+        self.root_lead_time = int(structure.bom.at[structure.root, 't_process'])
+        self.subtrees = []
+        for k, nodes in enumerate(separable_subtrees(structure, service_t)):
+            files = write_subtree_instance(bom, eligibility, header_lines, structure.root, nodes,
+                                           nb_supp, work_dir, f"{self.instance_id}_sub{k}")
+            self.subtrees.append(dict(self.base,
+                                      _NODE_FILE_=files['bom'].resolve().as_posix(),
+                                      _NODE_SUPP_FILE_=files['supp_list'].resolve().as_posix()))
+
+    def solve_tax(self, tax: float) -> dict:
+        # repr() round-trips the float, so two k-section points closer than any fixed
+        # precision still get distinct work files when they run in the same batch.
+        prefix = f"LAG-{self.instance_id}-T{tax!r}"
+        if not self.subtrees:
+            return run_model(self.oplrun, TAX_MODEL, dict(self.base, _EMISTAXE_=tax),
+                             self.work_dir, prefix)
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(self.subtrees))) as pool:
+            results = list(pool.map(
+                lambda k: run_model(self.oplrun, TAX_MODEL, dict(self.subtrees[k], _EMISTAXE_=tax),
+                                    self.work_dir, f"{prefix}-S{k}"),
+                range(len(self.subtrees))))
+        return combine_subtree_results(results, self.root_lead_time)
+
+    def solve_cap(self, cap: float) -> dict:
+        return run_model(self.oplrun, CAP_MODEL, dict(self.base, _EMISCAP_=cap),
+                         self.work_dir, f"LAG-{self.instance_id}-CAP")
+
+
+class LagrangianCapSolver:
+    def __init__(self, output_dir: str, oplrun: str, data_dir: str = None,
+                 nb_supp: int = DEFAULT_NB_SUPP, service_t: int = 1, workers: int = 4):
+        self.output_dir = Path(output_dir)
+        self.oplrun = oplrun
+        self.data_dir = Path(data_dir) if data_dir else DATA_DIR
+        self.nb_supp = nb_supp
+        self.service_t = service_t
+        self.workers = workers
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def solve_instance(self, instance: dict, cap_percentages, verify: bool = False) -> list:
+        oracle = TaxModelOracle(instance, self.oplrun, self.output_dir, self.data_dir,
+                                self.nb_supp, self.service_t, self.workers)
+        search = LagrangianCapSearch(oracle.solve_tax, oracle.solve_cap,
+                                     workers=max(1, self.workers // max(1, len(oracle.subtrees))))
+        # Caps are percentages of the tax-0 emissions, as in the carbon_cap_sweep campaign.
+        baseline = known_emissions(search.evaluate([0.0])[0])
+        if baseline is None:
+            print(f"  {instance['id']}: no tax-0 baseline, skipped")
+            return []
+        rows = []
+        for cap_pct in cap_percentages:
+            cap_value = int(baseline * cap_pct)
+            row = {'instance_id': instance['id'], 'cap_pct': cap_pct,
+                   'subtrees': len(oracle.subtrees)}
+            row.update(search.solve(cap_value))
+            if verify:
+                direct = oracle.solve_cap(cap_value)
+                row.update({'direct_objective': direct.get('objective'),
+                            'direct_status': direct.get('status'),
+                            'direct_runtime_sec': direct.get('runtime_sec')})
+            rows.append(row)
+            gap = 'n/a' if row['gap_pct'] is None else f"{row['gap_pct']:.3f}%"
+            print(f"  {instance['id']} cap {cap_pct:.0%}: {row['method']}, gap {gap}, "
+                  f"{row['tax_solves']} tax solves, {row['runtime_sec']:.2f}s")
+        return rows
+
+    def run(self, instance_ids, cap_percentages, verify: bool = False) -> pd.DataFrame:
+        instances = registry_instances()
+        rows = []
+        for instance_id in instance_ids:
+            instance = instances.get(instance_id)
+            if instance is None or not (self.data_dir / instance['file']).exists():
+                print(f"  Skipping {instance_id} - instance not found")
+                continue
+            rows.extend(self.solve_instance(instance, cap_percentages, verify))
+        report = pd.DataFrame(rows).reindex(columns=REPORT_COLUMNS)
+        report.to_csv(self.output_dir / 'lagrangian_cap_report.csv', index=False)
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lagrangian EMISCAP solver over tax-model solves')
+    parser.add_argument('output_dir', nargs='?', default=str(REPO_DIR / 'logs' / 'lagrangian_cap'))
+    parser.add_argument('--oplrun', required=True, help='oplrun executable')
+    parser.add_argument('--instances', nargs='+', default=['bom_26', 'bom_50', 'bom_par4'])
+    parser.add_argument('--caps', nargs='+', type=float, default=DEFAULT_CAPS)
+    parser.add_argument('--suppliers', type=int, default=DEFAULT_NB_SUPP)
+    parser.add_argument('--service-time', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--verify', action='store_true', help='also solve the direct cap model')
+    args = parser.parse_args()
+
+    solver = LagrangianCapSolver(args.output_dir, args.oplrun, nb_supp=args.suppliers,
+                                 service_t=args.service_time, workers=args.workers)
+    report = solver.run(args.instances, args.caps, args.verify)
+    print(f"Wrote {len(report)} rows to {Path(args.output_dir) / 'lagrangian_cap_report.csv'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
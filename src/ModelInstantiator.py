@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+"""
+Immutable OPL models plus generated .dat files for campaign runs
+
+FinalCampaignRunner::prepareModelFile rewrites the whole .mod for every run: it
+injects the time limit (cplex.tilim / cp.param.TimeLimit), the decision-stability
+probe, the staticLex baseline and the NLM warm start (NLMWarmStart::seedModel), then
+str_replaces every scalar config key
+(_NBSUPP_, _NODE_FILE_, _EMISTAXE_, ...) and writes a new model file per run.
+
+Here the run-independent part is done once. A ModelTemplate turns each placeholder
+declaration into an OPL external-data declaration
+
+    int NB_SUPP = _NBSUPP_;   ->   int NB_SUPP = ...;
+
+and applies the structural variants (probe type, staticLex, NLM seed with or without
+the PLM bound) with their data (time limit, reference X/Z/Q, objective limit, seed
+A/X/Z/Q, tolerance, bound) also declared as `= ...`. The
+parametric model depends only on (model file, variant) and is written once per
+campaign under models/<name>-<sha>.mod; every run gets a .dat with its values,
+content-hashed to dat/<sha>.dat, so identical runs (stability re-solves, repeated
+baselines) share one file. The pair is run as `oplrun model.mod run.dat`.
+
+Writes are atomic (temp file + rename), so parallel workers can share a work
+directory; --tmpfs puts it under /dev/shm. verify substitutes each .dat back into
+its parametric model and checks the text against a port of prepareModelFile.
+
+seed_nlm_run_config ports NLMWarmStart::seedRunConfig, for the runners that build
+the NLM runs of the nlm_comparison experiment in Python (CampaignQueue).
+
+Usage:
+    python ModelInstantiator.py instantiate runs.json [--work-dir DIR | --tmpfs] [--time-limit 300]
+    python ModelInstantiator.py verify runs.json
+
+runs.json holds one runConfig object (as built by FinalCampaignRunner), a list of
+them, or one per line. instantiate writes instances.json (PREFIXE -> model, dat).
+
+Requires: (standard library only)
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+from SupplierDominancePruner import MODELS_DIR
+
+DEFAULT_TIME_LIMIT = 300
+# Seconds past the model's own time limit after which a silent oplrun is killed.
+OPLRUN_TIMEOUT_MARGIN = 120
+# NLMWarmStart: CPLEX's default stopping rule for an OPTIMAL MIP (the PLM models set
+# neither), the 4-decimal rounding of #TS / #CS and the certified gap (%) below which
+# the PLM solution settles the NLM run.
+CPLEX_RELATIVE_GAP = 1e-4
+CPLEX_ABSOLUTE_GAP = 1e-6
+LOG_ROUNDING = 5e-5
+CERTIFIED_GAP_PCT = 0.1
+TMPFS_DIR = Path('/dev/shm')
+PROBES = ('buffers', 'suppliers', 'allocation')
+PLACEHOLDER = re.compile(r'(?<!\w)_[A-Z][A-Z_]*_(?!\w)')
+PARAMETER_DECLARATION = re.compile(
+    r'^(?P<indent>[ \t]*)(?P<type>int|float|string)\s+(?P<name>\w+)\s*=\s*'
+    r'(?P<quote>"?)(?P<placeholder>_[A-Z][A-Z_]*_)(?P=quote)\s*;', re.M)
+STATIC_LEX_CONSTRAINTS = (
+    r'^\s*ct9\s*:\s*Emis\s*<=\s*EmisCap\s*;\s*$',
+    r'^\s*ct_epsilon_Cost\s*:\s*TotalCostCS\s*<=\s*epsilon_Cost\s*;.*$',
+    r'^\s*ct_epsilon_DIO\s*:\s*DIO\s*<=\s*epsilon_DIO\s*;.*$',
+    r'^\s*ct_epsilon_WIP\s*:\s*WIP\s*<=\s*epsilon_WIP\s*;.*$',
+    r'^\s*ct_epsilon_Emis\s*:\s*Emis\s*<=\s*epsilon_Emis\s*;.*$',
+)
+
+
+def php_string(value) -> str:
+    """String form PHP's str_replace gives a scalar config value."""
+    if value is None or value is False:
+        return ''
+    if value is True:
+        return '1'
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() and abs(value) < 1e15 else repr(value)
+    return str(value)
+
+
+def format_number(value: float) -> str:
+    """DecisionStabilityAnalyzer::formatNumber."""
+    return ('%.12f' % float(value)).rstrip('0').rstrip('.')
+
+
+def opl_vector(values) -> str:
+    return '[' + ','.join(str(int(round(float(value)))) for value in values) + ']'
+
+
+def opl_matrix(values, rows: int, columns: int) -> str:
+    values = list(values)
+    return '[' + ','.join(opl_vector(values[row * columns:(row + 1) * columns]) for row in range(rows)) + ']'
+
+
+def insert_time_limit(text: str, is_nlm: bool, limit: str) -> str:
+    """The time-limit injection of prepareModelFile, with `limit` as the value."""
+    if is_nlm:
+        return re.sub(r'cp\.param\.TimeLimit\s*=\s*\d+', lambda m: f'cp.param.TimeLimit = {limit}', text)
+    match = re.search(r'(execute\s*\{[\s\n]*//BOM Nodes Data)', text)
+    if match:
+        text = text[:match.end()] + f'\n    cplex.tilim = {limit};\n' + text[match.end():]
+    return text
+
+
+def insert_probe(text: str, probe: str, ref_x: str, ref_z: str, ref_q: str, limit: str) -> str:
+    """DecisionStabilityAnalyzer::buildProbeModel with the reference literals given as text."""
+    if probe not in PROBES:
+        raise ValueError(f'Unknown decision-stability probe: {probe}')
+    objective = re.search(r'^[ \t]*minimize\s+([^;\r\n]+);', text, re.M)
+    if not objective:
+        raise ValueError('Could not locate the original PLM objective')
+    score = {'buffers': 'stabilityBufferDivergence', 'suppliers': 'stabilitySupplierDivergence',
+             'allocation': 'stabilityAllocationDivergence'}[probe]
+    declarations = (
+        f" int stabilityRefX[N] = {ref_x};\n"
+        f" int stabilityRefZ[N][S] = {ref_z};\n"
+        f" int stabilityRefQ[N][S] = {ref_q};\n"
+        " dvar int+ stabilityQDiff[N][S];\n"
+        " dvar boolean stabilityQSign[N][S];\n"
+        f" dexpr float stabilityOriginalObjective = {objective.group(1).strip()};\n"
+        " dexpr float stabilityBufferDivergence = sum(i in N)(stabilityRefX[i] == 1 ? 1-x[i] : x[i]);\n"
+        " dexpr float stabilitySupplierDivergence = sum(i in N, j in S)"
+        "(stabilityRefZ[i][j] == 1 ? 1-z[i][j] : z[i][j]);\n"
+        " dexpr float stabilityAllocationDivergence = sum(i in N, j in S) stabilityQDiff[i][j];\n"
+        f" dexpr float stabilityScore = {score};\n"
+        " minimize -stabilityScore;")
+    text = text[:objective.start()] + declarations + text[objective.end():]
+    constraints = (
+        f"\n \tct_stability_objective: stabilityOriginalObjective <= {limit};\n"
+        "\tforall (i in N, j in S) {\n"
+        "\t\tct_stability_qdiff_pos: stabilityQDiff[i][j] >= q[i][j] - stabilityRefQ[i][j];\n"
+        "\t\tct_stability_qdiff_neg: stabilityQDiff[i][j] >= stabilityRefQ[i][j] - q[i][j];\n"
+        "\t\tct_stability_qdiff_sign_pos: stabilityQDiff[i][j] <= q[i][j] - stabilityRefQ[i][j]"
+        " + 2*sup[j][3]*(1-stabilityQSign[i][j]);\n"
+        "\t\tct_stability_qdiff_sign_neg: stabilityQDiff[i][j] <= stabilityRefQ[i][j] - q[i][j]"
+        " + 2*sup[j][3]*stabilityQSign[i][j];\n"
+        "\t}\n")
+    text, count = re.subn(r'subject\s+to\s*\{', lambda m: 'subject to {' + constraints, text, count=1)
+    if count != 1:
+        raise ValueError('Could not locate the PLM constraint block')
+    output = ('write("#STABILITY_ORIGINAL_OBJECTIVE:",stabilityOriginalObjective);\n\t'
+              'write("#STABILITY_SCORE:",stabilityScore);\n\t')
+    text, count = re.subn(r'writeln\("#DELIVER:"\);', lambda m: output + 'writeln("#DELIVER:");', text, count=1)
+    if count != 1:
+        raise ValueError('Could not locate the PLM result-output block')
+    return text
+
+
+def apply_static_lex(text: str) -> str:
+    """FinalCampaignRunner::applyStaticLexBaselineModel."""
+    text, count = re.subn(r'minimize\s+PrimaryObj\s*;', 'minimize staticLex(TotalCostCS, Emis);', text, count=1)
+    if count != 1:
+        raise ValueError('Unable to prepare native lexicographic baseline: PrimaryObj objective not found')
+    for pattern in STATIC_LEX_CONSTRAINTS:
+        text, count = re.subn(pattern, lambda m: '//' + m.group(0).lstrip(), text, count=1, flags=re.M)
+        if count != 1:
+            raise ValueError(f'Unable to prepare native lexicographic baseline: '
+                             f'expected constraint pattern missing ({pattern})')
+    return text
+
+
+def insert_nlm_seed(text: str, seed_a: str, seed_x: str, seed_z: str, seed_q: str, tolerance: str,
+                    bound: str = None) -> str:
+    """NLMWarmStart::buildSeededModel with the seed literals given as text (no bound when None)."""
+    if 'using CP;' not in text:
+        raise ValueError('Only the CP Optimizer NLM models can be seeded')
+    dvars = list(re.finditer(r'^[ \t]*dvar\b[^\n]*\n', text, re.M))
+    if not dvars:
+        raise ValueError('Could not locate the NLM decision variables')
+    # ct2 is an equality in the NLM: the last node is seeded at its exact lead time.
+    seed = (
+        f" int nlmSeedA[N] = {seed_a};\n"
+        f" int nlmSeedX[N] = {seed_x};\n"
+        f" int nlmSeedZ[N][S] = {seed_z};\n"
+        f" int nlmSeedQ[N][S] = {seed_q};\n"
+        " execute NLM_SEED {\n"
+        "     var seed = new IloOplCPSolution();\n"
+        "     for (var i in N) {\n"
+        "         var lead = nlmSeedA[i];\n"
+        "         if (i == NB_NODE) {\n"
+        "             lead = t_process[i];\n"
+        "             for (var k in S) {\n"
+        "                 if (t_process[i] + nlmSeedZ[i][k]*su[i][k]*sup[k][1] > lead) "
+        "lead = t_process[i] + nlmSeedZ[i][k]*su[i][k]*sup[k][1];\n"
+        "             }\n"
+        "         }\n"
+        "         seed.setValue(a[i], lead);\n"
+        "         seed.setValue(x[i], nlmSeedX[i]);\n"
+        "         for (var j in S) {\n"
+        "             seed.setValue(z[i][j], nlmSeedZ[i][j]);\n"
+        "             seed.setValue(q[i][j], nlmSeedQ[i][j]);\n"
+        "         }\n"
+        "     }\n"
+        "     cp.setStartingPoint(seed);\n"
+        f"     cp.param.RelativeOptimalityTolerance = {tolerance};\n"
+        " }\n")
+    text = text[:dvars[-1].end()] + seed + text[dvars[-1].end():]
+    if bound is not None:
+        objective = re.search(r'^[ \t]*minimize\s+([^;\r\n]+);', text, re.M)
+        if not objective:
+            raise ValueError('Could not locate the NLM objective')
+        constraint = f"\n \tct_nlm_plm_bound: {objective.group(1).strip()} >= {bound};\n"
+        text, count = re.subn(r'subject\s+to\s*\{', lambda m: 'subject to {' + constraint, text, count=1)
+        if count != 1:
+            raise ValueError('Could not locate the NLM constraint block')
+    return text
+
+
+def nlm_seed_literals(run_config: dict) -> tuple:
+    """(A, X, Z, Q, tolerance, bound or None) literals of the NLM_SEED_* keys of a run."""
+    seed_a, seed_x = list(run_config['NLM_SEED_A']), list(run_config['NLM_SEED_X'])
+    seed_z, seed_q = list(run_config['NLM_SEED_Z']), list(run_config['NLM_SEED_Q'])
+    nb_supp = int(run_config['_NBSUPP_'])
+    if nb_supp <= 0 or not seed_x or len(seed_a) != len(seed_x):
+        raise ValueError('Seed decision dimensions must be positive and consistent')
+    if len(seed_z) != len(seed_x) * nb_supp or len(seed_q) != len(seed_x) * nb_supp:
+        raise ValueError(f'Seed Z/Q vectors must each contain {len(seed_x) * nb_supp} values')
+    bound = run_config.get('NLM_LOWER_BOUND')
+    return (opl_vector(seed_a), opl_vector(seed_x), opl_matrix(seed_z, len(seed_x), nb_supp),
+            opl_matrix(seed_q, len(seed_x), nb_supp),
+            format_number(run_config.get('NLM_RELATIVE_TOLERANCE', CERTIFIED_GAP_PCT / 100)),
+            format_number(bound) if bound is not None else None)
+
+
+def plm_objective(plm_result: dict, strategy: str):
+    """NLMWarmStart::plmObjective: TotalCostCS (cap) or TotalCostTS + dlts, None without them."""
+    cost = plm_result.get('CS') if strategy == 'EMISCAP' else plm_result.get('TS')
+    if isinstance(cost, bool) or not isinstance(cost, (int, float)) or not isinstance(plm_result.get('A'), list):
+        return None
+    return float(cost) + sum(float(value) for value in plm_result['A'])
+
+
+def plm_lower_bound(objective: float, status: str, gap_pct):
+    """NLMWarmStart::plmLowerBound: lower bound of the PLM (hence NLM) optimum, or None."""
+    if status == 'OPTIMAL':
+        slack = max(CPLEX_ABSOLUTE_GAP, CPLEX_RELATIVE_GAP * abs(objective))
+    elif status == 'FEASIBLE' and isinstance(gap_pct, (int, float)) and not isinstance(gap_pct, bool):
+        slack = float(gap_pct) / 100 * abs(objective)
+    else:
+        return None
+    return objective - slack - LOG_ROUNDING
+
+
+def seed_nlm_run_config(run_config: dict, plm_result: dict, certified_gap_pct: float = CERTIFIED_GAP_PCT,
+                        skip_certified: bool = False) -> dict:
+    """NLMWarmStart::seedRunConfig: the seed, PLM bound and tolerance added to an NLM run config.
+
+    With skip_certified, a PLM solution certified within certified_gap_pct also becomes
+    the NLM result (NLM_CERTIFIED_RESULT) and no CP search is needed.
+    """
+    if not all(isinstance(plm_result.get(key), list) for key in ('A', 'X', 'Z', 'Q')):
+        return run_config
+    run_config = dict(run_config, NLM_SEED_A=list(plm_result['A']), NLM_SEED_X=list(plm_result['X']),
+                      NLM_SEED_Z=list(plm_result['Z']), NLM_SEED_Q=list(plm_result['Q']),
+                      NLM_RELATIVE_TOLERANCE=certified_gap_pct / 100.0)
+    objective = plm_objective(plm_result, str(run_config.get('STRATEGY', '')))
+    bound = None if objective is None else plm_lower_bound(objective, str(plm_result.get('status', '')),
+                                                           plm_result.get('mip_gap'))
+    if bound is None:
+        return run_config
+    run_config['NLM_LOWER_BOUND'] = bound
+    gap_pct = max(0.0, (objective - bound) / max(abs(objective), 1e-10) * 100.0)
+    if skip_certified and gap_pct <= certified_gap_pct:
+        certified = {key: value for key, value in plm_result.items() if key != '_raw_output'}
+        certified.update(CplexRunTime='0 sec', RT=0.0, status='OPTIMAL', termination_reason='CERTIFIED_BY_PLM',
+                         mip_gap=gap_pct)
+        run_config['NLM_CERTIFIED_RESULT'] = certified
+    return run_config
+
+
+def probe_literals(run_config: dict) -> tuple:
+    ref_x = list(run_config['STABILITY_REFERENCE_X'])
+    ref_z = list(run_config['STABILITY_REFERENCE_Z'])
+    ref_q = list(run_config['STABILITY_REFERENCE_Q'])
+    nb_supp = int(run_config['_NBSUPP_'])
+    if nb_supp <= 0 or not ref_x:
+        raise ValueError('Reference decision dimensions must be positive')
+    if len(ref_z) != len(ref_x) * nb_supp or len(ref_q) != len(ref_x) * nb_supp:
+        raise ValueError(f'Reference Z/Q vectors must each contain {len(ref_x) * nb_supp} values')
+    return (opl_vector(ref_x), opl_matrix(ref_z, len(ref_x), nb_supp), opl_matrix(ref_q, len(ref_x), nb_supp),
+            format_number(run_config['STABILITY_OBJECTIVE_LIMIT']))
+
+
+def legacy_model_text(model_text: str, run_config: dict, time_limit: int = DEFAULT_TIME_LIMIT) -> str:
+    """Port of FinalCampaignRunner::prepareModelFile (the per-run rewrite)."""
+    text = insert_time_limit(model_text, 'using CP;' in model_text, str(time_limit))
+    if run_config.get('STABILITY_PROBE') is not None:
+        text = insert_probe(text, str(run_config['STABILITY_PROBE']), *probe_literals(run_config))
+    if run_config.get('STATIC_LEX_BASELINE'):
+        text = apply_static_lex(text)
+    if run_config.get('NLM_SEED_A') is not None:
+        text = insert_nlm_seed(text, *nlm_seed_literals(run_config))
+    for key, value in run_config.items():
+        if value is None or isinstance(value, (str, int, float, bool)):
+            text = text.replace(str(key), php_string(value))
+    return text
+
+
+def variant_of(run_config: dict) -> tuple:
+    probe = run_config.get('STABILITY_PROBE')
+    seeded = run_config.get('NLM_SEED_A') is not None
+    return (str(probe) if probe is not None else None, bool(run_config.get('STATIC_LEX_BASELINE')),
+            seeded, seeded and run_config.get('NLM_LOWER_BOUND') is not None)
+
+
+class ModelTemplate:
+    """Parametric version of a model file for one (probe, staticLex, NLM seed, bound) variant."""
+
+    def __init__(self, model_path, probe=None, static_lex: bool = False, nlm_seed: bool = False,
+                 nlm_bound: bool = False):
+        self.path = Path(model_path)
+        text = self.path.read_text(encoding='utf-8')
+        self.is_nlm = 'using CP;' in text
+        self.probe = probe
+        self.static_lex = static_lex
+        self.nlm_seed = nlm_seed
+        self.nlm_bound = nlm_seed and nlm_bound
+
+        # Scalars used only inside statements are declared as external data and
+        # substituted back by inline(); array references keep their declaration.
+        self.inlined = {'timeLimitSec': 'int'}
+        text = insert_time_limit(text, self.is_nlm, 'timeLimitSec')
+        if probe is not None:
+            self.inlined['stabilityObjectiveLimit'] = 'float'
+            text = insert_probe(text, probe, '...', '...', '...', 'stabilityObjectiveLimit')
+        if static_lex:
+            text = apply_static_lex(text)
+        if nlm_seed:
+            self.inlined['nlmRelativeTolerance'] = 'float'
+            if self.nlm_bound:
+                self.inlined['nlmLowerBound'] = 'float'
+            text = insert_nlm_seed(text, '...', '...', '...', '...', 'nlmRelativeTolerance',
+                                   'nlmLowerBound' if self.nlm_bound else None)
+
+        self.parameters = {}
+        for match in PARAMETER_DECLARATION.finditer(text):
+            self.parameters[match.group('placeholder')] = (match.group('type'), match.group('name'))
+        text = PARAMETER_DECLARATION.sub(lambda m: f"{m.group('indent')}{m.group('type')} {m.group('name')} = ...;",
+                                         text)
+        leftover = sorted(set(PLACEHOLDER.findall(text)))
+        if leftover:
+            raise ValueError(f"{self.path.name}: placeholders outside a declaration: {', '.join(leftover)}")
+
+        header = re.match(r'\s*/\*.*?\*/[ \t]*\n', text, re.S)
+        position = header.end() if header else 0
+        # `using CP;` has to stay the first statement of a CP model.
+        using = re.compile(r'[ \t]*using\s+CP\s*;[ \t]*\n').match(text, position)
+        position = using.end() if using else position
+        declarations = ''.join(f'{kind} {name} = ...;\n' for name, kind in self.inlined.items())
+        self.text = text[:position] + declarations + text[position:]
+        self.digest = hashlib.sha256(self.text.encode('utf-8')).hexdigest()[:16]
+
+    @property
+    def file_name(self) -> str:
+        return f'{self.path.stem}-{self.digest}.mod'
+
+    def data(self, run_config: dict, time_limit: int = DEFAULT_TIME_LIMIT) -> dict:
+        """.dat values of a run, keyed by OPL name, already as OPL literals."""
+        missing = [placeholder for placeholder in self.parameters if placeholder not in run_config]
+        if missing:
+            raise KeyError(f"{run_config.get('PREFIXE', 'run')}: no value for {', '.join(missing)}")
+        values = {'timeLimitSec': str(int(time_limit))}
+        for placeholder, (kind, name) in self.parameters.items():
+            literal = php_string(run_config[placeholder])
+            values[name] = f'"{literal}"' if kind == 'string' else literal
+        if self.probe is not None:
+            ref_x, ref_z, ref_q, limit = probe_literals(run_config)
+            values.update(stabilityRefX=ref_x, stabilityRefZ=ref_z, stabilityRefQ=ref_q,
+                          stabilityObjectiveLimit=limit)
+        if self.nlm_seed:
+            seed_a, seed_x, seed_z, seed_q, tolerance, bound = nlm_seed_literals(run_config)
+            values.update(nlmSeedA=seed_a, nlmSeedX=seed_x, nlmSeedZ=seed_z, nlmSeedQ=seed_q,
+                          nlmRelativeTolerance=tolerance)
+            if self.nlm_bound:
+                values['nlmLowerBound'] = bound
+        return values
+
+    @staticmethod
+    def render_dat(values: dict) -> str:
+        return ''.join(f'{name} = {literal};\n' for name, literal in values.items())
+
+    def inline(self, values: dict) -> str:
+        """The parametric model with a run's data written back in (for verification)."""
+        text = self.text
+        for name in self.inlined:
+            text = text.replace(f'{self.inlined[name]} {name} = ...;\n', '', 1)
+            literal = values[name]
+            text = re.sub(r'\b' + name + r'\b', lambda m: literal, text)
+        declaration = re.compile(r'^(?P<head>[ \t]*(?:int|float|string)\s+(?P<name>\w+)(?:\[\w+\])*)\s*=\s*\.\.\.;', re.M)
+
+        def fill(match):
+            head = match.group('head')
+            return f"{head} = {values[match.group('name')]};"
+        return declaration.sub(fill, text)
+
+
+def write_once(path: Path, content: str) -> bool:
+    """Write content unless the (content-named) file exists; True when written."""
+    if path.exists():
+        return False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    with os.fdopen(handle, 'w', encoding='utf-8', newline='\n') as stream:
+        stream.write(content)
+    os.replace(temp, path)
+    return True
+
+
+def default_work_dir(tmpfs: bool = False) -> Path:
+    if tmpfs:
+        if not TMPFS_DIR.is_dir():
+            raise OSError(f'{TMPFS_DIR} is not available on this system')
+        return TMPFS_DIR / 'phpauto_models'
+    return Path(tempfile.gettempdir()) / 'phpauto_models'
+
+
+class ModelInstantiator:
+    """Maps run configs to (parametric model, .dat) pairs under a work directory."""
+
+    def __init__(self, work_dir=None, time_limit: int = DEFAULT_TIME_LIMIT, models_dir=MODELS_DIR):
+        self.work_dir = Path(work_dir) if work_dir else default_work_dir()
+        self.time_limit = time_limit
+        self.models_dir = Path(models_dir)
+        self.templates = {}
+        self.stats = {'runs': 0, 'models_written': 0, 'dat_written': 0, 'dat_reused': 0}
+
+    def template(self, run_config: dict) -> ModelTemplate:
+        key = (run_config['MODEL_FILE'], *variant_of(run_config))
+        if key not in self.templates:
+            template = ModelTemplate(self.models_dir / run_config['MODEL_FILE'], *variant_of(run_config))
+            if write_once(self.work_dir / 'models' / template.file_name, template.text):
+                self.stats['models_written'] += 1
+            self.templates[key] = template
+        return self.templates[key]
+
+    def instantiate(self, run_config: dict) -> tuple:
+        """(model path, dat path) for a run, writing only files not already present."""
+        template = self.template(run_config)
+        dat = template.render_dat(template.data(run_config, self.time_limit))
+        dat_path = self.work_dir / 'dat' / f"{hashlib.sha256(dat.encode('utf-8')).hexdigest()[:16]}.dat"
+        self.stats['runs'] += 1
+        self.stats['dat_written' if write_once(dat_path, dat) else 'dat_reused'] += 1
+        return self.work_dir / 'models' / template.file_name, dat_path
+
+
+def read_run_configs(path) -> list:
+    text = Path(path).read_text(encoding='utf-8').strip()
+    try:
+        loaded = json.loads(text)
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return loaded if isinstance(loaded, list) else [loaded]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parametric OPL models plus per-run .dat files')
+    sub = parser.add_subparsers(dest='command', required=True)
+    instantiate = sub.add_parser('instantiate', help='write the models and .dat files of run configs')
+    instantiate.add_argument('runs')
+    instantiate.add_argument('--work-dir')
+    instantiate.add_argument('--tmpfs', action='store_true', help=f'use {TMPFS_DIR}')
+    instantiate.add_argument('--time-limit', type=int, default=DEFAULT_TIME_LIMIT)
+    verify = sub.add_parser('verify', help='check the parametric path against the per-run rewrite')
+    verify.add_argument('runs')
+    verify.add_argument('--time-limit', type=int, default=DEFAULT_TIME_LIMIT)
+    args = parser.parse_args()
+
+    runs = read_run_configs(args.runs)
+    if args.command == 'verify':
+        failures = 0
+        templates = {}
+        for run_config in runs:
+            key = (run_config['MODEL_FILE'], *variant_of(run_config))
+            if key not in templates:
+                templates[key] = ModelTemplate(MODELS_DIR / run_config['MODEL_FILE'], *variant_of(run_config))
+            template = templates[key]
+            expected = legacy_model_text(template.path.read_text(encoding='utf-8'), run_config, args.time_limit)
+            if template.inline(template.data(run_config, args.time_limit)) != expected:
+                failures += 1
+                print(f"MISMATCH {run_config.get('PREFIXE', '?')} ({run_config['MODEL_FILE']})")
+        print(f"Verified {len(runs)} runs over {len(templates)} model variants: {failures} mismatches")
+        return 1 if failures else 0
+
+    work_dir = Path(args.work_dir) if args.work_dir else default_work_dir(args.tmpfs)
+    instantiator = ModelInstantiator(work_dir, args.time_limit)
+    instances = {}
+    for run_config in runs:
+        model, dat = instantiator.instantiate(run_config)
+        instances[run_config.get('PREFIXE', str(len(instances)))] = {'model': str(model), 'dat': str(dat)}
+    manifest = work_dir / 'instances.json'
+    manifest.write_text(json.dumps(instances, indent=2), encoding='utf-8')
+    stats = instantiator.stats
+    print(f"{stats['runs']} runs: {stats['models_written']} models and {stats['dat_written']} .dat files written, "
+          f"{stats['dat_reused']} .dat reused")
+    print(f"Wrote {manifest}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Certified NLM objective of the PLM solutions of the nlm_comparison experiment
+
+The NLM models (RUNS_SupEmis_CP_NLM_*.mod) are the PLM models without the
+linearisation variables y = a * x and v = y * z, so for fixed decisions both have
+the cost and emission expressions of SolutionEvaluator.InstanceCoefficients:
+
+- the PLM decision of a pair is an NLM solution once a[NB_NODE] is lowered to the
+  equality the NLM states (ct2), which can only lower its objective; its NLM
+  objective is evaluated here directly, with every NLM constraint checked;
+- an NLM solution with its lead times lowered to the smallest feasible ones (none
+  above bigM) is a PLM solution, so a lower bound of the PLM bounds the NLM too:
+  objective * (1 - gap) for a FEASIBLE PLM run, CPLEX's optimality tolerance
+  (relative 1e-4, absolute 1e-6) for an OPTIMAL one. The CP Optimizer bound of the
+  NLM run, when its log reports one, is the other bound.
+
+certify adds, to the NLM rows of tables/nlm_comparison_results.csv (rewritten in the
+PHP CSV format, every other cell unchanged):
+
+    plm_objective_nlm      NLM objective of the PLM decision ('' when it is not NLM-feasible)
+    nlm_objective          objective of the NLM run itself (TotalCostTS / CS + DIO)
+    certified_lower_bound  max(PLM bound, CP bound)
+    certified_gap_pct      (best of the two objectives - bound) / best * 100
+    certificate            CERTIFIED (gap <= --gap-threshold), OPEN, PLM_NOT_NLM_FEASIBLE
+                           (with the violated constraints) or NO_PLM_SOLUTION
+
+A CERTIFIED pair needs no CP search: FinalCampaignRunner seeds the NLM runs with
+the PLM decision and this bound (NLMWarmStart.php), so CP Optimizer stops as soon as
+the seed is within the tolerance, or skips the solve with skip_certified.
+
+Usage:
+    python NLMCertifier.py logs/final_campaign_YYYYMMDD_HHMMSS [--gap-threshold 0.1] [--dry-run]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from CampaignDiff import CampaignResults
+from CampaignRebaseline import read_text_table, write_text_table
+from ModelInstantiator import CERTIFIED_GAP_PCT, CPLEX_ABSOLUTE_GAP, CPLEX_RELATIVE_GAP, LOG_ROUNDING
+from RunOutput import php_string
+from SolutionEvaluator import InstanceCoefficients, logged_values
+from SupplierDominancePruner import DATA_DIR, registry_instances, run_details_file
+
+NLM_TABLE = Path('tables') / 'nlm_comparison_results.csv'
+CERTIFICATE_COLUMNS = ['plm_objective_nlm', 'nlm_objective', 'certified_lower_bound', 'certified_gap_pct',
+                       'certificate']
+CAPPED_STRATEGIES = ('EMISCAP', 'EMISHYBRID')
+CP_BOUND = re.compile(r'(?:Best bound\s*:|Current bound is)\s*([-+]?[\d.,]+(?:e[-+]?\d+)?)', re.I)
+
+
+def nlm_violations(coefficients: InstanceCoefficients, a, x, z, q, service_t: float, cap: float = None) -> tuple:
+    """(a with the ct2 equality applied, names of the NLM constraints the decision violates)."""
+    a, x, z, q = (np.asarray(v, dtype=np.float64).copy() for v in (a, x, z, q))
+    n = coefficients.nb_nodes
+    nodes = np.arange(n)
+    has_child = np.isin(nodes, coefficients.parent)
+    used = z * coefficients.su
+    delay = (used * coefficients.delay).max(axis=1)
+    # ct2: the last node's lead time is exactly its processing time plus its slowest supplier.
+    a[-1] = min(a[-1], coefficients.t_process[-1] + delay[-1])
+    children = (coefficients.parent >= 0) & (coefficients.parent < nodes)
+    incoming = np.zeros(n)
+    np.maximum.at(incoming, coefficients.parent[children], (a * (1 - x))[children])
+    checks = {
+        'integrality': (np.abs(np.concatenate([a, q.ravel()]) % 1) > 1e-9).any() or (q < 0).any(),
+        'lead_time': (a[:-1] < coefficients.t_process[:-1] + delay[:-1] + incoming[:-1] - 1e-9).any(),
+        'ct2': a[-1] < coefficients.t_process[-1] + delay[-1] - 1e-9,
+        'ct3': a[0] > service_t + 1e-9,
+        'ct8': (used[~has_child].sum(axis=1) < 1).any(),
+        'ct9': (np.abs(q.sum(axis=1) - coefficients.demand) > 1e-6).any(),
+        'ct11': (q > used * coefficients.capacity + 1e-9).any(),
+        'ct12': (z[has_child] != 0).any(),
+        'ct13': (z > coefficients.su).any(),
+        'ct14': (q < z - 1e-9).any(),
+    }
+    if cap is not None:
+        emissions = coefficients.evaluate(a[None], x[None], z[None], q[None], [0.0])['Emis'][0]
+        checks['ct10'] = emissions > cap * (1 + 1e-12)
+    return a, [name for name, violated in checks.items() if violated]
+
+
+def objective(values: dict, strategy: str, index: int = 0) -> float:
+    """TotalCostCS + dlts for the cap model, TotalCostTS + dlts for the tax and hybrid models."""
+    cost = values['TotalCostCS'] if strategy == 'EMISCAP' else values['TotalCostTS']
+    return float(cost[index] + values['DIO'][index])
+
+
+def plm_lower_bound(plm_objective: float, status: str, gap_pct) -> float:
+    """Lower bound of the PLM optimum (hence of the NLM optimum) from a PLM run."""
+    if status == 'OPTIMAL':
+        slack = max(CPLEX_ABSOLUTE_GAP, CPLEX_RELATIVE_GAP * abs(plm_objective))
+    elif status == 'FEASIBLE' and pd.notna(gap_pct):
+        slack = float(gap_pct) / 100 * abs(plm_objective)
+    else:
+        return np.nan
+    return plm_objective - slack - LOG_ROUNDING
+
+
+def cp_bound(log_text: str) -> float:
+    """Last lower bound reported by CP Optimizer in a run log."""
+    found = CP_BOUND.findall(log_text)
+    return pd.to_numeric(found[-1].replace(',', '.'), errors='coerce') if found else np.nan
+
+
+def logged_objective(log_text: str, vectors: dict, strategy: str) -> float:
+    """TotalCostTS / CS + DIO of a run from its full-precision log fields."""
+    exact, _ = logged_values(log_text)
+    cost = exact.get('CS') if strategy == 'EMISCAP' else exact.get('TS')
+    if cost is None or pd.isna(cost) or 'A' not in vectors:
+        return np.nan
+    return float(cost) + float(np.sum(vectors['A']))
+
+
+class NLMCertifier:
+    """Certificates of the NLM rows of a campaign from its PLM twins."""
+
+    def __init__(self, campaign, gap_threshold: float = CERTIFIED_GAP_PCT, data_dir: Path = DATA_DIR):
+        self.campaign = CampaignResults(campaign)
+        self.path = Path(campaign)
+        self.gap_threshold = gap_threshold
+        self.data_dir = Path(data_dir)
+        self._instances = registry_instances()
+
+    def certify_pair(self, plm: pd.Series, nlm: pd.Series) -> dict:
+        strategy = nlm['strategy']
+        instance = self._instances[nlm['instance_id']]
+        coefficients = InstanceCoefficients.from_instance(
+            instance, int(nlm['suppliers_available']), run_details_file('nlm_comparison', instance), self.data_dir)
+        n, s = coefficients.nb_nodes, coefficients.nb_supp
+        tax = pd.to_numeric(nlm['tax_rate'], errors='coerce')
+        tax = 0.0 if strategy == 'EMISCAP' or pd.isna(tax) else float(tax)
+        cap = float(nlm['cap_value']) if strategy in CAPPED_STRATEGIES and nlm['cap_value'] != '' else None
+
+        nlm_log = self.campaign.log_text(nlm['run_id'])
+        nlm_value = logged_objective(nlm_log, self.campaign.decisions(nlm['run_id']), strategy)
+        row = {'plm_objective_nlm': np.nan, 'nlm_objective': nlm_value}
+        bounds = [cp_bound(nlm_log)]
+
+        vectors = self.campaign.decisions(plm['run_id']) if plm is not None else {}
+        if not all(len(vectors.get(key, ())) == size for key, size in (('A', n), ('X', n), ('Z', n * s), ('Q', n * s))):
+            certificate = 'NO_PLM_SOLUTION'
+        else:
+            z, q = vectors['Z'].reshape(n, s), vectors['Q'].reshape(n, s)
+            a, violated = nlm_violations(coefficients, vectors['A'], vectors['X'], z, q,
+                                         float(nlm['service_time_promised']), cap)
+            plm_value = objective(
+                coefficients.evaluate(vectors['A'][None], vectors['X'][None], z[None], q[None], [tax]), strategy)
+            gap_pct = pd.to_numeric(plm['mip_gap'], errors='coerce')
+            bounds.append(plm_lower_bound(plm_value, plm['solver_status'], gap_pct))
+            if violated:
+                certificate = 'PLM_NOT_NLM_FEASIBLE:' + '|'.join(violated)
+            else:
+                row['plm_objective_nlm'] = objective(
+                    coefficients.evaluate(a[None], vectors['X'][None], z[None], q[None], [tax]), strategy)
+                certificate = None
+
+        best = np.nanmin([row['plm_objective_nlm'], row['nlm_objective'], np.inf])
+        bound = np.nanmax(bounds) if not np.isnan(bounds).all() else np.nan
+        gap = max(0.0, (best - bound) / abs(best) * 100) if np.isfinite(best) and pd.notna(bound) else np.nan
+        row['certified_lower_bound'] = bound
+        row['certified_gap_pct'] = gap
+        if certificate is None:
+            certificate = 'CERTIFIED' if pd.notna(gap) and gap <= self.gap_threshold else 'OPEN'
+        row['certificate'] = certificate
+        return row
+
+    def certify(self, dry_run: bool = False) -> pd.DataFrame:
+        """The nlm_comparison table with the certificate columns (written unless dry_run)."""
+        path = self.path / NLM_TABLE
+        table = read_text_table(path)
+        for column in CERTIFICATE_COLUMNS:
+            table[column] = ''
+        plm_rows = table[table['model_type'] == 'PLM'].set_index(['instance_id', 'strategy'])
+        for index, nlm in table[table['model_type'] == 'NLM'].iterrows():
+            key = (nlm['instance_id'], nlm['strategy'])
+            plm = plm_rows.loc[key] if key in plm_rows.index else None
+            if isinstance(plm, pd.DataFrame):
+                plm = plm.iloc[-1]
+            for column, value in self.certify_pair(plm, nlm).items():
+                table.at[index, column] = value if isinstance(value, str) else (
+                    '' if pd.isna(value) else php_string(float(value)))
+        if not dry_run:
+            write_text_table(path, table)
+        return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Certify the NLM optimum with the PLM solution and bounds')
+    parser.add_argument('campaign', help='results directory')
+    parser.add_argument('--gap-threshold', type=float, default=CERTIFIED_GAP_PCT,
+                        help='largest certified gap (%%) of a CERTIFIED pair')
+    parser.add_argument('--dry-run', action='store_true', help='print the certificates without writing')
+    args = parser.parse_args()
+
+    table = NLMCertifier(args.campaign, args.gap_threshold).certify(args.dry_run)
+    rows = table[table['model_type'] == 'NLM']
+    print(rows[['run_id', 'solver_status', 'mip_gap', 'runtime_sec', *CERTIFICATE_COLUMNS]].to_string(index=False))
+    if not args.dry_run:
+        print(f"Wrote {Path(args.campaign) / NLM_TABLE}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,230 @@
+<?php
+
+require_once __DIR__ . '/CplexRunner.php';
+
+/**
+ * Seeds the CP Optimizer NLM runs with the PLM solution of the same instance and
+ * strategy, and certifies the NLM optimum from the PLM bound.
+ *
+ * The NLM models are the PLM models without the linearisation variables, so the PLM
+ * decision is an NLM solution (with a[NB_NODE] at the ct2 equality) and a PLM lower
+ * bound is an NLM lower bound (see NLMCertifier.py). The seeded model starts the CP
+ * search from the PLM decision, states the bound on the objective and sets the
+ * relative optimality tolerance, so CP Optimizer stops as soon as the seed is proven
+ * within the tolerance instead of searching until the time limit.
+ */
+class NLMWarmStart {
+
+    // CPLEX's default stopping rule for an OPTIMAL MIP; the PLM models set neither.
+    public const CPLEX_RELATIVE_GAP = 1.0e-4;
+    public const CPLEX_ABSOLUTE_GAP = 1.0e-6;
+    // #TS and #CS are printed with 4 decimals.
+    public const LOG_ROUNDING = 5.0e-5;
+    // Certified gap (%) below which the PLM solution settles the NLM run.
+    public const CERTIFIED_GAP_PCT = 0.1;
+
+    /**
+     * Adds the seed, the PLM bound and the tolerance to the config of an NLM run.
+     *
+     * With $skipCertified, a PLM solution certified within $certifiedGapPct also
+     * becomes the NLM result (NLM_CERTIFIED_RESULT) and no CP search is run.
+     */
+    public static function seedRunConfig(
+        array $runConfig,
+        array $plmResult,
+        float $certifiedGapPct = self::CERTIFIED_GAP_PCT,
+        bool $skipCertified = false
+    ): array {
+        foreach (['A', 'X', 'Z', 'Q'] as $key) {
+            if (!isset($plmResult[$key]) || !is_array($plmResult[$key])) {
+                return $runConfig;
+            }
+        }
+
+        $runConfig['NLM_SEED_A'] = array_values($plmResult['A']);
+        $runConfig['NLM_SEED_X'] = array_values($plmResult['X']);
+        $runConfig['NLM_SEED_Z'] = array_values($plmResult['Z']);
+        $runConfig['NLM_SEED_Q'] = array_values($plmResult['Q']);
+        $runConfig['NLM_RELATIVE_TOLERANCE'] = $certifiedGapPct / 100.0;
+
+        $objective = self::plmObjective($plmResult, (string)($runConfig['STRATEGY'] ?? ''));
+        $lowerBound = $objective === null ? null : self::plmLowerBound(
+            $objective,
+            (string)($plmResult['status'] ?? ''),
+            $plmResult['mip_gap'] ?? null
+        );
+        if ($lowerBound === null) {
+            return $runConfig;
+        }
+        $runConfig['NLM_LOWER_BOUND'] = $lowerBound;
+
+        $gapPct = max(0.0, ($objective - $lowerBound) / max(abs($objective), 1.0e-10) * 100.0);
+        if ($skipCertified && $gapPct <= $certifiedGapPct) {
+            $runConfig['NLM_CERTIFIED_RESULT'] = self::certifiedResult($plmResult, $gapPct);
+        }
+        return $runConfig;
+    }
+
+    /**
+     * Model content seeded from the NLM_SEED_* keys of a run config (unchanged without them).
+     */
+    public static function seedModel(string $content, array $runConfig): string {
+        if (!isset($runConfig['NLM_SEED_A'])) {
+            return $content;
+        }
+        return self::buildSeededModel(
+            $content,
+            $runConfig['NLM_SEED_A'],
+            $runConfig['NLM_SEED_X'],
+            $runConfig['NLM_SEED_Z'],
+            $runConfig['NLM_SEED_Q'],
+            (int)$runConfig['_NBSUPP_'],
+            isset($runConfig['NLM_LOWER_BOUND']) ? (float)$runConfig['NLM_LOWER_BOUND'] : null,
+            (float)($runConfig['NLM_RELATIVE_TOLERANCE'] ?? self::CERTIFIED_GAP_PCT / 100.0)
+        );
+    }
+
+    public static function buildSeededModel(
+        string $content,
+        array $seedA,
+        array $seedX,
+        array $seedZ,
+        array $seedQ,
+        int $supplierCount,
+        ?float $lowerBound,
+        float $relativeTolerance
+    ): string {
+        if (strpos($content, 'using CP;') === false) {
+            throw new InvalidArgumentException('Only the CP Optimizer NLM models can be seeded');
+        }
+        if ($supplierCount <= 0 || count($seedX) === 0 || count($seedA) !== count($seedX)) {
+            throw new InvalidArgumentException('Seed decision dimensions must be positive and consistent');
+        }
+        $nodeCount = count($seedX);
+        $expectedMatrixSize = $nodeCount * $supplierCount;
+        if (count($seedZ) !== $expectedMatrixSize || count($seedQ) !== $expectedMatrixSize) {
+            throw new InvalidArgumentException("Seed Z/Q vectors must each contain {$expectedMatrixSize} values");
+        }
+
+        if (!preg_match_all('/^[ \t]*dvar\b[^\n]*\n/m', $content, $dvarMatches, PREG_OFFSET_CAPTURE)) {
+            throw new RuntimeException('Could not locate the NLM decision variables');
+        }
+        $lastDvar = end($dvarMatches[0]);
+        $seedOffset = $lastDvar[1] + strlen($lastDvar[0]);
+
+        // ct2 is an equality in the NLM: the last node is seeded at its exact lead time.
+        $seed =
+            " int nlmSeedA[N] = " . self::toOplVector($seedA) . ";\n" .
+            " int nlmSeedX[N] = " . self::toOplVector($seedX) . ";\n" .
+            " int nlmSeedZ[N][S] = " . self::toOplMatrix($seedZ, $nodeCount, $supplierCount) . ";\n" .
+            " int nlmSeedQ[N][S] = " . self::toOplMatrix($seedQ, $nodeCount, $supplierCount) . ";\n" .
+            " execute NLM_SEED {\n" .
+            "     var seed = new IloOplCPSolution();\n" .
+            "     for (var i in N) {\n" .
+            "         var lead = nlmSeedA[i];\n" .
+            "         if (i == NB_NODE) {\n" .
+            "             lead = t_process[i];\n" .
+            "             for (var k in S) {\n" .
+            "                 if (t_process[i] + nlmSeedZ[i][k]*su[i][k]*sup[k][1] > lead) " .
+                                  "lead = t_process[i] + nlmSeedZ[i][k]*su[i][k]*sup[k][1];\n" .
+            "             }\n" .
+            "         }\n" .
+            "         seed.setValue(a[i], lead);\n" .
+            "         seed.setValue(x[i], nlmSeedX[i]);\n" .
+            "         for (var j in S) {\n" .
+            "             seed.setValue(z[i][j], nlmSeedZ[i][j]);\n" .
+            "             seed.setValue(q[i][j], nlmSeedQ[i][j]);\n" .
+            "         }\n" .
+            "     }\n" .
+            "     cp.setStartingPoint(seed);\n" .
+            "     cp.param.RelativeOptimalityTolerance = " . self::formatNumber($relativeTolerance) . ";\n" .
+            " }\n";
+        $content = substr_replace($content, $seed, $seedOffset, 0);
+
+        if ($lowerBound !== null) {
+            if (!preg_match('/^[ \t]*minimize\s+([^;\r\n]+);/m', $content, $objectiveMatch)) {
+                throw new RuntimeException('Could not locate the NLM objective');
+            }
+            $bound = self::formatNumber($lowerBound);
+            $constraint = "\n \tct_nlm_plm_bound: " . trim($objectiveMatch[1]) . " >= {$bound};\n";
+            $content = preg_replace('/subject\s+to\s*\{/', "subject to {{$constraint}", $content, 1, $count);
+            if ($count !== 1) {
+                throw new RuntimeException('Could not locate the NLM constraint block');
+            }
+        }
+
+        return $content;
+    }
+
+    /**
+     * PLM objective from the full-precision log fields: TotalCostCS + dlts for the cap
+     * model, TotalCostTS + dlts for the tax and hybrid models.
+     */
+    public static function plmObjective(array $plmResult, string $strategy): ?float {
+        $cost = $strategy === 'EMISCAP' ? ($plmResult['CS'] ?? null) : ($plmResult['TS'] ?? null);
+        if (!is_numeric($cost) || !isset($plmResult['A']) || !is_array($plmResult['A'])) {
+            return null;
+        }
+        return (float)$cost + array_sum(array_map('floatval', $plmResult['A']));
+    }
+
+    /**
+     * Lower bound of the PLM optimum, hence of the NLM optimum, or null without one.
+     */
+    public static function plmLowerBound(float $objective, string $status, $gapPct): ?float {
+        if ($status === 'OPTIMAL') {
+            $slack = max(self::CPLEX_ABSOLUTE_GAP, self::CPLEX_RELATIVE_GAP * abs($objective));
+        } elseif ($status === 'FEASIBLE' && is_numeric($gapPct)) {
+            $slack = (float)$gapPct / 100.0 * abs($objective);
+        } else {
+            return null;
+        }
+        return $objective - $slack - self::LOG_ROUNDING;
+    }
+
+    /**
+     * The PLM result standing for an NLM run its certificate makes unnecessary.
+     */
+    public static function certifiedResult(array $plmResult, float $gapPct): array {
+        $result = $plmResult;
+        unset($result['_raw_output']);
+        $result['CplexRunTime'] = '0 sec';
+        $result['RT'] = 0.0;
+        $result['status'] = 'OPTIMAL';
+        $result['termination_reason'] = 'CERTIFIED_BY_PLM';
+        $result['mip_gap'] = $gapPct;
+        return $result;
+    }
+
+    /**
+     * Parsed result of a campaign run log (print_r of the result with its _raw_output).
+     */
+    public static function resultFromLog(string $logFile): ?array {
+        if (!file_exists($logFile)) {
+            return null;
+        }
+        $log = file_get_contents($logFile);
+        $marker = strpos($log, '[_raw_output] =>');
+        $result = CplexRunner::parse($marker === false ? $log : substr($log, $marker));
+        return isset($result['A']) ? $result : null;
+    }
+
+    private static function toOplVector(array $values): string {
+        return '[' . implode(',', array_map(function($value) {
+            return (string)(int)round((float)$value);
+        }, array_values($values))) . ']';
+    }
+
+    private static function toOplMatrix(array $values, int $rows, int $columns): string {
+        $values = array_values($values);
+        $matrix = [];
+        for ($row = 0; $row < $rows; $row++) {
+            $matrix[] = self::toOplVector(array_slice($values, $row * $columns, $columns));
+        }
+        return '[' . implode(',', $matrix) . ']';
+    }
+
+    private static function formatNumber(float $value): string {
+        return rtrim(rtrim(sprintf('%.12F', $value), '0'), '.');
+    }
+}
@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""
+Plotting-free core of the campaign reporting: loading, admissibility, labels
+
+GraphGenerator used to import matplotlib, seaborn and matplotlib.patches and apply
+the publication style at module load, so every caller of its static helpers paid
+for the plotting stack (about 1 s) even without drawing anything. The result
+loading (directory or archive, whole or in chunks), the comparison-admissibility
+filter and the article-facing instance labels live here and import only pandas;
+GraphGenerator builds on CampaignTables and imports and styles matplotlib on its
+first plot (GraphGenerator.load_plotting).
+
+Run as a script, this is the import-time benchmark of the reporting modules: each
+import is timed in fresh interpreters (median of --repeat), together with whether
+matplotlib got loaded. --record appends the measurement to a JSON-lines history
+and --budget fails (exit 1) when importing the core takes longer.
+
+Usage:
+    python ReportingCore.py [--repeat 5] [--record logs/import_benchmark.jsonl] [--budget 0.8]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from CampaignArchive import CampaignArchive, is_archive
+from CampaignDiff import admissible_mask
+from InstanceCatalog import load_catalog
+from StreamingAggregates import ResultsSummary, read_csv_chunks, series_rows
+
+EXPERIMENT_TABLES = {
+    'scalability_df': 'scalability_results.csv',
+    'tax_sweep_df': 'carbon_tax_sweep_results.csv',
+    'cap_sweep_df': 'carbon_cap_sweep_results.csv',
+    'hybrid_df': 'carbon_hybrid_results.csv',
+    'svt_df': 'service_time_sensitivity_results.csv',
+    'topology_df': 'topology_baseline_results.csv',
+    'nlm_comparison_df': 'nlm_comparison_results.csv',
+}
+# Registry families other than these are regular BOMs (simple, medium, complex).
+TOPOLOGY_LABELS = {'multi_level': 'Multi-Level', 'parallel': 'Parallel'}
+FAMILY_ORDER = {'multi_level': 1, 'parallel': 2}
+INSTANCE_COLUMNS = ['family', 'N', 'levels', 'components', 'depth', 'branches', 'leaves', 'suppliers',
+                    'topology', 'sort_key']
+BENCHMARKS = {
+    'ReportingCore': 'import ReportingCore',
+    'GraphGenerator': 'import GraphGenerator',
+    'GraphGenerator+plotting': 'import GraphGenerator; GraphGenerator.load_plotting()',
+}
+
+
+def comparison_admissible(df: pd.DataFrame) -> pd.DataFrame:
+    """Keep proven-optimal rows and feasible incumbents with a final gap <= 1%."""
+    return df[admissible_mask(df).to_numpy()].copy()
+
+
+_catalog = None
+
+
+def instance_catalog() -> dict:
+    """InstanceCatalog records by instance id, loaded (from its cache) once per process."""
+    global _catalog
+    if _catalog is None:
+        _catalog = load_catalog()
+    return _catalog
+
+
+def display_instance_id(instance_id: str) -> str:
+    """Return article-facing instance labels: parallel-branch BOMs carry their size."""
+    entry = instance_catalog().get(str(instance_id))
+    if entry and entry['family'] == 'parallel':
+        return f"{instance_id}_{entry['nodes']}"
+    return str(instance_id)
+
+
+def instance_metadata(instance_id: str) -> dict:
+    """INSTANCE_COLUMNS of an instance, from the instance catalog.
+
+    N is the registry size and levels the registry depth; components, depth,
+    branches, leaves and suppliers are measured on the instance files. sort_key
+    orders the regular BOMs by size, then the multi-level BOMs by size and levels,
+    then the parallel-branch BOMs in registry order; unregistered ids come last.
+    """
+    value = str(instance_id)
+    entry = instance_catalog().get(value)
+    if entry is None:
+        return dict(dict.fromkeys(INSTANCE_COLUMNS), family='unregistered', topology='Standard',
+                    sort_key=(9, value))
+    family = entry['family']
+    if family == 'parallel':
+        sort_key = (FAMILY_ORDER[family], entry['position'], value)
+    else:
+        sort_key = (FAMILY_ORDER.get(family, 0), entry['nodes'], entry['levels'], value)
+    return {'family': family, 'N': entry['nodes'], 'levels': entry['levels'],
+            'components': entry['components'], 'depth': entry['depth'], 'branches': entry['branches'],
+            'leaves': entry['leaves'], 'suppliers': entry['suppliers'],
+            'topology': TOPOLOGY_LABELS.get(family, 'Standard'), 'sort_key': sort_key}
+
+
+def instance_sort_key(instance_id: str) -> tuple:
+    """Sort regular BOMs numerically first, then structural benchmark families."""
+    return instance_metadata(instance_id)['sort_key']
+
+
+class ResultsIndex:
+    """Admissibility, instance metadata and group positions of one results table.
+
+    Every figure and table used to copy its frame, filter it again for admissibility,
+    re-parse the instance ids and then scan it once per instance, strategy or tax
+    level. Here each of those is computed once: the admissible mask, the per-row
+    instance metadata (INSTANCE_COLUMNS, from the instance catalog) and, per column,
+    the row positions of every value in order of first appearance. Callers select
+    positions and take only the rows (and columns) they draw; the table itself is
+    never copied.
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._admissible = None
+        self._instances = None
+        self._groups = {}
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def admissible(self) -> np.ndarray:
+        if self._admissible is None:
+            self._admissible = admissible_mask(self.frame).to_numpy()
+        return self._admissible
+
+    @property
+    def instances(self) -> pd.DataFrame:
+        """INSTANCE_COLUMNS of every row, looked up once per distinct instance id."""
+        if self._instances is None:
+            codes, uniques = pd.factorize(self.frame['instance_id'].astype(str))
+            metadata = pd.DataFrame([instance_metadata(value) for value in uniques], columns=INSTANCE_COLUMNS)
+            self._instances = metadata.iloc[codes].set_index(self.frame.index)
+        return self._instances
+
+    def positions(self, admissible: bool = True) -> np.ndarray:
+        if admissible:
+            return np.flatnonzero(self.admissible)
+        return np.arange(len(self.frame))
+
+    def column(self, name: str) -> pd.Series:
+        if name in INSTANCE_COLUMNS:
+            return self.instances[name]
+        return self.frame[name]
+
+    def groups(self, name: str, admissible: bool = True) -> dict:
+        """Row positions (ascending) of every value of a column, in order of first appearance."""
+        key = (name, admissible)
+        if key not in self._groups:
+            candidates = self.positions(admissible)
+            codes, uniques = pd.factorize(self.column(name).to_numpy()[candidates])
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+            self._groups[key] = {value: candidates[order[bounds[code]:bounds[code + 1]]]
+                                 for code, value in enumerate(uniques)}
+        return self._groups[key]
+
+    def select(self, admissible: bool = True, **where) -> np.ndarray:
+        """Positions of the rows equal to every column=value given."""
+        selected = self.positions(admissible)
+        for name, value in where.items():
+            group = self.groups(name, admissible).get(value)
+            if group is None:
+                return np.empty(0, dtype=np.intp)
+            selected = np.intersect1d(selected, group, assume_unique=True)
+        return selected
+
+    def values(self, name: str, positions: np.ndarray) -> list:
+        """Distinct values of a column over some positions, in order of first appearance."""
+        return list(pd.unique(self.column(name).to_numpy()[positions]))
+
+    def take(self, positions: np.ndarray, columns=None) -> pd.DataFrame:
+        """The rows at positions, with the instance metadata columns asked for."""
+        columns = list(self.frame.columns) if columns is None else list(columns)
+        table = [name for name in columns if name not in INSTANCE_COLUMNS]
+        rows = self.frame.iloc[positions, [self.frame.columns.get_loc(name) for name in table]]
+        for location, name in enumerate(columns):
+            if name in INSTANCE_COLUMNS:
+                rows.insert(location, name, self.instances[name].to_numpy()[positions])
+        return rows
+
+    def rows(self, admissible: bool = True, columns=None, **where) -> pd.DataFrame:
+        return self.take(self.select(admissible, **where), columns)
+
+
+class CampaignTables:
+    """Result tables of a campaign directory or archive, as the figures use them."""
+
+    comparison_admissible = staticmethod(comparison_admissible)
+    display_instance_id = staticmethod(display_instance_id)
+    instance_sort_key = staticmethod(instance_sort_key)
+
+    def __init__(self, results_dir: str, chunksize: int = None, source=None, summary: ResultsSummary = None):
+        """source replaces the files (anything with exists/read_csv/glob, like a CampaignArchive);
+        summary, when given, stands for consolidated_results.csv."""
+        self.results_dir = Path(results_dir)
+        self.chunksize = chunksize
+        if source is None and is_archive(self.results_dir):
+            source = CampaignArchive(self.results_dir)
+        self.archive = source
+        self.tables_dir = self.results_dir / 'tables'
+        self.consolidated_df = None
+        self.summary = summary
+        self.indexes = {}
+        self.load_data()
+
+    def load_data(self):
+        """Load all result CSV files"""
+        # Try to load consolidated results
+        if self.summary is not None:
+            print(f"Using aggregated consolidated results: {self.summary.rows} rows")
+        elif self._exists('consolidated_results.csv') and self.chunksize:
+            chunks = read_csv_chunks(self.archive or self.results_dir, 'consolidated_results.csv', self.chunksize)
+            self.summary = ResultsSummary.from_chunks(chunks)
+            print(f"Aggregated consolidated results: {self.summary.rows} rows in chunks of {self.chunksize}")
+        elif self._exists('consolidated_results.csv'):
+            self.consolidated_df = self._read_csv('consolidated_results.csv')
+            self.summary = ResultsSummary.from_frame(self.consolidated_df)
+            print(f"Loaded consolidated results: {len(self.consolidated_df)} rows")
+
+        # Load experiment-specific data
+        for attribute, filename in EXPERIMENT_TABLES.items():
+            setattr(self, attribute, self._load_csv(filename))
+
+    def index(self, attribute: str) -> ResultsIndex:
+        """The ResultsIndex of an experiment table (EXPERIMENT_TABLES), built on first use."""
+        if attribute not in self.indexes:
+            self.indexes[attribute] = ResultsIndex(getattr(self, attribute))
+        return self.indexes[attribute]
+
+    def _load_csv(self, filename: str) -> pd.DataFrame:
+        """Load CSV file if it exists"""
+        filepath = Path('tables') / filename
+        if self._exists(filepath) and self.chunksize:
+            # Every experiment figure starts from the comparison-admissible rows; the line
+            # plots read one point per instance and level of the sweeps.
+            chunks = read_csv_chunks(self.archive or self.results_dir, filepath, self.chunksize)
+            df = series_rows(chunks, filename[:-len('_results.csv')])
+            print(f"Loaded {filename}: {len(df)} comparison-admissible rows")
+            return df
+        if self._exists(filepath):
+            df = self._read_csv(filepath)
+            print(f"Loaded {filename}: {len(df)} rows")
+            return df
+        return None
+
+    def _exists(self, relpath) -> bool:
+        if self.archive:
+            return self.archive.exists(relpath)
+        return (self.results_dir / relpath).exists()
+
+    def _read_csv(self, relpath, **kwargs) -> pd.DataFrame:
+        """Read a results CSV by its path relative to the campaign directory"""
+        if self.archive:
+            return self.archive.read_csv(relpath, **kwargs)
+        return pd.read_csv(self.results_dir / relpath, **kwargs)
+
+    def _glob(self, pattern: str) -> list:
+        if self.archive:
+            return [Path(name) for name in self.archive.glob(pattern)]
+        # Sorted like CampaignArchive.glob so both sources give figures the same order.
+        return sorted((path.relative_to(self.results_dir) for path in self.results_dir.glob(pattern)),
+                      key=Path.as_posix)
+
+
+def time_import(statement: str) -> tuple:
+    """(seconds, matplotlib loaded) of a statement in a fresh interpreter."""
+    code = ("import sys, time; sys.path.insert(0, {src!r}); start = time.perf_counter(); {statement}; "
+            "print(time.perf_counter() - start, 'matplotlib' in sys.modules)"
+            ).format(src=str(Path(__file__).resolve().parent), statement=statement)
+    done = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    seconds, loaded = done.stdout.split()[-2:]
+    return float(seconds), loaded == 'True'
+
+
+def import_benchmark(repeat: int = 5) -> dict:
+    """Median import time and matplotlib use per benchmarked statement."""
+    results = {}
+    for name, statement in BENCHMARKS.items():
+        samples = [time_import(statement) for _ in range(repeat)]
+        results[name] = {'median_sec': statistics.median(seconds for seconds, _ in samples),
+                         'max_sec': max(seconds for seconds, _ in samples),
+                         'matplotlib': samples[-1][1]}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Import-time benchmark of the reporting modules')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters per import')
+    parser.add_argument('--record', help='append the measurement to this JSON-lines file')
+    parser.add_argument('--budget', type=float, help='fail when importing ReportingCore takes longer (seconds)')
+    args = parser.parse_args()
+
+    results = import_benchmark(args.repeat)
+    for name, result in results.items():
+        print(f"{name:<24} median {result['median_sec']:.3f}s  max {result['max_sec']:.3f}s  "
+              f"matplotlib {'loaded' if result['matplotlib'] else 'not loaded'}")
+    if args.record:
+        record = {'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+                  'host': platform.node(), 'repeat': args.repeat, 'imports': results}
+        Path(args.record).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.record, 'a', encoding='utf-8') as stream:
+            stream.write(json.dumps(record) + '\n')
+        print(f"Appended to {args.record}")
+    core = results['ReportingCore']
+    if core['matplotlib'] or results['GraphGenerator']['matplotlib']:
+        print("matplotlib is imported before the first plot", file=sys.stderr)
+        return 1
+    if args.budget is not None and core['median_sec'] > args.budget:
+        print(f"ReportingCore import {core['median_sec']:.3f}s exceeds the {args.budget}s budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
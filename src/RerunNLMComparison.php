@@ -8,6 +8,7 @@ $config = require __DIR__ . '/../config/settings.php';
 require_once __DIR__ . '/FileUtils.php';
 require_once __DIR__ . '/CplexRunner.php';
 require_once __DIR__ . '/KPICalculator.php';
+require_once __DIR__ . '/NLMWarmStart.php';
 
 // Configuration
 $baseDir = realpath(__DIR__ . '/..');
@@ -182,6 +183,15 @@ foreach ($instances as $instanceId) {
             'STRATEGY' => $strategy
         ];
         
+        // Start from the campaign's PLM solution of the same pair. The supplier files and cap
+        // here are this script's own, so the PLM bound does not carry over: starting point only.
+        $plmResult = NLMWarmStart::resultFromLog($campaignDir . 'logs/' . "COMP-{$instanceId}-{$strategy}-PLM.log");
+        if ($plmResult !== null) {
+            $runConfig = NLMWarmStart::seedRunConfig($runConfig, $plmResult);
+            unset($runConfig['NLM_LOWER_BOUND']);
+            echo "    Seeded from the PLM solution\n";
+        }
+        
         // Prepare model file (with correct CP time limit handling)
         $modelPath = $modelDir . $modelFile;
         $content = file_get_contents($modelPath);
@@ -193,9 +203,13 @@ foreach ($instances as $instanceId) {
             $content
         );
         
+        $content = NLMWarmStart::seedModel($content, $runConfig);
+        
         // Apply parameter replacements
         foreach ($runConfig as $key => $value) {
-            $content = str_replace($key, $value, $content);
+            if (is_scalar($value)) {
+                $content = str_replace($key, $value, $content);
+            }
         }
         
         // Write prepared model
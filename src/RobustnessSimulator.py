@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo robustness of stored buffer positions and supplier mixes
+
+The campaign solves deterministic models: every node draws rqtf*adup per day and
+every supplier delivers in exactly `delay` days. This tool keeps the decisions of
+each logged run (A, X, Z, Q) fixed and replays them under variability taken from
+the instance data:
+
+- demand: the demand of node i over a window of L days is rqtf*adup*L times
+  max(0, 1 + var_factor[i] * N(0,1) / sqrt(L)), independently per node;
+- supplier lead time: supplier k is on time with probability reliability[k];
+  otherwise it is late by ceil(delay[k] * lead_time_variance[k] * |N(0,1)|)
+  days, for every leaf it delivers in that scenario.
+
+The realised decoupled lead times follow the model constraints bottom-up,
+
+    L[i] = t_process[i] + max(out[j] over children j, delay of the suppliers used at i)
+
+where a buffered child contributes out[j] = 0 unless it stocks out, i.e. unless its
+demand over L[j] exceeds the buffer the model paid for, spread*rqtf*adup*a[j]
+(spread = (1.5 + var_factor) * lt_factor); unbuffered or stocked-out children pass
+L[j] on. The service level is P(L[0] <= service_time_promised), the root constraint
+ct3. Emissions use the Emis expression with the supplier term scaled by each leaf's
+demand and the transport term evaluated at the realised L; facility and inventory
+terms are those of the plan. With var_factor = 0 and reliability = 1 every scenario
+reproduces the logged plan.
+
+Scenarios are simulated as (chunk, nodes) arrays with one vectorised step per node,
+runs are spread over a process pool, and the per-run summary and per-buffer rows are
+appended to the output CSVs as runs finish. Every run draws from its own seed
+(--seed and the run_id), so the results do not depend on the number of workers.
+
+Usage:
+    python RobustnessSimulator.py logs/final_campaign_YYYYMMDD_HHMMSS
+        [--scenarios 100000] [--chunk-size 50000] [--workers 4] [--seed 0]
+        [--runs TAX-bom_13-0.00,CAP-bom_13-95] [--output robustness_summary.csv]
+        [--buffers robustness_buffers.csv]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from SolutionEvaluator import InstanceCoefficients, SolutionEvaluator
+from SupplierDominancePruner import DATA_DIR
+
+DEFAULT_SCENARIOS = 100_000
+DEFAULT_CHUNK_SIZE = 50_000
+EMISSION_QUANTILES = (0.05, 0.5, 0.95, 0.99)
+RUN_COLUMNS = ['run_id', 'experiment', 'instance_id', 'strategy', 'model_type', 'service_time_promised',
+               'suppliers_available']
+
+
+def simulate_chunk(model: InstanceCoefficients, a, x, z, q, scenarios: int, rng: np.random.Generator) -> dict:
+    """Realised lead times, buffer stockouts and emissions of one plan over a chunk of scenarios."""
+    nb_nodes = model.nb_nodes
+    used = (np.asarray(z) > 0.5) & model.su
+    late = rng.random((scenarios, model.nb_supp)) >= model.reliability
+    delay = model.delay + late * np.ceil(model.delay * model.lead_time_variance
+                                         * np.abs(rng.standard_normal((scenarios, model.nb_supp))))
+    shocks = rng.standard_normal((scenarios, nb_nodes))
+    lead = np.zeros((scenarios, nb_nodes))
+    incoming = np.zeros((scenarios, nb_nodes))
+    stockout = np.zeros((scenarios, nb_nodes), dtype=bool)
+    supplier_emis = np.zeros(scenarios)
+    y = a * x
+    # The models only link a[i] to children j > i (bom_50 has a node whose parent does not exist),
+    # so a reverse sweep over the indices sees every child before its parent.
+    for i in range(nb_nodes - 1, -1, -1):
+        wait = incoming[:, i]
+        if used[i].any():
+            wait = np.maximum(wait, delay[:, used[i]].max(axis=1))
+        lead[:, i] = model.t_process[i] + wait
+        factor = np.maximum(0.0, 1.0 + model.var_factor[i] * shocks[:, i] / np.sqrt(np.maximum(lead[:, i], 1.0)))
+        if used[i].any():
+            supplier_emis += (q[i] @ model.emissions) * factor
+        if x[i] > 0.5 and model.daily_usage[i] > 0:
+            demand = model.daily_usage[i] * lead[:, i] * factor
+            stockout[:, i] = demand > model.buffer_scale[i] * a[i] + 1e-9
+            out = np.where(stockout[:, i], lead[:, i], 0.0)
+        else:
+            out = np.zeros(scenarios) if x[i] > 0.5 else lead[:, i]
+        parent = model.parent[i]
+        if 0 <= parent < i:
+            incoming[:, parent] = np.maximum(incoming[:, parent], out)
+    planned = float(model.facility @ x + model.inventory @ y + model.transport_y @ y)
+    emis = supplier_emis + lead @ model.transport_a + planned
+    return {'lead': lead, 'stockout': stockout, 'emis': emis}
+
+
+def simulate_run(task: dict) -> tuple:
+    """(summary row, per-buffer frame) of one run; the task carries the plan and the simulation settings."""
+    model, run = task['model'], task['run']
+    a, x, z, q = (np.asarray(task[key], dtype=np.float64) for key in ('a', 'x', 'z', 'q'))
+    service_t = float(run['service_time_promised'])
+    seeds = np.random.SeedSequence([task['seed'], zlib.crc32(run['run_id'].encode())])
+    sizes = [task['chunk_size']] * (task['scenarios'] // task['chunk_size'])
+    if task['scenarios'] % task['chunk_size']:
+        sizes.append(task['scenarios'] % task['chunk_size'])
+    buffered = np.flatnonzero(x > 0.5)
+    root_lead, emis = [], []
+    served = late_buffers = any_stockout = 0
+    stockouts = np.zeros(model.nb_nodes)
+    lead_sum = np.zeros(model.nb_nodes)
+    start = time.perf_counter()
+    for size, seed in zip(sizes, seeds.spawn(len(sizes))):
+        chunk = simulate_chunk(model, a, x, z, q, size, np.random.default_rng(seed))
+        root_lead.append(chunk['lead'][:, 0])
+        emis.append(chunk['emis'])
+        served += int((chunk['lead'][:, 0] <= service_t + 1e-9).sum())
+        counts = chunk['stockout'].sum(axis=1)
+        late_buffers += int(counts.sum())
+        any_stockout += int((counts > 0).sum())
+        stockouts += chunk['stockout'].sum(axis=0)
+        lead_sum += chunk['lead'].sum(axis=0)
+    root_lead, emis = np.concatenate(root_lead), np.concatenate(emis)
+    scenarios = task['scenarios']
+    summary = {key: run[key] for key in RUN_COLUMNS}
+    summary.update({
+        'scenarios': scenarios,
+        'buffers': len(buffered),
+        'planned_DIO': float(a.sum()),
+        'service_level': served / scenarios,
+        'stockout_probability': any_stockout / scenarios,
+        'expected_stockouts': late_buffers / scenarios,
+        'root_lead_time_mean': float(root_lead.mean()),
+        'root_lead_time_p95': float(np.quantile(root_lead, 0.95)),
+        'root_lead_time_max': float(root_lead.max()),
+        'planned_Emis': float(model.emission_breakdown(a[None], x[None], q[None]).sum()),
+        'Emis_mean': float(emis.mean()),
+        'Emis_std': float(emis.std()),
+    })
+    for level, value in zip(EMISSION_QUANTILES, np.quantile(emis, EMISSION_QUANTILES)):
+        summary[f'Emis_p{round(level * 100):02d}'] = float(value)
+    summary['sim_time_sec'] = round(time.perf_counter() - start, 3)
+    buffers = pd.DataFrame({
+        'run_id': run['run_id'],
+        'node': buffered,
+        'a': a[buffered],
+        'buffer': model.buffer_scale[buffered] * a[buffered],
+        'stockout_probability': stockouts[buffered] / scenarios,
+        'replenishment_mean': lead_sum[buffered] / scenarios,
+    })
+    return summary, buffers
+
+
+class RobustnessSimulator:
+    """Builds one simulation task per logged run of a campaign and streams the results to disk."""
+
+    def __init__(self, campaign, data_dir: Path = DATA_DIR):
+        self.evaluator = SolutionEvaluator(campaign, data_dir)
+
+    def tasks(self, scenarios: int = DEFAULT_SCENARIOS, chunk_size: int = DEFAULT_CHUNK_SIZE, seed: int = 0,
+              run_ids=None):
+        selected = set(run_ids) if run_ids else None
+        for model, runs, a, x, z, q, _ in self.evaluator.batches():
+            for k, run in enumerate(runs.to_dict('records')):
+                if selected is not None and run['run_id'] not in selected:
+                    continue
+                run['run_id'] = str(run['run_id'])
+                yield {'model': model, 'run': run, 'a': a[k], 'x': x[k], 'z': z[k], 'q': q[k],
+                       'scenarios': int(scenarios), 'chunk_size': int(min(chunk_size, scenarios)),
+                       'seed': int(seed)}
+
+    def run(self, output: Path, buffers_output: Path = None, workers: int = 1, **settings) -> int:
+        """Simulate every task and append each finished run to the CSVs; returns the number of runs."""
+        output = Path(output)
+        for path in (output, buffers_output):
+            if path is not None and Path(path).exists():
+                Path(path).unlink()
+        tasks = list(self.tasks(**settings))
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                written = self._stream(pool.map(simulate_run, tasks), output, buffers_output)
+        else:
+            written = self._stream(map(simulate_run, tasks), output, buffers_output)
+        return written
+
+    @staticmethod
+    def _stream(results, output: Path, buffers_output: Path = None) -> int:
+        written = 0
+        for summary, buffers in results:
+            pd.DataFrame([summary]).to_csv(output, mode='a', header=written == 0, index=False)
+            if buffers_output is not None:
+                buffers.to_csv(buffers_output, mode='a', header=not Path(buffers_output).exists(), index=False)
+            written += 1
+        return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Monte Carlo robustness of stored buffer configurations')
+    parser.add_argument('campaign', help='results directory or campaign archive')
+    parser.add_argument('--scenarios', type=int, default=DEFAULT_SCENARIOS, help='scenarios per run')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help='scenarios simulated per array batch')
+    parser.add_argument('--workers', type=int, default=1, help='processes (runs are distributed)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--runs', help='comma-separated run_ids (default: every logged run)')
+    parser.add_argument('--output', default='robustness_summary.csv')
+    parser.add_argument('--buffers', default='robustness_buffers.csv', help='per-buffer stockout table')
+    args = parser.parse_args()
+
+    run_ids = [r.strip() for r in args.runs.split(',') if r.strip()] if args.runs else None
+    start = time.perf_counter()
+    count = RobustnessSimulator(args.campaign).run(Path(args.output), Path(args.buffers), args.workers,
+                                                   scenarios=args.scenarios, chunk_size=args.chunk_size,
+                                                   seed=args.seed, run_ids=run_ids)
+    if not count:
+        print("No logged run to simulate", file=sys.stderr)
+        return 1
+    print(f"Simulated {count} runs x {args.scenarios} scenarios in {time.perf_counter() - start:.1f}s")
+    print(f"Wrote {args.output} and {args.buffers}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
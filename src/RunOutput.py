@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Run output shared by the campaign tools: parsing, PHP formatting, admissibility
+
+Python ports of what the PHP runner does with one oplrun output: CplexRunner::parse
+(parse_output), KPICalculator's reading of the parsed fields (numeric, run_emissions,
+run_runtime), the print_r and fputcsv formatting of the logs and result tables
+(print_r, csv_line, php_string) and KPICalculator's comparison admissibility
+(admissible_status). The queue workers, the re-baseliner, the regression diff and
+the benchmarks all import them from here, so none of them pulls in the queue or the
+model instantiation.
+
+Requires: standard library only
+"""
+
+import csv
+import io
+import math
+import os
+import re
+import tempfile
+from pathlib import Path
+
+COMPARISON_GAP_THRESHOLD_PCT = 1.0
+# OPL writes #E through a 32-bit int, which clamps to 2^31-1 on large instances.
+EMISSIONS_CLAMP = 2147483647.0
+
+
+# ---------------------------------------------------------------- CplexRunner::parse
+
+def is_numeric(text: str) -> bool:
+    return re.fullmatch(r'\s*[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?\s*', text) is not None
+
+
+def normalize_scalar(value: str):
+    value = value.strip()
+    if value == '':
+        return ''
+    normalized = value.replace(',', '.')
+    if not is_numeric(normalized):
+        return value
+    if re.fullmatch(r'\s*[-+]?\d+\s*', normalized):
+        return int(normalized)
+    return float(normalized)
+
+
+def normalize_value(value: str):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == '[' and value[-1] == ']':
+        inner = value.strip('[]')
+        return [normalize_scalar(item) for item in inner.split(',')] if inner.strip() else []
+    return normalize_scalar(value)
+
+
+def cplex_time(trace: str) -> str:
+    """Solve time as CplexRunner::extractCplexTime reports it (-1 when absent)."""
+    lines = trace.split('\n')
+    for line in lines:
+        if 'Total (root+branch&cut)' in line:
+            return line.split('sec.')[0].strip()
+        if 'Time spent in solve' in line:
+            match = re.search(r'Time spent in solve\s*:\s*([\d,.]+)s', line)
+            if match:
+                return match.group(1).strip()
+    in_block, seconds, matched = False, 0.0, False
+    for line in lines:
+        if 'Multi-objective solve log' in line:
+            in_block = True
+            continue
+        if not in_block:
+            continue
+        match = re.match(r'^\s*\d+\s+\d+\s+\d+\s+\S+\s+\d+\s+([\d.,]+)\s+[\d.,]+\s*$', line)
+        if match:
+            seconds += float(match.group(1).replace(',', '.'))
+            matched = True
+        elif line.strip() and 'Index' not in line:
+            in_block = False
+    if matched:
+        return ('%.6f' % seconds).rstrip('0').rstrip('.')
+    return '-1'
+
+
+def termination(output: str) -> dict:
+    """status, termination_reason and mip_gap as CplexRunner::extractSolverMetadata."""
+    metadata = {'status': 'UNKNOWN', 'termination_reason': 'UNKNOWN', 'mip_gap': None}
+    gaps = re.findall(r'gap is\s*([\d,.]+)%', output, re.IGNORECASE)
+    if gaps:
+        metadata['mip_gap'] = float(gaps[-1].replace(',', '.'))
+    has_solution = bool(re.search(r'^\s*OBJECTIVE\s*:', output, re.IGNORECASE | re.MULTILINE)
+                        or re.search(r'#Result\s*<', output, re.IGNORECASE))
+    if re.search(r'Search terminated by limit|time limit (?:exceeded|reached)|time limit abort', output, re.I):
+        metadata.update(status='FEASIBLE' if has_solution else 'TIMEOUT', termination_reason='TIME_LIMIT')
+    elif re.search(r'Infeasibility|\binfeasible\b|model has no solution|\bno solution\b|integer infeasible',
+                   output, re.IGNORECASE):
+        metadata.update(status='INFEASIBLE', termination_reason='INFEASIBLE')
+    elif ((has_solution and re.search(r'Multi-objective solve log', output, re.IGNORECASE)
+           and re.search(r'^\s*\d+\s+\d+\s+\d+\s+[-+]?[\d,.]+(?:e[+\-]?\d+)?', output, re.I | re.M))
+          or re.search(r'Best objective\s*:.*\(optimal\b|integer optimal solution|optimal solution found',
+                       output, re.IGNORECASE)
+          or (has_solution and re.search(r'Total \(root\+branch&cut\)', output, re.IGNORECASE))):
+        metadata.update(status='OPTIMAL', termination_reason='OPTIMAL', mip_gap=0.0)
+    elif has_solution:
+        metadata.update(status='FEASIBLE', termination_reason='SOLUTION_RETURNED')
+    return metadata
+
+
+def parse_output(output: str) -> dict:
+    """Port of CplexRunner::parse (keys in the same order)."""
+    if not output:
+        return {}
+    normalized = output.replace('\r\n', '\n').replace('\r', '\n')
+    sections = re.split(r'^\s*xxxx\s*$', normalized, flags=re.M)
+    solution = {'CplexRunTime': cplex_time(sections[0]) + ' sec'}
+    solution.update(termination(normalized))
+    if len(sections) < 2 or not sections[1].strip():
+        return solution
+    for match in re.finditer(r'#([A-Za-z0-9_]+)\s*:?-?\s*([^#]*)', sections[1]):
+        key, raw = match.group(1).strip(), match.group(2).strip()
+        if key.lower() == 'deliver':
+            solution['DELIVER'] = [item.strip() for item in re.split(r'\n+', raw) if item.strip()]
+            continue
+        groups = re.findall(r'<([^>]+)>', raw)
+        if key == 'Result' and groups:
+            components = re.split(r'\s+', groups[-1].replace(',', '.').strip())
+            if len(components) >= 8:
+                labels = ['Objective', 'TotalCost', 'DIO', 'WIP', 'Emissions', 'RawMCost', 'InventCost', 'EmisCost']
+            elif len(components) >= 5:
+                labels = ['Objective', 'TotalCost', 'DIO', 'WIP', 'Emissions']
+            else:
+                labels = ['Objective', 'TotalCost', 'LeadTime', 'Emissions']
+            values = {label: normalize_scalar(value) for label, value in zip(labels, components)}
+            if values:
+                solution['Result'] = values
+            continue
+        solution[key] = normalize_value(raw)
+    return solution
+
+
+# ---------------------------------------------------------------- KPICalculator fields
+
+def numeric(result: dict, *keys):
+    """First numeric value among keys (dotted for nested arrays), as KPICalculator::extractNumeric."""
+    for key in keys:
+        value = result
+        for part in key.split('.'):
+            value = value.get(part) if isinstance(value, dict) else None
+        if isinstance(value, bool):
+            continue
+        if isinstance(value, (int, float)) or (isinstance(value, str) and is_numeric(value)):
+            return float(value)
+    return None
+
+
+def run_emissions(result: dict):
+    """Emissions of a parsed run (KPICalculator::extractEmissions).
+
+    #E carries full precision unless it hit EMISSIONS_CLAMP; the #Result tuple is
+    used then.
+    """
+    emis_field = numeric(result, 'E', 'Emis')
+    if emis_field is not None and abs(emis_field - EMISSIONS_CLAMP) > 0.5:
+        return emis_field
+    emissions = numeric(result, 'Result.Emissions', 'Result.Emiss', 'Result.emiss')
+    return emis_field if emissions is None else emissions
+
+
+def run_runtime(result: dict) -> float:
+    """Solve time in seconds of a parsed run; -1 when the output reports none."""
+    if 'RT' in result and numeric(result, 'RT') is not None:
+        return numeric(result, 'RT')
+    if 'CplexRunTime' in result:
+        text = str(result['CplexRunTime'])
+        match = (re.search(r'([\d,.]+)\s*sec', text) or re.search(r'CP Time\s*=\s*([\d,.]+)', text))
+        if match:
+            return float(match.group(1).replace(',', '.'))
+        if is_numeric(text.replace(',', '.')):
+            return float(text.replace(',', '.'))
+    return -1.0
+
+
+# ---------------------------------------------------------------- PHP formatting
+
+def php_string(value) -> str:
+    """PHP's string conversion of a scalar (precision 14 for floats)."""
+    if value is None or value is False:
+        return ''
+    if value is True:
+        return '1'
+    if isinstance(value, float):
+        if value != value:
+            return 'NAN'
+        if value in (float('inf'), float('-inf')):
+            return 'INF' if value > 0 else '-INF'
+        text = format(value, '.14G')
+        if 'E' in text:
+            mantissa, exponent = text.split('E')
+            sign = exponent[0] if exponent[0] == '-' else '+'
+            text = f"{mantissa if '.' in mantissa else mantissa + '.0'}E{sign}{int(exponent.lstrip('+-'))}"
+        return text
+    return str(value)
+
+
+def print_r(value, indent: int = 0) -> str:
+    """PHP print_r of a parsed result (dicts and lists are arrays)."""
+    if not isinstance(value, (dict, list)):
+        return php_string(value)
+    items = value.items() if isinstance(value, dict) else enumerate(value)
+    pad = ' ' * indent
+    lines = [f'Array\n{pad}(\n']
+    for key, item in items:
+        nested = isinstance(item, (dict, list))
+        lines.append(f"{pad}    [{key}] => {print_r(item, indent + 8)}{'' if nested else chr(10)}")
+    lines.append(f'{pad})\n')
+    return ''.join(lines) + ('\n' if indent else '')
+
+
+def csv_line(values) -> str:
+    """One CSV line with PHP's number formatting (fputcsv of the flattened KPIs)."""
+    stream = io.StringIO()
+    csv.writer(stream, lineterminator='\n').writerow([php_string(value) for value in values])
+    return stream.getvalue()
+
+
+def write_atomic(path: Path, text: str):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    # Solver output is not always valid UTF-8; its bytes are written back unchanged.
+    with os.fdopen(handle, 'w', encoding='utf-8', errors='surrogateescape', newline='\n') as stream:
+        stream.write(text)
+    os.replace(temp, path)
+
+
+# ---------------------------------------------------------------- KPICalculator admissibility
+
+def admissible_status(status, gap, gap_threshold: float = COMPARISON_GAP_THRESHOLD_PCT):
+    """KPICalculator's comparison admissibility: OPTIMAL, or FEASIBLE with a final gap (%) within the threshold.
+
+    Takes scalars (gap None when not reported) or pandas Series (NaN) alike.
+    """
+    if gap is None:
+        gap = math.nan
+    return (status == 'OPTIMAL') | ((status == 'FEASIBLE') & (gap <= gap_threshold))
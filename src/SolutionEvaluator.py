@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+Batch evaluation and carbon-price re-pricing of stored solutions
+
+For fixed decisions the cost and emission expressions of the PLM and NLM models
+are linear in the BOM and supplier columns (y = a * x, v = y * z):
+
+    Emis        = sum q*emissions + sum facility_emis*x
+                  + (inventory_emis*y + trsp_emis*(a - (1 - 1/3)*y)) * spread*rqtf*adup
+    RawMCost    = sum unit_price * sum q*price
+    InventCost  = adup * sum aih_cost*spread*unit_price*rqtf * (y + sum z*price*y)
+    WIP         = sum unit_price*rqtf*adup * (y + sum z*price*y)
+    TotalCostTS = RawMCost + InventCost + EmisTax * Emis / 1e6,   DIO = sum a
+
+with spread = (1.5 + var_factor) * lt_factor. SolutionEvaluator stacks the A, X, Z
+and Q vectors of every run of an instance into (runs x nodes [x suppliers]) arrays
+and evaluates all of them with a handful of einsums. Runs whose logs carry no Q
+(the multi-objective and topology runs) get their allocation from #DELIVER when
+every leaf is single-sourced; otherwise the sourcing terms are left NaN.
+
+evaluate writes the recomputed values next to the logged ones (#TS, #CS, #E, #DIO,
+#WIP and the rounded #Result tuple) with a check column, plus the per-node emission
+attribution (supplier, facility, inventory, transport). reprice gives the tax-model
+objective TotalCostTS + DIO of every stored solution under any list of carbon prices,
+and the best stored solution per instance, service time, supplier data and price,
+without a solve.
+
+Usage:
+    python SolutionEvaluator.py evaluate logs/final_campaign_YYYYMMDD_HHMMSS
+        [--output solution_evaluation.csv] [--breakdown emission_breakdown.csv]
+    python SolutionEvaluator.py reprice logs/final_campaign_YYYYMMDD_HHMMSS
+        --taxes 0:200:10 [--output solution_repricing.csv]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from CampaignDiff import CampaignResults
+from SupplierDominancePruner import (
+    ADUP,
+    DATA_DIR,
+    instance_files,
+    read_bom,
+    read_supplier_details,
+    read_supplier_list,
+    registry_instances,
+    run_details_file,
+)
+from TreeDPSolver import BUFF_TRSP_COEF, GRAMS_PER_TONNE, read_deliveries_text
+
+EMISSION_COMPONENTS = ('supplier', 'facility', 'inventory', 'transport')
+# OPL writes #E through a 32-bit int; large emissions clamp to this value.
+INT32_SENTINEL = 2147483647
+# Full-precision log fields (#TS is printed with 4 decimals) and the #Result tuple,
+# which OPL rounds to ~5 significant figures.
+EXACT_TOLERANCE = (1e-6, 1e-3)
+RESULT_TOLERANCE = (1e-4, 1.0)
+EXACT_FIELDS = {'TS': 'TotalCostTS', 'CS': 'TotalCostCS', 'E': 'Emis', 'DIO': 'DIO', 'WIP': 'WIP',
+                'RawMCost': 'RawMCost', 'InventCost': 'InventCost'}
+# #Result labels (see CplexRunner::parseOutput) per tuple layout.
+RESULT_FIELDS_TAX = {'Objective': 'objective', 'TotalCost': 'TotalCostTS', 'LeadTime': 'DIO',
+                     'Emissions': 'Emis'}
+RESULT_FIELDS_MULTIOBJ = {'TotalCost': 'TotalCostCS', 'DIO': 'DIO', 'WIP': 'WIP', 'Emissions': 'Emis',
+                          'RawMCost': 'RawMCost', 'InventCost': 'InventCost', 'EmisCost': 'EmisCost'}
+
+
+class InstanceCoefficients:
+    """Per-node and per-supplier coefficient arrays of one instance as the models read it."""
+
+    def __init__(self, bom: pd.DataFrame, eligibility: dict, details: pd.DataFrame, nb_supp: int):
+        bom = bom.sort_values('ind').reset_index(drop=True)
+        self.nb_nodes = len(bom)
+        self.nb_supp = nb_supp
+        self.supp_details_file = None
+        column = {name: bom[name].to_numpy(dtype=np.float64) for name in
+                  ('unit_price', 'rqtf', 'aih_cost', 'var_factor', 'lt_factor', 'facility_emis',
+                   'inventory_emis', 'trsp_emis')}
+        scale = (1.5 + column['var_factor']) * column['lt_factor'] * column['rqtf'] * ADUP
+        self.facility = column['facility_emis']
+        self.inventory = column['inventory_emis'] * scale
+        self.transport_a = column['trsp_emis'] * scale
+        self.transport_y = (1.0 / BUFF_TRSP_COEF - 1.0) * column['trsp_emis'] * scale
+        self.holding = scale * column['aih_cost'] * column['unit_price']
+        self.wip = column['unit_price'] * column['rqtf'] * ADUP
+        self.unit_price = column['unit_price']
+        # Lead-time structure and buffer sizing (RobustnessSimulator, BufferZoneSizer).
+        self.t_process = bom['t_process'].to_numpy(dtype=np.float64)
+        self.parent = bom['parent'].to_numpy(dtype=np.int64)
+        self.var_factor = column['var_factor']
+        self.lt_factor = column['lt_factor']
+        self.order_cycle = bom['cycle'].to_numpy(dtype=np.float64)
+        self.min_order = bom['minOrder'].to_numpy(dtype=np.float64)
+        self.daily_usage = column['rqtf'] * ADUP
+        self.buffer_scale = scale
+        # The model reads the first NB_SUPP detail rows into sup[id][*].
+        suppliers = details.iloc[:nb_supp].set_index('id_supp', drop=False).reindex(range(1, nb_supp + 1))
+        self.price = suppliers['price'].to_numpy(dtype=np.float64)
+        self.emissions = suppliers['emissions'].to_numpy(dtype=np.float64)
+        self.delay = suppliers['delay'].to_numpy(dtype=np.float64)
+        self.capacity = suppliers['capacity'].to_numpy(dtype=np.float64)
+        self.reliability = suppliers.get('reliability', pd.Series(1.0, suppliers.index)).to_numpy(dtype=np.float64)
+        self.lead_time_variance = suppliers.get('lead_time_variance',
+                                                pd.Series(0.0, suppliers.index)).to_numpy(dtype=np.float64)
+        parents = set(bom['parent'].astype(int))
+        self.demand = np.where(~bom['ind'].astype(int).isin(parents), ADUP * column['rqtf'], 0.0)
+        self.su = np.zeros((self.nb_nodes, nb_supp), dtype=bool)
+        for node, listed in eligibility.items():
+            ids = [k for k in listed if 0 < k <= nb_supp]
+            if 0 <= node < self.nb_nodes and ids:
+                self.su[node, np.asarray(ids) - 1] = True
+
+    @classmethod
+    def from_instance(cls, instance: dict, nb_supp: int, supp_details_file: str = None,
+                      data_dir: Path = DATA_DIR):
+        bom_file, supp_list_file, default_details = instance_files(instance)
+        supp_details_file = supp_details_file or default_details
+        _, _, _, eligibility = read_supplier_list(data_dir / supp_list_file)
+        details = read_supplier_details(data_dir / supp_details_file)
+        coefficients = cls(read_bom(data_dir / bom_file), eligibility, details.reset_index(drop=True), nb_supp)
+        coefficients.supp_details_file = supp_details_file
+        return coefficients
+
+    def emission_breakdown(self, a, x, q) -> np.ndarray:
+        """(runs, nodes, components) emissions in gCO2, components as EMISSION_COMPONENTS."""
+        y = a * x
+        return np.stack([
+            np.einsum('rns,s->rn', q, self.emissions),
+            self.facility * x,
+            self.inventory * y,
+            self.transport_a * a + self.transport_y * y,
+        ], axis=-1)
+
+    def evaluate(self, a, x, z, q, tax) -> dict:
+        """Model expressions of a batch: a, x (runs, nodes), z, q (runs, nodes, suppliers), tax (runs,)."""
+        a, x, z, q = (np.asarray(v, dtype=np.float64) for v in (a, x, z, q))
+        y = a * x
+        z = z * self.su
+        priced_y = y * (1.0 + np.einsum('rns,s->rn', z, self.price))
+        emis = self.emission_breakdown(a, x, q).sum(axis=(1, 2))
+        raw = np.einsum('rns,s,n->r', q, self.price, self.unit_price)
+        invent = priced_y @ self.holding
+        emis_cost = np.asarray(tax, dtype=np.float64) * emis / GRAMS_PER_TONNE
+        return {
+            'TotalCostTS': raw + invent + emis_cost,
+            'TotalCostCS': raw + invent,
+            'RawMCost': raw,
+            'InventCost': invent,
+            'EmisCost': emis_cost,
+            'Emis': emis,
+            'DIO': a.sum(axis=1),
+            'WIP': priced_y @ self.wip,
+            'buffer_count': x.sum(axis=1),
+            'suppliers_used': (z.sum(axis=1) > 0).sum(axis=1).astype(np.float64),
+        }
+
+    def allocation_from_deliveries(self, deliveries: dict):
+        """(z, q) for #DELIVER lines; q is NaN at multi-sourced leaves (the split is not logged)."""
+        z = np.zeros((self.nb_nodes, self.nb_supp))
+        q = np.zeros((self.nb_nodes, self.nb_supp))
+        for node, ids in deliveries.items():
+            ids = [k for k in ids if 0 < k <= self.nb_supp]
+            if not 0 <= node < self.nb_nodes or not ids:
+                continue
+            z[node, np.asarray(ids) - 1] = 1.0
+            q[node] = np.nan if len(ids) > 1 else q[node]
+            if len(ids) == 1:
+                q[node, ids[0] - 1] = self.demand[node]
+        return z, q
+
+
+def logged_values(text: str) -> tuple:
+    """Full-precision scalar fields and the #Result tuple of a run log."""
+    exact = {}
+    for key, value in re.findall(r'^    \[(\w+)\] => ([^\n]*)$', text, re.M):
+        if key in EXACT_FIELDS:
+            exact[key] = pd.to_numeric(value.strip().replace(',', '.'), errors='coerce')
+    result = {}
+    block = re.search(r'^    \[Result\] => Array\s*\(\n(.*?)^\s*\)', text, re.M | re.S)
+    if block:
+        for key, value in re.findall(r'^\s+\[(\w+)\] => ([^\n]*)$', block.group(1), re.M):
+            result[key] = pd.to_numeric(value.strip().replace(',', '.'), errors='coerce')
+    return exact, result
+
+
+def compare(recomputed: dict, logged: dict, fields: dict, tolerance: tuple) -> list:
+    rel, abs_tol = tolerance
+    mismatched = []
+    for log_key, key in fields.items():
+        expected, actual = logged.get(log_key), recomputed.get(key)
+        if expected is None or actual is None or pd.isna(expected) or pd.isna(actual):
+            continue
+        if log_key in ('E', 'Emissions') and expected == INT32_SENTINEL:
+            continue
+        if abs(actual - expected) > abs_tol + rel * abs(expected):
+            mismatched.append(key)
+    return mismatched
+
+
+class SolutionEvaluator:
+    """Stacks the stored decisions of a campaign per instance and evaluates them in batch."""
+
+    def __init__(self, campaign, data_dir: Path = DATA_DIR):
+        self.campaign = CampaignResults(campaign)
+        self.data_dir = Path(data_dir)
+        if self.campaign.archive:
+            frame = self.campaign.archive.read_csv('consolidated_results.csv')
+        else:
+            frame = pd.read_csv(self.campaign.path / 'consolidated_results.csv')
+        self.runs = frame.drop_duplicates('run_id', keep='last').reset_index(drop=True)
+        self.runs['run_id'] = self.runs['run_id'].astype(str)
+        self._instances = registry_instances()
+        self._coefficients = {}
+
+    def coefficients(self, run) -> InstanceCoefficients:
+        details = run_details_file(run['experiment'], self._instances[run['instance_id']])
+        key = (run['instance_id'], int(run['suppliers_available']), details)
+        if key not in self._coefficients:
+            self._coefficients[key] = InstanceCoefficients.from_instance(
+                self._instances[run['instance_id']], key[1], details, self.data_dir)
+        return self._coefficients[key]
+
+    def batches(self):
+        """(coefficients, runs frame, a, x, z, q, logged) per instance configuration."""
+        logged_runs = self.campaign.logged_runs()
+        runs = self.runs[self.runs['instance_id'].isin(self._instances.keys())
+                         & self.runs['run_id'].isin(logged_runs)
+                         & pd.to_numeric(self.runs['suppliers_available'], errors='coerce').notna()]
+        groups = {}
+        for _, run in runs.iterrows():
+            coefficients = self.coefficients(run)
+            text = self.campaign.log_text(run['run_id'])
+            vectors = self.campaign.decisions(run['run_id'])
+            n, s = coefficients.nb_nodes, coefficients.nb_supp
+            if len(vectors.get('A', ())) != n or len(vectors.get('X', ())) != n:
+                continue
+            if len(vectors.get('Z', ())) == n * s and len(vectors.get('Q', ())) == n * s:
+                z, q = vectors['Z'].reshape(n, s), vectors['Q'].reshape(n, s)
+            else:
+                z, q = coefficients.allocation_from_deliveries(read_deliveries_text(text))
+            entry = groups.setdefault(id(coefficients), (coefficients, [], []))
+            entry[1].append(run)
+            entry[2].append((vectors['A'], vectors['X'], z, q, logged_values(text)))
+        for coefficients, rows, decisions in groups.values():
+            a, x, z, q, logged = zip(*decisions)
+            yield coefficients, pd.DataFrame(rows), np.stack(a), np.stack(x), np.stack(z), np.stack(q), logged
+
+    def evaluate(self, breakdown: bool = False):
+        """Recomputed and logged values per run (and the per-node emission breakdown)."""
+        frames, breakdowns = [], []
+        for coefficients, runs, a, x, z, q, logged in self.batches():
+            tax = pd.to_numeric(runs['tax_rate'], errors='coerce').fillna(0.0).to_numpy()
+            tax = np.where(runs['strategy'].to_numpy() == 'EMISCAP', 0.0, tax)
+            values = coefficients.evaluate(a, x, z, q, tax)
+            frame = runs[['run_id', 'experiment', 'instance_id', 'strategy', 'model_type',
+                          'service_time_promised', 'suppliers_available']].reset_index(drop=True)
+            frame['supp_details_file'] = coefficients.supp_details_file
+            frame['tax_rate'] = tax
+            for key, column in values.items():
+                frame[key] = column
+            # The cap model minimises TotalCostCS + dlts, the tax and hybrid models TotalCostTS + dlts.
+            frame['objective'] = np.where(frame['strategy'] == 'EMISCAP', frame['TotalCostCS'],
+                                          frame['TotalCostTS']) + frame['DIO']
+            frame['allocation'] = np.where(np.isnan(q).any(axis=(1, 2)), 'MULTI_SOURCED_UNLOGGED', 'LOGGED')
+            checks = []
+            for i, (exact, result) in enumerate(logged):
+                recomputed = frame.iloc[i].to_dict()
+                fields = RESULT_FIELDS_MULTIOBJ if 'WIP' in result or 'DIO' in result else RESULT_FIELDS_TAX
+                if frame.at[i, 'strategy'] not in ('EMISTAXE', 'EMISCAP', 'EMISHYBRID'):
+                    fields = {k: v for k, v in fields.items() if k != 'Objective'}
+                for key, value in exact.items():
+                    frame.at[i, 'logged_' + EXACT_FIELDS[key]] = value
+                for key, value in result.items():
+                    frame.at[i, 'result_' + key] = value
+                mismatched = (compare(recomputed, exact, EXACT_FIELDS, EXACT_TOLERANCE)
+                              + compare(recomputed, result, fields, RESULT_TOLERANCE))
+                if mismatched:
+                    checks.append('MISMATCH:' + '|'.join(dict.fromkeys(mismatched)))
+                elif not exact and not result:
+                    checks.append('NOT_LOGGED')
+                else:
+                    checks.append('MATCH')
+            frame['check'] = checks
+            frames.append(frame)
+            if breakdown:
+                parts = coefficients.emission_breakdown(a.astype(float), x.astype(float), q)
+                runs_idx, nodes = np.indices(parts.shape[:2])
+                table = pd.DataFrame({'run_id': frame['run_id'].to_numpy()[runs_idx.ravel()],
+                                      'node': nodes.ravel()})
+                for k, name in enumerate(EMISSION_COMPONENTS):
+                    table[name] = parts[..., k].ravel()
+                table['total'] = parts.sum(axis=-1).ravel()
+                breakdowns.append(table)
+        result = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=['run_id'])
+        result = result.sort_values('run_id', kind='stable').reset_index(drop=True)
+        if not breakdown:
+            return result
+        parts = pd.concat(breakdowns, ignore_index=True) if breakdowns else pd.DataFrame()
+        return result, parts
+
+    def reprice(self, taxes) -> pd.DataFrame:
+        """Tax-model objective TotalCostTS + DIO of every stored solution at every carbon price."""
+        taxes = np.asarray(taxes, dtype=np.float64)
+        evaluated = self.evaluate()
+        evaluated = evaluated[evaluated[['TotalCostCS', 'Emis']].notna().all(axis=1)]
+        group = ['instance_id', 'service_time_promised', 'suppliers_available', 'supp_details_file']
+        cost = (evaluated['TotalCostCS'].to_numpy()[:, None]
+                + np.outer(evaluated['Emis'].to_numpy(), taxes) / GRAMS_PER_TONNE
+                + evaluated['DIO'].to_numpy()[:, None])
+        frame = pd.DataFrame({
+            'run_id': np.repeat(evaluated['run_id'].to_numpy(), len(taxes)),
+            **{key: np.repeat(evaluated[key].to_numpy(), len(taxes)) for key in group},
+            'tax': np.tile(taxes, len(evaluated)),
+            'TotalCostCS': np.repeat(evaluated['TotalCostCS'].to_numpy(), len(taxes)),
+            'Emis': np.repeat(evaluated['Emis'].to_numpy(), len(taxes)),
+            'objective': cost.ravel(),
+        })
+        # Stored solutions are only comparable under the same service time and supplier data.
+        best = frame.groupby([*group, 'tax'])['objective'].transform('min')
+        frame['best_stored'] = frame['objective'] <= best + 1e-9
+        return frame
+
+
+def parse_taxes(spec: str) -> np.ndarray:
+    """'0,25,50' or 'start:stop:step' (stop included)."""
+    if ':' in spec:
+        start, stop, step = (float(v) for v in spec.split(':'))
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(v) for v in spec.split(',') if v.strip()])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Batch evaluation and re-pricing of stored solutions')
+    sub = parser.add_subparsers(dest='command', required=True)
+    evaluate = sub.add_parser('evaluate', help='recompute and cross-check every logged solution')
+    evaluate.add_argument('campaign', help='results directory or campaign archive')
+    evaluate.add_argument('--output', default='solution_evaluation.csv')
+    evaluate.add_argument('--breakdown', help='also write the per-node emission attribution here')
+    reprice = sub.add_parser('reprice', help='objective of every stored solution under other carbon prices')
+    reprice.add_argument('campaign', help='results directory or campaign archive')
+    reprice.add_argument('--taxes', required=True, help="'0,25,50' or 'start:stop:step' (currency/tCO2)")
+    reprice.add_argument('--output', default='solution_repricing.csv')
+    args = parser.parse_args()
+
+    evaluator = SolutionEvaluator(args.campaign)
+    if args.command == 'evaluate':
+        if args.breakdown:
+            table, parts = evaluator.evaluate(breakdown=True)
+            parts.to_csv(args.breakdown, index=False)
+            print(f"Wrote {args.breakdown}")
+        else:
+            table = evaluator.evaluate()
+        table.to_csv(args.output, index=False)
+        counts = table['check'].str.split(':').str[0].value_counts().to_dict() if len(table) else {}
+        print(f"Evaluated {len(table)} runs: " + ', '.join(f'{k}={v}' for k, v in sorted(counts.items())))
+        print(f"Wrote {args.output}")
+        return 1 if any(k == 'MISMATCH' for k in counts) else 0
+
+    table = evaluator.reprice(parse_taxes(args.taxes))
+    table.to_csv(args.output, index=False)
+    print(f"Re-priced {table['run_id'].nunique()} solutions at {table['tax'].nunique()} carbon prices")
+    print(f"Wrote {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,480 @@
+#!/usr/bin/env python3
+"""
+Longitudinal solver benchmark: repeated trials, append-only history, significance tests
+
+ScalabilityBenchmark.php, PLMValidationBenchmark.php and StructuralBaselineBenchmark.php
+solve every instance once and write a report, so a model change cannot be told apart
+from timing noise. This harness runs the fixed instance set of
+config/benchmark_suite.json (versioned in its metadata) for every strategy of the
+suite, several trials each, and appends one record per solve to an append-only JSON
+lines history (logs/benchmark_history.jsonl). Every record carries:
+
+- the batch (one `run` invocation), an optional label (e.g. the git revision) and the
+  suite version;
+- the SHA-256 of the model file, a key of the settings (suite version, time limit,
+  suppliers, service time, target gap, strategy substitutions) and the SHA-256 of the
+  instance files, so a history point is identified by what was solved and how;
+- the solver status, the solve time (Total (root+branch&cut), else the oplrun wall
+  time), the time to reach the target gap and the number of nodes.
+
+The time to gap is read from the CPLEX node log: the first node line at or below
+target_gap_pct is dated by the next clock of the log ("Elapsed time = ...", or the
+final total), an upper bound at the log's resolution. A solve proven optimal without
+such a line reached the gap within its solve time; a solve that never reaches it has
+an infinite time to gap. Nodes is the last Node column of the log (0 when solved at
+the root) or CP Optimizer's number of branches.
+
+Trials are interleaved (trial 1 of every cell, then trial 2, ...) and run one at a
+time, so drift and machine load spread over all cells instead of biasing one, and
+solves do not compete for cores.
+
+`report` gives, per history point and cell, the median and interquartile range of the
+three metrics. `compare` tests every cell and metric between two points with a
+two-sided Mann-Whitney U test (exact without ties, normal approximation with tie
+correction otherwise), adjusts the p-values of each metric over the cells with Holm's
+method, and flags a change when the adjusted p-value is below --alpha and the medians
+differ by at least --min-effect. With the default 7 trials a cell whose trials do not
+overlap has p = 2/3432, still 0.011 after the adjustment over the 18 cells of the
+suite; with 5 trials no cell could pass 0.05. The exit code is 1 when a metric of
+--fail-on regressed, as in CampaignDiff.
+
+A point is a batch id, a label (all batches with that label are pooled), `latest` or
+`previous`. FakeOplrun.py stands in for oplrun offline; the model file of every solve
+ends in -T<trial>, from which a seeded profile draws, so its draws repeat across
+batches. An oplrun still running OPLRUN_TIMEOUT_MARGIN seconds past the time limit
+is killed and the trial recorded as TIMEOUT.
+
+Usage:
+    python SolverBenchmark.py run --oplrun PATH [--label REV] [--trials 7] [--models-dir models]
+        [--instances bom_5 bom_13] [--strategies EMISTAXE] [--suite config/benchmark_suite.json]
+    python SolverBenchmark.py report [--points latest] [--csv benchmark_report.csv]
+    python SolverBenchmark.py compare [previous latest] [--alpha 0.05] [--min-effect 0.1]
+        [--fail-on runtime_sec,time_to_gap_sec] [--csv benchmark_compare.csv]
+
+All subcommands take --history (default logs/benchmark_history.jsonl).
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from InstanceCatalog import file_sha256
+from ModelInstantiator import OPLRUN_TIMEOUT_MARGIN, insert_time_limit
+from RunOutput import parse_output
+from SupplierDominancePruner import DATA_DIR, MODELS_DIR, REPO_DIR, instance_files, registry_instances
+
+SUITE_FILE = REPO_DIR / 'config' / 'benchmark_suite.json'
+HISTORY_FILE = REPO_DIR / 'logs' / 'benchmark_history.jsonl'
+METRICS = ('runtime_sec', 'time_to_gap_sec', 'nodes')
+DEFAULT_FAIL_ON = ('runtime_sec', 'time_to_gap_sec')
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_EFFECT = 0.10
+EXACT_MAX_TRIALS = 25
+IDENTITY_COLUMNS = ('suite_version', 'model_sha256', 'settings_key', 'data_sha256', 'solver_version')
+NODE_LINE = re.compile(r'^\*?\s*(\d+)\+?\s+(\d+)\+?\s+.*?(?:\s([\d.,]+)%)?\s*$')
+CLOCK = re.compile(r'(?:Elapsed time|Total \(root\+branch&cut\))\s*=\s*([\d.,]+)\s*sec')
+NODE_LOG_END = ('Root node processing', 'cuts applied', 'Total (root+branch&cut)', 'Solution pool')
+
+
+# ---------------------------------------------------------------- solve logs
+
+def log_float(text: str) -> float:
+    return float(text.replace(',', '.'))
+
+
+def solve_profile(output: str, target_gap: float) -> dict:
+    """runtime_sec, time_to_gap_sec, nodes and final_gap_pct read from an oplrun log.
+
+    Missing values are None; time_to_gap_sec is inf when the gap was never reached
+    and is completed by the caller for solves proven optimal.
+    """
+    lines = output.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+    clocks = [(i, log_float(m.group(1))) for i, line in enumerate(lines) for m in [CLOCK.search(line)] if m]
+    totals = [seconds for i, seconds in clocks if 'Total (root' in lines[i]]
+    runtime = totals[-1] if totals else None
+    if runtime is None:
+        match = re.search(r'Time spent in solve\s*:\s*([\d.,]+)\s*s', output)
+        runtime = log_float(match.group(1)) if match else None
+
+    nodes, final_gap, reached_at, in_log = None, None, None, False
+    for i, line in enumerate(lines):
+        if 'Node  Left' in line:
+            in_log = True
+            continue
+        if not in_log:
+            continue
+        if any(marker in line for marker in NODE_LOG_END):
+            in_log = False
+            continue
+        match = NODE_LINE.match(line)
+        if not match:
+            continue
+        nodes = int(match.group(1))
+        if match.group(3) is not None:
+            final_gap = log_float(match.group(3))
+            if reached_at is None and final_gap <= target_gap:
+                reached_at = i
+    if nodes is None:
+        match = re.search(r'Number of branches\s*:\s*([\d,]+)', output)
+        nodes = int(match.group(1).replace(',', '')) if match else None
+
+    time_to_gap = float('inf')
+    if reached_at is not None:
+        later = [seconds for i, seconds in clocks if i > reached_at]
+        time_to_gap = later[0] if later else runtime
+    return {'runtime_sec': runtime, 'time_to_gap_sec': time_to_gap, 'nodes': nodes, 'final_gap_pct': final_gap}
+
+
+# ---------------------------------------------------------------- statistics
+
+def _u_counts(n1: int, n2: int) -> np.ndarray:
+    """Number of orderings of n1 + n2 distinct values giving U = 0..n1*n2."""
+    # counts[m] is the distribution for (m, n) while n grows from 0 to n2.
+    counts = [np.ones(1, dtype=float) for _ in range(n1 + 1)]
+    for n in range(1, n2 + 1):
+        updated = [np.ones(1, dtype=float)]
+        for m in range(1, n1 + 1):
+            row = np.zeros(m * n + 1)
+            row[n:n + len(updated[m - 1])] += updated[m - 1]
+            row[:len(counts[m])] += counts[m]
+            updated.append(row)
+        counts = updated
+    return counts[n1]
+
+
+def mann_whitney(a, b) -> tuple:
+    """(U of a, two-sided p-value) of the Mann-Whitney U test."""
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    n1, n2 = len(a), len(b)
+    if n1 == 0 or n2 == 0:
+        return float('nan'), float('nan')
+    ranks = pd.Series(np.concatenate([a, b])).rank().to_numpy()
+    u = ranks[:n1].sum() - n1 * (n1 + 1) / 2
+    tied = pd.Series(ranks).value_counts()
+    tied = tied[tied > 1].to_numpy(dtype=float)
+    if not len(tied) and max(n1, n2) <= EXACT_MAX_TRIALS:
+        counts = _u_counts(n1, n2)
+        low = int(round(min(u, n1 * n2 - u)))
+        return u, min(1.0, 2 * counts[:low + 1].sum() / counts.sum())
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - (tied ** 3 - tied).sum() / (n * (n - 1)))
+    if variance <= 0:
+        return u, 1.0
+    z = (abs(u - n1 * n2 / 2) - 0.5) / np.sqrt(variance)
+    return u, min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
+
+def holm(p_values) -> np.ndarray:
+    """Holm-adjusted p-values (NaN stays NaN and does not count)."""
+    p = np.asarray(p_values, dtype=float)
+    adjusted = np.full(len(p), np.nan)
+    valid = np.flatnonzero(~np.isnan(p))
+    order = valid[np.argsort(p[valid], kind='stable')]
+    m = len(order)
+    running = 0.0
+    for rank, index in enumerate(order):
+        running = max(running, min(1.0, (m - rank) * p[index]))
+        adjusted[index] = running
+    return adjusted
+
+
+# ---------------------------------------------------------------- suite and runs
+
+class BenchmarkSuite:
+    """The fixed instance set, strategies and settings of config/benchmark_suite.json."""
+
+    def __init__(self, path: Path = SUITE_FILE, data_dir: Path = DATA_DIR):
+        self.path = Path(path)
+        config = json.loads(self.path.read_text(encoding='utf-8'))
+        self.name = config['metadata']['name']
+        self.version = str(config['metadata']['version'])
+        self.settings = config['settings']
+        self.strategies = config['strategies']
+        self.instance_values = config.get('instance_values', {})
+        self.data_dir = Path(data_dir)
+        registry = registry_instances()
+        missing = [instance_id for instance_id in config['instances'] if instance_id not in registry]
+        if missing:
+            raise KeyError(f"{self.path.name}: instances not in the registry: {', '.join(missing)}")
+        self.instances = {instance_id: registry[instance_id] for instance_id in config['instances']}
+
+    def substitutions(self, instance_id: str, strategy: str) -> dict:
+        """Strategy placeholders with the per-instance values (e.g. cap_85) resolved."""
+        values = {}
+        for placeholder, value in self.strategies[strategy]['substitutions'].items():
+            if isinstance(value, str):
+                value = self.instance_values[value][instance_id]
+            values[placeholder] = value
+        return values
+
+    def cells(self, instance_ids=None, strategies=None) -> list:
+        cells = []
+        for instance_id in instance_ids or self.instances:
+            if instance_id not in self.instances:
+                raise KeyError(f"{instance_id} is not in suite {self.name} {self.version}")
+            for strategy in strategies or self.strategies:
+                files = instance_files(self.instances[instance_id])
+                digest = hashlib.sha256(''.join(file_sha256(self.data_dir / f) for f in files).encode('ascii'))
+                substitutions = self.substitutions(instance_id, strategy)
+                settings = {'suite_version': self.version, 'substitutions': substitutions,
+                            **{key: self.settings[key] for key in
+                               ('time_limit_sec', 'nb_supp', 'service_t', 'target_gap_pct')}}
+                cells.append({
+                    'instance_id': instance_id,
+                    'strategy': strategy,
+                    'model_file': self.strategies[strategy]['model'],
+                    'files': files,
+                    'substitutions': substitutions,
+                    'data_sha256': digest.hexdigest(),
+                    'settings_key': hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()[:16],
+                })
+        return cells
+
+
+class SolverBenchmark:
+    """Runs the trials of a suite through oplrun and appends them to the history."""
+
+    def __init__(self, oplrun: str, suite: BenchmarkSuite, history: Path = HISTORY_FILE,
+                 models_dir: Path = MODELS_DIR, work_dir: Path = None):
+        self.oplrun = oplrun
+        self.suite = suite
+        self.history = Path(history)
+        self.models_dir = Path(models_dir)
+        self.work_dir = Path(work_dir) if work_dir else Path(tempfile.gettempdir()) / 'phpauto_benchmark'
+
+    def model_text(self, model_file: str) -> tuple:
+        """(SHA-256 of the model file, text with the time limit inserted)."""
+        path = self.models_dir / model_file
+        text = path.read_text(encoding='utf-8')
+        limited = insert_time_limit(text, 'using CP;' in text, str(int(self.suite.settings['time_limit_sec'])))
+        return file_sha256(path), limited
+
+    def solve(self, cell: dict, model: str, prefix: str) -> dict:
+        settings = self.suite.settings
+        substitutions = dict(cell['substitutions'],
+                             _NODE_FILE_=(self.suite.data_dir / cell['files'][0]).resolve().as_posix(),
+                             _NODE_SUPP_FILE_=(self.suite.data_dir / cell['files'][1]).resolve().as_posix(),
+                             _SUPP_DETAILS_FILE_=(self.suite.data_dir / cell['files'][2]).resolve().as_posix(),
+                             _NBSUPP_=settings['nb_supp'], _SERVICE_T_=settings['service_t'])
+        for key, value in substitutions.items():
+            model = model.replace(key, str(value))
+        prepared = self.work_dir / f"{prefix}_{cell['model_file']}"
+        prepared.write_text(model, encoding='utf-8')
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            output = subprocess.run([self.oplrun, str(prepared)], capture_output=True, text=True,
+                                    timeout=float(settings['time_limit_sec']) + OPLRUN_TIMEOUT_MARGIN).stdout
+        except subprocess.TimeoutExpired:
+            output, timed_out = '', True
+        finally:
+            prepared.unlink()
+        wall = time.perf_counter() - start
+
+        result = parse_output(output)
+        profile = solve_profile(output, float(settings['target_gap_pct']))
+        status = 'TIMEOUT' if timed_out else result.get('status', 'ERROR')
+        if profile['runtime_sec'] is None:
+            profile['runtime_sec'] = wall
+        if status == 'OPTIMAL' and profile['time_to_gap_sec'] == float('inf'):
+            profile['time_to_gap_sec'] = profile['runtime_sec']
+        if status not in ('OPTIMAL', 'FEASIBLE'):
+            profile['time_to_gap_sec'] = float('inf')
+        version = re.search(r'Version identifier:\s*(\S+)', output)
+        return dict(profile, status=status, mip_gap=result.get('mip_gap'), wall_sec=wall,
+                    objective=(result.get('Result') or {}).get('Objective'),
+                    solver_version=version.group(1) if version else None)
+
+    def run(self, trials: int = None, label: str = None, instance_ids=None, strategies=None) -> str:
+        """Solves every cell `trials` times, interleaved, and returns the batch id."""
+        trials = trials or int(self.suite.settings['trials'])
+        batch = f"{time.strftime('%Y%m%d_%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        cells = self.suite.cells(instance_ids, strategies)
+        models = {cell['model_file']: self.model_text(cell['model_file']) for cell in cells}
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        self.history.parent.mkdir(parents=True, exist_ok=True)
+        host = socket.gethostname()
+        for trial in range(1, trials + 1):
+            for cell in cells:
+                model_sha, model = models[cell['model_file']]
+                result = self.solve(cell, model, f"BENCH-{batch}-{cell['instance_id']}-{cell['strategy']}-T{trial}")
+                record = {
+                    'batch': batch, 'label': label, 'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'host': host, 'suite': self.suite.name, 'suite_version': self.suite.version,
+                    'instance_id': cell['instance_id'], 'strategy': cell['strategy'], 'trial': trial,
+                    'model_file': cell['model_file'], 'model_sha256': model_sha,
+                    'settings_key': cell['settings_key'], 'data_sha256': cell['data_sha256'],
+                    'key': f"{model_sha[:16]}-{cell['settings_key']}", **result,
+                }
+                # One line per solve, appended and flushed: an interrupted batch keeps its trials.
+                with open(self.history, 'a', encoding='utf-8') as stream:
+                    stream.write(json.dumps(record) + '\n')
+                print(f"  {cell['instance_id']} {cell['strategy']} trial {trial}/{trials}: {result['status']} "
+                      f"{result['runtime_sec']:.2f}s")
+        return batch
+
+
+# ---------------------------------------------------------------- history
+
+def read_history(path: Path = HISTORY_FILE) -> pd.DataFrame:
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"no benchmark history at {path}")
+    # json (not pandas.read_json) reads back the Infinity of unreached gaps.
+    records = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines() if line.strip()]
+    frame = pd.DataFrame(records)
+    for metric in METRICS:
+        frame[metric] = pd.to_numeric(frame[metric], errors='coerce')
+    return frame
+
+
+def batches(history: pd.DataFrame) -> list:
+    """Batch ids in the order they were appended."""
+    return list(dict.fromkeys(history['batch']))
+
+
+def select_point(history: pd.DataFrame, point: str) -> pd.DataFrame:
+    """Records of a batch id, a label (pooled), `latest` or `previous`."""
+    order = batches(history)
+    if point in ('latest', 'previous'):
+        position = -1 if point == 'latest' else -2
+        if len(order) < -position:
+            raise ValueError(f"the history has {len(order)} batch(es), no {point} one")
+        return history[history['batch'] == order[position]]
+    selected = history[(history['batch'] == point) | (history['label'] == point)]
+    if selected.empty:
+        raise ValueError(f"no batch or label {point!r} in the history")
+    return selected
+
+
+def quartiles(values: pd.Series) -> tuple:
+    values = values.dropna().to_numpy(dtype=float)
+    if not len(values):
+        return (np.nan,) * 3
+    with np.errstate(invalid='ignore'):  # unreached gaps are inf
+        return tuple(np.quantile(values, [0.25, 0.5, 0.75]))
+
+
+def summarise(records: pd.DataFrame, point: str) -> pd.DataFrame:
+    """Median and interquartile range of the METRICS per cell of one point."""
+    rows = []
+    for (instance_id, strategy), cell in records.groupby(['instance_id', 'strategy'], sort=False):
+        row = {'point': point, 'instance_id': instance_id, 'strategy': strategy, 'trials': len(cell),
+               'solved': int(cell['status'].isin(['OPTIMAL', 'FEASIBLE']).sum()),
+               'gap_reached': int(np.isfinite(cell['time_to_gap_sec']).sum())}
+        for metric in METRICS:
+            q25, median, q75 = quartiles(cell[metric])
+            with np.errstate(invalid='ignore'):
+                row.update({f'{metric}_median': median, f'{metric}_iqr': q75 - q25})
+        row['keys'] = ','.join(dict.fromkeys(cell['key']))
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def compare_points(history: pd.DataFrame, baseline: str, candidate: str, alpha: float = DEFAULT_ALPHA,
+                   min_effect: float = DEFAULT_MIN_EFFECT) -> pd.DataFrame:
+    """Per cell and metric: medians, relative change, p-values and a verdict."""
+    a, b = select_point(history, baseline), select_point(history, candidate)
+    rows = []
+    for (instance_id, strategy), cell_b in b.groupby(['instance_id', 'strategy'], sort=False):
+        cell_a = a[(a['instance_id'] == instance_id) & (a['strategy'] == strategy)]
+        if cell_a.empty:
+            continue
+        changed = [column.replace('_sha256', '').replace('_key', '') for column in IDENTITY_COLUMNS
+                   if set(cell_a[column].dropna()) != set(cell_b[column].dropna())]
+        for metric in METRICS:
+            values_a, values_b = cell_a[metric].dropna(), cell_b[metric].dropna()
+            median_a = float(np.median(values_a)) if len(values_a) else np.nan
+            median_b = float(np.median(values_b)) if len(values_b) else np.nan
+            with np.errstate(divide='ignore', invalid='ignore'):
+                change = median_b / median_a - 1 if np.isfinite(median_a) and median_a > 0 else np.nan
+            p = mann_whitney(values_a, values_b)[1] if len(values_a) > 1 and len(values_b) > 1 else np.nan
+            rows.append({'instance_id': instance_id, 'strategy': strategy, 'metric': metric,
+                         'n_baseline': len(values_a), 'n_candidate': len(values_b),
+                         'median_baseline': median_a, 'median_candidate': median_b, 'change': change,
+                         'p_value': p, 'changed': ','.join(changed)})
+    report = pd.DataFrame(rows, columns=['instance_id', 'strategy', 'metric', 'n_baseline', 'n_candidate',
+                                         'median_baseline', 'median_candidate', 'change', 'p_value', 'changed'])
+    report['p_holm'] = np.nan
+    for metric, group in report.groupby('metric'):
+        report.loc[group.index, 'p_holm'] = holm(group['p_value'])
+    significant = (report['p_holm'] < alpha) & (report['change'].abs() >= min_effect)
+    report['verdict'] = np.where(significant, np.where(report['change'] < 0, 'improved', 'regressed'), '')
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Repeated-trial solver benchmark with a comparable history')
+    parser.add_argument('--history', default=str(HISTORY_FILE))
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', help='solve the suite and append the trials to the history')
+    run.add_argument('--oplrun', required=True, help='oplrun executable')
+    run.add_argument('--suite', default=str(SUITE_FILE))
+    run.add_argument('--models-dir', default=str(MODELS_DIR), help='model files to benchmark')
+    run.add_argument('--data-dir', default=str(DATA_DIR))
+    run.add_argument('--trials', type=int, help='default: the suite setting')
+    run.add_argument('--label', help='name of the history point, e.g. the git revision')
+    run.add_argument('--instances', nargs='+')
+    run.add_argument('--strategies', nargs='+')
+    report = sub.add_parser('report', help='median and IQR per history point and cell')
+    report.add_argument('--points', nargs='+', help='default: every batch')
+    report.add_argument('--csv')
+    compare = sub.add_parser('compare', help='significant changes between two history points')
+    compare.add_argument('points', nargs='*', default=['previous', 'latest'], help='baseline and candidate')
+    compare.add_argument('--alpha', type=float, default=DEFAULT_ALPHA)
+    compare.add_argument('--min-effect', type=float, default=DEFAULT_MIN_EFFECT,
+                         help='smallest relative change of the median that is flagged')
+    compare.add_argument('--fail-on', default=','.join(DEFAULT_FAIL_ON),
+                         help='comma-separated metrics whose regression makes the exit code non-zero')
+    compare.add_argument('--csv')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        suite = BenchmarkSuite(Path(args.suite), Path(args.data_dir))
+        benchmark = SolverBenchmark(args.oplrun, suite, Path(args.history), Path(args.models_dir))
+        batch = benchmark.run(args.trials, args.label, args.instances, args.strategies)
+        print(f"Appended batch {batch} to {args.history}")
+        return 0
+
+    history = read_history(Path(args.history))
+    pd.set_option('display.width', 200)
+    if args.command == 'report':
+        points = args.points or batches(history)
+        table = pd.concat([summarise(select_point(history, point), point) for point in points], ignore_index=True)
+        print(table.drop(columns='keys').to_string(index=False, float_format=lambda v: f'{v:.3g}'))
+        if args.csv:
+            table.to_csv(args.csv, index=False)
+        return 0
+
+    if len(args.points) != 2:
+        parser.error('compare takes a baseline and a candidate point')
+    table = compare_points(history, *args.points, alpha=args.alpha, min_effect=args.min_effect)
+    print(f"{args.points[0]} -> {args.points[1]}")
+    print(table.to_string(index=False, float_format=lambda v: f'{v:.3g}'))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+    fail_on = {metric.strip() for metric in args.fail_on.split(',') if metric.strip()}
+    regressions = table[(table['verdict'] == 'regressed') & table['metric'].isin(fail_on)]
+    for row in regressions.itertuples(index=False):
+        print(f"REGRESSION {row.instance_id} {row.strategy} {row.metric}: "
+              f"{row.median_baseline:.3g} -> {row.median_candidate:.3g} (p_holm={row.p_holm:.3g})")
+    return 1 if len(regressions) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
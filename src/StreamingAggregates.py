@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Bounded-memory aggregation of consolidated_results.csv for figures and tables
+
+GraphGenerator and generate_article_tables.py only need a few partial aggregates of
+the consolidated results, not the frame itself:
+
+- per strategy (comparison-admissible rows): the cost/emission scatter points of
+  fig7, the cost, emission and buffer-count distributions of the fig8 box plots
+  and the DIO means of fig9;
+- the experiments the LaTeX tables list (TABLE_EXPERIMENTS), projected to the
+  columns the tables and figures read (TABLE_COLUMNS): every scalability row (one
+  per BOM size), the tax, cap and PLM/NLM series folded to their first
+  comparison-admissible row per instance and level (SERIES_LEVELS), and the
+  hybrid rows, which the longtable lists one by one, spilled to one file per
+  instance and read back an instance at a time.
+
+ResultsSummary folds chunks of the CSV into those aggregates (--chunksize rows at a
+time), so peak memory is set by the chunk size and the number of groups and series
+levels, not by the number of result rows. The same reducer runs on a frame that
+fits in memory (one chunk), so both modes draw the same figures and tables.
+series_rows folds a per-experiment table the same way for the line plots.
+
+Distributions are TDigest sketches that keep their raw values up to exact_limit
+points; below that the box-plot statistics are matplotlib's own (identical
+figures), above it the quartiles and whiskers come from a merging t-digest
+(k1 scale, --compression centroids) and only the extreme points are kept as fliers.
+Scatter points are kept in file order up to a limit and uniformly sampled
+(bottom-k on a fixed-seed key) beyond it. Sums use math.fsum over chunk partials,
+so means do not depend on the chunk size.
+
+Usage:
+    python StreamingAggregates.py logs/final_campaign_YYYYMMDD_HHMMSS [--chunksize 50000]
+
+Requires: pandas, numpy (matplotlib for exact box-plot statistics)
+"""
+
+import argparse
+import math
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from CampaignDiff import admissible_mask
+
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_COMPRESSION = 200
+EXACT_LIMIT = 50_000
+POINT_LIMIT = 20_000
+BOX_STRATEGIES = ('EMISTAXE', 'EMISCAP', 'EMISHYBRID')
+# Experiments whose rows generate_article_tables.py tabulates, and what ResultsSummary
+# keeps of them: every row, the series points, or every row spilled to disk.
+TABLE_EXPERIMENTS = {
+    'scalability': 'rows',
+    'carbon_tax_sweep': 'series',
+    'carbon_cap_sweep': 'series',
+    'carbon_hybrid': 'spill',
+    'nlm_comparison': 'series',
+}
+# Columns the tables and figures read of each of them (besides experiment and the
+# admissibility columns).
+TABLE_COLUMNS = {
+    'scalability': ('instance_id', 'buffer_count', 'DIO', 'total_emissions', 'runtime_sec'),
+    'carbon_tax_sweep': ('instance_id', 'tax_rate', 'total_emissions', 'total_cost_with_tax'),
+    'carbon_cap_sweep': ('instance_id', 'cap_value', 'baseline_emissions', 'emission_reduction_pct',
+                         'total_cost_with_tax', 'total_cost_without_tax'),
+    'carbon_hybrid': ('instance_id', 'tax_rate', 'cap_value', 'cap_level', 'total_emissions',
+                      'total_cost_with_tax', 'buffer_count'),
+    'nlm_comparison': ('instance_id', 'strategy', 'model_type', 'total_cost_with_tax', 'total_cost_without_tax',
+                       'runtime_sec'),
+}
+ADMISSIBILITY_COLUMNS = ('solver_status', 'mip_gap', 'comparison_admissible')
+# Levels of the per-instance series of an experiment: one point per instance and level.
+SERIES_LEVELS = {
+    'carbon_tax_sweep': ('tax_rate',),
+    'carbon_cap_sweep': ('cap_value', 'baseline_emissions'),
+    'carbon_hybrid': ('tax_rate', 'cap_level'),
+    'nlm_comparison': ('strategy', 'model_type'),
+}
+# Experiments GraphGenerator draws as per-instance line plots (fig4 to fig6).
+LINE_PLOT_EXPERIMENTS = ('carbon_tax_sweep', 'carbon_cap_sweep', 'carbon_hybrid')
+
+
+def read_csv_chunks(source, relpath, chunksize: int = DEFAULT_CHUNKSIZE, **kwargs):
+    """Chunks of a campaign CSV; source is a results directory or an open CampaignArchive."""
+    if hasattr(source, 'read_csv'):
+        return source.read_csv(relpath, chunksize=chunksize, **kwargs)
+    return pd.read_csv(Path(source) / relpath, chunksize=chunksize, **kwargs)
+
+
+def table_columns(rows: pd.DataFrame, experiment: str) -> pd.DataFrame:
+    """The rows of a table experiment, projected to what the tables and figures read."""
+    wanted = ('experiment',) + TABLE_COLUMNS[experiment] + ADMISSIBILITY_COLUMNS
+    return rows[[column for column in wanted if column in rows.columns]]
+
+
+def series_rows(chunks, experiment: str) -> pd.DataFrame:
+    """Comparison-admissible rows of a per-experiment table, read chunk by chunk.
+
+    Table experiments are projected to TABLE_COLUMNS and the line plots reduced to
+    the first row per instance and level; other experiments keep every row.
+    """
+    series = FirstRows(('instance_id',) + SERIES_LEVELS[experiment]) if experiment in LINE_PLOT_EXPERIMENTS else None
+    parts = []
+    for chunk in chunks:
+        chunk = chunk[admissible_mask(chunk).to_numpy()]
+        if experiment in TABLE_COLUMNS:
+            chunk = table_columns(chunk, experiment)
+        if series is not None:
+            series.add(chunk)
+        else:
+            parts.append(chunk)
+    if series is not None:
+        return series.frame()
+    return pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+
+
+class TDigest:
+    """Quantile sketch that stays exact up to exact_limit values (merging t-digest beyond)."""
+
+    def __init__(self, compression: int = DEFAULT_COMPRESSION, exact_limit: int = EXACT_LIMIT):
+        self.compression = compression
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._partial_sums = []
+        self._values = []
+        self.means = None
+        self.weights = None
+
+    @property
+    def exact(self) -> bool:
+        return self.means is None
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._partial_sums.append(math.fsum(values))
+        if self.exact:
+            self._values.append(values)
+            if self.count > self.exact_limit:
+                self._compress(np.concatenate(self._values), np.ones(self.count))
+                self._values = []
+        else:
+            self._compress(np.concatenate([self.means, values]),
+                           np.concatenate([self.weights, np.ones(len(values))]))
+
+    def values(self) -> np.ndarray:
+        """The raw values in insertion order (exact sketches only)."""
+        return np.concatenate(self._values) if self._values else np.empty(0)
+
+    def mean(self) -> float:
+        return math.fsum(self._partial_sums) / self.count if self.count else math.nan
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        left = (np.cumsum(weights) - weights) / total
+        # k1 scale: a centroid spans at most one unit of k(q) = delta/(2 pi) * asin(2q - 1).
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * left - 1, -1, 1))
+        bucket = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def quantile(self, q):
+        q = np.asarray(q, dtype=np.float64)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        if self.exact:
+            return np.quantile(self.values(), q)
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.r_[0.0, centers, self.count]
+        values = np.r_[self.min, self.means, self.max]
+        return np.interp(q * self.count, positions, values)
+
+    def boxplot_stats(self, label=None, scale: float = 1.0, whis: float = 1.5) -> dict:
+        """One entry of matplotlib.cbook.boxplot_stats for these values divided by scale."""
+        if self.exact:
+            from matplotlib import cbook
+            return cbook.boxplot_stats(self.values() / scale, whis=whis, labels=[label])[0]
+        q1, med, q3 = self.quantile([0.25, 0.5, 0.75]) / scale
+        iqr = q3 - q1
+        low, high = self.min / scale, self.max / scale
+        candidates = self.means / scale
+        whishi = high if high <= q3 + whis * iqr else candidates[candidates <= q3 + whis * iqr].max(initial=q3)
+        whislo = low if low >= q1 - whis * iqr else candidates[candidates >= q1 - whis * iqr].min(initial=q1)
+        fliers = [v for v in (low, high) if v < whislo or v > whishi]
+        notch = 1.57 * iqr / math.sqrt(self.count)
+        return {'mean': self.mean() / scale, 'iqr': iqr, 'cilo': med - notch, 'cihi': med + notch,
+                'whishi': whishi, 'whislo': whislo, 'fliers': np.array(fliers), 'q1': q1, 'med': med,
+                'q3': q3, 'label': label}
+
+
+class PointSample:
+    """(x, y) points in file order up to limit, a uniform sample of that size beyond."""
+
+    def __init__(self, limit: int = POINT_LIMIT, seed: int = 0):
+        self.limit = limit
+        self.seen = 0
+        self._rng = np.random.default_rng(seed)
+        self._x, self._y, self._key = [np.empty(0)], [np.empty(0)], [np.empty(0)]
+
+    def add(self, x, y):
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        self._x.append(x)
+        self._y.append(y)
+        self._key.append(self._rng.random(len(x)))
+        self.seen += len(x)
+        if sum(len(v) for v in self._x) > 2 * self.limit:
+            self._trim()
+
+    def _trim(self):
+        x, y, key = (np.concatenate(v) for v in (self._x, self._y, self._key))
+        if len(x) > self.limit:
+            # The limit smallest keys, back in file order.
+            keep = np.sort(np.argpartition(key, self.limit)[:self.limit])
+            x, y, key = x[keep], y[keep], key[keep]
+        self._x, self._y, self._key = [x], [y], [key]
+
+    def points(self) -> tuple:
+        self._trim()
+        return self._x[0], self._y[0]
+
+
+class GroupStats:
+    """Per-key count, sum, min and max of a column, folded chunk by chunk."""
+
+    def __init__(self):
+        self.groups = {}
+
+    def add(self, keys, values):
+        frame = pd.DataFrame({'key': np.asarray(keys, dtype=object),
+                              'value': pd.to_numeric(pd.Series(np.asarray(values)), errors='coerce')})
+        for key, part in frame.groupby('key', sort=False)['value']:
+            part = part.dropna().to_numpy()
+            entry = self.groups.setdefault(key, {'count': 0, 'sums': [], 'min': math.inf, 'max': -math.inf})
+            if len(part):
+                entry['count'] += len(part)
+                entry['sums'].append(math.fsum(part))
+                entry['min'] = min(entry['min'], float(part.min()))
+                entry['max'] = max(entry['max'], float(part.max()))
+
+    def mean(self, key) -> float:
+        entry = self.groups.get(key)
+        if not entry or not entry['count']:
+            return math.nan
+        return math.fsum(entry['sums']) / entry['count']
+
+
+class FirstRows:
+    """First row per key, in file order, folded chunk by chunk.
+
+    Chunks are deduplicated on arrival and merged once they hold twice the keys
+    kept so far, so memory follows the number of keys, not of rows.
+    """
+
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self._parts = []
+        self._pending = 0
+        self._kept = 0
+
+    def add(self, rows: pd.DataFrame):
+        if rows.empty:
+            return
+        part = rows.drop_duplicates([key for key in self.keys if key in rows.columns])
+        self._parts.append(part)
+        self._pending += len(part)
+        if self._pending > max(2 * self._kept, DEFAULT_CHUNKSIZE):
+            self._merge()
+
+    def _merge(self):
+        if len(self._parts) > 1:
+            merged = pd.concat(self._parts, ignore_index=True)
+            self._parts = [merged.drop_duplicates([key for key in self.keys if key in merged.columns])]
+        self._kept = len(self._parts[0]) if self._parts else 0
+        self._pending = 0
+
+    def frame(self) -> pd.DataFrame:
+        self._merge()
+        return self._parts[0].reset_index(drop=True) if self._parts else pd.DataFrame()
+
+
+class SpilledRows:
+    """Rows appended to one CSV file per instance, read back one instance at a time."""
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = None
+        self.files = {}
+        self._directory = None
+
+    def add(self, rows: pd.DataFrame):
+        if rows.empty:
+            return
+        if self._directory is None:
+            self._directory = tempfile.TemporaryDirectory(prefix='phpauto_rows_')
+            self.columns = list(rows.columns)
+        rows = rows.reindex(columns=self.columns)
+        for instance, group in rows.groupby('instance_id', sort=False, dropna=False):
+            path = self.files.get(instance)
+            if path is None:
+                path = self.files[instance] = Path(self._directory.name) / f'{len(self.files)}.csv'
+            group.to_csv(path, mode='a', header=not path.exists(), index=False)
+        self.rows += len(rows)
+
+    def instances(self) -> list:
+        """Instance ids in order of first appearance."""
+        return list(self.files)
+
+    def frame(self, instance) -> pd.DataFrame:
+        """The rows of one instance, in file order."""
+        return pd.read_csv(self.files[instance])
+
+
+class ResultsSummary:
+    """Partial aggregates of consolidated_results.csv used by the figures and tables."""
+
+    def __init__(self, exact_limit: int = EXACT_LIMIT, point_limit: int = POINT_LIMIT,
+                 compression: int = DEFAULT_COMPRESSION):
+        self.exact_limit = exact_limit
+        self.point_limit = point_limit
+        self.compression = compression
+        self.rows = 0
+        self.admissible_rows = 0
+        self.columns = []
+        self.strategies = []
+        self.points = {}
+        self.distributions = {}
+        self.dio = GroupStats()
+        self.dio_improvement = GroupStats()
+        self._table_rows = []
+        self._series = {}
+        self._spilled = {}
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, **kwargs):
+        summary = cls(**kwargs)
+        summary.add(frame)
+        return summary
+
+    @classmethod
+    def from_chunks(cls, chunks, **kwargs):
+        summary = cls(**kwargs)
+        for chunk in chunks:
+            summary.add(chunk)
+        return summary
+
+    def has(self, column: str) -> bool:
+        return column in self.columns
+
+    def digest(self, column: str, strategy) -> TDigest:
+        key = (column, strategy)
+        if key not in self.distributions:
+            self.distributions[key] = TDigest(self.compression, self.exact_limit)
+        return self.distributions[key]
+
+    def add(self, chunk: pd.DataFrame):
+        self.rows += len(chunk)
+        self.columns.extend(c for c in chunk.columns if c not in self.columns)
+        if 'experiment' in chunk.columns:
+            self._add_table_rows(chunk)
+        if 'strategy' not in chunk.columns or chunk.empty:
+            return
+        chunk = chunk[admissible_mask(chunk)]
+        self.admissible_rows += len(chunk)
+        strategy = chunk['strategy']
+        for name in strategy.dropna().unique():
+            if name not in self.strategies:
+                self.strategies.append(name)
+            rows = chunk[strategy == name]
+            if 'total_emissions' in rows.columns and 'total_cost_without_tax' in rows.columns:
+                sample = self.points.setdefault(name, PointSample(self.point_limit))
+                pairs = rows[['total_emissions', 'total_cost_without_tax']].apply(pd.to_numeric, errors='coerce')
+                pairs = pairs.dropna()
+                sample.add(pairs['total_emissions'].to_numpy(), pairs['total_cost_without_tax'].to_numpy())
+            for column in ('total_cost_with_tax', 'total_cost_without_tax', 'total_emissions', 'buffer_count'):
+                if column in rows.columns:
+                    self.digest(column, name).add(pd.to_numeric(rows[column], errors='coerce'))
+        if 'DIO' in chunk.columns:
+            self.dio.add(strategy, chunk['DIO'])
+        if 'DIO_improvement_pct' in chunk.columns:
+            self.dio_improvement.add(strategy, chunk['DIO_improvement_pct'])
+
+    def _add_table_rows(self, chunk: pd.DataFrame):
+        experiments = chunk['experiment']
+        for experiment in experiments[experiments.isin(list(TABLE_EXPERIMENTS))].unique():
+            rows = chunk[(experiments == experiment).to_numpy()]
+            kind = TABLE_EXPERIMENTS[experiment]
+            if kind == 'series':
+                rows = rows[admissible_mask(rows).to_numpy()]
+                key = ('instance_id',) + SERIES_LEVELS[experiment]
+                self._series.setdefault(experiment, FirstRows(key)).add(table_columns(rows, experiment))
+            elif kind == 'spill':
+                self.listing(experiment).add(table_columns(rows, experiment))
+            else:
+                self._table_rows.append(table_columns(rows, experiment))
+
+    def table_rows(self) -> pd.DataFrame:
+        """The kept rows of TABLE_EXPERIMENTS: every scalability row and the series points.
+
+        Rows are in file order within an experiment; spilled experiments are read
+        through listing().
+        """
+        if len(self._table_rows) > 1:
+            self._table_rows = [pd.concat(self._table_rows, ignore_index=True)]
+        parts = self._table_rows + [self._series[name].frame() for name in TABLE_EXPERIMENTS if name in self._series]
+        if not parts:
+            return pd.DataFrame(columns=['experiment'])
+        return pd.concat(parts, ignore_index=True)
+
+    def listing(self, experiment: str) -> SpilledRows:
+        """Every row of a spilled experiment (empty when it has none)."""
+        return self._spilled.setdefault(experiment, SpilledRows())
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bounded-memory aggregation of consolidated results')
+    parser.add_argument('campaign', help='results directory or campaign archive')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args()
+
+    from CampaignArchive import CampaignArchive, is_archive
+    source = CampaignArchive(args.campaign) if is_archive(args.campaign) else Path(args.campaign)
+    tracemalloc.start()
+    start = time.perf_counter()
+    summary = ResultsSummary.from_chunks(read_csv_chunks(source, 'consolidated_results.csv', args.chunksize))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    print(f"{summary.rows} rows ({summary.admissible_rows} comparison-admissible) in {elapsed:.2f}s, "
+          f"peak {peak / 2**20:.1f} MiB")
+    for strategy in summary.strategies:
+        emis = summary.digest('total_emissions', strategy)
+        q1, med, q3 = emis.quantile([0.25, 0.5, 0.75])
+        print(f"  {strategy}: n={emis.count} emissions q1/med/q3 {q1:.6g}/{med:.6g}/{q3:.6g} "
+              f"({'exact' if emis.exact else 't-digest'}), mean DIO {summary.dio.mean(strategy):.4g}")
+    print(f"  table rows kept: {len(summary.table_rows())}, spilled: "
+          f"{sum(summary.listing(name).rows for name, kind in TABLE_EXPERIMENTS.items() if kind == 'spill')}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Supplier dominance pruning for the DDMRP / supplier-selection models
+
+Every leaf node of a BOM lists its eligible suppliers in supp_list_N.csv and each
+eligible pair becomes z/q/v allocation variables in the PLM models. A supplier k
+weakly dominates a supplier j at node i when it is at least as good on every
+objective-relevant attribute of the strategy and can absorb the whole node demand
+(capacity >= adup * rqtf[i]). Any solution sourcing from j can then be rewritten to
+source from k without increasing cost, lead time or emissions, and without breaking
+the per-pair capacity constraint, so j can be removed at node i.
+
+The surviving suppliers are renumbered 1..K so that the unchanged models can be run
+with NB_SUPP = K. A JSON mapping brings Z/Q vectors and #DELIVER lines back to the
+original supplier ids, so logs and KPIs stay in the original id space.
+
+Usage:
+    python SupplierDominancePruner.py [output_dir] [--instances bom_5 bom_13]
+        [--strategies EMISTAXE ATTRIBUTE_PENALTY] [--oplrun PATH]
+
+output_dir defaults to logs/supplier_pruning.
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from RunOutput import numeric, parse_output, run_emissions, run_runtime
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = REPO_DIR / 'data'
+MODELS_DIR = REPO_DIR / 'models'
+REGISTRY_FILE = REPO_DIR / 'config' / 'instance_registry.json'
+
+ADUP = 20
+DEFAULT_NB_SUPP = 10
+LARGE_CAPACITY_DETAILS = 'supp_details_supeco_grdCapacity.csv'
+
+# Objective-relevant supplier attributes per strategy: +1 when lower is better,
+# -1 when higher is better. Delay drives the decoupled lead times, price the
+# procurement and holding costs, and emissions the carbon tax/cap terms of all
+# three carbon strategies. The attribute-penalty variant of the sensitivity
+# benchmark (C1/C2) also charges (1 - quality_score) and (1 - reliability).
+PLM_CRITERIA = (('delay', 1), ('price', 1), ('emissions', 1))
+STRATEGY_CRITERIA = {
+    'EMISTAXE': PLM_CRITERIA,
+    'EMISCAP': PLM_CRITERIA,
+    'EMISHYBRID': PLM_CRITERIA,
+    'ATTRIBUTE_PENALTY': PLM_CRITERIA + (('quality_score', -1), ('reliability', -1)),
+}
+
+REPORT_COLUMNS = [
+    'instance_id', 'strategy', 'nodes', 'leaf_nodes',
+    'suppliers_original', 'suppliers_reduced',
+    'eligible_pairs_original', 'eligible_pairs_reduced',
+    'allocation_vars_original', 'allocation_vars_reduced', 'variable_reduction_pct',
+    'preprocess_sec',
+    'objective_original', 'objective_reduced',
+    'runtime_sec_original', 'runtime_sec_reduced', 'runtime_gain_pct',
+]
+
+
+# ---------------------------------------------------------------- readers
+def read_semicolon_csv(path) -> pd.DataFrame:
+    """Read one of the semicolon data files into numeric columns.
+
+    The files mix trailing separators and decimal commas (0,25), so every row is
+    cut to the header width and parsed like FinalCampaignRunner::csvFloat.
+    """
+    lines = [line for line in Path(path).read_text(encoding='utf-8').splitlines() if line.strip()]
+    header = [name.strip() for name in lines[0].split(';')]
+    width = len(header)
+    while width and not header[width - 1]:
+        width -= 1
+    rows = [line.split(';')[:width] for line in lines[1:]]
+    frame = pd.DataFrame(rows, columns=header[:width])
+    return frame.apply(lambda column: pd.to_numeric(
+        column.str.strip().str.replace(',', '.', regex=False), errors='coerce'))
+
+
+def read_bom(path) -> pd.DataFrame:
+    """Read a bom_supemis_*.csv file, ordered by node index."""
+    bom = read_semicolon_csv(path)
+    bom['ind'] = bom['ind'].astype(int)
+    bom['parent'] = bom['parent'].astype(int)
+    return bom.sort_values('ind').reset_index(drop=True)
+
+
+def read_supplier_list(path):
+    """Read a supp_list_*.csv file.
+
+    Returns (nb_nodes, nb_suppliers, header_lines, eligibility) where eligibility
+    maps a node id to its list of eligible supplier ids, in file order.
+    """
+    lines = Path(path).read_text(encoding='utf-8').splitlines()
+    header = [line.split('#')[0].split(';') for line in lines[:2]]
+    nb_nodes = int(header[1][0])
+    nb_suppliers = int(header[1][1])
+    eligibility = {}
+    for line in lines[3:]:
+        fields = line.split('#')[0].split(';')
+        if len(fields) < 2 or not fields[0].strip() or not fields[1].strip():
+            continue
+        eligibility[int(fields[0])] = [int(s) for s in fields[1].split(',') if s.strip()]
+    return nb_nodes, nb_suppliers, lines[:3], eligibility
+
+
+def read_supplier_details(path) -> pd.DataFrame:
+    """Read a supp_details_*.csv file indexed by id_supp."""
+    details = read_semicolon_csv(path)
+    details['id_supp'] = details['id_supp'].astype(int)
+    return details.set_index('id_supp', drop=False)
+
+
+def leaf_demand(bom: pd.DataFrame) -> dict:
+    """Demand adup * rqtf of every leaf node (the only nodes that buy from suppliers)."""
+    parents = set(bom['parent'].astype(int))
+    leaves = bom[~bom['ind'].astype(int).isin(parents)]
+    return {int(row.ind): float(ADUP * row.rqtf) for row in leaves.itertuples()}
+
+
+def instance_files(instance: dict):
+    """BOM, supplier-list and supplier-details file names, as chosen by FinalCampaignRunner."""
+    bom_file = instance['file']
+    supp_list_file = 'supp_list_' + re.sub(r'^bom_supemis_', '', Path(bom_file).stem) + '.csv'
+    supp_details_file = LARGE_CAPACITY_DETAILS if instance['nodes'] >= 25 else 'supp_details_supeco.csv'
+    return bom_file, supp_list_file, supp_details_file
+
+
+def run_details_file(experiment: str, instance: dict) -> str:
+    """Supplier-details file of one campaign run.
+
+    runNLMComparison always uses the large-capacity file; every other phase
+    follows instance_files.
+    """
+    if experiment == 'nlm_comparison':
+        return LARGE_CAPACITY_DETAILS
+    return instance_files(instance)[2]
+
+
+def registry_instances() -> dict:
+    registry = json.loads(REGISTRY_FILE.read_text(encoding='utf-8'))
+    return {
+        instance['id']: instance
+        for family in registry['bom_families'].values()
+        for instance in family['instances']
+    }
+
+
+# ---------------------------------------------------------------- pruning
+def dominated_suppliers(candidates, details: pd.DataFrame, demand: float, criteria):
+    """Return {dominated_id: dominating_id} among the candidate suppliers of one node.
+
+    k dominates j when k is no worse on every criterion, has enough capacity to
+    cover the node demand on its own, and is either strictly better somewhere or
+    identical with a lower id (so exactly one of a group of twins survives).
+    """
+    ids = np.asarray(candidates, dtype=int)
+    if len(ids) < 2:
+        return {}
+    rows = details.loc[ids]
+    scores = np.column_stack([rows[column].to_numpy(dtype=float) * sense
+                              for column, sense in criteria])
+    capable = rows['capacity'].to_numpy(dtype=float) >= demand
+
+    no_worse = (scores[:, None, :] <= scores[None, :, :]).all(axis=2)
+    better = (scores[:, None, :] < scores[None, :, :]).any(axis=2)
+    lower_id = ids[:, None] < ids[None, :]
+    dominates = no_worse & (better | lower_id) & capable[:, None]
+    np.fill_diagonal(dominates, False)
+
+    removed = {}
+    for j in np.flatnonzero(dominates.any(axis=0)):
+        # Report a non-dominated witness: dominance is transitive, so the
+        # dominating supplier with the best scores is itself kept.
+        witnesses = np.flatnonzero(dominates[:, j] & ~dominates.any(axis=0))
+        k = witnesses[0] if len(witnesses) else np.flatnonzero(dominates[:, j])[0]
+        removed[int(ids[j])] = int(ids[k])
+    return removed
+
+
+def prune_instance(bom: pd.DataFrame, eligibility: dict, details: pd.DataFrame,
+                   nb_supp: int, strategy: str) -> dict:
+    """Prune dominated suppliers of every leaf node for one strategy.
+
+    Only supplier ids 1..nb_supp are considered, like the models which read the
+    first NB_SUPP supplier rows. Non-leaf nodes never buy and are left untouched.
+    """
+    criteria = STRATEGY_CRITERIA[strategy]
+    demand = leaf_demand(bom)
+    kept, removed = {}, {}
+    for node, suppliers in eligibility.items():
+        active = [s for s in suppliers if 1 <= s <= nb_supp]
+        if node not in demand:
+            kept[node] = active
+            continue
+        node_removed = dominated_suppliers(active, details, demand[node], criteria)
+        kept[node] = [s for s in active if s not in node_removed]
+        if node_removed:
+            removed[node] = node_removed
+
+    original_ids = sorted({s for suppliers in kept.values() for s in suppliers})
+    return {
+        'strategy': strategy,
+        'nb_supp_original': nb_supp,
+        'nb_supp_reduced': len(original_ids),
+        'original_supplier_ids': original_ids,
+        'kept': kept,
+        'removed': removed,
+    }
+
+
+def renumbered(pruning: dict) -> dict:
+    """Map original supplier ids to the compact 1..K ids of the reduced instance."""
+    return {orig: new for new, orig in enumerate(pruning['original_supplier_ids'], start=1)}
+
+
+# ---------------------------------------------------------------- writers
+def write_reduced_instance(pruning: dict, header_lines, nb_nodes: int,
+                           details: pd.DataFrame, out_dir: Path, stem: str) -> dict:
+    """Write the reduced supplier list, supplier details and id mapping files."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    to_new = renumbered(pruning)
+    supp_list_path = out_dir / f'supp_list_{stem}.csv'
+    supp_details_path = out_dir / f'supp_details_{stem}.csv'
+    mapping_path = out_dir / f'supplier_map_{stem}.json'
+
+    lines = [header_lines[0], f"{nb_nodes};{pruning['nb_supp_reduced']};", header_lines[2]]
+    for node, suppliers in pruning['kept'].items():
+        lines.append(f"{node};" + ','.join(str(to_new[s]) for s in suppliers))
+    supp_list_path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    reduced = details.loc[pruning['original_supplier_ids']].copy()
+    reduced['id_supp'] = [to_new[s] for s in reduced['id_supp']]
+    with supp_details_path.open('w', encoding='utf-8', newline='') as handle:
+        handle.write(';'.join(reduced.columns) + ';\n')
+        for row in reduced.itertuples(index=False):
+            handle.write(';'.join(format_value(v) for v in row) + ';\n')
+
+    mapping = {
+        'strategy': pruning['strategy'],
+        'nb_supp_original': pruning['nb_supp_original'],
+        'nb_supp_reduced': pruning['nb_supp_reduced'],
+        'original_supplier_ids': pruning['original_supplier_ids'],
+        'removed': {str(node): {str(j): k for j, k in pairs.items()}
+                    for node, pairs in pruning['removed'].items()},
+    }
+    mapping_path.write_text(json.dumps(mapping, indent=2), encoding='utf-8')
+    return {'supp_list': supp_list_path, 'supp_details': supp_details_path, 'mapping': mapping_path}
+
+
+def format_value(value) -> str:
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# ---------------------------------------------------------------- expansion
+def expand_allocation(values, mapping: dict, nb_nodes: int) -> list:
+    """Expand a flattened (nb_nodes+1) x K Z or Q vector to the original supplier ids."""
+    reduced = np.asarray(values, dtype=float).reshape(nb_nodes + 1, mapping['nb_supp_reduced'])
+    expanded = np.zeros((nb_nodes + 1, mapping['nb_supp_original']))
+    columns = np.asarray(mapping['original_supplier_ids'], dtype=int) - 1
+    expanded[:, columns] = reduced
+    return expanded.ravel().tolist()
+
+
+def expand_deliveries(deliveries, mapping: dict) -> list:
+    """Rewrite #DELIVER lines (S<j>=>P<i>) with original supplier ids."""
+    ids = mapping['original_supplier_ids']
+    return [re.sub(r'^S(\d+)', lambda m: f"S{ids[int(m.group(1)) - 1]}", line.strip())
+            for line in deliveries]
+
+
+# ---------------------------------------------------------------- runtime check
+def run_model(oplrun: str, model_file: str, substitutions: dict, work_dir: Path, prefix: str,
+              transform=None) -> dict:
+    """Instantiate a model by placeholder substitution and run it with oplrun.
+
+    transform, when given, rewrites the model text before the substitution.
+    """
+    content = (MODELS_DIR / model_file).read_text(encoding='utf-8')
+    if transform is not None:
+        content = transform(content)
+    for key, value in substitutions.items():
+        content = content.replace(key, str(value))
+    prepared = work_dir / f"{prefix}_{model_file}"
+    prepared.write_text(content, encoding='utf-8')
+    start = time.perf_counter()
+    output = subprocess.run([oplrun, str(prepared)], capture_output=True, text=True).stdout
+    wall = time.perf_counter() - start
+    prepared.unlink()
+
+    solution = parse_output(output)
+    runtime = run_runtime(solution)
+    return {'status': solution.get('status', 'UNKNOWN'), 'mip_gap': solution.get('mip_gap'),
+            'objective': numeric(solution, 'Result.Objective'), 'emissions': run_emissions(solution),
+            'runtime_sec': runtime if runtime >= 0 else wall}
+
+
+def measure_runtime_gain(oplrun: str, files: dict, reduced_files: dict, nb_supp: int,
+                         nb_supp_reduced: int, work_dir: Path, instance_id: str) -> dict:
+    """Solve the tax model at tax 0 on the original and reduced instance."""
+    common = {'_NODE_FILE_': (DATA_DIR / files['bom']).as_posix(),
+              '_SERVICE_T_': 1, '_EMISCAP_': 0, '_EMISTAXE_': 0.0}
+    original = run_model(oplrun, 'RUNS_SupEmis_Cplex_PLM_Tax.mod', dict(
+        common,
+        _NODE_SUPP_FILE_=(DATA_DIR / files['supp_list']).as_posix(),
+        _SUPP_DETAILS_FILE_=(DATA_DIR / files['supp_details']).as_posix(),
+        _NBSUPP_=nb_supp), work_dir, f"PRUNE-{instance_id}-ORIG")
+    reduced = run_model(oplrun, 'RUNS_SupEmis_Cplex_PLM_Tax.mod', dict(
+        common,
+        _NODE_SUPP_FILE_=reduced_files['supp_list'].resolve().as_posix(),
+        _SUPP_DETAILS_FILE_=reduced_files['supp_details'].resolve().as_posix(),
+        _NBSUPP_=nb_supp_reduced), work_dir, f"PRUNE-{instance_id}-RED")
+    gain = None
+    if original['runtime_sec'] > 0:
+        gain = (original['runtime_sec'] - reduced['runtime_sec']) / original['runtime_sec'] * 100.0
+    return {
+        'objective_original': original['objective'],
+        'objective_reduced': reduced['objective'],
+        'runtime_sec_original': original['runtime_sec'],
+        'runtime_sec_reduced': reduced['runtime_sec'],
+        'runtime_gain_pct': gain,
+    }
+
+
+# ---------------------------------------------------------------- driver
+class SupplierDominancePruner:
+    def __init__(self, output_dir: str, data_dir: str = None, nb_supp: int = DEFAULT_NB_SUPP):
+        self.output_dir = Path(output_dir)
+        self.data_dir = Path(data_dir) if data_dir else DATA_DIR
+        self.nb_supp = nb_supp
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def prune(self, instance: dict, strategy: str, oplrun: str = None) -> dict:
+        """Write the reduced instance of one (instance, strategy) pair and return its report row."""
+        bom_file, supp_list_file, supp_details_file = instance_files(instance)
+        start = time.perf_counter()
+        bom = read_bom(self.data_dir / bom_file)
+        nb_nodes, _, header_lines, eligibility = read_supplier_list(self.data_dir / supp_list_file)
+        details = read_supplier_details(self.data_dir / supp_details_file)
+        pruning = prune_instance(bom, eligibility, details, self.nb_supp, strategy)
+        stem = f"{re.sub(r'^bom_supemis_', '', Path(bom_file).stem)}_{strategy}_pruned"
+        reduced_files = write_reduced_instance(
+            pruning, header_lines, nb_nodes, details, self.output_dir, stem)
+        elapsed = time.perf_counter() - start
+
+        pairs_original = sum(len([s for s in suppliers if 1 <= s <= self.nb_supp])
+                             for suppliers in eligibility.values())
+        pairs_reduced = sum(len(suppliers) for suppliers in pruning['kept'].values())
+        # z, q and v are declared over N x S in every PLM model.
+        vars_original = 3 * (nb_nodes + 1) * self.nb_supp
+        vars_reduced = 3 * (nb_nodes + 1) * pruning['nb_supp_reduced']
+        row = {
+            'instance_id': instance['id'],
+            'strategy': strategy,
+            'nodes': nb_nodes,
+            'leaf_nodes': len(leaf_demand(bom)),
+            'suppliers_original': self.nb_supp,
+            'suppliers_reduced': pruning['nb_supp_reduced'],
+            'eligible_pairs_original': pairs_original,
+            'eligible_pairs_reduced': pairs_reduced,
+            'allocation_vars_original': vars_original,
+            'allocation_vars_reduced': vars_reduced,
+            'variable_reduction_pct': (vars_original - vars_reduced) / vars_original * 100.0,
+            'preprocess_sec': elapsed,
+        }
+        if oplrun:
+            row.update(measure_runtime_gain(
+                oplrun,
+                {'bom': bom_file, 'supp_list': supp_list_file, 'supp_details': supp_details_file},
+                reduced_files, self.nb_supp, pruning['nb_supp_reduced'],
+                self.output_dir, instance['id']))
+        return row
+
+    def run(self, instance_ids, strategies, oplrun: str = None) -> pd.DataFrame:
+        instances = registry_instances()
+        rows = []
+        for instance_id in instance_ids:
+            instance = instances.get(instance_id)
+            if instance is None or not (self.data_dir / instance['file']).exists():
+                print(f"  Skipping {instance_id} - instance not found")
+                continue
+            for strategy in strategies:
+                row = self.prune(instance, strategy, oplrun)
+                rows.append(row)
+                print(f"  {instance_id}, {strategy}: suppliers "
+                      f"{row['suppliers_original']}->{row['suppliers_reduced']}, pairs "
+                      f"{row['eligible_pairs_original']}->{row['eligible_pairs_reduced']}")
+        report = pd.DataFrame(rows).reindex(columns=REPORT_COLUMNS)
+        report.to_csv(self.output_dir / 'supplier_pruning_report.csv', index=False)
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Supplier dominance pruning per node and strategy')
+    parser.add_argument('output_dir', nargs='?', default=str(REPO_DIR / 'logs' / 'supplier_pruning'))
+    parser.add_argument('--instances', nargs='+', default=sorted(registry_instances()))
+    parser.add_argument('--strategies', nargs='+', default=['EMISTAXE', 'ATTRIBUTE_PENALTY'],
+                        choices=sorted(STRATEGY_CRITERIA))
+    parser.add_argument('--suppliers', type=int, default=DEFAULT_NB_SUPP)
+    parser.add_argument('--oplrun', help='measure the runtime gain with this oplrun executable')
+    args = parser.parse_args()
+
+    pruner = SupplierDominancePruner(args.output_dir, nb_supp=args.suppliers)
+    report = pruner.run(args.instances, args.strategies, args.oplrun)
+    print(f"Wrote {len(report)} rows to {Path(args.output_dir) / 'supplier_pruning_report.csv'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Sparse node x supplier eligibility index with dense supplier attributes
+
+supp_list_N.csv lists the eligible suppliers of every node as a comma-joined
+string after three header lines, and supp_details_*.csv holds one attribute row
+per supplier. SupplierIndex turns the pair into
+
+- a CSR matrix (indptr over node rows 0..nb_nodes, indices = supplier columns,
+  sorted and de-duplicated), read the way the OPL models fill su[i][j]: ids <= 0
+  or above NB_SUPP are ignored, and only the first NB_SUPP detail rows are used;
+- dense float arrays per supplier attribute (delay, price, capacity, emissions,
+  quality_score, ...) aligned with the supplier columns.
+
+Queries are vectorised over all nodes: best supplier by any attribute (cheapest,
+lowest-emission, fastest), per-node minima, summed eligible capacity, and the
+fractional lower bounds of the sourcing terms of the PLM models for a demand
+vector (RawMCost = unit_price * sum q*price and Emis_supp = sum q*emissions, with
+q <= capacity per pair): eligible suppliers are filled greedily in attribute
+order, which is optimal for the LP relaxation.
+
+Built indexes are cached as .npz by the SHA-256 of both files and NB_SUPP.
+
+Usage:
+    python SupplierIndex.py bounds bom_13 [--suppliers 10]
+    python SupplierIndex.py bench [--nodes 10000] [--suppliers 1000] [--density 0.2]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from SupplierDominancePruner import (
+    ADUP,
+    DATA_DIR,
+    DEFAULT_NB_SUPP,
+    instance_files,
+    read_bom,
+    read_supplier_details,
+    registry_instances,
+)
+
+INDEX_FORMAT = 1
+DEFAULT_CACHE_DIR = Path(tempfile.gettempdir()) / 'phpauto_cache' / 'supplier_index'
+
+
+def file_digest(*paths, extra: str = '') -> str:
+    digest = hashlib.sha256(f'{INDEX_FORMAT}:{extra}'.encode())
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+def parse_eligibility(path):
+    """(nb_nodes, node ids, supplier ids) as flat int arrays, one entry per listed pair."""
+    lines = Path(path).read_text(encoding='utf-8').splitlines()
+    nb_nodes = int(lines[1].split('#')[0].split(';')[0])
+    node_parts, supplier_parts = [], []
+    for line in lines[3:]:
+        fields = line.split('#')[0].split(';')
+        if len(fields) < 2 or not fields[0].strip():
+            continue
+        listed = fields[1].strip().strip(',')
+        if not listed:
+            continue
+        if ',,' in listed:
+            suppliers = np.array([int(s) for s in listed.split(',') if s.strip()], dtype=np.int64)
+        else:
+            suppliers = np.fromstring(listed, dtype=np.int64, sep=',')
+        node_parts.append(np.full(len(suppliers), int(fields[0]), dtype=np.int64))
+        supplier_parts.append(suppliers)
+    if not node_parts:
+        return nb_nodes, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return nb_nodes, np.concatenate(node_parts), np.concatenate(supplier_parts)
+
+
+class SupplierIndex:
+    """CSR eligibility (node rows x supplier columns) plus aligned attribute arrays."""
+
+    def __init__(self, indptr, indices, supplier_ids, attributes: dict):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.supplier_ids = np.asarray(supplier_ids, dtype=np.int64)
+        self.attributes = {name: np.asarray(values, dtype=np.float64) for name, values in attributes.items()}
+        self.nb_nodes = len(self.indptr) - 1
+        # Row of every stored pair, so per-pair arrays reduce per node with bincount.
+        self.entry_rows = np.repeat(np.arange(self.nb_nodes), np.diff(self.indptr))
+        self._orders = {}
+
+    @classmethod
+    def build(cls, nb_nodes: int, node_ids, supplier_ids, details: pd.DataFrame, nb_supp: int = None):
+        """Index from flat (node, supplier) pairs and a supp_details frame (file order)."""
+        if nb_supp is not None:
+            details = details.iloc[:nb_supp]
+        details = details.reset_index(drop=True).sort_values('id_supp', kind='stable')
+        known = details['id_supp'].to_numpy(dtype=np.int64)
+        column_of = np.full(int(max(known.max(initial=0), np.max(supplier_ids, initial=0))) + 1, -1, dtype=np.int64)
+        column_of[known] = np.arange(len(known))
+        node_ids = np.asarray(node_ids, dtype=np.int64)
+        supplier_ids = np.asarray(supplier_ids, dtype=np.int64)
+        keep = (supplier_ids > 0) & (node_ids >= 0)
+        if nb_supp is not None:
+            keep &= supplier_ids <= nb_supp
+        columns = np.where(keep, column_of[np.clip(supplier_ids, 0, None)], -1)
+        keep &= columns >= 0
+        rows = max(nb_nodes + 1, int(node_ids.max(initial=-1)) + 1)
+        pairs = np.unique(node_ids[keep] * len(known) + columns[keep])
+        indptr = np.zeros(rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(pairs // max(len(known), 1), minlength=rows), out=indptr[1:])
+        attributes = {name: details[name].to_numpy(dtype=np.float64)
+                      for name in details.columns if name != 'id_supp'}
+        return cls(indptr, pairs % max(len(known), 1), known, attributes)
+
+    @classmethod
+    def from_files(cls, supp_list, supp_details, nb_supp: int = None, cache_dir=DEFAULT_CACHE_DIR):
+        """Load from the CSV files, reusing the .npz cached for identical file contents."""
+        cache_file = None
+        if cache_dir is not None:
+            cache_file = Path(cache_dir) / f"{file_digest(supp_list, supp_details, extra=str(nb_supp))}.npz"
+            if cache_file.exists():
+                return cls.load(cache_file)
+        nb_nodes, node_ids, supplier_ids = parse_eligibility(supp_list)
+        index = cls.build(nb_nodes, node_ids, supplier_ids, read_supplier_details(supp_details), nb_supp)
+        if cache_file is not None:
+            index.save(cache_file)
+        return index
+
+    @classmethod
+    def from_instance(cls, instance: dict, nb_supp: int = DEFAULT_NB_SUPP, cache_dir=DEFAULT_CACHE_DIR):
+        _, supp_list_file, supp_details_file = instance_files(instance)
+        return cls.from_files(DATA_DIR / supp_list_file, DATA_DIR / supp_details_file, nb_supp, cache_dir)
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp = path.with_name(path.name + '.tmp.npz')
+        np.savez(temp, indptr=self.indptr, indices=self.indices, supplier_ids=self.supplier_ids,
+                 **{'attr_' + name: values for name, values in self.attributes.items()})
+        temp.replace(path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            attributes = {name[5:]: data[name] for name in data.files if name.startswith('attr_')}
+            return cls(data['indptr'], data['indices'], data['supplier_ids'], attributes)
+
+    def eligible(self, node: int) -> np.ndarray:
+        """Supplier ids eligible at a node (an O(1) CSR slice)."""
+        if node >= self.nb_nodes:
+            return self.supplier_ids[:0]
+        return self.supplier_ids[self.indices[self.indptr[node]:self.indptr[node + 1]]]
+
+    def eligibility(self) -> dict:
+        """{node: [supplier ids]} for nodes with eligible suppliers, as read_supplier_list gives."""
+        return {node: self.eligible(node).tolist() for node in np.flatnonzero(np.diff(self.indptr))}
+
+    def counts(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def pair_values(self, attribute: str) -> np.ndarray:
+        return self.attributes[attribute][self.indices]
+
+    def pair_order(self, attribute: str, maximize: bool = False) -> np.ndarray:
+        """Permutation sorting the pairs of every node row by attribute, ties by supplier id."""
+        key = (attribute, maximize)
+        if key not in self._orders:
+            values = self.attributes[attribute]
+            # Rank the suppliers once; columns follow supplier ids, so the stable sort keeps ties in id order.
+            rank = np.empty(len(values), dtype=np.int64)
+            rank[np.argsort(-values if maximize else values, kind='stable')] = np.arange(len(values))
+            self._orders[key] = np.argsort(self.entry_rows * len(values) + rank[self.indices], kind='stable')
+        return self._orders[key]
+
+    def minimum(self, attribute: str) -> np.ndarray:
+        """Per-node minimum of an attribute over eligible suppliers (NaN when none)."""
+        result = np.full(self.nb_nodes, np.nan)
+        values = self.pair_values(attribute)
+        nonempty = self.counts() > 0
+        if values.size:
+            result[nonempty] = np.minimum.reduceat(values, self.indptr[:-1][nonempty])
+        return result
+
+    def best(self, attribute: str, maximize: bool = False) -> np.ndarray:
+        """Per-node id of the eligible supplier with the lowest (or highest) attribute, -1 when none.
+
+        Ties go to the lowest supplier id.
+        """
+        order = self.pair_order(attribute, maximize)
+        result = np.full(self.nb_nodes, -1, dtype=np.int64)
+        nonempty = self.counts() > 0
+        result[nonempty] = self.supplier_ids[self.indices[order[self.indptr[:-1][nonempty]]]]
+        return result
+
+    def cheapest(self) -> np.ndarray:
+        return self.best('price')
+
+    def lowest_emission(self) -> np.ndarray:
+        return self.best('emissions')
+
+    def fastest(self) -> np.ndarray:
+        return self.best('delay')
+
+    def capacity_sum(self) -> np.ndarray:
+        return np.bincount(self.entry_rows, weights=self.pair_values('capacity'), minlength=self.nb_nodes)
+
+    def fill_bound(self, demand, attribute: str) -> np.ndarray:
+        """min sum q*attribute s.t. sum q = demand, 0 <= q <= capacity per eligible pair.
+
+        Greedy in attribute order per node (the LP optimum); inf where the eligible
+        capacity cannot cover the demand, 0 where the demand is 0.
+        """
+        demand = np.asarray(demand, dtype=np.float64)
+        order = self.pair_order(attribute)
+        values = self.pair_values(attribute)[order]
+        capacity = self.pair_values('capacity')[order]
+        cumulative = np.cumsum(capacity)
+        row_start = np.concatenate(([0.0], cumulative))[self.indptr[:-1]]
+        before = cumulative - capacity - row_start[self.entry_rows]
+        take = np.clip(demand[self.entry_rows] - before, 0.0, capacity)
+        bound = np.bincount(self.entry_rows, weights=take * values, minlength=self.nb_nodes)
+        return np.where(self.capacity_sum() + 1e-9 >= demand, bound, np.where(demand > 0, np.inf, 0.0))
+
+    def node_bounds(self, bom: pd.DataFrame) -> pd.DataFrame:
+        """Per-node sourcing bounds of the PLM models for a BOM (leaves buy adup * rqtf)."""
+        bom = bom.sort_values('ind')
+        nodes = bom['ind'].to_numpy(dtype=np.int64)
+        leaf = ~np.isin(nodes, bom['parent'].to_numpy(dtype=np.int64))
+        demand = np.zeros(self.nb_nodes)
+        demand[nodes[leaf]] = ADUP * bom['rqtf'].to_numpy(dtype=np.float64)[leaf]
+        unit_price = np.zeros(self.nb_nodes)
+        unit_price[nodes] = bom['unit_price'].to_numpy(dtype=np.float64)
+        return pd.DataFrame({
+            'node': np.arange(self.nb_nodes),
+            'eligible': self.counts(),
+            'demand': demand,
+            'capacity': self.capacity_sum(),
+            'cheapest': self.cheapest(),
+            'lowest_emission': self.lowest_emission(),
+            'min_delay': self.minimum('delay'),
+            'raw_cost_lb': unit_price * self.fill_bound(demand, 'price'),
+            'supplier_emissions_lb': self.fill_bound(demand, 'emissions'),
+        })
+
+
+def write_synthetic(directory, nodes: int, suppliers: int, density: float, seed: int = 0):
+    """Random supp_list / supp_details pair of the given size (for benchmarking)."""
+    rng = np.random.default_rng(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    supp_list = directory / f'supp_list_synthetic_{nodes}.csv'
+    lines = ['nb_nodes;nb_suppliers; # synthetic', f'{nodes};{suppliers};', 'id_nodes;list_suppliers;']
+    per_node = max(1, int(round(density * suppliers)))
+    for node in range(1, nodes + 1):
+        chosen = np.sort(rng.choice(np.arange(1, suppliers + 1), size=per_node, replace=False))
+        lines.append(f"{node};{','.join(map(str, chosen))}")
+    supp_list.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    supp_details = directory / f'supp_details_synthetic_{suppliers}.csv'
+    rows = ['id_supp;delay;price;capacity;emissions;']
+    for supplier in range(1, suppliers + 1):
+        rows.append(f'{supplier};{rng.integers(1, 10)};{rng.uniform(0.1, 1.5):.3f};'
+                    f'{rng.integers(20, 500)};{rng.integers(1, 100)};')
+    supp_details.write_text('\n'.join(rows) + '\n', encoding='utf-8')
+    return supp_list, supp_details
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sparse supplier eligibility and attribute index')
+    sub = parser.add_subparsers(dest='command', required=True)
+    bounds = sub.add_parser('bounds', help='print per-node sourcing bounds of an instance')
+    bounds.add_argument('instance_id')
+    bounds.add_argument('--suppliers', type=int, default=DEFAULT_NB_SUPP)
+    bench = sub.add_parser('bench', help='time parsing, cached loads and queries on a generated instance')
+    bench.add_argument('--nodes', type=int, default=10000)
+    bench.add_argument('--suppliers', type=int, default=1000)
+    bench.add_argument('--density', type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.command == 'bounds':
+        instance = registry_instances()[args.instance_id]
+        index = SupplierIndex.from_instance(instance, args.suppliers)
+        bom = read_bom(DATA_DIR / instance_files(instance)[0])
+        table = index.node_bounds(bom)
+        print(table[table['eligible'] > 0].to_string(index=False))
+        return 0
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        supp_list, supp_details = write_synthetic(temp_dir, args.nodes, args.suppliers, args.density)
+        cache_dir = Path(temp_dir) / 'cache'
+        started = time.perf_counter()
+        index = SupplierIndex.from_files(supp_list, supp_details, cache_dir=cache_dir)
+        parsed = time.perf_counter() - started
+        started = time.perf_counter()
+        index = SupplierIndex.from_files(supp_list, supp_details, cache_dir=cache_dir)
+        cached = time.perf_counter() - started
+        started = time.perf_counter()
+        index.cheapest()
+        index.lowest_emission()
+        index.capacity_sum()
+        demand = np.full(index.nb_nodes, 100.0)
+        index.fill_bound(demand, 'price')
+        index.fill_bound(demand, 'emissions')
+        queries = time.perf_counter() - started
+    print(f"{args.nodes} nodes x {args.suppliers} suppliers, {len(index.indices)} eligible pairs")
+    print(f"  parse + build {parsed:.2f}s, cached load {cached:.3f}s, all-node queries {queries:.3f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,545 @@
+#!/usr/bin/env python3
+"""
+Space-filling design of experiments for supplier-attribute sensitivity
+
+SupplierAttributeSensitivityBenchmark.php compares four hand-picked variants (A,
+B, C1 with alpha=0.1, C2 with alpha=0.5), one serial oplrun pass over the BOMs each.
+This driver samples the same penalty model over a continuous space instead:
+
+- every supplier read by the model (the first NB_SUPP rows of its supp_details file)
+  gets a multiplier in [1 - spread, 1 + spread] per perturbed attribute (price,
+  emissions, capacity, reliability, lead_time_variance by default; quality_score and
+  reliability are clipped to [0, 1]);
+- the penalty alpha of variant C is drawn from its own range.
+
+Factors are grouped by attribute (plus alpha), so the indices answer "how much does
+the cost depend on the supplier prices" rather than on one supplier's price. Two
+designs are available, both built from NumPy Latin hypercubes:
+
+- sobol: the Saltelli radial scheme, n * (groups + 2) designs, with first-order
+  (Saltelli 2010) and total (Jansen) indices and bootstrap confidence intervals;
+- morris: grouped elementary-effect trajectories, r * (groups + 1) designs, with
+  mu, mu* and sigma.
+
+Each design writes one perturbed supp_details file per instance into designs/, named
+by the SHA-256 of its content, so repeated designs share a file. Runs are keyed by
+(instance, file hash, alpha), executed through a thread pool of oplrun processes on
+the variant-C model with alpha as a placeholder, and appended to runs.csv as they
+finish; a rerun in the same output directory only solves the missing keys. The
+model enrichment is that of the benchmark (sup[S][1..7] and the quality and
+reliability penalties on RawMCost), at tax 0 and service time 1.
+lead_time_variance is read by the model but priced nowhere, so its indices are the
+null reference of the design.
+
+Only comparison-admissible runs enter the indices (as KPICalculator decides it:
+OPTIMAL, or FEASIBLE within --gap-threshold percent); the outputs of the others
+count as missing, which drops every Saltelli sample or Morris trajectory they
+belong to. The dropped samples are reported per instance.
+
+Outputs in output_dir: designs.csv (multipliers and alpha per design), runs.csv and
+sensitivity_indices.csv (one row per instance, output and attribute).
+
+Usage:
+    python SupplierSensitivityDOE.py --oplrun PATH [output_dir] [--method sobol|morris]
+        [--samples 32] [--trajectories 20] [--levels 4] [--instances bom_13 bom_50]
+        [--attributes price emissions capacity reliability lead_time_variance]
+        [--spread 0.2] [--alpha 0 0.5] [--workers 4] [--time-limit 1800] [--gap-threshold 1.0]
+        [--seed 0]
+
+output_dir defaults to logs/supplier_sensitivity_doe.
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import hashlib
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ModelInstantiator import OPLRUN_TIMEOUT_MARGIN, insert_time_limit, write_once
+from RunOutput import COMPARISON_GAP_THRESHOLD_PCT, admissible_status, parse_output
+from SupplierDominancePruner import (
+    DATA_DIR,
+    DEFAULT_NB_SUPP,
+    MODELS_DIR,
+    REPO_DIR,
+    instance_files,
+    read_supplier_details,
+    registry_instances,
+)
+
+TAX_MODEL = 'RUNS_SupEmis_Cplex_PLM_Tax.mod'
+ALPHA_PLACEHOLDER = '_PENALTY_ALPHA_'
+DEFAULT_ATTRIBUTES = ['price', 'emissions', 'capacity', 'reliability', 'lead_time_variance']
+SUPPLIER_ATTRIBUTES = ['delay', 'price', 'capacity', 'emissions', 'quality_score', 'reliability',
+                       'lead_time_variance']
+UNIT_ATTRIBUTES = ('quality_score', 'reliability')
+DEFAULT_INSTANCES = ['bom_13', 'bom_50']
+DEFAULT_SPREAD = 0.2
+DEFAULT_ALPHA = (0.0, 0.5)
+DEFAULT_TIME_LIMIT = 1800
+BOOTSTRAP = 200
+OUTPUTS = ['objective', 'total_cost', 'total_emissions', 'suppliers_used']
+
+# The variant B/C edits of SupplierAttributeSensitivityBenchmark::prepareModelFile.
+ENRICHMENT = [
+    ('float sup[S][1..4]; //delay;price;capacity;emissions',
+     'float sup[S][1..7]; //delay;price;capacity;emissions;quality;reliability;lead_time_variance'),
+    ('         sup[index][4] = det[4];',
+     '         sup[index][4] = det[4];\n'
+     '         sup[index][5] = det[5]; // quality_score\n'
+     '         sup[index][6] = det[6]; // reliability\n'
+     '         sup[index][7] = det[7]; // lead_time_variance'),
+    ('dexpr float RawMCost = sum(i in N)( unit_price[i]*sum(j in S)(q[i][j]*sup[j][2]) ); '
+     '// somme des achat selon fournisseur',
+     '// Base procurement cost\n'
+     'dexpr float RawMCost = sum(i in N)( unit_price[i]*sum(j in S)(q[i][j]*sup[j][2]) ); '
+     '// somme des achat selon fournisseur\n'
+     '// Quality and reliability penalty terms\n'
+     f'dexpr float QualityPenalty = {ALPHA_PLACEHOLDER} * '
+     'sum(i in N)( unit_price[i]*sum(j in S)(q[i][j]*(1.0 - sup[j][5])) );\n'
+     f'dexpr float ReliabilityPenalty = {ALPHA_PLACEHOLDER} * '
+     'sum(i in N)( unit_price[i]*sum(j in S)(q[i][j]*(1.0 - sup[j][6])) );\n'
+     'dexpr float RawMCostWithPenalties = RawMCost + QualityPenalty + ReliabilityPenalty;'),
+    ('dexpr float TotalCostCS = RawMCost + InventCost;',
+     'dexpr float TotalCostCS = RawMCostWithPenalties + InventCost;'),
+]
+
+RUN_COLUMNS = ['run_key', 'instance_id', 'supp_details_sha256', 'alpha', 'status', 'mip_gap',
+               'objective', 'total_cost', 'total_emissions', 'suppliers_used', 'runtime_sec']
+INDEX_COLUMNS = ['instance_id', 'output', 'method', 'factor', 'S1', 'S1_conf', 'ST', 'ST_conf',
+                 'mu', 'mu_star', 'sigma', 'samples', 'dropped']
+
+
+# ---------------------------------------------------------------- designs
+def latin_hypercube(n: int, d: int, rng: np.random.Generator) -> np.ndarray:
+    """n points in [0, 1)^d with exactly one point per 1/n slice of every column."""
+    strata = rng.permuted(np.tile(np.arange(n), (d, 1)), axis=1).T
+    return (strata + rng.random((n, d))) / n
+
+
+def saltelli_design(n: int, groups: list, d: int, rng: np.random.Generator) -> np.ndarray:
+    """Rows A, B, then A with the columns of group g taken from B, for every group.
+
+    groups lists the column indices of each factor group.
+    """
+    base = latin_hypercube(n, 2 * d, rng)
+    a, b = base[:, :d], base[:, d:]
+    blocks = [a, b]
+    for columns in groups:
+        mixed = a.copy()
+        mixed[:, columns] = b[:, columns]
+        blocks.append(mixed)
+    return np.vstack(blocks)
+
+
+def sobol_indices(y: np.ndarray, n: int, groups: int, bootstrap: int = BOOTSTRAP,
+                  rng: np.random.Generator = None) -> dict:
+    """First-order and total indices of a saltelli_design evaluation.
+
+    y is (n * (groups + 2), outputs); samples with a missing value in any of their
+    groups + 2 rows are dropped. Returns (groups, outputs) arrays S1, ST and their 95%
+    bootstrap half-widths, plus the number of samples used.
+    """
+    y = np.asarray(y, dtype=float).reshape(groups + 2, n, -1)
+    valid = np.isfinite(y).all(axis=(0, 2))
+    y = y[:, valid]
+    # Centred outputs keep the first-order estimator stable when the mean dwarfs the spread.
+    y = y - y[:2].mean(axis=(0, 1))
+    a, b, mixed = y[0], y[1], y[2:]
+
+    def estimate(a, b, mixed):
+        variance = np.concatenate([a, b], axis=-2).var(axis=-2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            first = (b * (mixed - a)).mean(axis=-2) / variance
+            total = 0.5 * ((a - mixed) ** 2).mean(axis=-2) / variance
+        return first, total
+
+    first, total = estimate(a, b, mixed)
+    samples = int(valid.sum())
+    first_conf = total_conf = np.full_like(first, np.nan)
+    if bootstrap and samples > 1:
+        rng = rng or np.random.default_rng(0)
+        draws = rng.integers(0, samples, (bootstrap, samples))
+        first_b, total_b = estimate(a[draws], b[draws], mixed[:, draws])
+        first_conf = 1.96 * bootstrap_std(first_b)
+        total_conf = 1.96 * bootstrap_std(total_b)
+    return {'S1': first, 'S1_conf': first_conf, 'ST': total, 'ST_conf': total_conf, 'samples': samples}
+
+
+def bootstrap_std(draws: np.ndarray) -> np.ndarray:
+    """nanstd of (groups, bootstrap, outputs) draws over the bootstrap axis.
+
+    An output without variance has no defined index in any draw; its spread is NaN.
+    """
+    draws = np.moveaxis(draws, 1, -1)
+    defined = np.isfinite(draws).any(axis=-1)
+    spread = np.full(defined.shape, np.nan)
+    spread[defined] = np.nanstd(draws[defined], axis=-1)
+    return spread
+
+
+def morris_design(r: int, groups: list, d: int, levels: int, rng: np.random.Generator) -> tuple:
+    """r grouped one-at-a-time trajectories on a `levels`-level grid.
+
+    Each trajectory starts on the grid and moves every group once, in random order,
+    by +-delta (all columns of a group together). Returns (points, moved, direction,
+    delta): points is (r * (groups + 1), d) and moved/direction (r, groups) give the
+    group and sign of every step.
+    """
+    g = len(groups)
+    delta = levels / (2.0 * (levels - 1))
+    owner = np.empty(d, dtype=int)
+    for k, columns in enumerate(groups):
+        owner[columns] = k
+    start = rng.integers(0, levels // 2, (r, d)) / (levels - 1)
+    direction = rng.choice([-1.0, 1.0], (r, g))
+    sign = direction[:, owner]
+    start = start + delta * (sign < 0)
+    moved = rng.permuted(np.tile(np.arange(g), (r, 1)), axis=1)
+    steps = (owner[None, None, :] == moved[:, :, None]) * (delta * sign)[:, None, :]
+    points = start[:, None, :] + np.concatenate([np.zeros((r, 1, d)), np.cumsum(steps, axis=1)], axis=1)
+    return points.reshape(r * (g + 1), d), moved, direction, delta
+
+
+def morris_indices(y: np.ndarray, moved: np.ndarray, direction: np.ndarray, delta: float) -> dict:
+    """mu, mu* and sigma of the elementary effects of a morris_design evaluation.
+
+    Trajectories with a missing value are dropped. Returns (groups, outputs) arrays.
+    """
+    r, g = moved.shape
+    y = np.asarray(y, dtype=float).reshape(r, g + 1, -1)
+    valid = np.isfinite(y).all(axis=(1, 2))
+    rows = np.arange(r)[:, None]
+    effects = np.empty((r, g, y.shape[2]))
+    step_sign = direction[rows, moved]
+    effects[rows, moved] = np.diff(y, axis=1) / (delta * step_sign)[..., None]
+    effects = effects[valid]
+    trajectories = int(valid.sum())
+    return {
+        'mu': effects.mean(axis=0),
+        'mu_star': np.abs(effects).mean(axis=0),
+        'sigma': effects.std(axis=0, ddof=1) if trajectories > 1 else np.full(effects.shape[1:], np.nan),
+        'samples': trajectories,
+    }
+
+
+class DesignSpace:
+    """Attribute multipliers for the first nb_supp suppliers and the penalty alpha."""
+
+    def __init__(self, attributes=DEFAULT_ATTRIBUTES, nb_supp: int = DEFAULT_NB_SUPP,
+                 spread: float = DEFAULT_SPREAD, alpha=DEFAULT_ALPHA):
+        unknown = set(attributes) - set(SUPPLIER_ATTRIBUTES)
+        if unknown:
+            raise ValueError(f"unknown supplier attributes: {sorted(unknown)}")
+        if not 0 <= spread < 1:
+            raise ValueError('spread must be in [0, 1)')
+        self.attributes = list(attributes)
+        self.nb_supp = nb_supp
+        self.spread = spread
+        self.alpha = (float(alpha[0]), float(alpha[1]))
+        self.factors = self.attributes + ['alpha']
+        self.columns = [f"{attribute}_S{k}" for attribute in self.attributes
+                        for k in range(1, nb_supp + 1)] + ['alpha']
+        self.groups = [np.arange(j * nb_supp, (j + 1) * nb_supp) for j in range(len(self.attributes))]
+        self.groups.append(np.array([len(self.columns) - 1]))
+
+    @property
+    def dimension(self) -> int:
+        return len(self.columns)
+
+    def scale(self, unit: np.ndarray) -> tuple:
+        """(multipliers (rows, attributes, nb_supp), alpha (rows,)) of unit-cube rows."""
+        unit = np.asarray(unit, dtype=float)
+        multipliers = 1.0 + self.spread * (2.0 * unit[:, :-1] - 1.0)
+        low, high = self.alpha
+        return (multipliers.reshape(len(unit), len(self.attributes), self.nb_supp),
+                low + (high - low) * unit[:, -1])
+
+    def frame(self, unit: np.ndarray) -> pd.DataFrame:
+        multipliers, alpha = self.scale(unit)
+        designs = pd.DataFrame(multipliers.reshape(len(unit), -1), columns=self.columns[:-1])
+        designs['alpha'] = alpha
+        designs.insert(0, 'design_id', np.arange(len(unit)))
+        return designs
+
+
+# ---------------------------------------------------------------- supplier files
+def format_number(value: float) -> str:
+    return format(float(value), '.6g')
+
+
+class SupplierFile:
+    """A supp_details file whose first nb_supp rows are rewritten per design."""
+
+    def __init__(self, path: Path, nb_supp: int = DEFAULT_NB_SUPP):
+        self.path = Path(path)
+        self.lines = [line for line in self.path.read_text(encoding='utf-8').splitlines() if line.strip()]
+        self.details = read_supplier_details(self.path).iloc[:nb_supp]
+        if len(self.details) < nb_supp:
+            raise ValueError(f"{self.path.name} has fewer than {nb_supp} suppliers")
+        self.header = self.details.columns.tolist()
+        self.nb_supp = nb_supp
+
+    def perturbed(self, attributes, multipliers: np.ndarray) -> np.ndarray:
+        """(designs, nb_supp, columns) values of the read rows under the multipliers."""
+        values = np.repeat(self.details.to_numpy(dtype=float)[None], len(multipliers), axis=0)
+        for j, attribute in enumerate(attributes):
+            column = self.header.index(attribute)
+            values[:, :, column] *= multipliers[:, j, :]
+            if attribute in UNIT_ATTRIBUTES:
+                values[:, :, column] = np.clip(values[:, :, column], 0.0, 1.0)
+        return values
+
+    def text(self, values: np.ndarray) -> str:
+        """File content with the read rows replaced by `values` (nb_supp, columns)."""
+        rows = [';'.join([str(int(row[0]))] + [format_number(v) for v in row[1:]]) + ';' for row in values]
+        return '\n'.join([self.lines[0]] + rows + self.lines[1 + self.nb_supp:]) + '\n'
+
+
+def content_path(directory: Path, text: str) -> tuple:
+    """(sha256, designs/supp_details_<sha256[:16]>.csv) of a file content."""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return digest, Path(directory) / f"supp_details_{digest[:16]}.csv"
+
+
+def run_key(instance_id: str, digest: str, alpha: float) -> str:
+    return f"{instance_id}-{digest[:16]}-a{alpha:.9g}"
+
+
+# ---------------------------------------------------------------- oplrun oracle
+def penalty_model(text: str) -> str:
+    """Variant-C model text with the penalty alpha left as ALPHA_PLACEHOLDER."""
+    for anchor, replacement in ENRICHMENT:
+        if anchor not in text:
+            raise ValueError(f"model has no line {anchor.strip()[:40]!r}...")
+        text = text.replace(anchor, replacement)
+    return text
+
+
+def comparison_admissible(runs: pd.DataFrame, gap_threshold: float = COMPARISON_GAP_THRESHOLD_PCT) -> pd.Series:
+    """admissible_status of every DOE run."""
+    return admissible_status(runs['status'], pd.to_numeric(runs['mip_gap'], errors='coerce'), gap_threshold)
+
+
+def suppliers_used(deliveries) -> int:
+    return len({item.split('=>')[0] for item in deliveries or [] if '=>' in item})
+
+
+class PenaltyModelOracle:
+    """Solves one DOE run (instance, perturbed supplier file, alpha) with oplrun."""
+
+    def __init__(self, oplrun: str, work_dir: Path, data_dir: Path = DATA_DIR,
+                 nb_supp: int = DEFAULT_NB_SUPP, service_t: int = 1,
+                 time_limit: int = DEFAULT_TIME_LIMIT, model_file: str = TAX_MODEL):
+        self.oplrun = oplrun
+        self.work_dir = Path(work_dir)
+        self.data_dir = Path(data_dir)
+        self.model_file = model_file
+        self.settings = {'_NBSUPP_': nb_supp, '_SERVICE_T_': service_t, '_EMISCAP_': 2500000,
+                         '_EMISTAXE_': 0.0}
+        text = (MODELS_DIR / model_file).read_text(encoding='utf-8')
+        self.template = insert_time_limit(penalty_model(text), False, str(time_limit))
+        self.timeout = time_limit + OPLRUN_TIMEOUT_MARGIN
+
+    def __call__(self, task: dict) -> dict:
+        bom_file, supp_list_file, _ = instance_files(task['instance'])
+        substitutions = dict(self.settings,
+                             _NODE_FILE_=(self.data_dir / bom_file).as_posix(),
+                             _NODE_SUPP_FILE_=(self.data_dir / supp_list_file).as_posix(),
+                             _SUPP_DETAILS_FILE_=Path(task['supp_details_file']).resolve().as_posix())
+        substitutions[ALPHA_PLACEHOLDER] = repr(float(task['alpha']))
+        content = self.template
+        for key, value in substitutions.items():
+            content = content.replace(key, str(value))
+        prepared = self.work_dir / f"DOE-{task['run_key']}_{self.model_file}"
+        prepared.write_text(content, encoding='utf-8')
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            output = subprocess.run([self.oplrun, str(prepared)], capture_output=True, text=True,
+                                    timeout=self.timeout).stdout
+        except subprocess.TimeoutExpired:
+            output, timed_out = '', True
+        finally:
+            prepared.unlink()
+        wall = time.perf_counter() - start
+        result = parse_output(output)
+        values = result.get('Result') or {}
+        match = re.search(r'Total \(root\+branch&cut\)\s*=\s*([\d.]+)\s*sec', output)
+        return {
+            'status': 'TIMEOUT' if timed_out else result.get('status', 'ERROR'),
+            'mip_gap': result.get('mip_gap'),
+            'objective': values.get('Objective'),
+            'total_cost': result.get('TS'),
+            'total_emissions': result.get('E'),
+            'suppliers_used': suppliers_used(result.get('DELIVER')) if 'DELIVER' in result else None,
+            'runtime_sec': float(match.group(1)) if match else wall,
+        }
+
+
+# ---------------------------------------------------------------- driver
+class SupplierSensitivityDOE:
+    """Writes the designs, runs them through `solve` and computes the indices.
+
+    solve(task) gets {'run_key', 'instance', 'supp_details_file', 'alpha'} and returns a
+    dict with the OUTPUTS (None when missing), status and runtime_sec.
+    """
+
+    def __init__(self, output_dir, solve, instance_ids=DEFAULT_INSTANCES, space: DesignSpace = None,
+                 data_dir: Path = DATA_DIR, workers: int = 4, gap_threshold: float = COMPARISON_GAP_THRESHOLD_PCT):
+        self.output_dir = Path(output_dir)
+        self.gap_threshold = gap_threshold
+        self.solve = solve
+        self.space = space or DesignSpace()
+        self.data_dir = Path(data_dir)
+        self.workers = max(1, workers)
+        registry = registry_instances()
+        self.instances = {}
+        for instance_id in instance_ids:
+            instance = registry.get(instance_id)
+            if instance is None or not (self.data_dir / instance['file']).exists():
+                print(f"  Skipping {instance_id} - instance not found")
+                continue
+            self.instances[instance_id] = instance
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def design(self, method: str, samples: int, trajectories: int, levels: int, seed: int) -> dict:
+        rng = np.random.default_rng(seed)
+        space = self.space
+        if method == 'sobol':
+            return {'unit': saltelli_design(samples, space.groups, space.dimension, rng), 'samples': samples}
+        unit, moved, direction, delta = morris_design(trajectories, space.groups, space.dimension, levels, rng)
+        return {'unit': unit, 'moved': moved, 'direction': direction, 'delta': delta}
+
+    def materialise(self, unit: np.ndarray) -> pd.DataFrame:
+        """Content-addressed supplier files and the run task of every (design, instance)."""
+        multipliers, alpha = self.space.scale(unit)
+        designs_dir = self.output_dir / 'designs'
+        tasks = []
+        for instance_id, instance in self.instances.items():
+            source = SupplierFile(self.data_dir / instance_files(instance)[2], self.space.nb_supp)
+            values = source.perturbed(self.space.attributes, multipliers)
+            for design_id in range(len(unit)):
+                text = source.text(values[design_id])
+                digest, path = content_path(designs_dir, text)
+                write_once(path, text)
+                tasks.append({'design_id': design_id, 'instance_id': instance_id,
+                              'supp_details_sha256': digest, 'supp_details_file': str(path),
+                              'alpha': float(alpha[design_id]),
+                              'run_key': run_key(instance_id, digest, float(alpha[design_id]))})
+        return pd.DataFrame(tasks)
+
+    def execute(self, tasks: pd.DataFrame) -> pd.DataFrame:
+        """Results of every distinct run key, solving only those not already in runs.csv."""
+        runs_file = self.output_dir / 'runs.csv'
+        done = pd.read_csv(runs_file) if runs_file.exists() else pd.DataFrame(columns=RUN_COLUMNS)
+        pending = tasks.drop_duplicates('run_key')
+        pending = pending[~pending['run_key'].isin(done['run_key'])]
+        jobs = [{'run_key': task.run_key, 'instance': self.instances[task.instance_id],
+                 'supp_details_file': task.supp_details_file, 'alpha': task.alpha}
+                for task in pending.itertuples(index=False)]
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(jobs))) as pool:
+                written = not runs_file.exists()
+                for task, result in zip(pending.itertuples(index=False), pool.map(self.solve, jobs)):
+                    row = dict(result, run_key=task.run_key, instance_id=task.instance_id,
+                               supp_details_sha256=task.supp_details_sha256, alpha=task.alpha)
+                    pd.DataFrame([row]).reindex(columns=RUN_COLUMNS).to_csv(
+                        runs_file, mode='a', header=written, index=False)
+                    written = False
+            done = pd.read_csv(runs_file)
+        print(f"  {len(jobs)} runs solved, {tasks['run_key'].nunique() - len(jobs)} reused")
+        return done.drop_duplicates('run_key', keep='last')
+
+    def indices(self, method: str, design: dict, tasks: pd.DataFrame, runs: pd.DataFrame,
+                rng: np.random.Generator) -> pd.DataFrame:
+        results = tasks.merge(runs.drop(columns=['instance_id', 'supp_details_sha256', 'alpha']),
+                              on='run_key', how='left')
+        # Timed-out or gap-limited optima are not comparable with the rest of the design.
+        inadmissible = ~comparison_admissible(results, self.gap_threshold)
+        results[OUTPUTS] = results[OUTPUTS].astype(float).mask(inadmissible, axis=0)
+        results['inadmissible'] = inadmissible
+        total = design['samples'] if method == 'sobol' else len(design['moved'])
+        rows = []
+        for instance_id, frame in results.groupby('instance_id', sort=False):
+            y = frame.sort_values('design_id')[OUTPUTS].to_numpy(dtype=float)
+            if method == 'sobol':
+                found = sobol_indices(y, design['samples'], len(self.space.groups), rng=rng)
+            else:
+                found = morris_indices(y, design['moved'], design['direction'], design['delta'])
+            dropped = total - found['samples']
+            print(f"  {instance_id}: {int(frame['inadmissible'].sum())} inadmissible runs, "
+                  f"{dropped} of {total} samples dropped")
+            for o, output in enumerate(OUTPUTS):
+                for k, factor in enumerate(self.space.factors):
+                    row = {'instance_id': instance_id, 'output': output, 'method': method, 'factor': factor,
+                           'samples': found['samples'], 'dropped': dropped}
+                    row.update({key: float(found[key][k, o]) for key in found if key != 'samples'})
+                    rows.append(row)
+        return pd.DataFrame(rows).reindex(columns=INDEX_COLUMNS)
+
+    def run(self, method: str = 'sobol', samples: int = 32, trajectories: int = 20, levels: int = 4,
+            seed: int = 0) -> pd.DataFrame:
+        start = time.perf_counter()
+        design = self.design(method, samples, trajectories, levels, seed)
+        self.space.frame(design['unit']).to_csv(self.output_dir / 'designs.csv', index=False)
+        tasks = self.materialise(design['unit'])
+        print(f"  {len(design['unit'])} designs x {len(self.instances)} instances, "
+              f"{tasks['supp_details_sha256'].nunique()} distinct supplier files")
+        runs = self.execute(tasks)
+        report = self.indices(method, design, tasks, runs, np.random.default_rng(seed + 1))
+        report.to_csv(self.output_dir / 'sensitivity_indices.csv', index=False)
+        print(f"  done in {time.perf_counter() - start:.1f}s")
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sobol / Morris sensitivity of the supplier attributes')
+    parser.add_argument('output_dir', nargs='?', default=str(REPO_DIR / 'logs' / 'supplier_sensitivity_doe'))
+    parser.add_argument('--oplrun', required=True, help='oplrun executable')
+    parser.add_argument('--method', choices=['sobol', 'morris'], default='sobol')
+    parser.add_argument('--samples', type=int, default=32, help='Saltelli base samples (sobol)')
+    parser.add_argument('--trajectories', type=int, default=20, help='elementary-effect trajectories (morris)')
+    parser.add_argument('--levels', type=int, default=4, help='grid levels (morris)')
+    parser.add_argument('--instances', nargs='+', default=DEFAULT_INSTANCES)
+    parser.add_argument('--attributes', nargs='+', choices=SUPPLIER_ATTRIBUTES, default=DEFAULT_ATTRIBUTES)
+    parser.add_argument('--spread', type=float, default=DEFAULT_SPREAD, help='relative perturbation (+-)')
+    parser.add_argument('--alpha', nargs=2, type=float, default=DEFAULT_ALPHA, metavar=('LOW', 'HIGH'))
+    parser.add_argument('--suppliers', type=int, default=DEFAULT_NB_SUPP)
+    parser.add_argument('--service-time', type=int, default=1)
+    parser.add_argument('--time-limit', type=int, default=DEFAULT_TIME_LIMIT)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--gap-threshold', type=float, default=COMPARISON_GAP_THRESHOLD_PCT,
+                        help='largest MIP gap (%%) of an admissible FEASIBLE run')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    space = DesignSpace(args.attributes, args.suppliers, args.spread, args.alpha)
+    oracle = PenaltyModelOracle(args.oplrun, output_dir, nb_supp=args.suppliers,
+                                service_t=args.service_time, time_limit=args.time_limit)
+    doe = SupplierSensitivityDOE(output_dir, oracle, args.instances, space, workers=args.workers,
+                                 gap_threshold=args.gap_threshold)
+    if not doe.instances:
+        print("No instance to run", file=sys.stderr)
+        return 1
+    report = doe.run(args.method, args.samples, args.trajectories, args.levels, args.seed)
+    key = 'ST' if args.method == 'sobol' else 'mu_star'
+    summary = report[report['output'] == 'total_cost'].pivot(index='factor', columns='instance_id', values=key)
+    print(f"{key} of total_cost:")
+    print(summary.reindex(space.factors).round(3).to_string())
+    print(f"Wrote {output_dir / 'sensitivity_indices.csv'}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
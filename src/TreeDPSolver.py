@@ -0,0 +1,520 @@
+#!/usr/bin/env python3
+"""
+Exact tree dynamic programme for single-sourced PLM buffer positioning
+
+With one supplier per leaf the PLM models (RUNS_SupEmis_Cplex_PLM_*.mod) reduce to
+choosing the buffers x and decoupled lead times a on the BOM tree:
+
+    a[i] >= t_process[i] + max(a[j] - y[j] over children j > i)   (assemblies)
+    a[i] >= t_process[i] + delay[k]                                 (leaf i buying from k)
+    a[0] <= service_t, a[i] <= bigM, y = a * x
+
+Every cost term of the objective is separable by node and linear in a for a given
+x, so a bottom-up pass over a = 0..bigM computes, for every node, the cheapest
+subtree whose outgoing lead time a - y stays within each bound. The pass is
+O(nodes * bigM * suppliers) with NumPy vectors over a, and a top-down pass
+recovers x, a and the leaf suppliers.
+
+The result is exact:
+- for a fixed supplier per leaf (e.g. the #DELIVER of a single-sourced CPLEX run);
+- for the full EMISTAXE model when every eligible supplier can carry its leaf's
+  whole demand, since splitting an order then never lowers cost, delay or holding;
+- for EMISCAP / EMISHYBRID when the DP optimum (at tax 0 / the hybrid tax) already
+  respects the cap.
+Other runs get status SINGLE_SOURCING_BOUND (a feasible upper bound),
+SINGLE_SOURCING_INFEASIBLE or CAP_BINDING and are left to CPLEX.
+
+to_campaign_result lays an OPTIMAL plan out like a parsed oplrun result (Result, TS,
+A, X, Z, Q, E, DELIVER, status); CampaignQueue workers started with --tree-dp log
+it through the usual print_r / KPI path instead of running oplrun whenever
+solve_run_config settles a plain PLM run config exactly, and solve --json prints
+it. verify compares the DP against the PLM rows of a campaign's
+consolidated_results.csv and writes the report to --output (the campaign directory
+is left untouched); runs the free DP cannot settle are re-solved with the suppliers
+of the CPLEX #DELIVER when that run was single-sourced.
+
+Usage:
+    python TreeDPSolver.py solve bom_13 [--tax 50] [--service-time 1] [--cap 2.5e7] [--json]
+    python TreeDPSolver.py verify logs/final_campaign_YYYYMMDD_HHMMSS [--output tree_dp_verification.csv]
+
+Requires: pandas, numpy
+"""
+
+import argparse
+import json
+import math
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ModelInstantiator import variant_of
+from SupplierDominancePruner import (
+    ADUP,
+    DATA_DIR,
+    DEFAULT_NB_SUPP,
+    instance_files,
+    read_bom,
+    read_supplier_details,
+    read_supplier_list,
+    registry_instances,
+    run_details_file,
+)
+
+BUFF_TRSP_COEF = 3  # buff_trsp_coef in the PLM models
+GRAMS_PER_TONNE = 1e6
+# Result.fctObj is printed with ~5 significant figures, so the verifier compares
+# TotalCostTS/CS (full precision) plus DIO instead of objective_value.
+OBJECTIVE_TOLERANCE = 1e-6
+PLM_STRATEGIES = ('EMISTAXE', 'EMISCAP', 'EMISHYBRID')
+PLM_MODELS = {'RUNS_SupEmis_Cplex_PLM_Tax.mod': 'EMISTAXE', 'RUNS_SupEmis_Cplex_PLM_Cap.mod': 'EMISCAP',
+              'RUNS_SupEmis_Cplex_PLM_Hybrid.mod': 'EMISHYBRID'}
+# Files and supplier count that define the TreeInstance of a run config.
+INSTANCE_KEYS = ('_NODE_FILE_', '_NODE_SUPP_FILE_', '_SUPP_DETAILS_FILE_', '_NBSUPP_')
+
+VERIFY_COLUMNS = [
+    'run_id', 'instance_id', 'strategy', 'tax_rate', 'cap_value', 'service_time',
+    'cplex_status', 'cplex_mip_gap', 'cplex_objective', 'cplex_emissions', 'cplex_DIO',
+    'cplex_runtime_sec', 'dp_mode', 'dp_status', 'dp_objective', 'dp_emissions', 'dp_DIO',
+    'dp_runtime_sec', 'objective_diff', 'verdict',
+]
+
+
+class TreeInstance:
+    """Node and supplier coefficients of one PLM instance."""
+
+    def __init__(self, bom: pd.DataFrame, eligibility: dict, details: pd.DataFrame,
+                 nb_supp: int = DEFAULT_NB_SUPP):
+        self.bom = bom.reset_index(drop=True)
+        self.nodes = self.bom['ind'].astype(int).to_numpy()
+        self.nb_node = int(self.nodes.max())
+        if not np.array_equal(self.nodes, np.arange(self.nb_node + 1)):
+            raise ValueError('BOM node ids must be 0..NB_NODE')
+        # The model reads the first NB_SUPP rows of the details file, indexed by id.
+        self.suppliers = details.iloc[:nb_supp].set_index('id_supp', drop=False)
+        self.nb_supp = nb_supp
+        parent = self.bom['parent'].astype(int).to_numpy()
+        self.parent = parent
+        has_children = np.isin(self.nodes, parent)
+        self.leaves = [int(i) for i in self.nodes[~has_children]]
+        # Lead-time constraints only link i to children j > i (forall j in (i+1)..NB_NODE).
+        self.children = {int(i): [] for i in self.nodes}
+        for j, p in zip(self.nodes, parent):
+            if p in self.children and j > p:
+                self.children[int(p)].append(int(j))
+        linked = {j for kids in self.children.values() for j in kids}
+        self.roots = [int(i) for i in self.nodes if i not in linked]
+        self.eligible = {
+            i: [k for k in dict.fromkeys(eligibility.get(i, []))
+                if 1 <= k <= nb_supp and k in self.suppliers.index]
+            for i in self.leaves
+        }
+        delays = self.suppliers['delay'].to_numpy(dtype=float)
+        self.big_m = int(self.bom['t_process'].sum() + (delays.max() if len(delays) else 0))
+
+    @classmethod
+    def from_instance(cls, instance: dict, data_dir: Path = DATA_DIR, nb_supp: int = DEFAULT_NB_SUPP,
+                      supp_details_file: str = None):
+        bom_file, supp_list_file, default_details = instance_files(instance)
+        supp_details_file = supp_details_file or default_details
+        _, _, _, eligibility = read_supplier_list(data_dir / supp_list_file)
+        return cls(read_bom(data_dir / bom_file), eligibility,
+                   read_supplier_details(data_dir / supp_details_file), nb_supp)
+
+    def demand(self, node: int) -> float:
+        return float(ADUP * self.bom.at[node, 'rqtf'])
+
+    def node_terms(self, node: int) -> dict:
+        """Per-unit terms of the node's cost, emissions and holding expressions."""
+        row = self.bom.loc[node]
+        spread = (1.5 + row['var_factor']) * row['lt_factor']
+        emis_scale = spread * row['rqtf'] * ADUP
+        return {
+            'facility': float(row['facility_emis']),
+            # Emis: (inventory + (1/3 - 1) * trsp) * y + trsp * a, times emis_scale
+            'emis_y': float((row['inventory_emis'] + (1.0 / BUFF_TRSP_COEF - 1.0) * row['trsp_emis'])
+                            * emis_scale),
+            'emis_a': float(row['trsp_emis'] * emis_scale),
+            # InventCost: holding * (y + sum_k price_k * v_k), v_k = y on the chosen supplier
+            'holding': float(ADUP * row['aih_cost'] * spread * row['unit_price'] * row['rqtf']),
+            'unit_price': float(row['unit_price']),
+        }
+
+    def supplier_capacity_slack(self) -> bool:
+        """True when every eligible supplier can take its leaf's whole order."""
+        capacity = self.suppliers['capacity']
+        return all(capacity.loc[k] >= self.demand(i) for i in self.leaves for k in self.eligible[i])
+
+
+def _leaf_options(instance: TreeInstance, node: int, tax: float, fixed: int = None) -> list:
+    """(supplier, lead-time floor, constant cost, holding add-on) per admissible supplier."""
+    demand = instance.demand(node)
+    candidates = [fixed] if fixed is not None else instance.eligible[node]
+    terms = instance.node_terms(node)
+    options = []
+    for k in candidates:
+        if k not in instance.suppliers.index or demand < 1:
+            continue
+        supplier = instance.suppliers.loc[k]
+        if supplier['capacity'] < demand:
+            continue
+        constant = demand * (terms['unit_price'] * supplier['price']
+                             + tax / GRAMS_PER_TONNE * supplier['emissions'])
+        options.append((int(k), math.ceil(supplier['delay'] - 1e-9), float(constant),
+                        terms['holding'] * float(supplier['price'])))
+    return options
+
+
+def solve_tree(instance: TreeInstance, tax: float = 0.0, service_t: int = 1,
+               suppliers: dict = None) -> dict:
+    """Minimise TotalCostTS + dlts at carbon price tax over single-sourced plans.
+
+    suppliers fixes the supplier of some or all leaves ({leaf: supplier id}).
+    """
+    start = time.perf_counter()
+    suppliers = suppliers or {}
+    size = instance.big_m + 1
+    grid = np.arange(size, dtype=float)
+    tax_g = tax / GRAMS_PER_TONNE
+    # cost[i][x] over a = 0..bigM, best_leaf[i][x] the supplier behind each entry.
+    cost, best_leaf, envelope = {}, {}, {}
+
+    order = []
+    stack = list(instance.roots)
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(instance.children[node])
+
+    for node in reversed(order):
+        terms = instance.node_terms(node)
+        t_process = int(instance.bom.at[node, 't_process'])
+        slope_a = 1.0 + tax_g * terms['emis_a']
+        slope_y = tax_g * terms['emis_y'] + terms['holding']
+        fixed_x = np.array([0.0, tax_g * terms['facility']])
+
+        # Cheapest children given the node's lead time a: each child must keep a - y <= a - t.
+        requirement = np.where(grid >= t_process, 0.0, np.inf)
+        for child in instance.children[node]:
+            shifted = np.full(size, np.inf)
+            shifted[t_process:] = envelope[child][:size - t_process]
+            requirement = requirement + shifted
+
+        node_cost = np.empty((2, size))
+        node_leaf = np.zeros((2, size), dtype=int)
+        if node in instance.leaves:
+            node_cost.fill(np.inf)
+            for k, delay, constant, holding_k in _leaf_options(instance, node, tax, suppliers.get(node)):
+                floor = np.where(grid >= t_process + delay, 0.0, np.inf)
+                for x in (0, 1):
+                    candidate = (floor + constant + fixed_x[x]
+                                 + grid * (slope_a + x * (slope_y + holding_k)))
+                    better = candidate < node_cost[x]
+                    node_cost[x][better] = candidate[better]
+                    node_leaf[x][better] = k
+        else:
+            for x in (0, 1):
+                node_cost[x] = requirement + fixed_x[x] + grid * (slope_a + x * slope_y)
+        cost[node], best_leaf[node] = node_cost, node_leaf
+        # Outgoing lead time is 0 with a buffer and a without one.
+        envelope[node] = np.minimum(node_cost[1].min(), np.minimum.accumulate(node_cost[0]))
+
+    x_values = np.zeros(instance.nb_node + 1, dtype=int)
+    a_values = np.zeros(instance.nb_node + 1, dtype=int)
+    chosen = {}
+
+    def place(node: int, limit: int):
+        node_cost = cost[node]
+        buffered = int(np.argmin(node_cost[1]))
+        unbuffered = int(np.argmin(node_cost[0][:limit + 1])) if limit >= 0 else None
+        if unbuffered is None or node_cost[1][buffered] < node_cost[0][unbuffered]:
+            x, a = 1, buffered
+        else:
+            x, a = 0, unbuffered
+        x_values[node], a_values[node] = x, a
+        if node in instance.leaves:
+            chosen[node] = int(best_leaf[node][x][a])
+        t_process = int(instance.bom.at[node, 't_process'])
+        for child in instance.children[node]:
+            place(child, a - t_process)
+
+    def root_choice(node: int, limit: int):
+        window = cost[node][:, :limit + 1]
+        if window.size == 0 or not np.isfinite(window).any():
+            return None
+        x, a = np.unravel_index(int(np.argmin(window)), window.shape)
+        return int(x), int(a)
+
+    for root in instance.roots:
+        limit = service_t if root == 0 else instance.big_m
+        choice = root_choice(root, min(limit, instance.big_m))
+        if choice is None:
+            return {'status': 'INFEASIBLE', 'runtime_sec': time.perf_counter() - start}
+        x, a = choice
+        x_values[root], a_values[root] = x, a
+        if root in instance.leaves:
+            chosen[root] = int(best_leaf[root][x][a])
+        t_process = int(instance.bom.at[root, 't_process'])
+        for child in instance.children[root]:
+            place(child, a - t_process)
+
+    result = evaluate_plan(instance, x_values, a_values, chosen, tax)
+    result['runtime_sec'] = time.perf_counter() - start
+    result['status'] = 'OPTIMAL'
+    return result
+
+
+def evaluate_plan(instance: TreeInstance, x, a, suppliers: dict, tax: float = 0.0) -> dict:
+    """PLM cost, emissions and lead-time expressions of a single-sourced plan."""
+    x = np.asarray(x, dtype=float)
+    a = np.asarray(a, dtype=float)
+    y = x * a
+    raw, invent, emis = 0.0, 0.0, 0.0
+    for node in instance.nodes:
+        terms = instance.node_terms(int(node))
+        emis += terms['facility'] * x[node] + terms['emis_y'] * y[node] + terms['emis_a'] * a[node]
+        invent += terms['holding'] * y[node]
+        k = suppliers.get(int(node))
+        if k is not None:
+            supplier = instance.suppliers.loc[k]
+            demand = instance.demand(int(node))
+            raw += terms['unit_price'] * demand * supplier['price']
+            emis += demand * supplier['emissions']
+            invent += terms['holding'] * supplier['price'] * y[node]
+    total_cs = raw + invent
+    total_ts = total_cs + tax * emis / GRAMS_PER_TONNE
+    dlts = float(a.sum())
+    # z[i][j] and q[i][j] of the models, row-major over nodes 0..NB_NODE and suppliers 1..NB_SUPP.
+    z = np.zeros((instance.nb_node + 1, instance.nb_supp), dtype=int)
+    q = np.zeros_like(z)
+    for node, k in suppliers.items():
+        z[node, k - 1] = 1
+        q[node, k - 1] = round(instance.demand(node))
+    return {
+        'objective': total_ts + dlts,
+        'TotalCostTS': total_ts,
+        'TotalCostCS': total_cs,
+        'RawMCost': raw,
+        'InventCost': invent,
+        'Emis': emis,
+        'DIO': dlts,
+        'X': x.astype(int).tolist(),
+        'A': a.astype(int).tolist(),
+        'Z': z.ravel().tolist(),
+        'Q': q.ravel().tolist(),
+        'suppliers': dict(sorted(suppliers.items())),
+        'buffer_count': int(x.sum()),
+    }
+
+
+def solve_strategy(instance: TreeInstance, strategy: str, tax: float = 0.0, cap: float = None,
+                   service_t: int = 1, suppliers: dict = None) -> dict:
+    """Solve one PLM run; status says whether the DP value is the model optimum."""
+    # Splitting an order can only pay off when some supplier cannot take it whole.
+    exact_sourcing = (set(instance.leaves) <= set(suppliers or {})
+                      or instance.supplier_capacity_slack())
+    priced = 0.0 if strategy == 'EMISCAP' else tax
+    result = solve_tree(instance, priced, service_t, suppliers)
+    if result['status'] != 'OPTIMAL':
+        if not exact_sourcing:
+            result['status'] = 'SINGLE_SOURCING_INFEASIBLE'
+        return result
+    if strategy == 'EMISCAP':
+        result['objective'] = result['TotalCostCS'] + result['DIO']
+    if strategy in ('EMISCAP', 'EMISHYBRID') and cap is not None and result['Emis'] > cap:
+        result['status'] = 'CAP_BINDING'
+    elif not exact_sourcing:
+        result['status'] = 'SINGLE_SOURCING_BOUND'
+    return result
+
+
+def run_config_strategy(run_config: dict):
+    """PLM strategy of a campaign run config the DP models, None for any other run.
+
+    Stability probes, the staticLex baseline and NLM seeds change the model, so
+    only the plain PLM variant qualifies.
+    """
+    strategy = PLM_MODELS.get(run_config.get('MODEL_FILE'))
+    if strategy is None or variant_of(run_config) != (None, False, False, False):
+        return None
+    return strategy
+
+
+def run_config_instance(run_config: dict, data_dir: Path = DATA_DIR) -> TreeInstance:
+    """TreeInstance of the files a run config names (relative to data_dir)."""
+    data_dir = Path(data_dir)
+    _, _, _, eligibility = read_supplier_list(data_dir / run_config['_NODE_SUPP_FILE_'])
+    return TreeInstance(read_bom(data_dir / run_config['_NODE_FILE_']), eligibility,
+                        read_supplier_details(data_dir / run_config['_SUPP_DETAILS_FILE_']),
+                        int(run_config['_NBSUPP_']))
+
+
+def solve_run_config(run_config: dict, instance: TreeInstance = None, data_dir: Path = DATA_DIR):
+    """solve_strategy of a campaign run config; None when run_config_strategy rejects it."""
+    strategy = run_config_strategy(run_config)
+    if strategy is None:
+        return None
+    instance = instance or run_config_instance(run_config, data_dir)
+    return solve_strategy(instance, strategy, float(run_config.get('_EMISTAXE_', 0.0)),
+                          float(run_config.get('_EMISCAP_', 0.0)), int(run_config.get('_SERVICE_T_', 1)))
+
+
+# ---------------------------------------------------------------- campaign check
+def read_deliveries_text(text: str) -> dict:
+    """{leaf: [supplier ids]} from the S<j>=>P<i> lines of a run log."""
+    deliveries = {}
+    for supplier, node in re.findall(r'S(\d+)=>P(\d+)', text):
+        deliveries.setdefault(int(node), set()).add(int(supplier))
+    return {node: sorted(ids) for node, ids in deliveries.items()}
+
+
+def read_deliveries(log_file: Path) -> dict:
+    """read_deliveries_text of a log file, {} when it does not exist."""
+    if not log_file.exists():
+        return {}
+    return read_deliveries_text(log_file.read_text(encoding='utf-8', errors='replace'))
+
+
+def verify_campaign(results_dir: Path, data_dir: Path = DATA_DIR) -> pd.DataFrame:
+    """Re-solve the PLM rows of a campaign and compare against CPLEX."""
+    results = pd.read_csv(results_dir / 'consolidated_results.csv')
+    instances = registry_instances()
+    rows, cache = [], {}
+    for run in results.itertuples(index=False):
+        if run.model_type != 'PLM' or run.strategy not in PLM_STRATEGIES or run.instance_id not in instances:
+            continue
+        details = run_details_file(run.experiment, instances[run.instance_id])
+        key = (run.instance_id, int(run.suppliers_available), details)
+        if key not in cache:
+            cache[key] = TreeInstance.from_instance(instances[run.instance_id], data_dir, key[1], details)
+        instance = cache[key]
+        tax = float(run.tax_rate) if pd.notna(run.tax_rate) else 0.0
+        cap = float(run.cap_value) if pd.notna(run.cap_value) else None
+        service_t = int(run.service_time_promised)
+        dp = solve_strategy(instance, run.strategy, tax, cap, service_t)
+        mode = 'free'
+        if dp['status'].startswith('SINGLE_SOURCING'):
+            deliveries = read_deliveries(results_dir / 'logs' / f'{run.run_id}.log')
+            if deliveries and all(len(ids) == 1 for ids in deliveries.values()):
+                fixed = {node: ids[0] for node, ids in deliveries.items()}
+                dp = solve_strategy(instance, run.strategy, tax, cap, service_t, fixed)
+                mode = 'cplex_suppliers'
+
+        cost_column = 'total_cost_without_tax' if run.strategy == 'EMISCAP' else 'total_cost_with_tax'
+        cost = getattr(run, cost_column)
+        cplex_objective = (float(cost) + float(run.DIO)
+                           if pd.notna(cost) and pd.notna(run.DIO) else None)
+        diff = (dp['objective'] - cplex_objective
+                if cplex_objective is not None and 'objective' in dp else None)
+        rows.append({
+            'run_id': run.run_id,
+            'instance_id': run.instance_id,
+            'strategy': run.strategy,
+            'tax_rate': tax,
+            'cap_value': cap,
+            'service_time': service_t,
+            'cplex_status': run.solver_status,
+            'cplex_mip_gap': run.mip_gap,
+            'cplex_objective': cplex_objective,
+            'cplex_emissions': run.total_emissions,
+            'cplex_DIO': run.DIO,
+            'cplex_runtime_sec': run.runtime_sec,
+            'dp_mode': mode,
+            'dp_status': dp['status'],
+            'dp_objective': dp.get('objective'),
+            'dp_emissions': dp.get('Emis'),
+            'dp_DIO': dp.get('DIO'),
+            'dp_runtime_sec': dp['runtime_sec'],
+            'objective_diff': diff,
+            'verdict': verdict(dp['status'], run.solver_status, diff, cplex_objective),
+        })
+    return pd.DataFrame(rows).reindex(columns=VERIFY_COLUMNS)
+
+
+def verdict(dp_status: str, cplex_status: str, diff, cplex_objective) -> str:
+    if dp_status == 'INFEASIBLE':
+        return 'AGREE' if cplex_status == 'INFEASIBLE' else 'DP_INFEASIBLE'
+    if dp_status != 'OPTIMAL' or cplex_status not in ('OPTIMAL', 'FEASIBLE') or diff is None:
+        return 'NOT_COMPARABLE'
+    tolerance = OBJECTIVE_TOLERANCE * max(1.0, abs(cplex_objective))
+    if abs(diff) <= tolerance:
+        return 'AGREE'
+    if diff < 0:
+        # The DP is exact here, so a better DP value means CPLEX stopped short.
+        return 'CPLEX_SUBOPTIMAL' if cplex_status == 'FEASIBLE' else 'MISMATCH'
+    return 'MISMATCH'
+
+
+def to_campaign_result(result: dict) -> dict:
+    """DP plan in the key layout of a parsed oplrun result (see the run logs)."""
+    optimal = result['status'] == 'OPTIMAL'
+    return {
+        'status': result['status'],
+        'termination_reason': 'OPTIMAL' if optimal else result['status'],
+        'mip_gap': 0.0 if optimal else None,
+        'Result': {'Objective': result.get('objective'), 'TotalCost': result.get('TotalCostTS'),
+                   'LeadTime': result.get('DIO'), 'Emissions': result.get('Emis')},
+        'TS': result.get('TotalCostTS'),
+        'CS': result.get('TotalCostCS'),
+        'RawMCost': result.get('RawMCost'),
+        'InventCost': result.get('InventCost'),
+        'A': result.get('A'),
+        'X': result.get('X'),
+        'Z': result.get('Z'),
+        'Q': result.get('Q'),
+        'E': result.get('Emis'),
+        'DIO': result.get('DIO'),
+        'DELIVER': [f"S{k}=>P{i}" for i, k in result.get('suppliers', {}).items()],
+        'RT': result['runtime_sec'],
+        'solver': 'tree_dp',
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exact tree DP for single-sourced PLM runs')
+    sub = parser.add_subparsers(dest='command', required=True)
+    solve = sub.add_parser('solve', help='solve one instance')
+    solve.add_argument('instance_id')
+    solve.add_argument('--strategy', choices=PLM_STRATEGIES, default='EMISTAXE')
+    solve.add_argument('--tax', type=float, default=0.0)
+    solve.add_argument('--cap', type=float)
+    solve.add_argument('--service-time', type=int, default=1)
+    solve.add_argument('--suppliers', type=int, default=DEFAULT_NB_SUPP)
+    solve.add_argument('--supp-details', help='supplier details file in data/ (default: as the campaign)')
+    solve.add_argument('--json', action='store_true', help='print the plan as campaign-style JSON')
+    verify = sub.add_parser('verify', help='check the PLM runs of a campaign results directory')
+    verify.add_argument('results_dir')
+    verify.add_argument('--output', default='tree_dp_verification.csv')
+    args = parser.parse_args()
+
+    if args.command == 'solve':
+        instance = TreeInstance.from_instance(registry_instances()[args.instance_id],
+                                              nb_supp=args.suppliers,
+                                              supp_details_file=args.supp_details)
+        result = solve_strategy(instance, args.strategy, args.tax, args.cap, args.service_time)
+        if args.json:
+            print(json.dumps(to_campaign_result(result), indent=2))
+            return 0 if result['status'] == 'OPTIMAL' else 2
+        print(f"{args.instance_id} {args.strategy}: status={result['status']}")
+        if 'objective' in result:
+            print(f"  objective={result['objective']:.4f} TS={result['TotalCostTS']:.4f} "
+                  f"CS={result['TotalCostCS']:.4f} E={result['Emis']:.1f} DIO={result['DIO']:.0f} "
+                  f"buffers={result['buffer_count']} ({result['runtime_sec'] * 1000:.1f} ms)")
+            print(f"  X={result['X']}")
+            print(f"  A={result['A']}")
+            print(f"  DELIVER={['S%d=>P%d' % (k, i) for i, k in result['suppliers'].items()]}")
+        return 0 if result['status'] != 'INFEASIBLE' else 1
+
+    report = verify_campaign(Path(args.results_dir))
+    counts = report['verdict'].value_counts().to_dict()
+    print(f"Checked {len(report)} PLM runs: {counts}")
+    report.to_csv(args.output, index=False)
+    print(f"Wrote {args.output}")
+    return 1 if (report['verdict'].isin(['MISMATCH', 'DP_INFEASIBLE'])).any() else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
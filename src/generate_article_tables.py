@@ -4,18 +4,45 @@ Generate publication-ready LaTeX table fragments for the Journal of Cleaner
 Production article from a final-campaign consolidated_results.csv.
 
 Usage:
-    python generate_article_tables.py [results_dir]
+    python generate_article_tables.py [results_dir] [--chunksize 50000] [--workers 4]
+                                      [--tables tab_hybrid.tex ...]
 
 If results_dir is omitted, the most recent logs/final_campaign_* directory is used.
-Outputs .tex fragments into <results_dir>/tables_tex/.
+Outputs .tex fragments into <results_dir>/tables_tex/. results_dir may also be an
+archive written by CampaignArchive.py; it is read in place and the fragments go to
+the sibling directory named after the campaign. The consolidated results are
+folded by a ResultsSummary (StreamingAggregates.py), in chunks with --chunksize:
+the tables slice the scalability rows and the sweep series from one ResultsIndex
+of what it keeps (ReportingCore.py) and read the hybrid rows back from its spill
+one instance at a time.
+
+Each fragment has a builder in TABLE_BUILDERS declaring the datasets it reads.
+The declared datasets are read once, the builders run on --workers threads and
+every fragment is streamed to its file row by row, so the hybrid longtable is
+never held as one string. The rows and build time of each fragment are reported.
 """
+import argparse
 import sys
 import glob
 import os
 import math
-import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 
+from CampaignArchive import CampaignArchive, is_archive, unpacked_dir
+from ReportingCore import ResultsIndex, instance_sort_key
+from StreamingAggregates import ResultsSummary, read_csv_chunks
+
+CONSOLIDATED = 'consolidated_results.csv'
+HYBRID_ROWS = CONSOLIDATED + '#carbon_hybrid'
+PRICE_THRESHOLD = 'tables/carbon_price_threshold_results.csv'
+DECISION_STABILITY = 'tables/decision_stability_summary.csv'
+PARETO_EMISSIONS = 'pareto/*_cost_emissions_pareto.csv'
+PARETO_DIO = 'pareto/*_cost_dio_pareto.csv'
+
 # ---------------------------------------------------------------- helpers
 def fmt_emis(x):
     """Format an emission value, converting the model's gCO2 to tonnes (1 t = 1e6 gCO2)."""
@@ -64,157 +91,174 @@ def fmt_rate(x):
 def emis_of(df_rows):
     return df_rows['total_emissions'].astype(float)
 
-# ---------------------------------------------------------------- locate data
-if len(sys.argv) > 1:
-    results_dir = sys.argv[1]
-else:
-    base = os.path.join(os.path.dirname(__file__), '..', 'logs')
-    cands = sorted(glob.glob(os.path.join(base, 'final_campaign_*')),
-                   key=os.path.getmtime)
-    if not cands:
-        print("No final_campaign_* directory found.")
-        sys.exit(1)
-    results_dir = cands[-1]
-
-results_dir = os.path.abspath(results_dir)
-csv_path = os.path.join(results_dir, 'consolidated_results.csv')
-df = pd.read_csv(csv_path)
-out_dir = os.path.join(results_dir, 'tables_tex')
-os.makedirs(out_dir, exist_ok=True)
-print(f"Loaded {len(df)} rows from {csv_path}")
-print(f"Writing LaTeX tables to {out_dir}")
-
-def write(name, content):
-    with open(os.path.join(out_dir, name), 'w', encoding='utf-8') as f:
-        f.write(content)
-    print("  wrote", name)
-
-def n_of(instance_id):
-    """Extract numeric BOM size from instance id like bom_50 / bom_ml4_30."""
-    digits = ''.join(ch for ch in str(instance_id).split('_')[-1] if ch.isdigit())
-    return int(digits) if digits else 0
-
-def instance_sort_key(instance_id):
-    """Sort regular BOMs numerically first, then structural benchmark families."""
-    value = str(instance_id)
-    regular = re.match(r'^bom_(\d+)$', value)
-    if regular:
-        return (0, int(regular.group(1)), value)
-    multi_level = re.match(r'^bom_ml(\d+)_(\d+)$', value)
-    if multi_level:
-        return (1, int(multi_level.group(2)), int(multi_level.group(1)), value)
-    parallel = re.match(r'^bom_par(\d+)$', value)
-    if parallel:
-        return (2, int(parallel.group(1)), value)
-    return (9, n_of(value), value)
-
-def comparison_admissible(rows):
-    """Keep rows eligible to support behavioral comparisons."""
-    if rows.empty:
-        return rows
-    if 'comparison_admissible' in rows.columns:
-        values = rows['comparison_admissible'].astype(str).str.strip().str.lower()
-        return rows[values.isin(['1', '1.0', 'true', 'yes'])].copy()
-    status = rows['solver_status'].astype(str).str.strip().str.upper()
-    if 'mip_gap' in rows.columns:
-        gap = pd.to_numeric(rows['mip_gap'], errors='coerce')
-    else:
-        gap = pd.Series(float('nan'), index=rows.index)
-    return rows[(status == 'OPTIMAL') | ((status == 'FEASIBLE') & (gap <= 1.0))].copy()
+def sorted_instances(index, positions):
+    """Instance ids of some rows, regular BOMs numerically first."""
+    return sorted(index.values('instance_id', positions), key=instance_sort_key)
+
+# ---------------------------------------------------------------- registry
+# Fragment name -> (builder, declared datasets). A builder receives the datasets it
+# declared and returns (head, rows, foot), or None when there is nothing to tabulate;
+# the fragment is head + "\n".join(rows) + foot, and rows may be a generator.
+TABLE_BUILDERS = {}
+
+def table(name, *inputs):
+    def register(builder):
+        TABLE_BUILDERS[name] = (builder, inputs)
+        return builder
+    return register
+
+class CampaignInputs:
+    """Reads the datasets declared by the table builders from a directory or archive."""
+
+    def __init__(self, results_dir, chunksize=None, source=None, summary=None):
+        """source replaces the files (anything with exists/read_csv/glob, like a CampaignArchive);
+        summary, when given, stands for consolidated_results.csv."""
+        self.results_dir = results_dir
+        if source is None and is_archive(results_dir):
+            source = CampaignArchive(results_dir)
+        self.archive = source
+        self.chunksize = chunksize
+        self._summary = summary
+        self._summary_lock = threading.Lock()
+
+    def read_csv(self, relpath, **kwargs):
+        if self.archive:
+            return self.archive.read_csv(relpath, **kwargs)
+        return pd.read_csv(os.path.join(self.results_dir, relpath), **kwargs)
+
+    def exists(self, relpath):
+        if self.archive:
+            return self.archive.exists(relpath)
+        return os.path.exists(os.path.join(self.results_dir, relpath))
+
+    def glob(self, pattern):
+        if self.archive:
+            return self.archive.glob(pattern)
+        return glob.glob(os.path.join(self.results_dir, pattern))
+
+    def load(self, name):
+        if name == CONSOLIDATED:
+            return ResultsIndex(self.summary().table_rows())
+        if name == HYBRID_ROWS:
+            return self.summary().listing('carbon_hybrid')
+        if '*' in name:
+            return self.pareto_fronts(name)
+        return self.read_csv(name) if self.exists(name) else pd.DataFrame()
+
+    def summary(self):
+        """The ResultsSummary of the consolidated results, folded once for every dataset of it."""
+        with self._summary_lock:
+            if self._summary is None:
+                if self.chunksize:
+                    self._summary = ResultsSummary.from_chunks(
+                        read_csv_chunks(self.archive or self.results_dir, CONSOLIDATED, self.chunksize))
+                else:
+                    self._summary = ResultsSummary.from_frame(self.read_csv(CONSOLIDATED))
+                print(f"Loaded {self._summary.rows} rows from {os.path.join(self.results_dir, CONSOLIDATED)}")
+            return self._summary
 
-def maybe_read_table_csv(name):
-    path = os.path.join(results_dir, 'tables', name)
-    if os.path.exists(path):
-        return pd.read_csv(path)
-    return pd.DataFrame()
+    def pareto_fronts(self, pattern):
+        """(instance, front) of every Pareto CSV, in instance order; None when unreadable."""
+        suffix = pattern.split('*', 1)[1]
+        fronts = []
+        for f in self.glob(pattern):
+            inst = os.path.basename(f).replace(suffix, '')
+            try:
+                front = self.archive.read_csv(f, sep=';') if self.archive else pd.read_csv(f, sep=';')
+            except Exception:
+                front = None
+            fronts.append((inst, front))
+        return sorted(fronts, key=lambda item: instance_sort_key(item[0]))
 
 # ================================================================ 1. SCALABILITY
-scal = df[df['experiment'] == 'scalability'].copy()
-if not scal.empty:
-    scal['N'] = scal['instance_id'].map(n_of)
+@table('tab_scalability.tex', CONSOLIDATED)
+def scalability_table(index):
+    scal = index.rows(admissible=False, experiment='scalability', columns=list(index.frame.columns) + ['N'])
+    if scal.empty:
+        return None
     scal = scal.sort_values('N')
-    rows = []
-    for _, r in scal.iterrows():
-        rows.append(
-            f"{int(r['N'])} & {int(r['buffer_count'])} & {fmt_num(r['DIO'],0)} & "
-            f"{fmt_emis(r['total_emissions'])} & {fmt_num(r['runtime_sec'],3)} & "
-            f"{r['solver_status']} \\\\"
-        )
-    body = "\n".join(rows)
-    tex = (
+    rows = (
+        f"{int(r['N'])} & {int(r['buffer_count'])} & {fmt_num(r['DIO'],0)} & "
+        f"{fmt_emis(r['total_emissions'])} & {fmt_num(r['runtime_sec'],3)} & "
+        f"{r['solver_status']} \\\\"
+        for r in scal.to_dict('records')
+    )
+    head = (
         "\\begin{table}[!htbp]\\centering\n"
         "\\caption{Scalability of the pseudo-linear model across BOM sizes "
         "(baseline, zero carbon tax).}\\label{tab:scal}\n"
         "\\begin{tabular}{cccccc}\n\\toprule\n"
         "$N$ & Buffers & DIO & Emissions (t\\,CO$_2$) & Runtime (s) & Status\\\\\n"
-        "\\midrule\n" + body + "\n\\bottomrule\n\\end{tabular}\n\\end{table}\n"
+        "\\midrule\n"
     )
-    write('tab_scalability.tex', tex)
+    return head, rows, "\n\\bottomrule\n\\end{tabular}\n\\end{table}\n"
 
 # ================================================================ 2. TAX SWEEP
-tax = comparison_admissible(df[df['experiment'] == 'carbon_tax_sweep'].copy())
-if not tax.empty:
-    tax['tax_rate'] = tax['tax_rate'].astype(float)
-    rates = sorted(tax['tax_rate'].unique())
-    insts = sorted(tax['instance_id'].unique(), key=instance_sort_key)
+@table('tab_tax_sweep.tex', CONSOLIDATED)
+def tax_sweep_table(index):
+    tax_rows = index.select(experiment='carbon_tax_sweep')
+    if not len(tax_rows):
+        return None
+    rates = sorted(set(float(r) for r in index.values('tax_rate', tax_rows)))
     header = "Instance & " + " & ".join(f"${r:g}$" for r in rates) + " & Red.\\,\\%\\\\"
-    rows = []
-    for inst in insts:
-        sub = tax[tax['instance_id'] == inst]
-        base = sub[sub['tax_rate'] == 0.0]['total_emissions']
-        base = float(base.iloc[0]) if len(base) else float('nan')
-        cells = []
-        red = float('nan')
-        for r in rates:
-            v = sub[sub['tax_rate'] == r]['total_emissions']
-            if len(v):
-                ev = float(v.iloc[0])
-                cells.append(fmt_emis(ev))
-                if r == rates[-1] and not math.isnan(base) and base > 0:
-                    red = (base - ev) / base * 100
-            else:
-                cells.append("--")
-        inst_esc = inst.replace('_', '\\_')
-        rows.append(f"{inst_esc} & " + " & ".join(cells) +
-                    f" & {fmt_num(red,1)} \\\\")
-    body = "\n".join(rows)
+
+    def rows():
+        for inst in sorted_instances(index, tax_rows):
+            sub = index.rows(experiment='carbon_tax_sweep', instance_id=inst, columns=['tax_rate', 'total_emissions'])
+            sub['tax_rate'] = sub['tax_rate'].astype(float)
+            base = sub[sub['tax_rate'] == 0.0]['total_emissions']
+            base = float(base.iloc[0]) if len(base) else float('nan')
+            cells = []
+            red = float('nan')
+            for r in rates:
+                v = sub[sub['tax_rate'] == r]['total_emissions']
+                if len(v):
+                    ev = float(v.iloc[0])
+                    cells.append(fmt_emis(ev))
+                    if r == rates[-1] and not math.isnan(base) and base > 0:
+                        red = (base - ev) / base * 100
+                else:
+                    cells.append("--")
+            inst_esc = inst.replace('_', '\\_')
+            yield f"{inst_esc} & " + " & ".join(cells) + f" & {fmt_num(red,1)} \\\\"
+
     colspec = "l" + "c" * (len(rates) + 1)
-    tex = (
+    head = (
         "\\begin{table*}[!htbp]\\centering\\scriptsize\n"
         "\\setlength{\\tabcolsep}{3pt}\n"
         "\\caption{Carbon tax sweep: total emissions (t\\,CO$_2$) per instance as the "
         "carbon price $EmisTax$ (EUR/tCO$_2$) increases; column headings report $EmisTax$ values.}"
         "\\label{tab:tax}\n"
-        f"\\begin{{tabular}}{{{colspec}}}\n\\toprule\n" + header + "\n\\midrule\n" +
-        body + "\n\\bottomrule\n\\end{tabular}\n\\end{table*}\n"
+        f"\\begin{{tabular}}{{{colspec}}}\n\\toprule\n" + header + "\n\\midrule\n"
     )
-    write('tab_tax_sweep.tex', tex)
+    return head, rows(), "\n\\bottomrule\n\\end{tabular}\n\\end{table*}\n"
 
 # ================================================================ 2B. PRICE THRESHOLD
-threshold = maybe_read_table_csv('carbon_price_threshold_results.csv')
-if not threshold.empty:
-    rows = []
-    for _, r in threshold.sort_values('instance_id', key=lambda s: s.map(instance_sort_key)).iterrows():
-        inst = str(r['instance_id']).replace('_', '\\_')
-        switched = str(r.get('switched_within_max', '0')).strip() in ['1', '1.0', 'true', 'True']
-        if switched:
-            interval = (
-                fmt_rate(r.get('threshold_lower_eur_per_tco2'))
-                + "--"
-                + fmt_rate(r.get('threshold_upper_eur_per_tco2'))
-            )
-        else:
-            interval = "$>" + fmt_rate(r.get('max_probe_rate')) + "$"
-        delta_cost = fmt_cost(r.get('delta_cost_without_tax'))
-        try:
-            emis_reduction = -float(r.get('delta_emissions_gco2')) / 1e6
-        except (TypeError, ValueError):
-            emis_reduction = float('nan')
-        rows.append(
-            f"{inst} & {interval} & {delta_cost} & {fmt_num(emis_reduction, 2)} \\\\"
-        )
-    body = "\n".join(rows)
-    tex = (
+@table('tab_price_threshold.tex', PRICE_THRESHOLD)
+def price_threshold_table(threshold):
+    if threshold.empty:
+        return None
+
+    def rows():
+        for _, r in threshold.sort_values('instance_id', key=lambda s: s.map(instance_sort_key)).iterrows():
+            inst = str(r['instance_id']).replace('_', '\\_')
+            switched = str(r.get('switched_within_max', '0')).strip() in ['1', '1.0', 'true', 'True']
+            if switched:
+                interval = (
+                    fmt_rate(r.get('threshold_lower_eur_per_tco2'))
+                    + "--"
+                    + fmt_rate(r.get('threshold_upper_eur_per_tco2'))
+                )
+            else:
+                interval = "$>" + fmt_rate(r.get('max_probe_rate')) + "$"
+            delta_cost = fmt_cost(r.get('delta_cost_without_tax'))
+            try:
+                emis_reduction = -float(r.get('delta_emissions_gco2')) / 1e6
+            except (TypeError, ValueError):
+                emis_reduction = float('nan')
+            yield f"{inst} & {interval} & {delta_cost} & {fmt_num(emis_reduction, 2)} \\\\"
+
+    head = (
         "\\begin{table*}[!htbp]\\centering\\scriptsize\n"
         "\\setlength{\\tabcolsep}{4pt}\n"
         "\\caption{Exploratory carbon-price switching-threshold diagnostic. The interval reports "
@@ -223,13 +267,16 @@ if not threshold.empty:
         "not proposed statutory taxes.}\\label{tab:pricethreshold}\n"
         "\\begin{tabular}{lccc}\n\\toprule\n"
         "Instance & Switching interval & $\\Delta$ cost & Emission reduction (t\\,CO$_2$)\\\\\n"
-        "\\midrule\n" + body + "\n\\bottomrule\n\\end{tabular}\n\\end{table*}\n"
+        "\\midrule\n"
     )
-    write('tab_price_threshold.tex', tex)
+    return head, rows(), "\n\\bottomrule\n\\end{tabular}\n\\end{table*}\n"
 
 # ================================================================ 3. CAP SWEEP
-cap = comparison_admissible(df[df['experiment'] == 'carbon_cap_sweep'].copy())
-if not cap.empty:
+@table('tab_cap_sweep.tex', CONSOLIDATED)
+def cap_sweep_table(index):
+    cap = index.rows(experiment='carbon_cap_sweep')
+    if cap.empty:
+        return None
     # cap level expressed as % of baseline; recover from cap_value vs baseline_emissions
     insts = sorted(cap['instance_id'].unique(), key=instance_sort_key)
     # Determine cap percentages present (round cap_value/baseline)
@@ -244,9 +291,11 @@ if not cap.empty:
         return None
     cap['cap_pct'] = cap.apply(cap_pct, axis=1)
     pcts = sorted([p for p in cap['cap_pct'].dropna().unique()], reverse=True)
-    if pcts:
-        header = "Instance & " + " & ".join(f"{int(p)}\\%" for p in pcts) + "\\\\"
-        rows = []
+    if not pcts:
+        return None
+    header = "Instance & " + " & ".join(f"{int(p)}\\%" for p in pcts) + "\\\\"
+
+    def rows():
         for inst in insts:
             sub = cap[cap['instance_id'] == inst]
             cells = []
@@ -254,36 +303,38 @@ if not cap.empty:
                 v = sub[sub['cap_pct'] == p]['total_cost_with_tax']
                 cells.append(fmt_cost(v.iloc[0]) if len(v) else "--")
             inst_esc = inst.replace('_', '\\_')
-            rows.append(f"{inst_esc} & " + " & ".join(cells) + " \\\\")
-        body = "\n".join(rows)
-        colspec = "l" + "c" * len(pcts)
-        tex = (
-            "\\begin{table*}[!htbp]\\centering\\scriptsize\n"
-            "\\setlength{\\tabcolsep}{3pt}\n"
-            "\\caption{Carbon cap sweep: total cost per instance as the emission cap "
-            "tightens from 100\\% to 70\\% of the baseline emissions.}\\label{tab:cap}\n"
-            f"\\begin{{tabular}}{{{colspec}}}\n\\toprule\n" + header + "\n\\midrule\n" +
-            body + "\n\\bottomrule\n\\end{tabular}\n\\end{table*}\n"
-        )
-        write('tab_cap_sweep.tex', tex)
+            yield f"{inst_esc} & " + " & ".join(cells) + " \\\\"
+
+    colspec = "l" + "c" * len(pcts)
+    head = (
+        "\\begin{table*}[!htbp]\\centering\\scriptsize\n"
+        "\\setlength{\\tabcolsep}{3pt}\n"
+        "\\caption{Carbon cap sweep: total cost per instance as the emission cap "
+        "tightens from 100\\% to 70\\% of the baseline emissions.}\\label{tab:cap}\n"
+        f"\\begin{{tabular}}{{{colspec}}}\n\\toprule\n" + header + "\n\\midrule\n"
+    )
+    return head, rows(), "\n\\bottomrule\n\\end{tabular}\n\\end{table*}\n"
 
 # ================================================================ 4. HYBRID
-hyb = df[df['experiment'] == 'carbon_hybrid'].copy()
-if not hyb.empty:
-    rows = []
-    hyb['_instance_sort_key'] = hyb['instance_id'].map(instance_sort_key)
-    for _, r in hyb.sort_values(['_instance_sort_key', 'tax_rate', 'cap_value']).iterrows():
-        cap_level = str(r.get('cap_level', '')).strip().lower()
-        cap_display = "No cap" if cap_level == "none" else fmt_emis(r['cap_value'])
-        status = str(r.get('solver_status', 'UNKNOWN')).strip().upper().replace('_', '\\_')
-        buffer_count = fmt_num(r.get('buffer_count'), 0)
-        rows.append(
-            f"{str(r['instance_id']).replace('_',chr(92)+'_')} & {fmt_num(r['tax_rate'],2)} & "
-            f"{cap_display} & {fmt_emis(r['total_emissions'])} & "
-            f"{fmt_cost(r['total_cost_with_tax'])} & {buffer_count} & {status} \\\\"
-        )
-    body = "\n".join(rows)
-    tex = (
+@table('tab_hybrid.tex', HYBRID_ROWS)
+def hybrid_table(listing):
+    if not listing.rows:
+        return None
+
+    def rows():
+        for r in (record for inst in sorted(listing.instances(), key=instance_sort_key)
+                  for record in listing.frame(inst).sort_values(['tax_rate', 'cap_value']).to_dict('records')):
+            cap_level = str(r.get('cap_level', '')).strip().lower()
+            cap_display = "No cap" if cap_level == "none" else fmt_emis(r['cap_value'])
+            status = str(r.get('solver_status', 'UNKNOWN')).strip().upper().replace('_', '\\_')
+            buffer_count = fmt_num(r.get('buffer_count'), 0)
+            yield (
+                f"{str(r['instance_id']).replace('_',chr(92)+'_')} & {fmt_num(r['tax_rate'],2)} & "
+                f"{cap_display} & {fmt_emis(r['total_emissions'])} & "
+                f"{fmt_cost(r['total_cost_with_tax'])} & {buffer_count} & {status} \\\\"
+            )
+
+    head = (
         "\\begingroup\\scriptsize\n"
         "\\setlength{\\tabcolsep}{3pt}\n"
         "\\begin{longtable}{lcccccc}\n"
@@ -297,32 +348,34 @@ if not hyb.empty:
         "\\midrule\n\\endhead\n"
         "\\midrule\n\\multicolumn{7}{r}{Continued on next page}\\\\\n\\endfoot\n"
         "\\bottomrule\n\\endlastfoot\n"
-        + body + "\n\\end{longtable}\n\\endgroup\n"
     )
-    write('tab_hybrid.tex', tex)
+    return head, rows(), "\n\\end{longtable}\n\\endgroup\n"
 
 # ================================================================ 4B. DECISION STABILITY
-stability = maybe_read_table_csv('decision_stability_summary.csv')
-if not stability.empty:
-    rows = []
+@table('tab_decision_stability.tex', DECISION_STABILITY)
+def decision_stability_table(stability):
+    if stability.empty:
+        return None
     source_labels = {
         'carbon_tax_sweep': 'tax',
         'carbon_cap_sweep': 'cap',
         'carbon_hybrid': 'hybrid',
     }
-    stability['_instance_sort_key'] = stability['instance_id'].map(instance_sort_key)
-    for _, r in stability.sort_values(['_instance_sort_key', 'source_experiment', 'tax_rate']).iterrows():
-        source = source_labels.get(str(r['source_experiment']), str(r['source_experiment']))
-        rows.append(
-            f"{str(r['instance_id']).replace('_',chr(92)+'_')} & "
-            f"{source.replace('_',chr(92)+'_')} & "
-            f"{fmt_num(r.get('tax_rate'), 2)} & {str(r.get('cap_level', '--')).replace('%', chr(92)+'%')} & "
-            f"{fmt_num(r.get('minimum_buffer_jaccard_similarity'), 2)} & "
-            f"{fmt_num(r.get('minimum_supplier_jaccard_similarity'), 2)} & "
-            f"{fmt_num(r.get('maximum_allocation_l1_normalized'), 2)} \\\\"
-        )
-    body = "\n".join(rows)
-    tex = (
+    stability = stability.assign(_instance_sort_key=stability['instance_id'].map(instance_sort_key))
+
+    def rows():
+        for _, r in stability.sort_values(['_instance_sort_key', 'source_experiment', 'tax_rate']).iterrows():
+            source = source_labels.get(str(r['source_experiment']), str(r['source_experiment']))
+            yield (
+                f"{str(r['instance_id']).replace('_',chr(92)+'_')} & "
+                f"{source.replace('_',chr(92)+'_')} & "
+                f"{fmt_num(r.get('tax_rate'), 2)} & {str(r.get('cap_level', '--')).replace('%', chr(92)+'%')} & "
+                f"{fmt_num(r.get('minimum_buffer_jaccard_similarity'), 2)} & "
+                f"{fmt_num(r.get('minimum_supplier_jaccard_similarity'), 2)} & "
+                f"{fmt_num(r.get('maximum_allocation_l1_normalized'), 2)} \\\\"
+            )
+
+    head = (
         "\\begin{table*}[!htbp]\\centering\\scriptsize\n"
         "\\setlength{\\tabcolsep}{3pt}\n"
         "\\caption{Near-optimal decision-degeneracy diagnostic probes. Each row summarizes extremal alternatives "
@@ -330,73 +383,77 @@ if not stability.empty:
         "class is assigned.}\\label{tab:stability}\n"
         "\\begin{tabular}{llccccc}\n\\toprule\n"
         "Instance & Source & Tax & Cap & Buf. J & Sup. J & Alloc. L1\\\\\n"
-        "\\midrule\n" + body + "\n\\bottomrule\n\\end{tabular}\n\\end{table*}\n"
+        "\\midrule\n"
     )
-    write('tab_decision_stability.tex', tex)
+    return head, rows(), "\n\\bottomrule\n\\end{tabular}\n\\end{table*}\n"
 
 # ================================================================ 6. PARETO FRONTS
-def pareto_table(front, xcol, xfmt, xhead, caption, label, fname):
-    pdir = os.path.join(results_dir, 'pareto')
-    files = sorted(glob.glob(os.path.join(pdir, '*_' + front + '_pareto.csv')),
-                   key=lambda f: instance_sort_key(os.path.basename(f).replace('_' + front + '_pareto.csv', '')))
-    if not files:
-        return
-    rows = []
-    for f in files:
-        inst = os.path.basename(f).replace('_' + front + '_pareto.csv', '')
-        try:
-            pf = pd.read_csv(f, sep=';')
-        except Exception:
-            continue
-        if pf.empty:
-            continue
-        rows.append("\\multicolumn{3}{l}{\\textit{" + inst.replace('_', '\\_') + "}} \\\\")
-        seen = set()
-        for _, r in pf.iterrows():
-            key = (round(float(r[xcol]), 3), round(float(r['Cost']), 1))
-            if key in seen:
+def pareto_table(fronts, xcol, xfmt, xhead, caption, label):
+    if not fronts:
+        return None
+
+    def rows():
+        first = True
+        for inst, pf in fronts:
+            if pf is None or pf.empty:
                 continue
-            seen.add(key)
-            rows.append(" & " + xfmt(r[xcol]) + " & " + fmt_cost(r['Cost']) + " \\\\")
-        rows.append("\\midrule")
-    if rows and rows[-1] == "\\midrule":
-        rows = rows[:-1]
-    body = "\n".join(rows)
-    tex = (
+            # A rule separates consecutive instances.
+            if not first:
+                yield "\\midrule"
+            first = False
+            yield "\\multicolumn{3}{l}{\\textit{" + inst.replace('_', '\\_') + "}} \\\\"
+            seen = set()
+            for _, r in pf.iterrows():
+                key = (round(float(r[xcol]), 3), round(float(r['Cost']), 1))
+                if key in seen:
+                    continue
+                seen.add(key)
+                yield " & " + xfmt(r[xcol]) + " & " + fmt_cost(r['Cost']) + " \\\\"
+
+    head = (
         "\\begin{table}[!htbp]\\centering\\small\n"
         "\\caption{" + caption + "}\\label{" + label + "}\n"
         "\\begin{tabular}{lcc}\n\\toprule\n"
         "Instance & " + xhead + " & Cost\\\\\n"
-        "\\midrule\n" + body + "\n\\bottomrule\n\\end{tabular}\n\\end{table}\n"
+        "\\midrule\n"
     )
-    write(fname, tex)
+    return head, rows(), "\n\\bottomrule\n\\end{tabular}\n\\end{table}\n"
+
+@table('tab_pareto_emis.tex', PARETO_EMISSIONS)
+def pareto_emissions_table(fronts):
+    return pareto_table(fronts, 'Emissions', fmt_emis, 'Emissions (t\\,CO$_2$)',
+                        'Cost--emissions Pareto points obtained by the $\\varepsilon$-constraint method.',
+                        'tab:paretoemis')
 
-pareto_table('cost_emissions', 'Emissions', fmt_emis, 'Emissions (t\\,CO$_2$)',
-             'Cost--emissions Pareto points obtained by the $\\varepsilon$-constraint method.',
-             'tab:paretoemis', 'tab_pareto_emis.tex')
-pareto_table('cost_dio', 'DIO', lambda x: f"{float(x):.0f}", 'DIO (days)',
-             'Cost--DIO Pareto points obtained by the $\\varepsilon$-constraint method.',
-             'tab:paretodio', 'tab_pareto_dio.tex')
+@table('tab_pareto_dio.tex', PARETO_DIO)
+def pareto_dio_table(fronts):
+    return pareto_table(fronts, 'DIO', lambda x: f"{float(x):.0f}", 'DIO (days)',
+                        'Cost--DIO Pareto points obtained by the $\\varepsilon$-constraint method.',
+                        'tab:paretodio')
 
 # ================================================================ 5. PLM vs NLM
-nlm = comparison_admissible(df[df['experiment'] == 'nlm_comparison'].copy())
-if not nlm.empty:
-    insts = sorted(nlm['instance_id'].unique(), key=instance_sort_key)
-    rows = []
-    for inst in insts:
-        for strat in sorted(nlm[nlm['instance_id'] == inst]['strategy'].unique()):
-            sub = nlm[(nlm['instance_id'] == inst) & (nlm['strategy'] == strat)]
-            plm = sub[sub['model_type'] == 'PLM']
-            nl = sub[sub['model_type'] == 'NLM']
-            def g(d, col):
-                return d[col].iloc[0] if len(d) else float('nan')
-            rows.append(
-                f"{inst.replace('_',chr(92)+'_')} & {strat} & "
-                f"{fmt_cost(g(plm,'total_cost_with_tax'))} & {fmt_num(g(plm,'runtime_sec'),2)} & "
-                f"{fmt_cost(g(nl,'total_cost_with_tax'))} & {fmt_num(g(nl,'runtime_sec'),2)} \\\\"
-            )
-    body = "\n".join(rows)
-    tex = (
+@table('tab_plm_nlm.tex', CONSOLIDATED)
+def plm_nlm_table(index):
+    nlm_rows = index.select(experiment='nlm_comparison')
+    if not len(nlm_rows):
+        return None
+
+    def g(d, col):
+        return d[col].iloc[0] if len(d) else float('nan')
+
+    def rows():
+        for inst in sorted_instances(index, nlm_rows):
+            for strat in sorted(index.values('strategy', index.select(experiment='nlm_comparison', instance_id=inst))):
+                where = dict(experiment='nlm_comparison', instance_id=inst, strategy=strat)
+                plm = index.rows(model_type='PLM', **where)
+                nl = index.rows(model_type='NLM', **where)
+                yield (
+                    f"{inst.replace('_',chr(92)+'_')} & {strat} & "
+                    f"{fmt_cost(g(plm,'total_cost_with_tax'))} & {fmt_num(g(plm,'runtime_sec'),2)} & "
+                    f"{fmt_cost(g(nl,'total_cost_with_tax'))} & {fmt_num(g(nl,'runtime_sec'),2)} \\\\"
+                )
+
+    head = (
         "\\begin{table}[!htbp]\\centering\\small\n"
         "\\caption{Pseudo-linear (PLM) versus non-linear (NLM) model: cost and runtime. "
         "The NLM solve time is bounded to 300\\,s.}\\label{tab:plmnlm}\n"
@@ -404,8 +461,77 @@ if not nlm.empty:
         " & & \\multicolumn{2}{c}{PLM} & \\multicolumn{2}{c}{NLM}\\\\\n"
         "\\cmidrule(lr){3-4}\\cmidrule(lr){5-6}\n"
         "Instance & Strategy & Cost & RT (s) & Cost & RT (s)\\\\\n"
-        "\\midrule\n" + body + "\n\\bottomrule\n\\end{tabular}\n\\end{table}\n"
+        "\\midrule\n"
     )
-    write('tab_plm_nlm.tex', tex)
+    return head, rows(), "\n\\bottomrule\n\\end{tabular}\n\\end{table}\n"
+
+# ---------------------------------------------------------------- build
+def write_fragment(path, fragment):
+    """Stream head, rows and foot to path; the number of rows written."""
+    head, rows, foot = fragment
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(head)
+        for row in rows:
+            if count:
+                f.write("\n")
+            f.write(row)
+            count += 1
+        f.write(foot)
+    return count
+
+def build_table(name, builder, datasets, out_dir):
+    """Build and write one fragment: (name, rows or None when not written, seconds)."""
+    start = time.perf_counter()
+    fragment = builder(*datasets)
+    rows = write_fragment(os.path.join(out_dir, name), fragment) if fragment is not None else None
+    return name, rows, time.perf_counter() - start
+
+def build_tables(inputs, out_dir, names=None, workers=4):
+    """Build the registered fragments (all, or names) concurrently; one report per fragment."""
+    selected = {name: TABLE_BUILDERS[name] for name in (names or TABLE_BUILDERS)}
+    needed = sorted({dataset for _, declared in selected.values() for dataset in declared})
+    workers = max(1, workers)
+    with ThreadPoolExecutor(max_workers=min(workers, len(needed) or 1)) as pool:
+        datasets = dict(zip(needed, pool.map(inputs.load, needed)))
+    with ThreadPoolExecutor(max_workers=min(workers, len(selected) or 1)) as pool:
+        futures = [pool.submit(build_table, name, builder, [datasets[d] for d in declared], out_dir)
+                   for name, (builder, declared) in selected.items()]
+        return [future.result() for future in futures]
+
+def latest_campaign():
+    base = os.path.join(os.path.dirname(__file__), '..', 'logs')
+    cands = sorted(glob.glob(os.path.join(base, 'final_campaign_*')),
+                   key=os.path.getmtime)
+    return cands[-1] if cands else None
+
+def main():
+    parser = argparse.ArgumentParser(description='LaTeX table fragments of a final campaign')
+    parser.add_argument('results_dir', nargs='?', help='results directory or campaign archive (default: latest)')
+    parser.add_argument('--chunksize', type=int, help='scan consolidated_results.csv in chunks of this many rows')
+    parser.add_argument('--workers', type=int, default=4, help='tables built concurrently')
+    parser.add_argument('--tables', nargs='+', choices=list(TABLE_BUILDERS), help='build only these fragments')
+    args = parser.parse_args()
+    results_dir = args.results_dir or latest_campaign()
+    if not results_dir:
+        print("No final_campaign_* directory found.")
+        return 1
+
+    results_dir = os.path.abspath(results_dir)
+    inputs = CampaignInputs(results_dir, args.chunksize)
+    if inputs.archive:
+        out_dir = os.path.join(str(unpacked_dir(results_dir)), 'tables_tex')
+    else:
+        out_dir = os.path.join(results_dir, 'tables_tex')
+    os.makedirs(out_dir, exist_ok=True)
+    print(f"Writing LaTeX tables to {out_dir}")
+
+    start = time.perf_counter()
+    for name, rows, seconds in build_tables(inputs, out_dir, args.tables, args.workers):
+        if rows is not None:
+            print(f"  wrote {name}: {rows} rows in {seconds:.3f}s")
+    print(f"Done in {time.perf_counter() - start:.3f}s.")
+    return 0
 
-print("Done.")
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import tempfile
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from BomStructureReducer import (
+    BomStructure,
+    BomStructureReducer,
+    apply_constraints,
+    expand_solution,
+    symmetry_constraints,
+    twin_mapping,
+)
+
+
+def node(ind, parent, t_process, unit_price, rqtf=1):
+    return {
+        "ind": ind, "t_process": t_process, "parent": parent, "unit_price": unit_price,
+        "rqtf": rqtf, "aih_cost": 0.25, "var_factor": 0.5, "lt_factor": 0.8, "cycle": 1,
+        "minOrder": 0, "facility_emis": 10 * unit_price, "inventory_emis": unit_price,
+        "trsp_emis": 0 if ind == 0 else 1500,
+    }
+
+
+# 0 -> 1 -> {2, 3, 6}; 2 -> 4 and 3 -> 5 are identical branches, 6 differs.
+bom = pd.DataFrame([
+    node(0, -1, 0, 0, rqtf=0),
+    node(1, 0, 2, 700),
+    node(2, 1, 4, 165),
+    node(3, 1, 4, 165),
+    node(4, 2, 3, 25, rqtf=6),
+    node(5, 3, 3, 25, rqtf=6),
+    node(6, 1, 6, 100, rqtf=2),
+])
+eligibility = {4: [1, 2, 3], 5: [3, 2, 1, 15], 6: [1, 2, 3]}
+structure = BomStructure(bom, eligibility, nb_supp=10)
+
+assert structure.chains() == [[0, 1], [2, 4], [3, 5]]
+assert structure.symmetric_groups() == [[2, 3]]
+assert twin_mapping(structure) == {3: 2, 5: 4}
+
+# Different eligible suppliers break the symmetry.
+asymmetric = BomStructure(bom, {4: [1, 2], 5: [1, 3], 6: [1]}, nb_supp=10)
+assert asymmetric.symmetric_groups() == []
+
+tax_lines = symmetry_constraints(structure, "EMISTAXE")
+assert tax_lines[0] == "ct_sym_root: x[0] == 0;"
+assert "ct_sym_x_3: x[3] == x[2];" in tax_lines
+assert "ct_sym_a_5: a[5] == a[4];" in tax_lines
+cap_lines = symmetry_constraints(structure, "EMISCAP")
+assert cap_lines == ["ct_sym_root: x[0] == 0;", "ct_sym_order_3: x[2] >= x[3];"]
+
+model = "minimize TotalCostTS+dlts;\n subject to {\n \tct3: a[0]<=service_t;\n }"
+patched = apply_constraints(model, cap_lines)
+assert patched.index("ct_sym_order_3") < patched.index("ct3:")
+assert apply_constraints(model, []) == model
+
+mapping = twin_mapping(structure)
+assert expand_solution([0, 1, 1, 0, 0, 1, 1], mapping) == [0, 1, 1, 1, 0, 0, 1]
+z = [0] * 14
+z[4 * 2 + 1] = 1
+expanded = expand_solution(z, mapping, nb_supp=2)
+assert expanded[5 * 2 + 1] == 1 and sum(expanded) == 2
+
+# Orphan parents (bom_50 references a missing node) become separate roots.
+orphan = BomStructure(pd.concat([bom, pd.DataFrame([node(7, 67, 2, 30)])], ignore_index=True))
+assert 7 in orphan.roots and 7 in orphan.hashes
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    reducer = BomStructureReducer(temp_dir)
+    rows = reducer.reduce({"id": "bom_par2", "file": "bom_supemis_par2.csv", "nodes": 9})
+    assert [row["strategy"] for row in rows] == ["EMISTAXE", "EMISCAP", "EMISHYBRID"]
+    assert rows[0]["nodes"] == 10 and rows[0]["constraints"] >= 1
+
+    # The validation cap is 90% of the real tax-0 emissions even when #E is clamped
+    # (recorded SCAL-150 output: #E 2147483647, #Result emissions 2.508e+10).
+    log = (repo / "logs" / "final_campaign_20260118_134900" / "logs" / "SCAL-150.log").read_text(encoding="utf-8")
+    recorded = Path(temp_dir) / "scal150.out"
+    recorded.write_text(log.split("[_raw_output] => \n", 1)[1].rsplit("\n)", 1)[0], encoding="utf-8")
+    caps = Path(temp_dir) / "caps.txt"
+    oplrun = Path(temp_dir) / "oplrun"
+    oplrun.write_text(
+        f"#!{sys.executable}\nimport re, sys\n"
+        f"cap = re.search(r'float EmisCap = (.*);', open(sys.argv[1]).read())\n"
+        f"open({str(caps)!r}, 'a').write(cap.group(1) + '\\n' if cap else '')\n"
+        f"sys.stdout.write(open({str(recorded)!r}).read())\n", encoding="utf-8")
+    oplrun.chmod(0o755)
+    result = reducer.validate({"id": "bom_150", "file": "bom_supemis_150.csv", "nodes": 150}, "EMISCAP",
+                              cap_lines, str(oplrun))
+    # The free tax-0 run, then the original and reduced cap models.
+    assert [float(cap) for cap in caps.read_text().split()] == [0.0] + [0.9 * 2.508e10] * 2
+    assert result["objective_match"] == 1
+
+print("BOM structure reduction tests passed.")
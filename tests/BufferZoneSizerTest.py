@@ -0,0 +1,56 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from BufferZoneSizer import BufferZoneSizer
+from SupplierDominancePruner import ADUP
+
+
+source = repo / "logs" / "final_campaign_20260605_061305"
+run_ids = ["TAX-bom_5-0.00", "CAP-bom_5-75", "SCAL-035"]
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    campaign = Path(temp_dir) / "final_campaign_test"
+    (campaign / "logs").mkdir(parents=True)
+    results = pd.read_csv(source / "consolidated_results.csv")
+    results[results["run_id"].isin(run_ids)].to_csv(campaign / "consolidated_results.csv", index=False)
+    for run_id in run_ids:
+        shutil.copy(source / "logs" / f"{run_id}.log", campaign / "logs")
+
+    buffers, runs = BufferZoneSizer(campaign).tables()
+    runs = runs.set_index("run_id")
+    assert sorted(runs.index) == sorted(run_ids)
+    stored = results.drop_duplicates("run_id", keep="last").set_index("run_id")
+    assert (runs["buffers"] == stored.loc[runs.index, "buffer_count"]).all()
+
+    # Node 1 of bom_5: rqtf 1, lt_factor 0.8, var_factor 0.5, cycle 1, minOrder 0, unit_price 700.
+    node = buffers[(buffers["run_id"] == "TAX-bom_5-0.00") & (buffers["node"] == 1)].iloc[0]
+    adu, dlt = ADUP * 1, node["DLT"]
+    assert node["ADU"] == adu and dlt == 2
+    assert np.isclose(node["red_base"], adu * dlt * 0.8) and np.isclose(node["red_safety"], node["red_base"] * 0.5)
+    assert np.isclose(node["yellow"], adu * dlt) and np.isclose(node["green"], max(adu * dlt * 0.8, adu))
+    assert np.isclose(node["top_of_green"], node[["red_base", "red_safety", "yellow", "green"]].sum())
+    assert np.isclose(node["avg_on_hand_value"], 700 * (node["red_base"] + node["red_safety"] + node["green"] / 2))
+
+    # avg_on_hand is the model's holding base unless the order cycle sets the green zone.
+    assert abs(runs.loc["TAX-bom_5-0.00", "model_gap"]) < 1e-6 and abs(runs.loc["CAP-bom_5-75", "model_gap"]) < 1e-6
+    assert runs.loc["SCAL-035", "model_gap"] > 0
+    per_run = buffers.groupby("run_id")["avg_on_hand_value"].sum()
+    assert np.allclose(per_run.loc[runs.index], runs["working_capital"])
+
+    tool = repo / "src" / "BufferZoneSizer.py"
+    done = subprocess.run([sys.executable, str(tool), str(campaign)], capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    written = pd.read_csv(campaign / "buffer_working_capital.csv")
+    assert len(written) == len(run_ids) and len(pd.read_csv(campaign / "buffer_zones.csv")) == len(buffers)
+
+print("Buffer zone sizing tests passed.")
@@ -0,0 +1,106 @@
+import tempfile
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from CampaignArchive import CampaignArchive, is_archive, pack_campaign, parse_vectors, unpacked_dir
+from GraphGenerator import GraphGenerator
+
+
+LOG = """Array
+(
+    [CplexRunTime] => 0.16 sec
+    [status] => OPTIMAL
+    [Result] => Array
+        (
+            [Objective] => 48640
+        )
+
+    [A] => Array
+        (
+            [0] => 1
+            [1] => 2
+            [2] => 5
+        )
+
+    [X] => Array
+        (
+            [0] => 0
+            [1] => 1
+            [2] => 0
+        )
+
+    [E] => 2932200
+    [_raw_output] =>
+<<< solve
+Total (root+branch&cut) =    0,16 sec. \xe9
+)
+"""
+
+assert parse_vectors(LOG) == {"A": [1.0, 2.0, 5.0], "X": [0.0, 1.0, 0.0]}
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    results_dir = Path(temp_dir) / "final_campaign_20260101_000000"
+    for folder in ("logs", "tables", "pareto", "figures"):
+        (results_dir / folder).mkdir(parents=True)
+    consolidated = "experiment,run_id,instance_id,tax_rate,cap_level,total_emissions,solver_status\n" \
+                   "scalability,SCAL-005,bom_5,0,none,2932200,OPTIMAL\n" \
+                   "carbon_tax_sweep,TAX-bom_5-50.00,bom_5,50,,,INFEASIBLE\n"
+    (results_dir / "consolidated_results.csv").write_text(consolidated, encoding="utf-8")
+    (results_dir / "tables" / "scalability_results.csv").write_text(consolidated, encoding="utf-8")
+    (results_dir / "pareto" / "bom_5_cost_dio_pareto.csv").write_text("Cost;DIO\n48640;31\n", encoding="utf-8")
+    (results_dir / "logs" / "SCAL-005.log").write_bytes(LOG.encode("latin-1"))
+    for i in range(3):
+        (results_dir / "logs" / f"TAX-bom_5-{i}.log").write_text(LOG.replace("48640", str(i)), encoding="utf-8")
+    (results_dir / "figures" / "fig1.png").write_bytes(b"\x89PNG raster")
+    (results_dir / "figures" / "fig1.pdf").write_bytes(b"%PDF-1.4 vector")
+
+    # A tiny block size spreads the logs over several LZMA blocks.
+    summary = pack_campaign(results_dir, block_bytes=600)
+    path = summary["archive"]
+    assert path.name == "final_campaign_20260101_000000.campaign.zip" and is_archive(path)
+    assert not is_archive(results_dir) and unpacked_dir(path) == results_dir
+    assert summary["omitted"] == 1 and summary["runs"] == 5
+
+    with CampaignArchive(path) as archive:
+        assert len(archive.manifest["blocks"]) > 1
+        assert archive.read_bytes("logs/SCAL-005.log") == LOG.encode("latin-1")
+        assert "�" in archive.log_text("SCAL-005")
+        assert archive.exists("pareto") and not archive.exists("figures/fig1.png")
+        assert archive.glob("pareto/*_pareto.csv") == ["pareto/bom_5_cost_dio_pareto.csv"]
+        pd.testing.assert_frame_equal(archive.read_csv("consolidated_results.csv"),
+                                      pd.read_csv(results_dir / "consolidated_results.csv"))
+        assert archive.read_csv("pareto/bom_5_cost_dio_pareto.csv", sep=";")["DIO"].tolist() == [31]
+
+        vectors = archive.vectors("TAX-bom_5-1")
+        assert vectors["A"].tolist() == [1.0, 2.0, 5.0] and "Z" not in vectors
+        assert archive.row("SCAL-005")["total_emissions"] == 2932200
+        assert archive.row("TAX-bom_5-0") is None
+        assert archive.vectors("TAX-bom_5-50.00") == {} and archive.log_text("TAX-bom_5-50.00") is None
+
+        restored = Path(temp_dir) / "restored"
+        assert archive.extract(restored) == 8
+        for original in results_dir.rglob("*"):
+            if original.is_file() and original.suffix != ".png":
+                assert (restored / original.relative_to(results_dir)).read_bytes() == original.read_bytes()
+
+    # GraphGenerator reads the archive in place and writes next to it.
+    generator = GraphGenerator(str(path))
+    assert generator.figures_dir == results_dir / "figures"
+    assert len(generator.consolidated_df) == 2 and len(generator.scalability_df) == 2
+    assert generator._glob("pareto/*_pareto.csv") == [Path("pareto/bom_5_cost_dio_pareto.csv")]
+    generator.archive.close()
+
+    # The unpacked directory lists its files in the archive's order.
+    for name in ("bom_9_cost_dio_pareto.csv", "bom_10_cost_dio_pareto.csv"):
+        (results_dir / "pareto" / name).write_text("Cost;DIO\n48640;31\n", encoding="utf-8")
+    assert GraphGenerator(str(results_dir))._glob("pareto/*_pareto.csv") == [
+        Path("pareto/bom_10_cost_dio_pareto.csv"), Path("pareto/bom_5_cost_dio_pareto.csv"),
+        Path("pareto/bom_9_cost_dio_pareto.csv")]
+
+print("Campaign archive tests passed.")
@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from CampaignArchive import pack_campaign
+from CampaignDiff import DEFAULT_FAIL_ON, CampaignResults, diff_results, summarize
+
+
+def log(x):
+    lines = "\n".join(f"            [{i}] => {v}" for i, v in enumerate(x))
+    return f"Array\n(\n    [status] => OPTIMAL\n    [X] => Array\n        (\n{lines}\n        )\n\n)\n"
+
+
+def campaign(root, name, rows, logs):
+    results_dir = Path(root) / name
+    (results_dir / "logs").mkdir(parents=True)
+    pd.DataFrame(rows, columns=["experiment", "run_id", "instance_id", "strategy", "solver_status",
+                                "objective_value", "runtime_sec", "mip_gap", "comparison_admissible"]
+                 ).to_csv(results_dir / "consolidated_results.csv", index=False)
+    for run_id, x in logs.items():
+        (results_dir / "logs" / f"{run_id}.log").write_text(log(x), encoding="utf-8")
+    return results_dir
+
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    old = campaign(temp_dir, "final_campaign_old", [
+        ["scalability", "SCAL-005", "bom_5", "EMISTAXE", "OPTIMAL", 48640, 0.2, 0, 1],
+        ["scalability", "SCAL-013", "bom_13", "EMISTAXE", "OPTIMAL", 117610, 4.0, 0, 1],
+        ["scalability", "SCAL-050", "bom_50", "EMISTAXE", "FEASIBLE", 2123100, 300, 0.5, 1],
+        ["carbon_tax_sweep", "TAX-bom_5-50.00", "bom_5", "EMISTAXE", "OPTIMAL", 48412, 0.1, 0, 1],
+        ["carbon_cap_sweep", "CAP-bom_5-70", "bom_5", "EMISCAP", "INFEASIBLE", None, 0.1, None, 0],
+    ], {"SCAL-005": [0, 1, 1], "SCAL-013": [0, 1, 0], "TAX-bom_5-50.00": [0, 1, 1]})
+    new = campaign(temp_dir, "final_campaign_new", [
+        ["scalability", "SCAL-005", "bom_5", "EMISTAXE", "OPTIMAL", 48640.001, 0.9, 0, 1],
+        ["scalability", "SCAL-013", "bom_13", "EMISTAXE", "OPTIMAL", 117610, 9.5, 0, 1],
+        ["scalability", "SCAL-050", "bom_50", "EMISTAXE", "FEASIBLE", 2100000, 300, 1.5, 0],
+        ["carbon_tax_sweep", "TAX-bom_5-50.00", "bom_5", "EMISTAXE", "OPTIMAL", 48412, 0.1, 0, 1],
+        ["carbon_cap_sweep", "CAP-bom_5-80", "bom_5", "EMISCAP", "OPTIMAL", 50000, 0.1, 0, 1],
+    ], {"SCAL-005": [0, 1, 1], "SCAL-013": [0, 0, 1], "TAX-bom_5-50.00": [0, 1, 1]})
+
+    diff = diff_results(CampaignResults(old), CampaignResults(new)).set_index("run_id")
+    # A tiny objective change is within tolerance; 0.2 -> 0.9 s is below the 1 s floor.
+    assert diff.loc["SCAL-005", "flags"] == ""
+    assert diff.loc["SCAL-013", "flags"] == "RUNTIME_REGRESSION|DECISION_CHANGED"
+    assert diff.loc["SCAL-013", "decision_changes"] == "X"
+    assert diff.loc["SCAL-050", "flags"] == "OBJECTIVE_CHANGED|ADMISSIBILITY_LOST"
+    assert diff.loc["CAP-bom_5-70", "flags"] == "RUN_MISSING"
+    assert diff.loc["CAP-bom_5-80", "flags"] == "RUN_ADDED"
+    assert diff.loc["CAP-bom_5-80", "experiment"] == "carbon_cap_sweep"
+
+    summary = summarize(diff.reset_index(), DEFAULT_FAIL_ON)
+    assert summary["failed"] and summary["runs_compared"] == 4
+    assert summary["counts"]["DECISION_CHANGED"] == 1 and len(summary["runs"]) == 4
+
+    # Archives are read in place, decisions included.
+    archive = pack_campaign(new)["archive"]
+    same = diff_results(CampaignResults(new), CampaignResults(archive))
+    assert (same["flags"] == "").all()
+
+    tool = repo / "src" / "CampaignDiff.py"
+    report = Path(temp_dir) / "diff.json"
+    gated = subprocess.run([sys.executable, str(tool), str(old), str(new), str(archive),
+                            "--output", str(report)], capture_output=True, text=True)
+    assert gated.returncode == 1
+    comparisons = json.loads(report.read_text(encoding="utf-8"))["comparisons"]
+    assert len(comparisons) == 2 and not comparisons[1]["failed"]
+    relaxed = subprocess.run([sys.executable, str(tool), str(old), str(new), "--output", str(report),
+                              "--fail-on", "STATUS_CHANGED"], capture_output=True, text=True)
+    assert relaxed.returncode == 0
+
+print("Campaign diff tests passed.")
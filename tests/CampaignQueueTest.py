@@ -0,0 +1,260 @@
+import csv
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from CampaignQueue import (
+    CAMPAIGN_CONFIG_FILE,
+    KPI_COLUMNS,
+    CampaignPlan,
+    CampaignQueue,
+    QueueWorker,
+    jobs_from_configs,
+    non_binding_bounds,
+    run_kpis,
+)
+from RunOutput import admissible_status, parse_output, php_string, print_r
+
+
+source = repo / "logs" / "final_campaign_20260605_061305"
+taxes = [0.0, 15.0, 50.0, 75.0, 100.0]
+tool = repo / "src" / "CampaignQueue.py"
+
+
+def read_log(run_id):
+    return (source / "logs" / f"{run_id}.log").read_bytes().decode("utf-8", "surrogateescape")
+
+
+def raw_output(log):
+    marker = "    [_raw_output] => "
+    return log[log.index(marker) + len(marker):-len("\n)\n")]
+
+
+def config(tax):
+    return {"PREFIXE": f"TAX-bom_5-{tax:.2f}", "_NODE_FILE_": "bom_supemis_5.csv", "_NODE_SUPP_FILE_": "supp_list_5.csv",
+            "_SUPP_DETAILS_FILE_": "supp_details_supeco.csv", "_NBSUPP_": 10, "_SERVICE_T_": 1,
+            "_EMISCAP_": 2500000, "_EMISTAXE_": tax, "MODEL_FILE": "RUNS_SupEmis_Cplex_PLM_Tax.mod",
+            "MODEL_TYPE": "PLM", "EXPERIMENT": "carbon_tax_sweep", "TAX_RATE": tax, "CAP_LEVEL": "none"}
+
+
+# One admissibility rule for result dicts and table columns alike.
+assert admissible_status("OPTIMAL", None) and not admissible_status("FEASIBLE", None)
+assert admissible_status("FEASIBLE", 0.5) and not admissible_status("FEASIBLE", 0.5, gap_threshold=0.1)
+assert admissible_status(pd.Series(["OPTIMAL", "FEASIBLE", "FEASIBLE", "TIMEOUT"]),
+                         pd.Series([None, 2.0, float("nan"), 0.0], dtype=float)).tolist() == [True, False, False, False]
+
+# The logs are written exactly as FinalCampaignRunner writes them, for every model family.
+for run_id in ["TAX-bom_5-15.00", "CAP-bom_13-100-STAB-BUFFERS", "SCAL-005", "COMP-bom_5-EMISCAP-NLM",
+               "HYB-bom_13-tax_0_cap_75"]:
+    log = read_log(run_id)
+    result = parse_output(raw_output(log))
+    result["_raw_output"] = raw_output(log)
+    assert print_r(result) == log, run_id
+
+# So are the table rows, apart from the columns relative to the instance baseline.
+stored = {row["run_id"]: row for row in csv.DictReader(open(source / "tables" / "carbon_tax_sweep_results.csv"))}
+baseline_columns = {"baseline_emissions", "emission_reduction_pct", "WIP_reduction_pct", "DIO_improvement_pct"}
+for tax in taxes:
+    run_id = f"TAX-bom_5-{tax:.2f}"
+    row = run_kpis(parse_output(raw_output(read_log(run_id))), config(tax), "bom_5")
+    compared = [c for c in KPI_COLUMNS if c in stored[run_id] and c not in baseline_columns]
+    assert len(compared) == 30 and all(php_string(row[c]) == stored[run_id][c] for c in compared), run_id
+    assert row["baseline_emissions"] is None
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    temp = Path(temp_dir)
+    # A stand-in for oplrun that replays the logged output of the tax in the .dat.
+    fake = temp / "oplrun"
+    fake.write_text(f"""#!{sys.executable}
+import os, re, sys, time
+tax = float(re.search(r'EmisTax = ([^;]+);', open(sys.argv[2]).read()).group(1))
+if os.environ.get('FAKE_HANG'):
+    time.sleep(120)
+log = open(os.path.join({str(source / 'logs')!r}, 'TAX-bom_5-%.2f.log' % tax), 'rb').read()
+marker = b'    [_raw_output] => '
+sys.stdout.buffer.write(log[log.index(marker) + len(marker):-3])
+""")
+    fake.chmod(0o755)
+    runs = temp / "runs.json"
+    runs.write_text("\n".join(json.dumps(config(tax)) for tax in taxes))
+
+    # Three worker processes stand in for three nodes.
+    queue_dir, results = temp / "queue", temp / "results"
+    done = subprocess.run([sys.executable, str(tool), "enqueue", str(queue_dir), str(runs)], capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    assert CampaignQueue(queue_dir).enqueue(jobs_from_configs([config(0.0)])) == 0
+    workers = [subprocess.Popen([sys.executable, str(tool), "work", str(queue_dir), str(results), "--oplrun", str(fake),
+                                 "--poll", "0.1"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+               for _ in range(3)]
+    for worker in workers:
+        _, stderr = worker.communicate(timeout=120)
+        assert worker.returncode == 0, stderr
+    queue = CampaignQueue(queue_dir)
+    assert queue.counts() == {"pending": 0, "claimed": 0, "done": 5, "failed": 0}
+    for tax in taxes:
+        run_id = f"TAX-bom_5-{tax:.2f}"
+        assert (results / "logs" / f"{run_id}.log").read_bytes().decode("utf-8", "surrogateescape") == read_log(run_id)
+    appended = list(csv.DictReader(open(results / "tables" / "carbon_tax_sweep_results.csv")))
+    assert sorted(row["run_id"] for row in appended) == sorted(f"TAX-bom_5-{tax:.2f}" for tax in taxes)
+
+    done = subprocess.run([sys.executable, str(tool), "collect", str(queue_dir), str(results)],
+                          capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    collected = list(csv.DictReader(open(results / "consolidated_results.csv")))
+    assert [row["run_id"] for row in collected] == [f"TAX-bom_5-{tax:.2f}" for tax in taxes]
+    assert {row["experiment"] for row in collected} == {"carbon_tax_sweep"}
+    table = list(csv.DictReader(open(results / "tables" / "carbon_tax_sweep_results.csv")))
+    assert [row["run_id"] for row in table] == [row["run_id"] for row in collected]
+
+    # A node dies mid-run: its lease expires and another worker solves the job again.
+    queue_dir, results = temp / "queue_crash", temp / "results_crash"
+    CampaignQueue(queue_dir).enqueue(jobs_from_configs(config(tax) for tax in taxes[:3]))
+    settings = ["--poll", "0.1", "--heartbeat", "0.2", "--lease-ttl", "2"]
+    doomed = subprocess.Popen([sys.executable, str(tool), "work", str(queue_dir), str(results), "--oplrun", str(fake),
+                               *settings], env=dict(os.environ, FAKE_HANG="1"), start_new_session=True,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while not list((queue_dir / "claimed").glob("*.json")) and time.time() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.5)
+    os.killpg(doomed.pid, signal.SIGKILL)
+    doomed.wait()
+    survivor = subprocess.run([sys.executable, str(tool), "work", str(queue_dir), str(results), "--oplrun", str(fake),
+                               *settings], capture_output=True, text=True, timeout=120)
+    assert survivor.returncode == 0, survivor.stderr
+    queue = CampaignQueue(queue_dir)
+    assert queue.counts() == {"pending": 0, "claimed": 0, "done": 3, "failed": 0}
+    retried = [job for job in queue.done_jobs() if job["attempts"]]
+    assert len(retried) == 1 and retried[0]["run_id"] == "TAX-bom_5-0.00" and len(retried[0]["lost_leases"]) == 1
+    assert (results / "logs" / "TAX-bom_5-0.00.log").read_bytes().decode("utf-8", "surrogateescape") \
+        == read_log("TAX-bom_5-0.00")
+
+    # A worker whose lease was reclaimed cannot record its result; repeated losses fail the job.
+    queue = CampaignQueue(temp / "queue_lease")
+    queue.enqueue(jobs_from_configs([config(15.0)]))
+    for attempt in range(2):
+        claimed, job = queue.claim(f"w{attempt}")
+        os.utime(claimed, (time.time() - 10, time.time() - 10))
+        assert queue.reclaim(lease_ttl=5, max_attempts=2) == [("TAX-bom_5-15.00", ["pending", "failed"][attempt])]
+        assert not queue.heartbeat(claimed)
+        assert not queue.complete(claimed, job, "", {}, temp / "results_lease")
+    assert queue.claim("w2") is None and queue.counts()["failed"] == 1
+    assert not (temp / "results_lease").exists()
+
+    # A run manifest is planned in campaign order: the caps wait for the lexicographic baseline of
+    # their instance, and collect fills the baseline columns like the sequential runner.
+    assert [non_binding_bounds(f"bom_supemis_{n}.csv", "supp_details_supeco.csv", 10)["emissions"]
+            for n in (5, 13)] == [154694400, 1694643072]
+    cap_runs = ["CAP-bom_5-100", "CAP-bom_5-95", "CAP-bom_5-90"]
+    manifest = temp / "run_manifest.json"
+    manifest_runs = [{"run_id": run_id} for run_id in sorted(cap_runs + ["SCAL-005"])]
+    manifest.write_text(json.dumps({"consolidated_runs": manifest_runs}))
+    replay = temp / "oplrun_plan"
+    replay.write_text(f"""#!{sys.executable}
+import re, sys
+cap = int(float(re.search(r'EmisCap = ([^;]+);', open(sys.argv[2]).read()).group(1)))
+run_id = {{154694400: 'SCAL-005', 2932200: 'CAP-bom_5-100', 2785590: 'CAP-bom_5-95', 2638980: 'CAP-bom_5-90'}}[cap]
+log = open({str(source / 'logs')!r} + '/' + run_id + '.log', 'rb').read()
+marker = b'    [_raw_output] => '
+sys.stdout.buffer.write(log[log.index(marker) + len(marker):-3])
+""")
+    replay.chmod(0o755)
+    queue_dir, results = temp / "queue_plan", temp / "results_plan"
+    done = subprocess.run([sys.executable, str(tool), "enqueue", str(queue_dir), "--manifest", str(manifest)],
+                          capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    queue = CampaignQueue(queue_dir)
+    assert queue.counts()["pending"] == 1 and queue.waiting() == ({run_id: "bom_5" for run_id in cap_runs}, [])
+    done = subprocess.run([sys.executable, str(tool), "work", str(queue_dir), str(results), "--oplrun", str(replay),
+                           "--poll", "0.1"], capture_output=True, text=True, timeout=120)
+    assert done.returncode == 0, done.stderr
+    assert [job["run_id"] for job in queue.done_jobs()] == ["SCAL-005"] + cap_runs
+    assert [job["config"]["_EMISCAP_"] for job in queue.done_jobs()[1:]] == [2932200, 2785590, 2638980]
+    assert queue.waiting() == ({}, [])
+    done = subprocess.run([sys.executable, str(tool), "collect", str(queue_dir), str(results)],
+                          capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    stored = {row["run_id"]: row for row in csv.DictReader(open(source / "tables" / "carbon_cap_sweep_results.csv"))}
+    collected = list(csv.DictReader(open(results / "consolidated_results.csv")))
+    assert [row["run_id"] for row in collected] == ["SCAL-005"] + cap_runs
+    for row in collected[1:]:
+        for column in ["baseline_emissions", "emission_reduction_pct", "total_emissions", "solver_status"]:
+            assert row[column] == stored[row["run_id"]][column], (row["run_id"], column)
+
+    # Only an untaxed scalability sweep provides baselines, as in runScalabilityExperiment.
+    experiments = json.loads(CAMPAIGN_CONFIG_FILE.read_text(encoding="utf-8"))["experiments"]
+    scal_done = {"SCAL-005": {"run_id": "SCAL-005", "experiment": "scalability", "instance_id": "bom_5",
+                              "sequence": 1, "config": {}, "row": {"solver_status": "OPTIMAL",
+                                                                   "total_emissions": 2932200}}}
+    for tax_rate, expected in ((0.0, ([cap_runs[0]], {})), (50.0, ([], {cap_runs[0]: "bom_5"}))):
+        plan = CampaignPlan({"consolidated_runs": [{"run_id": "SCAL-005"}, {"run_id": cap_runs[0]}]},
+                            {"scalability": dict(experiments["scalability"], tax_rate=tax_rate),
+                             "carbon_cap_sweep": experiments["carbon_cap_sweep"]})
+        jobs, waiting, _ = plan.jobs(scal_done)
+        assert ([job["run_id"] for job in jobs if job["run_id"] != "SCAL-005"], waiting) == expected, tax_rate
+
+    # A hung oplrun is killed once past the time limit and its run recorded as TIMEOUT.
+    hung = temp / "oplrun_hung"
+    hung.write_text(f"#!{sys.executable}\nimport time\ntime.sleep(60)\n")
+    hung.chmod(0o755)
+    worker = QueueWorker(CampaignQueue(temp / "queue_hung"), temp / "results_hung", str(hung), time_limit=1,
+                         oplrun_margin=0.5)
+    started = time.time()
+    assert worker.execute({"config": config(15.0)})["status"] == "TIMEOUT" and time.time() - started < 30
+
+    # The NLM run of a comparison waits for its PLM twin and starts from its solution; a certified
+    # one is recorded as inferred (FinalCampaignRunner::storeInferredRun) instead of solved.
+    settings = json.loads(CAMPAIGN_CONFIG_FILE.read_text(encoding="utf-8"))["experiments"]["nlm_comparison"]
+    twins = ["COMP-bom_5-EMISTAXE-PLM", "COMP-bom_5-EMISTAXE-NLM"]
+    plan = CampaignPlan({"consolidated_runs": [{"run_id": run_id} for run_id in twins]},
+                        {"nlm_comparison": dict(settings, representative_instances=["bom_5"], strategies=["EMISTAXE"],
+                                                skip_certified=True)})
+    jobs, waiting, _ = plan.jobs({})
+    assert [job["run_id"] for job in jobs] == twins[:1] and jobs[0]["keep_result"]
+    assert waiting == {twins[1]: twins[0]}
+    queue = CampaignQueue(temp / "queue_nlm")
+    queue.enqueue(jobs)
+    claimed, job = queue.claim("w")
+    plm_result = parse_output(raw_output(read_log(twins[0])))
+    plm_result["_raw_output"] = raw_output(read_log(twins[0]))
+    assert queue.complete(claimed, job, "", run_kpis(plm_result, job["config"], "bom_5"), temp / "results_nlm",
+                          plm_result)
+    jobs, waiting, _ = plan.jobs({job["run_id"]: job for job in queue.done_jobs()})
+    nlm_job = jobs[1]
+    assert waiting == {} and nlm_job["seeded_from"] == twins[0]
+    assert nlm_job["config"]["NLM_SEED_X"] == plm_result["X"] and "NLM_LOWER_BOUND" in nlm_job["config"]
+    result = QueueWorker(queue, temp / "results_nlm", str(temp / "no-oplrun")).execute(nlm_job)
+    assert result["termination_reason"] == "CERTIFIED_BY_PLM" and result["inferred_from"] == twins[0]
+    assert "_raw_output" not in result and result["TS"] == plm_result["TS"]
+    row = run_kpis(result, nlm_job["config"], "bom_5")
+    assert row["inferred"] == 1 and row["inference_rule"] == "certified_by_plm"
+
+    # --tree-dp: a single-sourced PLM run the tree DP settles exactly is logged and tabulated
+    # without oplrun; bound-only runs (bom_5, bom_26) and the NLM run above still go to oplrun.
+    tree_config = dict(config(15.0), PREFIXE="TAX-bom_3-15.00", _NODE_FILE_="bom_supemis_3.csv",
+                       _NODE_SUPP_FILE_="supp_list_3.csv")
+    queue = CampaignQueue(temp / "queue_dp")
+    queue.enqueue(jobs_from_configs([tree_config]))
+    worker = QueueWorker(queue, temp / "results_dp", str(temp / "no-oplrun"), tree_dp=True)
+    bound_config = dict(config(15.0), _NODE_FILE_="bom_supemis_26.csv", _NODE_SUPP_FILE_="supp_list_26.csv")
+    assert worker.tree_dp_result(config(15.0)) is None and worker.tree_dp_result(bound_config) is None
+    assert worker.tree_dp_result(nlm_job["config"]) is None
+    assert worker.run() == 1
+    log = (temp / "results_dp" / "logs" / "TAX-bom_3-15.00.log").read_text(encoding="utf-8")
+    assert "[solver] => tree_dp" in log and "[status] => OPTIMAL" in log
+    with (temp / "results_dp" / "tables" / "carbon_tax_sweep_results.csv").open(newline="") as stream:
+        rows = list(csv.DictReader(stream))
+    assert len(rows) == 1 and rows[0]["solver_status"] == "OPTIMAL" and float(rows[0]["total_emissions"]) > 0
+
+print("Campaign queue tests passed.")
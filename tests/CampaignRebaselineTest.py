@@ -0,0 +1,93 @@
+import filecmp
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from RunOutput import php_string
+from CampaignRebaseline import DERIVED_COLUMNS, CampaignRebaseline, read_text_table, write_text_table
+
+reference = repo / "logs" / "final_campaign_20260605_061305"
+files = ["consolidated_results.csv"] + sorted(f"tables/{path.name}" for path in (reference / "tables").glob("*.csv"))
+
+
+def same_files(left: Path, right: Path) -> bool:
+    return all(filecmp.cmp(left / name, right / name, shallow=False) for name in files)
+
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    temp = Path(temp_dir)
+    campaign = temp / "campaign"
+    shutil.copytree(reference, campaign)
+
+    # With the campaign's own baselines and the default threshold nothing changes, byte for byte.
+    report = CampaignRebaseline(campaign).run()
+    assert not any(sum(changed.values()) for changed in report.values()), report
+    assert same_files(reference, campaign)
+
+    # Emptied derived columns (as CampaignQueue leaves them) are filled back to the solve-time values.
+    consolidated = read_text_table(campaign / "consolidated_results.csv")
+    for column in DERIVED_COLUMNS:
+        consolidated[column] = ""
+    write_text_table(campaign / "consolidated_results.csv", consolidated)
+    CampaignRebaseline(campaign).run()
+    assert same_files(reference, campaign)
+
+    # A looser gap threshold admits the nlm FEASIBLE runs, in the consolidated file and their table.
+    loose = temp / "loose"
+    shutil.copytree(reference, loose)
+    report = CampaignRebaseline(reference, gap_threshold=60).run(loose)
+    assert report["consolidated_results.csv"]["comparison_admissible"] == 5
+    assert report["tables/nlm_comparison_results.csv"]["comparison_exclusion_reason"] == 5
+    rows = read_text_table(loose / "consolidated_results.csv")
+    assert (rows["comparison_admissible"] == "1").all() and (rows["comparison_exclusion_reason"] == "").all()
+    table = read_text_table(loose / "tables" / "nlm_comparison_results.csv").set_index("run_id")
+    nlm = rows[rows["experiment"] == "nlm_comparison"].set_index("run_id")
+    assert table[list(DERIVED_COLUMNS)].equals(nlm.loc[table.index, list(DERIVED_COLUMNS)])
+
+    # A baseline table moves every row of its instances, and only those.
+    pd.DataFrame({"instance_id": ["bom_13"], "total_emissions": [30_000_000], "DIO": [150]}).to_csv(
+        temp / "baseline.csv", index=False)
+    moved = temp / "moved"
+    shutil.copytree(reference, moved)
+    done = subprocess.run([sys.executable, str(repo / "src" / "CampaignRebaseline.py"), str(reference),
+                           "--baseline", str(temp / "baseline.csv"), "--output", str(moved)],
+                          capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    before = read_text_table(reference / "consolidated_results.csv")
+    after = read_text_table(moved / "consolidated_results.csv")
+    bom_13 = after["instance_id"] == "bom_13"
+    assert before[~bom_13].equals(after[~bom_13])
+    assert (after.loc[bom_13, "baseline_emissions"] == "30000000").all()
+    for _, row in after[bom_13].iterrows():
+        emissions, dio = float(row["total_emissions"]), float(row["DIO"])
+        assert row["emission_reduction_pct"] == php_string((30_000_000 - emissions) / 30_000_000 * 100)
+        assert row["DIO_improvement_pct"] == php_string((150 - dio) / 150 * 100)
+    # WIP has no baseline in the table: the campaign's own one is kept.
+    assert after.loc[bom_13, "WIP_reduction_pct"].equals(before.loc[bom_13, "WIP_reduction_pct"])
+    # A bom_13 sweep run reporting half the baseline WIP is measured against the campaign's WIP baseline.
+    sweep = after.index[bom_13 & (after["experiment"] == "carbon_tax_sweep")][0]
+    consolidated = read_text_table(moved / "consolidated_results.csv")
+    consolidated.loc[sweep, "WIP"] = "125180"
+    write_text_table(moved / "consolidated_results.csv", consolidated)
+    CampaignRebaseline(moved, baseline=temp / "baseline.csv").run()
+    assert read_text_table(moved / "consolidated_results.csv").loc[sweep, "WIP_reduction_pct"] == "50"
+
+    # A campaign as the baseline table: the reference against itself changes nothing but the baseline rows,
+    # which are now measured against the final baseline (themselves).
+    own = temp / "own"
+    shutil.copytree(reference, own)
+    CampaignRebaseline(reference, baseline=reference).run(own)
+    after = read_text_table(own / "consolidated_results.csv")
+    changed = (after != before).any(axis=1)
+    assert changed.any() and set(after.loc[changed, "experiment"]) <= {"scalability", "topology_baseline"}
+    assert (after.loc[changed, "emission_reduction_pct"] == "0").all()
+
+print("Campaign rebaseline tests passed.")
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+import CampaignWatcher
+from CampaignWatcher import CampaignWatcher as Watcher, TailedCSV
+from GraphGenerator import GraphGenerator
+from StreamingAggregates import ResultsSummary
+
+
+source = repo / "logs" / "final_campaign_20260605_061305"
+tax_table = (source / "tables" / "carbon_tax_sweep_results.csv").read_bytes()
+header_end = tax_table.index(b"\n") + 1
+lines = tax_table[header_end:].splitlines(keepends=True)
+
+# Only appended bytes are parsed: count what reaches the CSV parser.
+parsed = []
+read_csv = pd.read_csv
+CampaignWatcher.pd.read_csv = lambda buffer, **kwargs: parsed.append(len(buffer.getvalue())) or read_csv(buffer, **kwargs)
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    path = Path(temp_dir) / "table.csv"
+    tail = TailedCSV(path)
+    path.write_bytes(tax_table[:header_end] + b"".join(lines[:10]) + lines[10][:25])
+    rows, reset = tail.poll()
+    assert len(rows) == 10 and not reset and tail.partial == lines[10][:25]
+    assert tail.poll() == (None, False)
+    with open(path, "ab") as stream:
+        stream.write(lines[10][25:] + b"".join(lines[11:]))
+    rows, reset = tail.poll()
+    assert len(rows) == len(lines) - 10 and tail.offset == len(tax_table)
+    assert sum(parsed) - 2 * header_end == len(tax_table) - header_end
+    pd.testing.assert_frame_equal(tail.frame(), read_csv(path))
+    # A rewrite (fopen 'w') with different content is read again from the start.
+    path.write_bytes(tax_table[:header_end] + b"".join(reversed(lines)))
+    rows, reset = tail.poll()
+    assert reset and len(rows) == len(lines) and rows["run_id"].iloc[0] == read_csv(path)["run_id"].iloc[0]
+CampaignWatcher.pd.read_csv = read_csv
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    campaign = Path(temp_dir) / "final_campaign_live"
+    (campaign / "tables").mkdir(parents=True)
+    shutil.copy(source / "campaign_plan.json", campaign)
+    watcher = Watcher(campaign)
+    assert watcher.scan() == set()
+
+    # The tax sweep arrives in two parts.
+    live = campaign / "tables" / "carbon_tax_sweep_results.csv"
+    live.write_bytes(tax_table[:header_end] + b"".join(lines[:12]))
+    changed = watcher.scan()
+    assert changed == {"tables/carbon_tax_sweep_results.csv"}
+    assert watcher.figures_for(changed) == ["plot_tax_sweep", "plot_cost_emissions_pareto",
+                                            "plot_strategy_comparison", "plot_inventory_kpis"]
+    # Only the fragments declaring the consolidated results are rebuilt, not the hybrid listing.
+    assert watcher.tex_tables_for(changed) == ["tab_scalability.tex", "tab_tax_sweep.tex", "tab_cap_sweep.tex",
+                                               "tab_plm_nlm.tex"]
+    first = watcher.refresh(changed)
+    assert "plot_tax_sweep" in first["figures"] and first["tex"] == ["tab_tax_sweep.tex"] and not first["errors"]
+    with open(live, "ab") as stream:
+        stream.write(b"".join(lines[12:]))
+    changed = watcher.scan()
+    second = watcher.refresh(changed)
+    assert second["tex"] == ["tab_tax_sweep.tex"]
+    # The fragments are built in-process from the summary: nothing is staged on disk.
+    assert not (campaign / ".watch").exists()
+    assert watcher.summary.rows == len(lines)
+    full = read_csv(source / "tables" / "carbon_tax_sweep_results.csv").assign(experiment="carbon_tax_sweep")
+    expected = ResultsSummary.from_frame(full)
+    assert watcher.summary.strategies == expected.strategies
+    assert watcher.summary.dio.mean("EMISTAXE") == expected.dio.mean("EMISTAXE")
+
+    # The live figure and table are those of the finished experiment.
+    done = Path(temp_dir) / "final_campaign_done"
+    (done / "tables").mkdir(parents=True)
+    shutil.copy(source / "tables" / "carbon_tax_sweep_results.csv", done / "tables")
+    GraphGenerator(str(done)).plot_tax_sweep()
+    assert (campaign / "figures" / "fig4_tax_sweep.png").read_bytes() == \
+        (done / "figures" / "fig4_tax_sweep.png").read_bytes()
+    full.insert(0, "experiment", full.pop("experiment"))
+    full.to_csv(done / "consolidated_results.csv", index=False)
+    subprocess.run([sys.executable, str(repo / "src" / "generate_article_tables.py"), str(done)],
+                   capture_output=True, check=True)
+    assert (campaign / "tables_tex" / "tab_tax_sweep.tex").read_text() == \
+        (done / "tables_tex" / "tab_tax_sweep.tex").read_text()
+
+    # A new Pareto front redraws only the Pareto figures; the unchanged fragments are not rewritten.
+    shutil.copytree(source / "pareto", campaign / "pareto")
+    changed = watcher.scan()
+    assert all(relpath.startswith("pareto/") for relpath in changed)
+    assert watcher.figures_for(changed) == ["plot_pareto_fronts"]
+    assert watcher.tex_tables_for(changed) == ["tab_pareto_emis.tex", "tab_pareto_dio.tex"]
+    third = watcher.refresh(changed)
+    assert third["figures"] == ["plot_pareto_fronts"] and "tab_tax_sweep.tex" not in third["tex"]
+    assert watcher.scan() == set()
+
+    status = json.loads((campaign / "watch_status.json").read_text())
+    assert status["experiments"]["carbon_tax_sweep"] == {"rows": 30, "planned": 30}
+    assert status["experiments"]["carbon_cap_sweep"]["rows"] == 0 and status["refreshes"] == 3
+    assert 0 < status["progress_pct"] < 100 and not status["finished"]
+
+    # A rewritten table is summarised again from scratch.
+    live.write_bytes(tax_table[:header_end] + b"".join(lines[:5]))
+    changed = watcher.scan()
+    assert watcher.refresh(changed)["tex"] == ["tab_tax_sweep.tex"] and watcher.summary.rows == 5
+
+    tool = repo / "src" / "CampaignWatcher.py"
+    done_run = subprocess.run([sys.executable, str(tool), str(campaign), "--once", "--no-tex"],
+                              capture_output=True, text=True)
+    assert done_run.returncode == 0, done_run.stderr
+    assert json.loads((campaign / "watch_status.json").read_text())["refreshes"] == 1
+
+print("Campaign watcher tests passed.")
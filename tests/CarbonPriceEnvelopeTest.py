@@ -0,0 +1,87 @@
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from CarbonPriceEnvelope import CampaignSolutions, envelope_tables, lower_envelope
+from InstanceCatalog import file_sha256
+
+
+# The envelope agrees with the pointwise minimum on random line sets (with parallel lines).
+rng = np.random.default_rng(7)
+for _ in range(20):
+    intercepts = rng.integers(0, 50, size=30).astype(float)
+    slopes = rng.integers(0, 10, size=30).astype(float)
+    envelope = lower_envelope(intercepts, slopes)
+    assert envelope["t_from"].iloc[0] == 0 and np.isinf(envelope["t_to"].iloc[-1])
+    assert (envelope["t_from"].to_numpy()[1:] == envelope["t_to"].to_numpy()[:-1]).all()
+    for t in np.linspace(0, 60, 241):
+        segment = envelope[(envelope["t_from"] <= t) & (t <= envelope["t_to"])].iloc[0]
+        line = int(segment["line"])
+        assert abs(intercepts[line] + slopes[line] * t - (intercepts + slopes * t).min()) < 1e-9
+
+# Dominated and parallel lines drop out; a line optimal only before t = 0 is clipped away.
+envelope = lower_envelope([10, 12, 30, 11, 14], [5, 3, 0, 5, 9])
+assert envelope["line"].tolist() == [0, 1, 2]
+assert np.allclose(envelope["t_to"].iloc[:-1], [1, 6])
+
+source = repo / "logs" / "final_campaign_20260605_061305"
+run_ids = ["TAX-bom_5-0.00", "TAX-bom_5-50.00", "TAX-bom_5-100.00", "CAP-bom_5-95", "CAP-bom_5-70",
+           "HYB-bom_5-tax_0_cap_none", "SVT-bom_5-EMISTAXE-SvT3"]
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    campaign = Path(temp_dir) / "final_campaign_test"
+    (campaign / "logs").mkdir(parents=True)
+    (campaign / "pareto").mkdir()
+    results = pd.read_csv(source / "consolidated_results.csv")
+    results[results["run_id"].isin(run_ids)].to_csv(campaign / "consolidated_results.csv", index=False)
+    for run_id in run_ids + ["TAX-bom_5-50.00-STAB-BUFFERS"]:
+        shutil.copy(source / "logs" / f"{run_id}.log", campaign / "logs")
+    shutil.copy(source / "pareto" / "bom_5_cost_emissions_pareto.csv", campaign / "pareto")
+
+    solutions = CampaignSolutions(campaign)
+    kinds = solutions.solutions()["kind"].value_counts().to_dict()
+    assert kinds == {"run": len(run_ids), "pareto": 10, "stability_probe": 1}, kinds
+
+    segments, brackets = envelope_tables(solutions)
+    bracket = brackets.set_index(["instance_id", "service_time"]).loc[("bom_5", 1)]
+    # Baseline (48640, DIO 23, 2932200 g) meets CAP-bom_5-95 at 608.39; the solved diagnostic
+    # found the switch in [607.42, 609.38].
+    assert bracket["baseline_run_id"] == "TAX-bom_5-0.00"
+    assert bracket["lower"] == 100 and bracket["lower_run_id"] == "TAX-bom_5-100.00"
+    assert bracket["switch_source"] == "CAP-bom_5-95" and 607.42 <= bracket["upper"] <= 609.38
+    bom_5 = segments[(segments["instance_id"] == "bom_5") & (segments["service_time"] == 1)]
+    assert bom_5["Emis"].is_monotonic_decreasing and bom_5["t_from"].iloc[0] == 0
+    # Service time 3 is its own configuration, without a tax-0 baseline.
+    assert pd.isna(brackets.set_index(["instance_id", "service_time"]).loc[("bom_5", 3), "upper"])
+
+    tool = repo / "src" / "CarbonPriceEnvelope.py"
+    done = subprocess.run([sys.executable, str(tool), str(campaign)], capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    payload = json.loads((campaign / "tables" / "threshold_brackets.json").read_text(encoding="utf-8"))
+    assert payload["service_time"] == 1 and payload["suppliers"] == 10
+    assert list(payload["instances"]) == ["bom_5"]
+    assert payload["instances"]["bom_5"]["candidate_rates"][0] == round(bracket["upper"], 3)
+    assert (campaign / "tables" / "envelope.csv").exists()
+    # The diagnostic solves past the tie at upper, where CAP-bom_5-95 is cheaper by twice CPLEX's gap.
+    probe = payload["instances"]["bom_5"]["probe"]
+    assert bracket["upper"] < probe == bracket["probe"]
+    baseline, switch = (line["TotalCostCS"] + line["DIO"] + probe * line["Emis"] / 1e6
+                        for _, line in bom_5.iloc[:2].iterrows())
+    assert abs((baseline - switch) / switch - 2e-4) < 1e-9
+    # Provenance: the runner only trusts a bracket whose model and data files are unchanged.
+    assert payload["model_sha256"] == file_sha256(repo / "models" / payload["model_file"])
+    files = payload["instances"]["bom_5"]["data_files"]
+    assert files["supp_details"]["file"] == "supp_details_supeco.csv"
+    assert all(entry["sha256"] == file_sha256(repo / "data" / entry["file"]) for entry in files.values())
+
+print("Carbon price envelope tests passed.")
@@ -0,0 +1,121 @@
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from DenseRendering import (
+    DENSE_LIMITS,
+    RASTER_POINTS,
+    dense_layout,
+    downsample,
+    figure_sizes,
+    grid_shape,
+    lttb,
+    marker_step,
+    rasterise,
+    relative_bands,
+)
+from GraphGenerator import GraphGenerator
+from ReportingCore import CampaignTables
+
+
+# LTTB keeps the endpoints and the isolated peaks, and short series whole.
+x = np.arange(10_000, dtype=float)
+y = np.sin(x / 500)
+y[[1234, 7777]] = [40.0, -40.0]
+kept = lttb(x, y, 200)
+assert len(kept) == 200 and kept[0] == 0 and kept[-1] == 9_999
+assert (np.diff(kept) > 0).all() and {1234, 7777} <= set(kept)
+assert lttb(x[:50], y[:50], 200).tolist() == list(range(50))
+frame = pd.DataFrame({"x": x, "y": y})
+assert downsample(frame, "x", "y", 300).index.tolist() == lttb(x, y, 300).tolist()
+assert downsample(frame.head(300), "x", "y", 300).equals(frame.head(300))
+assert marker_step(25) == 1 and marker_step(400) == 16
+
+# Thresholds, and vector mode never changes a figure.
+assert not rasterise(RASTER_POINTS) and rasterise(RASTER_POINTS + 1) and not rasterise(10**6, "vector")
+limit = DENSE_LIMITS["fig7_cost_emissions_pareto"]
+assert not dense_layout("fig7_cost_emissions_pareto", limit, 3) and dense_layout("fig7_cost_emissions_pareto", limit + 1, 3)
+assert dense_layout("fig4_tax_sweep", 100, 8) and not dense_layout("fig4_tax_sweep", 10**6, 40, "vector")
+assert not dense_layout("fig5_cap_sweep", 10**6, 40)
+assert grid_shape(3, 2) == (2, 2) and grid_shape(9) == (3, 4) and grid_shape(1) == (1, 1)
+
+# Bands are quantiles of each series relative to its value at the lowest x.
+sweep = pd.DataFrame({"id": ["a", "a", "b", "b", "c"], "t": [0, 10, 0, 10, 10], "v": [200.0, 100.0, 50.0, 50.0, 8.0]})
+bands = relative_bands(sweep, "id", "t", "v")
+assert bands.loc[0, 0.5] == 100.0 and bands.loc[0, "series"] == 2
+assert bands.loc[10, 0.5] == 100.0 and bands.loc[10, 0.05] == 55.0 and bands.loc[10, "series"] == 3
+
+# The article campaign is far below every limit: its figures keep their layout.
+reference = CampaignTables(str(repo / "logs" / "final_campaign_20260605_061305"))
+for figure, (points, series) in figure_sizes(reference).items():
+    assert not dense_layout(figure, points, series), figure
+
+# A generated campaign: 24k runs, 12 instances x 500 tax levels, two 3k-point fronts.
+rng = np.random.default_rng(0)
+with tempfile.TemporaryDirectory() as temp_dir:
+    out = Path(temp_dir)
+    (out / "tables").mkdir()
+    (out / "pareto").mkdir()
+    n = 24_000
+    emissions = rng.lognormal(15, 0.5, n)
+    cost = 5e5 - 0.01 * emissions + rng.normal(0, 1e4, n)
+    pd.DataFrame({"experiment": "generated", "run_id": np.arange(n), "instance_id": "gen",
+                  "strategy": np.array(["EMISTAXE", "EMISCAP", "EMISHYBRID"])[rng.integers(0, 3, n)],
+                  "solver_status": "OPTIMAL", "mip_gap": 0.0, "total_emissions": emissions,
+                  "total_cost_without_tax": cost, "total_cost_with_tax": 1.1 * cost}).to_csv(
+        out / "consolidated_results.csv", index=False)
+    taxes = np.linspace(0, 1000, 500)
+    base = rng.uniform(1e6, 1e8, 12)
+    pd.DataFrame({"instance_id": np.repeat([f"gen_{k:02d}" for k in range(12)], len(taxes)),
+                  "tax_rate": np.tile(taxes, 12),
+                  "total_emissions": np.repeat(base, len(taxes)) * np.exp(-np.tile(taxes, 12) / 500),
+                  "total_cost_with_tax": np.repeat(base, len(taxes)) / 100 * (1 + np.tile(taxes, 12) / 2000),
+                  "solver_status": "OPTIMAL", "mip_gap": 0.0}).to_csv(
+        out / "tables" / "carbon_tax_sweep_results.csv", index=False)
+    for k in range(2):
+        front = np.sort(rng.uniform(1e6, 5e6, 3_000))
+        pd.DataFrame({"Cost": 1e9 / front, "DIO": np.linspace(10, 60, 3_000), "WIP": 0, "Emissions": front}).to_csv(
+            out / "pareto" / f"gen{k}_cost_emissions_pareto.csv", sep=";", index=False)
+
+    sizes = figure_sizes(CampaignTables(str(out)))
+    assert sizes["fig4_tax_sweep"] == (6_000, 12) and sizes["fig7_cost_emissions_pareto"] == (n, 3)
+    assert sizes["fig13_pareto_cost_emissions"] == (6_000, 2)
+
+    generator = GraphGenerator(str(out))
+    elapsed = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        for method, figure in (("plot_tax_sweep", "fig4_tax_sweep"),
+                               ("plot_cost_emissions_pareto", "fig7_cost_emissions_pareto"),
+                               ("plot_pareto_fronts", "fig13_pareto_cost_emissions")):
+            start = time.perf_counter()
+            getattr(generator, method)()
+            elapsed[figure] = time.perf_counter() - start
+    stats = generator.render_stats
+    assert stats["fig4_tax_sweep"]["layout"] == "bands"
+    assert stats["fig7_cost_emissions_pareto"]["layout"] == "density"
+    assert stats["fig13_pareto_cost_emissions"]["layout"] == "standard"
+    # Budgets: a dense figure stays a small PDF and renders in seconds.
+    for figure, seconds in elapsed.items():
+        assert stats[figure]["pdf_bytes"] < 250_000, (figure, stats[figure])
+        assert seconds < 15, (figure, seconds)
+
+    # The same scatter drawn point by point is the baseline the dense layout beats.
+    vector = GraphGenerator(str(out), render="vector")
+    with contextlib.redirect_stdout(io.StringIO()):
+        vector.plot_cost_emissions_pareto()
+    assert vector.render_stats["fig7_cost_emissions_pareto"]["layout"] == "standard"
+    assert vector.render_stats["fig7_cost_emissions_pareto"]["pdf_bytes"] > 2 * stats["fig7_cost_emissions_pareto"]["pdf_bytes"]
+
+print("Dense rendering tests passed.")
@@ -0,0 +1,68 @@
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+import InstanceCatalog
+from InstanceCatalog import bom_structure, catalog_frame, file_sha256, load_catalog, registry_entries
+from ReportingCore import display_instance_id
+from SupplierDominancePruner import DATA_DIR, read_bom
+
+
+# Structure measured on the files: par2 has a deep and a delivered branch under the end item.
+par2 = bom_structure(read_bom(DATA_DIR / "bom_supemis_par2.csv"))
+assert par2 == {"components": 10, "depth": 4, "branches": 2, "leaves": 5}
+assert bom_structure(pd.DataFrame({"ind": [0, 1, 2, 3], "parent": [-1, 0, 1, 9]})) == \
+    {"components": 4, "depth": 2, "branches": 1, "leaves": 2}
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    temp = Path(temp_dir)
+    data = temp / "data"
+    shutil.copytree(DATA_DIR, data, ignore=shutil.ignore_patterns("*.md", "*.backup"))
+    cache = temp / "instance_catalog.json"
+    frame = catalog_frame(cache=cache, data_dir=data)
+    assert list(frame.index) == list(registry_entries())
+    assert frame.loc["bom_par3", ["family", "nodes", "components", "branches"]].tolist() == ["parallel", 11, 12, 2]
+    assert frame.loc["bom_ml5_45", ["levels", "nodes"]].tolist() == [5, 45]
+    assert frame.loc["bom_13", "bom_sha256"] == file_sha256(DATA_DIR / "bom_supemis_13.csv")
+    assert frame.loc["bom_50", "supp_details_file"] == "supp_details_supeco_grdCapacity.csv"
+    assert (frame["suppliers"] > 0).all() and (frame["leaves"] < frame["components"]).all()
+
+    # Results join on instance_id.
+    results = pd.read_csv(repo / "logs" / "final_campaign_20260605_061305" / "tables" / "topology_baseline_results.csv")
+    joined = results.join(frame[["family", "depth", "branches"]], on="instance_id")
+    assert joined["family"].notna().all() and set(joined["family"]) == {"multi_level", "parallel"}
+
+    # A second load reads nothing but the cache; a changed file is read again.
+    read = []
+    original = InstanceCatalog.catalog_entry
+    InstanceCatalog.catalog_entry = lambda instance, data_dir: read.append(instance["id"]) or original(instance, data_dir)
+    assert load_catalog(cache=cache, data_dir=data) == load_catalog(cache=None, data_dir=data)
+    assert read == list(registry_entries())  # only the load without a cache read the files
+    read.clear()
+    assert load_catalog(cache=cache, data_dir=data)["bom_5"]["leaves"] == 3 and read == []
+    bom_5 = data / "bom_supemis_5.csv"
+    bom_5.write_text(bom_5.read_text() + "6;2;5;10;1;0.25;0.5;0.8;1;0;100;10;150;\n")
+    catalog = load_catalog(cache=cache, data_dir=data)
+    assert read == ["bom_5"] and catalog["bom_5"]["components"] == 7 and catalog["bom_5"]["depth"] == 4
+    assert json.loads(cache.read_text())["instances"]["bom_5"]["entry"]["bom_sha256"] == file_sha256(bom_5)
+    InstanceCatalog.catalog_entry = original
+
+    done = subprocess.run([sys.executable, str(repo / "src" / "InstanceCatalog.py"), "--cache", str(cache),
+                           "--csv", str(temp / "catalog.csv")], capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    assert pd.read_csv(temp / "catalog.csv", index_col="instance_id").loc["bom_par6", "branches"] == 6
+
+# The article labels of the parallel-branch BOMs come from the registry sizes.
+assert [display_instance_id(f"bom_par{k}") for k in range(2, 7)] == \
+    ["bom_par2_9", "bom_par3_11", "bom_par4_10", "bom_par5_18", "bom_par6_24"]
+
+print("Instance catalog tests passed.")
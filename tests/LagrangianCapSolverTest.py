@@ -0,0 +1,120 @@
+import tempfile
+from pathlib import Path
+import sys
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from BomStructureReducer import BomStructure
+from LagrangianCapSolver import (
+    LagrangianCapSearch,
+    LagrangianCapSolver,
+    combine_subtree_results,
+    known_emissions,
+    separable_subtrees,
+    write_subtree_instance,
+)
+from SupplierDominancePruner import DATA_DIR, read_bom, read_supplier_list
+
+
+# Four candidate plans (TotalCostCS + dlts, Emis in gCO2); B and D sit on the lower
+# convex envelope, C does not, so caps between B and D have a duality gap.
+PLANS = {"A": (100.0, 10e6), "B": (110.0, 6e6), "C": (130.0, 4e6), "D": (200.0, 1e6)}
+calls = []
+
+
+def solve_tax(tax):
+    calls.append(tax)
+    name = min(PLANS, key=lambda p: PLANS[p][0] + tax * PLANS[p][1] / 1e6)
+    cost, emissions = PLANS[name]
+    return {"status": "OPTIMAL", "mip_gap": 0.0, "objective": cost + tax * emissions / 1e6,
+            "emissions": emissions, "runtime_sec": 1.0}
+
+
+def solve_cap(cap):
+    cost, emissions = min(v for v in PLANS.values() if v[1] <= cap)
+    return {"status": "OPTIMAL", "objective": cost, "emissions": emissions, "runtime_sec": 5.0}
+
+
+search = LagrangianCapSearch(solve_tax, solve_cap, workers=2)
+
+loose = search.solve(12e6)
+assert loose["method"] == "lagrangian" and loose["multiplier"] == 0.0
+assert loose["objective"] == 100.0 and loose["gap_pct"] == 0.0 and loose["tax_solves"] == 1
+
+exact = search.solve(6e6)
+assert exact["method"] == "lagrangian"
+assert abs(exact["objective"] - 110.0) < 1e-9 and exact["emissions"] == 6e6
+assert exact["lower_bound"] <= exact["upper_bound"] and exact["gap_pct"] <= 1.0
+
+# Tax solves are cached across caps: the tax-0 solve is never repeated.
+assert calls.count(0.0) == 1
+
+gap = search.solve(5e6)
+assert gap["upper_bound"] == 130.0 and gap["gap_pct"] > 1.0
+assert gap["method"] == "direct_cap" and gap["objective"] == 130.0
+assert gap["fallback_status"] == "OPTIMAL" and gap["fallback_runtime_sec"] == 5.0
+
+# Without a fallback the best bounds are still reported.
+bounds_only = LagrangianCapSearch(solve_tax, workers=3).solve(5e6)
+assert bounds_only["method"] == "lagrangian" and bounds_only["objective"] == 130.0
+assert bounds_only["lower_bound"] < 130.0
+
+# Parallel BOMs at service time 1 separate by root subtree; serial ones do not.
+bom = read_bom(DATA_DIR / "bom_supemis_par2.csv")
+_, _, headers, eligibility = read_supplier_list(DATA_DIR / "supp_list_par2.csv")
+structure = BomStructure(bom, eligibility)
+subtrees = separable_subtrees(structure, service_t=1)
+assert len(subtrees) == 2 and sorted(sum(subtrees, [])) == list(range(1, 10))
+assert separable_subtrees(structure, service_t=3) == []
+serial = BomStructure(read_bom(DATA_DIR / "bom_supemis_26.csv"))
+assert separable_subtrees(serial, service_t=1) == []
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    files = write_subtree_instance(bom, eligibility, headers, 0, subtrees[1], 10,
+                                   Path(temp_dir), "par2_sub1")
+    sub_bom = read_bom(files["bom"])
+    assert sub_bom["ind"].tolist() == list(range(len(subtrees[1]) + 1))
+    assert sub_bom["parent"].iloc[0] == -1 and sub_bom["parent"].iloc[1] == 0
+    assert (sub_bom["parent"].iloc[1:] < sub_bom["ind"].iloc[1:]).all()
+    nb_nodes, _, _, sub_eligibility = read_supplier_list(files["supp_list"])
+    assert nb_nodes == len(subtrees[1])
+    assert len(sub_eligibility) == sum(node in eligibility for node in subtrees[1])
+
+combined = combine_subtree_results(
+    [{"status": "OPTIMAL", "objective": 50.0, "emissions": 2.0, "runtime_sec": 1.0},
+     {"status": "FEASIBLE", "mip_gap": 0.5, "objective": 70.0, "emissions": 3.0, "runtime_sec": 4.0}],
+    root_lead_time=0)
+assert combined["status"] == "FEASIBLE" and combined["mip_gap"] == 0.5
+assert combined["objective"] == 120.0 and combined["emissions"] == 5.0 and combined["runtime_sec"] == 4.0
+
+# Emissions only known as the #E int32 clamp are unknown: never feasible, never summed.
+clamped = {"status": "OPTIMAL", "objective": 1.0, "emissions": 2147483647.0}
+assert known_emissions(clamped) is None
+assert combine_subtree_results([clamped, combined], root_lead_time=0)["emissions"] is None
+
+# The caps of a large instance are percentages of its real tax-0 emissions: on the
+# recorded SCAL-150 output #E is 2147483647 while #Result holds 2.508e+10 gCO2.
+with tempfile.TemporaryDirectory() as temp_dir:
+    log = (repo / "logs" / "final_campaign_20260118_134900" / "logs" / "SCAL-150.log").read_text(encoding="utf-8")
+    recorded = Path(temp_dir) / "scal150.out"
+    recorded.write_text(log.split("[_raw_output] => \n", 1)[1].rsplit("\n)", 1)[0], encoding="utf-8")
+    caps = Path(temp_dir) / "caps.txt"
+    oplrun = Path(temp_dir) / "oplrun"
+    oplrun.write_text(
+        f"#!{sys.executable}\nimport re, sys\n"
+        f"model = open(sys.argv[1]).read()\n"
+        f"if 'ct9: Emis<=EmisCap' in model:\n"
+        f"    open({str(caps)!r}, 'a').write(re.search(r'float EmisCap = (.*);', model).group(1) + '\\n')\n"
+        f"sys.stdout.write(open({str(recorded)!r}).read())\n", encoding="utf-8")
+    oplrun.chmod(0o755)
+    solver = LagrangianCapSolver(str(Path(temp_dir) / "out"), str(oplrun), workers=4)
+    row, = solver.solve_instance({"id": "bom_150", "file": "bom_supemis_150.csv", "nodes": 150}, [0.9],
+                                 verify=True)
+    assert row["cap_value"] == int(2.508e10 * 0.9) and row["emissions"] == 2.508e10
+    # Every tax solve emits more than the cap, so the fallback and the check solve that cap.
+    assert row["method"] == "direct_cap" and row["direct_objective"] == 3.7172e6
+    assert caps.read_text().split() == [str(int(2.508e10 * 0.9))] * 2
+
+print("Lagrangian cap solver tests passed.")
@@ -0,0 +1,105 @@
+import json
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from ModelInstantiator import (
+    ModelInstantiator, ModelTemplate, format_number, legacy_model_text, php_string, seed_nlm_run_config, variant_of,
+)
+from SupplierDominancePruner import MODELS_DIR
+
+
+def run(prefix, model, tax=50.0, cap=2500000, **extra):
+    config = {"PREFIXE": prefix, "_NODE_FILE_": "bom_supemis_5.csv", "_NODE_SUPP_FILE_": "supp_list_5.csv",
+              "_SUPP_DETAILS_FILE_": "supp_details_supeco.csv", "_NBSUPP_": 2, "_SERVICE_T_": 1,
+              "_EMISCAP_": cap, "_EMISTAXE_": tax, "MODEL_FILE": model, "EXPERIMENT": "carbon_tax_sweep"}
+    config.update(extra)
+    return config
+
+
+tax = run("TAX-bom_5-50.00", "RUNS_SupEmis_Cplex_PLM_Tax.mod")
+nlm = run("COMP-bom_5-EMISCAP-NLM", "RUNS_SupEmis_CP_NLM_Cap.mod", tax=0.0)
+lex = run("SCAL-005", "RUNS_SupEmis_MultiObj_PLM.mod", tax=0.0, cap=154694400.0, _OBJ_PRIMARY_=1,
+          _EPSILON_COST_=1e9, _EPSILON_DIO_=1000, _EPSILON_WIP_=1e9, _EPSILON_EMIS_=154694400.0,
+          STATIC_LEX_BASELINE=True)
+probe = run("TAX-bom_5-50.00-STAB-BUFFERS", "RUNS_SupEmis_Cplex_PLM_Tax.mod",
+            STABILITY_PROBE="buffers", STABILITY_REFERENCE_X=[0, 1, 1],
+            STABILITY_REFERENCE_Z=[0, 0, 1, 0, 0, 1], STABILITY_REFERENCE_Q=[0, 0, 20, 0, 0, 60],
+            STABILITY_OBJECTIVE_LIMIT=48896.5)
+# NLM runs seeded from their PLM twin (NLMWarmStart), with and without the PLM bound.
+plm = {"CS": 48000.0, "A": [0, 2, 3, 1, 0, 4], "X": [0, 1, 1, 0, 0, 1], "Z": [1, 0] * 6, "Q": [20, 0] * 6,
+       "status": "OPTIMAL", "mip_gap": 0.0, "_raw_output": "..."}
+seeded = seed_nlm_run_config(dict(nlm, STRATEGY="EMISCAP"), plm)
+unbounded = seed_nlm_run_config(dict(nlm, STRATEGY="EMISCAP"), dict(plm, status="FEASIBLE", mip_gap=None))
+certified = seed_nlm_run_config(dict(nlm, STRATEGY="EMISCAP"), plm, skip_certified=True)
+
+assert php_string(50.0) == "50" and php_string(0.5) == "0.5" and php_string(True) == "1"
+
+# seed_nlm_run_config follows NLMWarmStart::seedRunConfig: the bound is CPLEX's stopping rule below #CS + sum(A).
+assert seeded["NLM_RELATIVE_TOLERANCE"] == 0.001 and "NLM_CERTIFIED_RESULT" not in seeded
+assert abs(seeded["NLM_LOWER_BOUND"] - (48010.0 - 4.801 - 5e-5)) < 1e-9
+assert "NLM_LOWER_BOUND" not in unbounded and unbounded["NLM_SEED_X"] == plm["X"]
+assert seed_nlm_run_config(nlm, {"status": "ERROR"}) == nlm
+result = certified["NLM_CERTIFIED_RESULT"]
+assert result["termination_reason"] == "CERTIFIED_BY_PLM" and result["status"] == "OPTIMAL"
+assert result["RT"] == 0.0 and "_raw_output" not in result and result["A"] == plm["A"]
+
+# Every model parametrizes, and the .dat written back reproduces the per-run rewrite.
+for config in (tax, nlm, lex, probe, seeded, unbounded):
+    template = ModelTemplate(MODELS_DIR / config["MODEL_FILE"], *variant_of(config))
+    assert "_NBSUPP_" not in template.text and "int NB_SUPP = ...;" in template.text
+    expected = legacy_model_text((MODELS_DIR / config["MODEL_FILE"]).read_text(encoding="utf-8"), config)
+    assert template.inline(template.data(config)) == expected, config["PREFIXE"]
+
+template = ModelTemplate(MODELS_DIR / "RUNS_SupEmis_Cplex_PLM_Tax.mod", "buffers")
+dat = template.render_dat(template.data(probe, time_limit=60))
+assert 'nodeFile = "bom_supemis_5.csv";' in dat and "EmisTax = 50;" in dat
+assert "timeLimitSec = 60;" in dat and "stabilityRefZ = [[0,0],[1,0],[0,1]];" in dat
+assert "stabilityObjectiveLimit = 48896.5;" in dat
+
+# The seeded CP model keeps `using CP;` first and gets the starting point, tolerance and PLM bound.
+text = legacy_model_text((MODELS_DIR / "RUNS_SupEmis_CP_NLM_Cap.mod").read_text(encoding="utf-8"), seeded)
+assert "cp.setStartingPoint(seed);" in text and "cp.param.RelativeOptimalityTolerance = 0.001;" in text
+assert f"ct_nlm_plm_bound: TotalCostCS+dlts >= {format_number(seeded['NLM_LOWER_BOUND'])};" in text
+assert "ct_nlm_plm_bound" not in legacy_model_text(
+    (MODELS_DIR / "RUNS_SupEmis_CP_NLM_Cap.mod").read_text(encoding="utf-8"), unbounded)
+template = ModelTemplate(MODELS_DIR / "RUNS_SupEmis_CP_NLM_Cap.mod", *variant_of(seeded))
+assert template.text.index("using CP;") < template.text.index("int timeLimitSec = ...;")
+assert "ct_nlm_plm_bound: TotalCostCS+dlts >= nlmLowerBound;" in template.text
+dat = template.render_dat(template.data(seeded))
+assert "nlmSeedX = [0,1,1,0,0,1];" in dat and "nlmRelativeTolerance = 0.001;" in dat
+
+try:
+    ModelTemplate(MODELS_DIR / "RUNS_SupEmis_MultiObj_PLM.mod").data(tax)
+    raise AssertionError("missing epsilon values must be reported")
+except KeyError as error:
+    assert "_EPSILON_COST_" in str(error)
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    instantiator = ModelInstantiator(temp_dir)
+    first = instantiator.instantiate(tax)
+    again = instantiator.instantiate(dict(tax, PREFIXE="TAX-bom_5-50.00-repeat"))
+    other = instantiator.instantiate(dict(tax, _EMISTAXE_=100))
+    assert first == again and first[0] == other[0] and first[1] != other[1]
+    assert instantiator.stats == {"runs": 3, "models_written": 1, "dat_written": 2, "dat_reused": 1}
+    assert first[1].read_text(encoding="utf-8").startswith("timeLimitSec = 300;\n")
+    # The model file itself is never rewritten per run.
+    assert ModelInstantiator(temp_dir).instantiate(tax) == first
+
+    runs_file = Path(temp_dir) / "runs.json"
+    runs_file.write_text("\n".join(json.dumps(c) for c in (tax, nlm, lex, probe, seeded)), encoding="utf-8")
+    tool = repo / "src" / "ModelInstantiator.py"
+    checked = subprocess.run([sys.executable, str(tool), "verify", str(runs_file)], capture_output=True, text=True)
+    assert checked.returncode == 0, checked.stdout
+    written = subprocess.run([sys.executable, str(tool), "instantiate", str(runs_file),
+                              "--work-dir", str(Path(temp_dir) / "work")], capture_output=True, text=True)
+    assert written.returncode == 0, written.stderr
+    instances = json.loads((Path(temp_dir) / "work" / "instances.json").read_text(encoding="utf-8"))
+    assert len(instances) == 4 and Path(instances["SCAL-005"]["dat"]).exists()
+
+print("Model instantiation tests passed.")
@@ -0,0 +1,125 @@
+<?php
+
+require_once __DIR__ . '/../src/FinalCampaignRunner.php';
+
+$runner = new FinalCampaignRunner(false);
+$tmpRoot = sys_get_temp_dir() . DIRECTORY_SEPARATOR . 'phpauto_monotone_' . uniqid('', true);
+$resultsDir = $tmpRoot . DIRECTORY_SEPARATOR;
+mkdir($resultsDir, 0777, true);
+
+$setProperty = function(string $name, $value) use ($runner): void {
+    $property = new ReflectionProperty(FinalCampaignRunner::class, $name);
+    $property->setAccessible(true);
+    $property->setValue($runner, $value);
+};
+$getProperty = function(string $name) use ($runner) {
+    $property = new ReflectionProperty(FinalCampaignRunner::class, $name);
+    $property->setAccessible(true);
+    return $property->getValue($runner);
+};
+$call = function(string $name, array $args) use ($runner) {
+    $method = new ReflectionMethod(FinalCampaignRunner::class, $name);
+    $method->setAccessible(true);
+    return $method->invokeArgs($runner, $args);
+};
+
+$removeTree = function(string $path) use (&$removeTree): void {
+    if (!is_dir($path)) {
+        return;
+    }
+    foreach (scandir($path) ?: [] as $entry) {
+        if ($entry === '.' || $entry === '..') {
+            continue;
+        }
+        $full = $path . DIRECTORY_SEPARATOR . $entry;
+        if (is_dir($full)) {
+            $removeTree($full);
+        } else {
+            unlink($full);
+        }
+    }
+    rmdir($path);
+};
+
+$hybridConfig = function(float $tax, float $capValue, string $label): array {
+    return [
+        'PREFIXE' => "HYB-bom_5-{$label}",
+        '_NODE_FILE_' => 'bom_supemis_5.csv',
+        '_NODE_SUPP_FILE_' => 'supp_list_5.csv',
+        '_SUPP_DETAILS_FILE_' => 'supp_details_supeco.csv',
+        '_NBSUPP_' => 10,
+        '_SERVICE_T_' => 1,
+        '_EMISCAP_' => $capValue,
+        '_EMISTAXE_' => $tax,
+        'MODEL_FILE' => 'RUNS_SupEmis_Cplex_PLM_Hybrid.mod',
+        'MODEL_TYPE' => 'PLM',
+        'EXPERIMENT' => 'carbon_hybrid',
+        'CAP_LEVEL' => $label
+    ];
+};
+
+try {
+    $setProperty('resultsDir', $resultsDir);
+
+    $ordered = $call('capLevelsLooseToTight', [[0.8, 'none', 1.0, 0.9]]);
+    if ($ordered !== ['none', 1.0, 0.9, 0.8]) {
+        throw new RuntimeException('Cap levels must be ordered from "none" to the tightest cap');
+    }
+
+    $looser = $hybridConfig(50.0, 1000.0, 'tax_50_cap_100');
+    $feasibilityKey = $call('capFeasibilityKey', [$looser, 'bom_5']);
+    $optimumKey = $feasibilityKey . '|' . $looser['MODEL_FILE'] . '|' . 50.0;
+    $setProperty('capOptimaBySetting', [
+        $optimumKey => [[
+            'cap_value' => 1000.0,
+            'emissions' => 800.0,
+            'run_id' => $looser['PREFIXE'],
+            'result' => [
+                'status' => 'OPTIMAL',
+                'E' => 800.0,
+                'TS' => 120.0,
+                'CplexRunTime' => 'Total (root+branch&cut) = 3.50 sec'
+            ]
+        ]]
+    ]);
+    $setProperty('capInfeasibilityBounds', [
+        $feasibilityKey => ['cap_value' => 500.0, 'run_id' => 'HYB-bom_5-tax_0_cap_50']
+    ]);
+
+    $copied = $call('executeCapMonotoneRun', [$hybridConfig(50.0, 850.0, 'tax_50_cap_85'), 'bom_5']);
+    $copiedFlat = (new KPICalculator())->flattenKPIs($copied['kpis']);
+    if ($copiedFlat['solver_status'] !== 'OPTIMAL'
+        || $copiedFlat['inferred'] !== 1
+        || $copiedFlat['inferred_from'] !== $looser['PREFIXE']
+        || $copiedFlat['inference_rule'] !== 'looser_cap_optimum'
+        || (float)$copiedFlat['runtime_sec'] !== 0.0
+        || (float)$copiedFlat['cap_value'] !== 850.0) {
+        throw new RuntimeException('A looser-cap optimum satisfying the tighter cap must be reused and flagged');
+    }
+
+    $pruned = $call('executeCapMonotoneRun', [$hybridConfig(100.0, 400.0, 'tax_100_cap_40'), 'bom_5']);
+    $prunedFlat = (new KPICalculator())->flattenKPIs($pruned['kpis']);
+    if ($prunedFlat['solver_status'] !== 'INFEASIBLE'
+        || $prunedFlat['inferred'] !== 1
+        || $prunedFlat['inference_rule'] !== 'cap_infeasible_monotone'
+        || $prunedFlat['comparison_admissible'] !== 0) {
+        throw new RuntimeException('A cap tighter than a proven-infeasible cap must be marked infeasible at any tax');
+    }
+
+    if ($getProperty('runCounter') !== 0) {
+        throw new RuntimeException('Inferred runs must not be counted as solver calls');
+    }
+    if ($getProperty('inferredRunIds') !== ['HYB-bom_5-tax_50_cap_85', 'HYB-bom_5-tax_100_cap_40']) {
+        throw new RuntimeException('Inferred run ids were not tracked for post-run validation');
+    }
+    if (count($getProperty('allResults')) !== 2) {
+        throw new RuntimeException('Inferred runs must still be reported as result rows');
+    }
+    if (!is_file($resultsDir . 'logs' . DIRECTORY_SEPARATOR . 'HYB-bom_5-tax_50_cap_85.log')) {
+        throw new RuntimeException('Inferred runs must keep a per-run log');
+    }
+} finally {
+    $removeTree($tmpRoot);
+}
+
+echo "Monotone cap inference tests passed.\n";
@@ -0,0 +1,98 @@
+import filecmp
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from CampaignDiff import CampaignResults
+from CampaignRebaseline import read_text_table, write_text_table
+from NLMCertifier import CERTIFICATE_COLUMNS, NLM_TABLE, NLMCertifier, cp_bound, nlm_violations, plm_lower_bound
+from SolutionEvaluator import InstanceCoefficients
+from SupplierDominancePruner import LARGE_CAPACITY_DETAILS, registry_instances
+
+reference = repo / "logs" / "final_campaign_20260605_061305"
+
+# Bounds: CPLEX's tolerance for an OPTIMAL PLM run, its gap for a FEASIBLE one, none otherwise.
+assert abs(plm_lower_bound(1000.0, "OPTIMAL", 0) - (1000.0 - 0.1 - 5e-5)) < 1e-12
+assert abs(plm_lower_bound(1000.0, "FEASIBLE", 2.5) - (975.0 - 5e-5)) < 1e-12
+assert np.isnan(plm_lower_bound(1000.0, "FEASIBLE", np.nan)) and np.isnan(plm_lower_bound(1000.0, "TIMEOUT", 0))
+assert cp_bound(" ! Current bound is 72409.55 (gap is 43,96%)\n ! Best bound             : 93361.92\n") == 93361.92
+assert np.isnan(cp_bound("Total (root+branch&cut) =    0,06 sec."))
+
+# The PLM decision of bom_13 is NLM-feasible; broken decisions name the NLM constraints they violate.
+campaign = CampaignResults(str(reference))
+coefficients = InstanceCoefficients.from_instance(registry_instances()["bom_13"], 10, LARGE_CAPACITY_DETAILS)
+n, s = coefficients.nb_nodes, coefficients.nb_supp
+vectors = campaign.decisions("COMP-bom_13-EMISTAXE-PLM")
+a, x, z, q = vectors["A"], vectors["X"], vectors["Z"].reshape(n, s), vectors["Q"].reshape(n, s)
+repaired, violated = nlm_violations(coefficients, a, x, z, q, 1)
+assert violated == [] and np.array_equal(repaired, a)
+# Slack on the last node is taken back to the ct2 equality, which lowers the objective.
+slack = a.copy()
+slack[-1] += 3
+repaired, violated = nlm_violations(coefficients, slack, x, z, q, 1)
+assert violated == [] and np.array_equal(repaired, a)
+late_root = a.copy()
+late_root[0] = 2
+assert nlm_violations(coefficients, late_root, x, z, q, 1)[1] == ["ct3"]
+leaf = int(np.flatnonzero(q.sum(axis=1))[0])
+moved = q.copy()
+moved[leaf] = np.roll(moved[leaf], 1)
+assert set(nlm_violations(coefficients, a, x, z, moved, 1)[1]) == {"ct11", "ct14"}
+late = a.copy()
+late[1] = 0
+assert "lead_time" in nlm_violations(coefficients, late, x, z, q, 1)[1]
+emissions = coefficients.evaluate(a[None], x[None], z[None], q[None], [0.0])["Emis"][0]
+assert nlm_violations(coefficients, a, x, z, q, 1, cap=emissions)[1] == []
+assert nlm_violations(coefficients, a, x, z, q, 1, cap=emissions - 1)[1] == ["ct10"]
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    temp = Path(temp_dir)
+    certified = temp / "certified"
+    shutil.copytree(reference, certified)
+
+    # Every reference NLM run reaches the PLM optimum, which the PLM bound certifies at CPLEX's tolerance,
+    # although five of them ran into the 300 s limit with CP gaps of 5-51%.
+    table = NLMCertifier(certified).certify()
+    nlm = table[table["model_type"] == "NLM"].set_index("run_id")
+    assert (nlm["certificate"] == "CERTIFIED").all()
+    assert (nlm["certified_gap_pct"].astype(float) < 0.0101).all()
+    assert (nlm.loc[nlm["solver_status"] == "FEASIBLE", "runtime_sec"].astype(float) > 300).sum() == 5
+    row = nlm.loc["COMP-bom_13-EMISTAXE-NLM"]
+    assert row["plm_objective_nlm"] == row["nlm_objective"] == "106795.6439"
+    assert abs(float(row["certified_lower_bound"]) - (106795.6439 * (1 - 1e-4) - 5e-5)) < 1e-6
+    # Without its NLM log the pair is still certified from the PLM side alone.
+    assert nlm.loc["COMP-bom_13-EMISCAP-NLM", "nlm_objective"] == ""
+    plm = table[table["model_type"] == "PLM"]
+    assert (plm[CERTIFICATE_COLUMNS] == "").all().all()
+
+    # Only the certificate columns are added; a second pass rewrites the same bytes.
+    written = read_text_table(certified / NLM_TABLE)
+    original = read_text_table(reference / NLM_TABLE)
+    assert list(written.columns) == list(original.columns) + CERTIFICATE_COLUMNS
+    assert written[original.columns].equals(original)
+    shutil.copy(certified / NLM_TABLE, temp / "first.csv")
+    NLMCertifier(certified).certify()
+    assert filecmp.cmp(certified / NLM_TABLE, temp / "first.csv", shallow=False)
+
+    # A stopped PLM run with a 5% gap bounds too loosely; the CP bound of bom_26 is looser still.
+    stopped = temp / "stopped"
+    shutil.copytree(reference, stopped)
+    rows = read_text_table(stopped / NLM_TABLE)
+    plm_row = rows["run_id"] == "COMP-bom_26-EMISTAXE-PLM"
+    rows.loc[plm_row, ["solver_status", "mip_gap"]] = ["FEASIBLE", "5"]
+    write_text_table(stopped / NLM_TABLE, rows)
+    table = NLMCertifier(stopped).certify(dry_run=True).set_index("run_id")
+    assert table.loc["COMP-bom_26-EMISTAXE-NLM", "certificate"] == "OPEN"
+    assert abs(float(table.loc["COMP-bom_26-EMISTAXE-NLM", "certified_gap_pct"]) - 5) < 1e-6
+    assert NLMCertifier(stopped, gap_threshold=5.01).certify(dry_run=True).set_index("run_id").loc[
+        "COMP-bom_26-EMISTAXE-NLM", "certificate"] == "CERTIFIED"
+    assert "certificate" not in read_text_table(stopped / NLM_TABLE)  # dry runs write nothing
+
+print("NLM certifier tests passed.")
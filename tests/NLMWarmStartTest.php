@@ -0,0 +1,108 @@
+<?php
+
+require_once __DIR__ . '/../src/NLMWarmStart.php';
+
+$model = <<<'OPL'
+using CP;
+int t_process[N];
+int su[N][S];
+float sup[S][1..4];
+dvar boolean x[N];
+dvar int a[N];
+dvar boolean z[N][S];
+dvar int+ q[N][S]; //order quantity per supplier
+dexpr float dlts = sum(i in N) a[i];
+ //minimize TotalCostCS+dlts;
+ minimize TotalCostTS+dlts;
+subject to {
+}
+OPL;
+
+$plmResult = [
+    'status' => 'OPTIMAL',
+    'mip_gap' => 0.0,
+    'TS' => 1000.0,
+    'CS' => 900.0,
+    'A' => [1, 4],
+    'X' => [0, 1],
+    'Z' => [0, 0, 1, 0],
+    'Q' => [0, 0, 20, 0],
+    '_raw_output' => 'oplrun output',
+];
+$runConfig = ['_NBSUPP_' => 2, 'STRATEGY' => 'EMISTAXE'];
+
+$seeded = NLMWarmStart::seedRunConfig($runConfig, $plmResult, 0.1);
+// Objective TS + sum(A) = 1005, minus CPLEX's relative tolerance and the #TS rounding.
+if (abs($seeded['NLM_LOWER_BOUND'] - (1005.0 - 0.1005 - 5.0e-5)) > 1e-9) {
+    throw new RuntimeException('PLM lower bound is incorrect');
+}
+if (isset($seeded['NLM_CERTIFIED_RESULT']) || $seeded['NLM_RELATIVE_TOLERANCE'] !== 0.001) {
+    throw new RuntimeException('Seeded run config is incorrect');
+}
+
+$transformed = NLMWarmStart::seedModel($model, $seeded);
+foreach ([
+    "dvar int+ q[N][S]; //order quantity per supplier\n int nlmSeedA[N] = [1,4];",
+    'int nlmSeedZ[N][S] = [[0,0],[1,0]];',
+    'cp.setStartingPoint(seed);',
+    'cp.param.RelativeOptimalityTolerance = 0.001;',
+    'ct_nlm_plm_bound: TotalCostTS+dlts >= 1004.89945;',
+] as $expected) {
+    if (strpos($transformed, $expected) === false) {
+        throw new RuntimeException("Missing seeded model fragment: {$expected}");
+    }
+}
+if (NLMWarmStart::seedModel($model, $runConfig) !== $model) {
+    throw new RuntimeException('An unseeded run config must leave the model unchanged');
+}
+
+// The cap model's objective is TotalCostCS + dlts; a FEASIBLE PLM run bounds with its gap.
+$capped = NLMWarmStart::seedRunConfig(
+    ['_NBSUPP_' => 2, 'STRATEGY' => 'EMISCAP'],
+    array_merge($plmResult, ['status' => 'FEASIBLE', 'mip_gap' => 2.0])
+);
+if (abs($capped['NLM_LOWER_BOUND'] - (905.0 - 18.1 - 5.0e-5)) > 1e-9) {
+    throw new RuntimeException('FEASIBLE PLM lower bound is incorrect');
+}
+// Without a usable status the PLM solution is only a starting point.
+$unbounded = NLMWarmStart::seedRunConfig($runConfig, array_merge($plmResult, ['status' => 'UNKNOWN']), 0.1, true);
+if (isset($unbounded['NLM_LOWER_BOUND']) || isset($unbounded['NLM_CERTIFIED_RESULT'])
+        || !isset($unbounded['NLM_SEED_A'])) {
+    throw new RuntimeException('A PLM run without bound must only seed the NLM run');
+}
+if (NLMWarmStart::seedRunConfig($runConfig, ['A' => [1, 4], 'X' => [0, 1]]) !== $runConfig) {
+    throw new RuntimeException('A PLM run without Z/Q cannot seed the NLM run');
+}
+
+// skip_certified: the OPTIMAL PLM solution stands for the NLM run.
+$skipped = NLMWarmStart::seedRunConfig($runConfig, $plmResult, 0.1, true);
+$certified = $skipped['NLM_CERTIFIED_RESULT'] ?? [];
+if (($certified['status'] ?? '') !== 'OPTIMAL' || $certified['termination_reason'] !== 'CERTIFIED_BY_PLM'
+        || isset($certified['_raw_output']) || $certified['A'] !== [1, 4]
+        || abs($certified['mip_gap'] - 0.01000497) > 1e-6) {
+    throw new RuntimeException('Certified NLM result is incorrect');
+}
+if (isset(NLMWarmStart::seedRunConfig($runConfig, $plmResult, 0.001, true)['NLM_CERTIFIED_RESULT'])) {
+    throw new RuntimeException('A PLM solution above the certified gap must not skip the NLM run');
+}
+
+try {
+    NLMWarmStart::buildSeededModel(str_replace('using CP;', '', $model), [1, 4], [0, 1], [0, 0, 1, 0],
+        [0, 0, 20, 0], 2, null, 0.001);
+    throw new LogicException('A CPLEX model must not be seeded');
+} catch (InvalidArgumentException $e) {
+}
+
+// The PLM runs of the reference campaign carry their decisions in the log.
+$logged = NLMWarmStart::resultFromLog(
+    __DIR__ . '/../logs/final_campaign_20260605_061305/logs/COMP-bom_13-EMISTAXE-PLM.log'
+);
+if ($logged === null || count($logged['A']) !== 14 || count($logged['Q']) !== 140
+        || ($logged['status'] ?? '') !== 'OPTIMAL') {
+    throw new RuntimeException('PLM result could not be read back from its log');
+}
+if (abs(NLMWarmStart::plmObjective($logged, 'EMISTAXE') - 106795.6439) > 1e-6) {
+    throw new RuntimeException('PLM objective from the log is incorrect');
+}
+
+echo "NLM warm start tests passed.\n";
@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+import GraphGenerator
+from ReportingCore import CampaignTables, comparison_admissible, display_instance_id
+
+
+# Neither the core nor GraphGenerator itself loads the plotting stack.
+assert "matplotlib" not in sys.modules and "seaborn" not in sys.modules
+assert GraphGenerator.GraphGenerator.comparison_admissible is comparison_admissible
+assert GraphGenerator.GraphGenerator.display_instance_id("bom_par3") == display_instance_id("bom_par3") == "bom_par3_11"
+assert display_instance_id("bom_13") == "bom_13"
+
+source = repo / "logs" / "final_campaign_20260605_061305"
+with tempfile.TemporaryDirectory() as temp_dir:
+    campaign = Path(temp_dir) / "final_campaign_test"
+    campaign.mkdir()
+    shutil.copy(source / "consolidated_results.csv", campaign)
+    shutil.copytree(source / "tables", campaign / "tables")
+    tables = CampaignTables(campaign)
+    assert tables.tax_sweep_df is not None and tables.svt_df is not None and tables.summary.rows > 0
+    assert not (campaign / "figures").exists()
+
+    # The first plot imports and styles matplotlib.
+    generator = GraphGenerator.GraphGenerator(str(campaign))
+    assert "matplotlib" not in sys.modules
+    generator.plot_tax_sweep()
+    import matplotlib
+    assert "seaborn" in sys.modules and matplotlib.rcParams["font.family"] == ["serif"]
+    assert (generator.figures_dir / "fig4_tax_sweep.png").exists()
+
+    # The startup benchmark times fresh interpreters and appends to its history.
+    history = Path(temp_dir) / "import_benchmark.jsonl"
+    for _ in range(2):
+        done = subprocess.run([sys.executable, str(repo / "src" / "ReportingCore.py"), "--repeat", "1",
+                               "--record", str(history), "--budget", "30"], capture_output=True, text=True)
+        assert done.returncode == 0, done.stderr
+    records = [json.loads(line) for line in history.read_text().splitlines()]
+    assert len(records) == 2
+    imports = records[-1]["imports"]
+    assert not imports["ReportingCore"]["matplotlib"] and not imports["GraphGenerator"]["matplotlib"]
+    assert imports["GraphGenerator+plotting"]["matplotlib"]
+    assert imports["ReportingCore"]["median_sec"] < imports["GraphGenerator+plotting"]["median_sec"]
+
+print("Reporting core tests passed.")
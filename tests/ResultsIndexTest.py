@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from ReportingCore import CampaignTables, ResultsIndex, comparison_admissible, instance_metadata, instance_sort_key
+
+
+source = repo / "logs" / "final_campaign_20260605_061305"
+df = pd.read_csv(source / "consolidated_results.csv")
+index = ResultsIndex(df)
+
+# The mask is the comparison-admissibility filter.
+assert index.admissible.sum() == len(comparison_admissible(df)) < len(df)
+pd.testing.assert_frame_equal(index.rows(), comparison_admissible(df))
+
+# Instance metadata, looked up once per distinct instance id in the instance catalog.
+assert instance_metadata("bom_13") == {"family": "medium", "N": 13, "levels": 5, "components": 14, "depth": 5,
+                                       "branches": 1, "leaves": 6, "suppliers": 20, "topology": "Standard",
+                                       "sort_key": (0, 13, 5, "bom_13")}
+assert instance_metadata("bom_ml4_30")["levels"] == 4 and instance_metadata("bom_ml4_30")["N"] == 30
+assert instance_metadata("bom_par3")["branches"] == 2 and instance_metadata("bom_par3")["N"] == 11
+assert instance_metadata("bom_par3")["topology"] == "Parallel"
+assert instance_metadata("other_7")["family"] == "unregistered" and instance_metadata("other_7")["N"] is None
+assert sorted(["bom_par4", "bom_ml4_55", "other_7", "bom_par2", "bom_ml4_30", "bom_50", "bom_5", "bom_ml5_45"],
+              key=instance_sort_key) == \
+    ["bom_5", "bom_50", "bom_ml4_30", "bom_ml5_45", "bom_ml4_55", "bom_par2", "bom_par4", "other_7"]
+assert (index.instances.index == df.index).all()
+assert index.instances.loc[df["instance_id"] == "bom_ml4_30", "topology"].eq("Multi-Level").all()
+
+# Groups hold the positions of the boolean filters, in order of first appearance.
+admissible = comparison_admissible(df)
+for column in ["experiment", "strategy", "instance_id", "model_type", "tax_rate", "cap_level"]:
+    groups = index.groups(column)
+    assert list(groups) == list(admissible[column].dropna().unique()), column
+    for value, positions in groups.items():
+        assert np.array_equal(df.index[positions], admissible.index[admissible[column] == value]), (column, value)
+assert index.groups("instance_id") is index.groups("instance_id")
+assert sum(len(p) for p in index.groups("experiment", admissible=False).values()) == len(df)
+
+where = (df["experiment"] == "carbon_tax_sweep") & (df["instance_id"] == "bom_13") & (df["tax_rate"] == 50)
+assert list(index.select(admissible=False, experiment="carbon_tax_sweep", instance_id="bom_13", tax_rate=50)) \
+    == list(np.flatnonzero(where))
+assert len(index.select(experiment="carbon_tax_sweep", instance_id="bom_404")) == 0
+
+# take returns only the asked columns, metadata included, and leaves the table alone.
+columns = list(df.columns)
+rows = index.rows(experiment="scalability", topology="Standard", columns=["N", "runtime_sec"])
+assert list(rows.columns) == ["N", "runtime_sec"] and rows["N"].min() >= 2
+rows["runtime_sec"] = 0
+assert list(df.columns) == columns and df["runtime_sec"].max() > 0
+
+# Each experiment table gets its index once.
+tables = CampaignTables(source)
+assert tables.index("tax_sweep_df") is tables.index("tax_sweep_df")
+assert tables.index("tax_sweep_df").frame is tables.tax_sweep_df
+assert list(tables.index("topology_df").groups("topology")) == ["Multi-Level", "Parallel"]
+
+print("Results index tests passed.")
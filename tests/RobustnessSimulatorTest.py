@@ -0,0 +1,82 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from RobustnessSimulator import RobustnessSimulator, simulate_run
+from SolutionEvaluator import SolutionEvaluator
+from SupplierDominancePruner import DATA_DIR, read_bom, read_supplier_details
+
+
+source = repo / "logs" / "final_campaign_20260605_061305"
+run_ids = ["TAX-bom_5-0.00", "CAP-bom_5-75", "SVT-bom_5-EMISTAXE-SvT3", "SCAL-005"]
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    campaign = Path(temp_dir) / "final_campaign_test"
+    (campaign / "logs").mkdir(parents=True)
+    results = pd.read_csv(source / "consolidated_results.csv")
+    results[results["run_id"].isin(run_ids)].to_csv(campaign / "consolidated_results.csv", index=False)
+    for run_id in run_ids:
+        shutil.copy(source / "logs" / f"{run_id}.log", campaign / "logs")
+
+    # Without variability every scenario replays the logged plan.
+    data_dir = Path(temp_dir) / "data"
+    shutil.copytree(DATA_DIR, data_dir, ignore=shutil.ignore_patterns("*.md", "*.backup*"))
+    for path in data_dir.glob("bom_supemis_*.csv"):
+        bom = read_bom(path)
+        bom["var_factor"] = 0.0
+        bom.to_csv(path, sep=";", index=False)
+    for path in data_dir.glob("supp_details_*.csv"):
+        details = read_supplier_details(path)
+        details["reliability"] = 1.0
+        details.to_csv(path, sep=";", index=False)
+    calm = RobustnessSimulator(campaign, data_dir)
+    summaries = {task["run"]["run_id"]: simulate_run(task)[0]
+                 for task in calm.tasks(scenarios=500, chunk_size=200)}
+    emis = SolutionEvaluator(campaign, data_dir).evaluate().set_index("run_id")["Emis"]
+    for run_id in ["TAX-bom_5-0.00", "CAP-bom_5-75", "SVT-bom_5-EMISTAXE-SvT3"]:
+        summary = summaries[run_id]
+        assert summary["service_level"] == 1 and summary["stockout_probability"] == 0, summary
+        assert summary["Emis_std"] < 1e-6 and abs(summary["Emis_mean"] - emis[run_id]) < 1e-6
+        assert summary["planned_Emis"] == emis[run_id]
+    # SCAL-005 is multi-sourced without a logged split: lead times are simulated, emissions are not.
+    assert summaries["SCAL-005"]["service_level"] == 1 and np.isnan(summaries["SCAL-005"]["Emis_mean"])
+
+    # With the real data the plans are exposed: late suppliers and demand peaks empty buffers.
+    simulator = RobustnessSimulator(campaign)
+    tasks = list(simulator.tasks(scenarios=3000, chunk_size=1000, seed=3, run_ids=["TAX-bom_5-0.00"]))
+    assert len(tasks) == 1
+    summary, buffers = simulate_run(tasks[0])
+    assert 0 < summary["service_level"] < 1 and 0 < summary["stockout_probability"] < 1
+    assert summary["Emis_p05"] <= summary["Emis_p50"] <= summary["Emis_p95"] <= summary["Emis_p99"]
+    assert len(buffers) == summary["buffers"] and (buffers["stockout_probability"] <= 1).all()
+    # The draws depend on the seed and run_id only: a repeat call sees the same scenarios.
+    again, _ = simulate_run(tasks[0])
+    assert again["service_level"] == summary["service_level"]
+
+    # Streaming output is the same with one or two worker processes.
+    single, pooled = Path(temp_dir) / "single.csv", Path(temp_dir) / "pooled.csv"
+    assert simulator.run(single, workers=1, scenarios=2000, chunk_size=700) == len(run_ids)
+    assert simulator.run(pooled, workers=2, scenarios=2000, chunk_size=700) == len(run_ids)
+    columns = [c for c in pd.read_csv(single).columns if c != "sim_time_sec"]
+    pd.testing.assert_frame_equal(pd.read_csv(single)[columns].sort_values("run_id", ignore_index=True),
+                                  pd.read_csv(pooled)[columns].sort_values("run_id", ignore_index=True))
+
+    tool = repo / "src" / "RobustnessSimulator.py"
+    output, buffer_table = Path(temp_dir) / "summary.csv", Path(temp_dir) / "buffers.csv"
+    done = subprocess.run([sys.executable, str(tool), str(campaign), "--scenarios", "1000",
+                           "--runs", "CAP-bom_5-75", "--output", str(output), "--buffers", str(buffer_table)],
+                          capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    assert pd.read_csv(output)["run_id"].tolist() == ["CAP-bom_5-75"]
+    assert set(pd.read_csv(buffer_table)["run_id"]) == {"CAP-bom_5-75"}
+
+print("Robustness simulator tests passed.")
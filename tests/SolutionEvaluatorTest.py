@@ -0,0 +1,87 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from CampaignArchive import pack_campaign
+from SolutionEvaluator import EMISSION_COMPONENTS, SolutionEvaluator, parse_taxes
+
+
+source = repo / "logs" / "final_campaign_20260605_061305"
+run_ids = ["TAX-bom_5-0.00", "TAX-bom_5-50.00", "CAP-bom_5-70", "HYB-bom_5-tax_50_cap_85",
+           "COMP-bom_5-EMISTAXE-NLM", "SCAL-005", "SVT-bom_5-EMISTAXE-SvT3"]
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    campaign = Path(temp_dir) / "final_campaign_test"
+    (campaign / "logs").mkdir(parents=True)
+    results = pd.read_csv(source / "consolidated_results.csv")
+    results[results["run_id"].isin(run_ids)].to_csv(campaign / "consolidated_results.csv", index=False)
+    for run_id in run_ids:
+        shutil.copy(source / "logs" / f"{run_id}.log", campaign / "logs")
+
+    evaluation, breakdown = SolutionEvaluator(campaign).evaluate(breakdown=True)
+    evaluation = evaluation.set_index("run_id")
+    # Every recomputed value agrees with #TS / #CS / #E / #WIP and the #Result tuple.
+    assert sorted(evaluation.index) == sorted(run_ids)
+    assert (evaluation["check"] == "MATCH").all(), evaluation["check"].to_dict()
+    tax = evaluation.loc["TAX-bom_5-50.00"]
+    assert abs(tax["TotalCostTS"] - 48786.61) < 1e-6 and tax["EmisCost"] > 0
+    assert abs(tax["objective"] - tax["TotalCostTS"] - tax["DIO"]) < 1e-9
+    cap = evaluation.loc["CAP-bom_5-70"]
+    assert cap["tax_rate"] == 0 and abs(cap["objective"] - cap["TotalCostCS"] - cap["DIO"]) < 1e-9
+    # SCAL runs log no Q: #DELIVER gives z, so WIP and DIO are still exact, but the split of a
+    # multi-sourced leaf is unknown and the sourcing terms stay NaN.
+    scal = evaluation.loc["SCAL-005"]
+    assert scal["allocation"] == "MULTI_SOURCED_UNLOGGED" and np.isnan(scal["RawMCost"])
+    assert abs(scal["WIP"] - scal["logged_WIP"]) < 1e-6 and scal["DIO"] == scal["logged_DIO"]
+
+    # The per-node attribution adds up to the model's Emis.
+    totals = breakdown.groupby("run_id")[list(EMISSION_COMPONENTS)].sum().sum(axis=1)
+    known = evaluation["Emis"].dropna()
+    assert len(known) == len(run_ids) - 1 and np.allclose(totals.loc[known.index], known, rtol=1e-12)
+    assert (breakdown["total"].dropna() >= 0).all()
+
+    # Re-pricing is TotalCostCS + DIO + t * Emis / 1e6 for every stored solution.
+    taxes = parse_taxes("0:100:50")
+    assert taxes.tolist() == [0, 50, 100] and parse_taxes("10,20").tolist() == [10, 20]
+    repriced = SolutionEvaluator(campaign).reprice(taxes)
+    at_50 = repriced[(repriced["run_id"] == "TAX-bom_5-50.00") & (repriced["tax"] == 50)].iloc[0]
+    assert abs(at_50["objective"] - tax["objective"]) < 1e-6
+    best = repriced[repriced["best_stored"] & (repriced["service_time_promised"] == 1)
+                    & (repriced["supp_details_file"] == "supp_details_supeco.csv")]
+    # The tax-0 optimum is the cheapest stored solution at t = 0.
+    assert "TAX-bom_5-0.00" in set(best.loc[best["tax"] == 0, "run_id"])
+    # SvT3 plans are not compared against service-time-1 runs.
+    svt = repriced[repriced["run_id"] == "SVT-bom_5-EMISTAXE-SvT3"]
+    assert svt["best_stored"].all()
+
+    # A corrupted log value is reported; the packed archive evaluates identically.
+    archive = pack_campaign(campaign)["archive"]
+    log = campaign / "logs" / "TAX-bom_5-50.00.log"
+    log.write_text(log.read_text(encoding="utf-8").replace("[TS] => 48786.61", "[TS] => 48790.61"),
+                   encoding="utf-8")
+    corrupted = SolutionEvaluator(campaign).evaluate().set_index("run_id")
+    assert corrupted.loc["TAX-bom_5-50.00", "check"] == "MISMATCH:TotalCostTS"
+    packed = SolutionEvaluator(archive).evaluate().set_index("run_id")
+    assert (packed["check"] == "MATCH").all()
+    assert np.allclose(packed.loc[evaluation.index, "Emis"], evaluation["Emis"], equal_nan=True)
+
+    tool = repo / "src" / "SolutionEvaluator.py"
+    output = Path(temp_dir) / "evaluation.csv"
+    failed = subprocess.run([sys.executable, str(tool), "evaluate", str(campaign), "--output", str(output)],
+                            capture_output=True, text=True)
+    assert failed.returncode == 1 and "MISMATCH=1" in failed.stdout, failed.stdout + failed.stderr
+    priced = subprocess.run([sys.executable, str(tool), "reprice", str(archive), "--taxes", "0,60",
+                             "--output", str(Path(temp_dir) / "repricing.csv")], capture_output=True, text=True)
+    assert priced.returncode == 0, priced.stderr
+    assert len(pd.read_csv(Path(temp_dir) / "repricing.csv")) == 2 * (len(run_ids) - 1)
+
+print("Solution evaluator tests passed.")
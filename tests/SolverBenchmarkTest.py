@@ -0,0 +1,125 @@
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from SolverBenchmark import BenchmarkSuite, holm, mann_whitney, read_history, select_point, solve_profile, summarise
+
+
+# A real CPLEX log (comma decimals): the gap closes at the root, before the only clock.
+log = (repo / "logs" / "scalability_20260116_111242" / "run_50.log").read_text()
+assert solve_profile(log, 1.0) == {"runtime_sec": 0.06, "time_to_gap_sec": 0.06, "nodes": 0, "final_gap_pct": 0.0}
+# The data echoed before the node log is not read as node lines.
+stopped = "\n".join([
+    "3 1 1.1 680 90 0.88 0.95 0.5 (9)9",
+    "   Node  Left     Objective  IInf  Best Integer    Best Bound    ItCnt     Gap",
+    "*     0+    0                       3,29802e+09   111953,0000           100,00%",
+    "Elapsed time = 1,50 sec. (45,69 ticks, tree = 0,01 MB, solutions = 1)",
+    "   1200   310  1360687,2857    38   1397153,0000  1360687,2857      188    2,61%",
+    "   4100   900  1362000,0000    12   1382166,0000  1369000,0000      900    0,95%",
+    "Elapsed time = 9,25 sec. (45,69 ticks, tree = 0,01 MB, solutions = 5)",
+    "   5000   800  1362000,0000    12   1382166,0000  1370000,0000     1000    0,87%",
+    "Root node processing (before b&c):",
+    "Total (root+branch&cut) =   10,00 sec. (45,77 ticks)",
+])
+assert solve_profile(stopped, 1.0) == {"runtime_sec": 10.0, "time_to_gap_sec": 9.25, "nodes": 5000,
+                                       "final_gap_pct": 0.87}
+assert solve_profile(stopped, 0.5)["time_to_gap_sec"] == float("inf")
+assert solve_profile("! Number of branches     : 12,345\nTime spent in solve : 3,5s", 1.0)["nodes"] == 12345
+
+# Exact Mann-Whitney p-values match the enumeration of all splits; Holm is monotone.
+a, b = [1.1, 2.5, 3.3, 0.2], [4.1, 0.5, 2.9, 5.5, 6.0]
+u, p = mann_whitney(a, b)
+values = a + b
+splits = [sum(values[i] > values[j] for i in chosen for j in range(9) if j not in chosen)
+          for chosen in itertools.combinations(range(9), 4)]
+assert u == 4 and abs(p - 2 * np.mean(np.array(splits) <= 4)) < 1e-12
+assert abs(mann_whitney(range(7), range(10, 17))[1] - 2 / 3432) < 1e-15
+assert mann_whitney([1, 1, 1], [1, 1, 1])[1] == 1.0
+assert np.allclose(holm([0.01, 0.04, np.nan, 0.03]), [0.03, 0.06, np.nan, 0.06], equal_nan=True)
+
+# The shipped suite resolves against the registry; per-instance caps are resolved.
+suite = BenchmarkSuite()
+assert len(suite.cells()) == 18 and suite.substitutions("bom_13", "EMISCAP")["_EMISCAP_"] == 25071554
+assert len({cell["settings_key"] for cell in suite.cells()}) == 1 + 6 + 6  # one tax setting, caps per instance
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    temp = Path(temp_dir)
+    config = json.loads((repo / "config" / "benchmark_suite.json").read_text())
+    config["settings"].update(trials=7, time_limit_sec=2)
+    (temp / "suite.json").write_text(json.dumps(config))
+    # The bom_5 cap model always hits the 2 s limit; the tax model carrying the marker is twice as fast.
+    # Draws depend on the seed, the model text and the trial only, so unchanged cells repeat exactly.
+    (temp / "profile.json").write_text(json.dumps({
+        "seed": 11,
+        "default": {"runtime": {"distribution": "lognormal", "median": 1.0, "sigma": 0.1}},
+        "rules": [{"model_contains": "faster branching",
+                   "runtime": {"distribution": "lognormal", "median": 0.5, "sigma": 0.1}},
+                  {"model_contains": "float EmisTax = 0.0", "node_file": "bom_supemis_5.csv",
+                   "runtime": {"distribution": "constant", "value": 5.0}}],
+    }))
+    models = temp / "models"
+    shutil.copytree(repo / "models", models)
+    tax = models / "RUNS_SupEmis_Cplex_PLM_Tax.mod"
+    environment = dict(os.environ, FAKE_OPLRUN_PROFILE=str(temp / "profile.json"))
+    history = temp / "history.jsonl"
+
+    def benchmark(*arguments):
+        return subprocess.run([sys.executable, str(repo / "src" / "SolverBenchmark.py"), "--history", str(history),
+                               *arguments], capture_output=True, text=True, env=environment)
+
+    run = ["run", "--oplrun", str(repo / "src" / "FakeOplrun.py"), "--suite", str(temp / "suite.json"),
+           "--models-dir", str(models), "--instances", "bom_5", "bom_13", "--strategies", "EMISTAXE", "EMISCAP"]
+    done = benchmark(*run, "--label", "base")
+    assert done.returncode == 0, done.stderr
+    first = history.read_text()
+    tax.write_text("// faster branching\n" + tax.read_text())
+    done = benchmark(*run, "--label", "faster")
+    assert done.returncode == 0, done.stderr
+    assert history.read_text().startswith(first)  # append-only
+
+    records = read_history(history)
+    assert len(records) == 2 * 4 * 7 and records["trial"].max() == 7
+    base = select_point(records, "base")
+    assert base.equals(select_point(records, "previous")) and base["batch"].nunique() == 1
+    assert records.groupby(["instance_id", "strategy"])["key"].nunique().to_dict() == \
+        {("bom_13", "EMISCAP"): 1, ("bom_13", "EMISTAXE"): 2, ("bom_5", "EMISCAP"): 1, ("bom_5", "EMISTAXE"): 2}
+    capped = base[(base["instance_id"] == "bom_5") & (base["strategy"] == "EMISCAP")]
+    assert (capped["status"] == "FEASIBLE").all() and (capped["runtime_sec"] == 2.0).all()
+    assert np.isinf(capped["time_to_gap_sec"]).all() and (capped["final_gap_pct"] > 1).all()
+    unchanged = [point[point["strategy"] == "EMISCAP"].sort_values(["instance_id", "trial"])["runtime_sec"].tolist()
+                 for point in (base, select_point(records, "faster"))]
+    assert unchanged[0] == unchanged[1]
+    summary = summarise(base, "base").set_index(["instance_id", "strategy"])
+    assert summary.loc[("bom_5", "EMISCAP"), "gap_reached"] == 0
+    assert summary.loc[("bom_13", "EMISTAXE"), ["trials", "solved", "gap_reached"]].tolist() == [7, 7, 7]
+    assert 0.8 < summary.loc[("bom_13", "EMISTAXE"), "runtime_sec_median"] < 1.25
+    assert summary.loc[("bom_13", "EMISTAXE"), "runtime_sec_iqr"] > 0
+
+    # The tax model change is significant on both timings; the unchanged cap cells are not.
+    done = benchmark("compare", "base", "faster", "--csv", str(temp / "compare.csv"))
+    assert done.returncode == 0, done.stdout
+    report = pd.read_csv(temp / "compare.csv")
+    flagged = report[report["verdict"].notna()]
+    assert set(zip(flagged["instance_id"], flagged["strategy"], flagged["metric"])) == \
+        {(i, "EMISTAXE", m) for i in ("bom_5", "bom_13") for m in ("runtime_sec", "time_to_gap_sec")}
+    assert (flagged["verdict"] == "improved").all() and (flagged["changed"] == "model").all()
+    assert (flagged["p_holm"] < 0.05).all() and (flagged["change"] < -0.3).all()
+    # Swapped, the same change is a regression and gates with exit code 1.
+    done = benchmark("compare", "latest", "previous")
+    assert done.returncode == 1 and done.stdout.count("REGRESSION") == 4
+    assert benchmark("compare", "latest", "previous", "--fail-on", "nodes").returncode == 0
+    assert benchmark("report", "--points", "faster").returncode == 0
+
+print("Solver benchmark tests passed.")
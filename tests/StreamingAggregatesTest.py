@@ -0,0 +1,185 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+os.environ.setdefault("MPLBACKEND", "Agg")
+
+import numpy as np
+import pandas as pd
+from matplotlib import cbook
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from CampaignArchive import pack_campaign
+from GraphGenerator import GraphGenerator
+from StreamingAggregates import (TABLE_EXPERIMENTS, GroupStats, PointSample, ResultsSummary, TDigest,
+                                 read_csv_chunks)
+
+
+rng = np.random.default_rng(11)
+
+# Exact below the limit: matplotlib's own box-plot statistics.
+values = rng.lognormal(10, 1, size=500)
+small = TDigest(exact_limit=1000)
+for part in np.array_split(values, 7):
+    small.add(part)
+assert small.exact and np.array_equal(small.values(), values)
+expected = cbook.boxplot_stats(values / 1e3, labels=["x"])[0]
+stats = small.boxplot_stats("x", scale=1e3)
+assert all(np.array_equal(stats[k], expected[k]) for k in expected)
+
+# Beyond it, a t-digest: quantiles within 0.5% in rank, exact extremes and mean.
+values = rng.lognormal(10, 1, size=300_000)
+digest = TDigest(exact_limit=1000)
+for part in np.array_split(values, 40):
+    digest.add(np.r_[part, np.nan])
+assert not digest.exact and digest.count == len(values) and len(digest.means) < 400
+ranks = np.searchsorted(np.sort(values), digest.quantile([0.01, 0.25, 0.5, 0.75, 0.99])) / len(values)
+assert np.all(np.abs(ranks - [0.01, 0.25, 0.5, 0.75, 0.99]) < 0.005), ranks
+assert digest.min == values.min() and digest.max == values.max() and np.isclose(digest.mean(), values.mean())
+approx = digest.boxplot_stats("x")
+assert approx["whislo"] <= approx["q1"] < approx["med"] < approx["q3"] <= approx["whishi"]
+assert approx["fliers"].tolist() == [values.max()]
+
+# Points keep file order up to the limit and a sample of exactly limit points beyond.
+sample = PointSample(limit=100)
+sample.add(np.arange(60), -np.arange(60))
+assert sample.points()[0].tolist() == list(range(60))
+for start in range(60, 1000, 60):
+    sample.add(np.arange(start, start + 60), -np.arange(start, start + 60))
+x, y = sample.points()
+assert len(x) == 100 and np.all(np.diff(x) > 0) and np.array_equal(y, -x) and sample.seen == 1020
+
+# Means do not depend on how the column is chunked.
+keys = rng.choice(["A", "B", None], size=1000)
+column = rng.normal(size=1000) * 1e6
+whole, chunked = GroupStats(), GroupStats()
+whole.add(keys, column)
+for part in np.array_split(np.arange(1000), 13):
+    chunked.add(keys[part], column[part])
+assert whole.mean("A") == chunked.mean("A") and np.isnan(whole.mean("missing"))
+
+source = repo / "logs" / "final_campaign_20260605_061305"
+frame = pd.read_csv(source / "consolidated_results.csv")
+in_memory = ResultsSummary.from_frame(frame)
+streamed = ResultsSummary.from_chunks(read_csv_chunks(source, "consolidated_results.csv", chunksize=17))
+assert streamed.rows == len(frame) and streamed.strategies == in_memory.strategies
+for key, sketch in in_memory.distributions.items():
+    assert np.array_equal(streamed.distributions[key].values(), sketch.values())
+for strategy in in_memory.strategies:
+    assert streamed.dio.mean(strategy) == in_memory.dio.mean(strategy)
+    assert all(np.array_equal(a, b) for a, b in zip(streamed.points[strategy].points(),
+                                                      in_memory.points[strategy].points()))
+pd.testing.assert_frame_equal(streamed.table_rows(), in_memory.table_rows(), check_dtype=False)
+kept = {name for name, kind in TABLE_EXPERIMENTS.items() if kind != "spill"}
+assert set(in_memory.table_rows()["experiment"]) == kept & set(frame["experiment"])
+hybrid = frame[frame["experiment"] == "carbon_hybrid"]
+assert in_memory.listing("carbon_hybrid").rows == streamed.listing("carbon_hybrid").rows == len(hybrid)
+assert streamed.listing("carbon_hybrid").instances() == list(dict.fromkeys(hybrid["instance_id"]))
+for instance in in_memory.listing("carbon_hybrid").instances():
+    pd.testing.assert_frame_equal(streamed.listing("carbon_hybrid").frame(instance),
+                                  in_memory.listing("carbon_hybrid").frame(instance), check_dtype=False)
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    # Peak memory follows the chunk size, not the row count.
+    big = Path(temp_dir) / "consolidated_results.csv"
+    rows = 200_000
+    pd.DataFrame({
+        "run_id": [f"MC-{i}" for i in range(rows)],
+        "experiment": "monte_carlo",
+        "instance_id": "bom_13",
+        "strategy": np.array(["EMISTAXE", "EMISCAP", "EMISHYBRID"])[np.arange(rows) % 3],
+        "solver_status": "OPTIMAL",
+        "comparison_admissible": 1,
+        "total_emissions": rng.lognormal(17, 0.5, size=rows),
+        "total_cost_with_tax": rng.lognormal(11, 0.3, size=rows),
+        "total_cost_without_tax": rng.lognormal(11, 0.3, size=rows),
+        "buffer_count": rng.integers(0, 30, size=rows),
+        "DIO": rng.integers(0, 500, size=rows),
+        "notes": "x" * 40,
+    }).to_csv(big, index=False)
+    tracemalloc.start()
+    full = pd.read_csv(big)
+    ResultsSummary.from_frame(full)
+    full_peak = tracemalloc.get_traced_memory()[1]
+    del full
+    tracemalloc.reset_peak()
+    summary = ResultsSummary.from_chunks(read_csv_chunks(temp_dir, "consolidated_results.csv", 10_000),
+                                         exact_limit=5_000, point_limit=2_000)
+    chunked_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert chunked_peak < full_peak / 4, (chunked_peak, full_peak)
+    assert summary.rows == rows and len(summary.points["EMISCAP"].points()[0]) == 2_000
+    assert summary.table_rows().empty
+
+    # Dense sweeps: repeated tax-sweep points fold to one per instance and level, and
+    # the hybrid rows are spilled, so the tables do not hold the experiment rows either.
+    points = np.arange(rows // 2)
+    sweep = pd.DataFrame({
+        "run_id": [f"S-{i}" for i in range(rows)],
+        "experiment": np.repeat(["carbon_tax_sweep", "carbon_hybrid"], rows // 2),
+        "instance_id": np.tile([f"bom_{n}" for n in points % 20], 2),
+        "strategy": np.repeat(["EMISTAXE", "EMISHYBRID"], rows // 2),
+        "tax_rate": np.tile(points // 20 % 250 * 0.5, 2),
+        "cap_level": np.tile(np.array(["none", "100%", "90%", "80%"])[points % 4], 2),
+        "cap_value": np.tile(rng.lognormal(17, 0.5, size=rows // 2), 2),
+        "solver_status": "OPTIMAL",
+        "comparison_admissible": 1,
+        "total_emissions": rng.lognormal(17, 0.5, size=rows),
+        "total_cost_with_tax": rng.lognormal(11, 0.3, size=rows),
+        "total_cost_without_tax": rng.lognormal(11, 0.3, size=rows),
+        "buffer_count": rng.integers(0, 30, size=rows),
+        "DIO": rng.integers(0, 500, size=rows),
+        "notes": "x" * 40,
+    })
+    sweep.to_csv(big, index=False)
+    tracemalloc.start()
+    full = pd.read_csv(big)
+    full_peak = tracemalloc.get_traced_memory()[1]
+    del full
+    tracemalloc.reset_peak()
+    summary = ResultsSummary.from_chunks(read_csv_chunks(temp_dir, "consolidated_results.csv", 10_000),
+                                         exact_limit=5_000, point_limit=2_000)
+    table_rows = summary.table_rows()
+    chunked_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert chunked_peak < full_peak / 4, (chunked_peak, full_peak)
+    assert len(table_rows) == 20 * 250 and summary.listing("carbon_hybrid").rows == rows // 2
+    first = sweep[sweep["experiment"] == "carbon_tax_sweep"].drop_duplicates(["instance_id", "tax_rate"])
+    assert np.allclose(table_rows["total_emissions"], first["total_emissions"], rtol=1e-12, atol=0)
+    assert "notes" not in table_rows.columns and "DIO" not in table_rows.columns
+    assert len(summary.listing("carbon_hybrid").frame("bom_7")) == rows // 2 // 20
+
+    # Figures and tables come out byte-identical from streamed chunks, also from an archive.
+    campaign = Path(temp_dir) / "final_campaign_test"
+    campaign.mkdir()
+    shutil.copy(source / "consolidated_results.csv", campaign)
+    shutil.copytree(source / "tables", campaign / "tables")
+    archive = pack_campaign(campaign)["archive"]
+    figures = {}
+    for name, target, chunksize in [("memory", campaign, None), ("streamed", archive, 25)]:
+        generator = GraphGenerator(str(target), chunksize=chunksize)
+        generator.plot_strategy_comparison()
+        generator.plot_cost_emissions_pareto()
+        generator.plot_inventory_kpis()
+        generator.plot_tax_sweep()
+        figures[name] = {path.name: path.read_bytes() for path in generator.figures_dir.glob("*.png")}
+        shutil.rmtree(generator.figures_dir)
+    assert len(figures["memory"]) == 4 and figures["memory"] == figures["streamed"]
+
+    tool = repo / "src" / "generate_article_tables.py"
+    outputs = {}
+    for name, args in [("memory", []), ("streamed", ["--chunksize", "11"])]:
+        done = subprocess.run([sys.executable, str(tool), str(campaign), *args], capture_output=True, text=True)
+        assert done.returncode == 0, done.stderr
+        outputs[name] = {path.name: path.read_text() for path in (campaign / "tables_tex").glob("*.tex")}
+        shutil.rmtree(campaign / "tables_tex")
+    assert outputs["memory"] and outputs["memory"] == outputs["streamed"]
+
+print("Streaming aggregation tests passed.")
@@ -0,0 +1,112 @@
+import json
+import tempfile
+from pathlib import Path
+import sys
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from SupplierDominancePruner import (
+    SupplierDominancePruner,
+    expand_allocation,
+    expand_deliveries,
+    prune_instance,
+    read_bom,
+    read_supplier_details,
+    read_supplier_list,
+    run_model,
+)
+
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    data_dir = Path(temp_dir) / "data"
+    data_dir.mkdir()
+    # Node 1 is an assembly, nodes 2 (demand 20) and 3 (demand 100, decimal commas) are leaves.
+    (data_dir / "bom_supemis_t3.csv").write_text(
+        "ind;t_process;parent;unit_price;rqtf;aih_cost;var_factor;lt_factor;cycle;minOrder;facility_emis;inventory_emis;trsp_emis;\n"
+        "0;0;-1;0;0;0.25;0.5;0.8;1;0;0;0;0;\n"
+        "1;2;0;700;1;0.25;0.5;0.8;1;0;7000;700;1500;\n"
+        "2;4;1;165;1;0.25;0.5;0.8;1;0;5000;500;1500;\n"
+        "3;6;1;100;5;0,25;0,5;0,8;1;0;3500;350;1500\n",
+        encoding="utf-8",
+    )
+    (data_dir / "supp_list_t3.csv").write_text(
+        "nb_nodes;nb_suppliers; #  comment\n"
+        "3;5;\n"
+        "id_nodes;list_suppliers;  #  comment\n"
+        "2;1,2,3,4,5,6\n"
+        "3;1,2,3,4,5;\n",
+        encoding="utf-8",
+    )
+    (data_dir / "supp_details_supeco.csv").write_text(
+        "id_supp;delay;price;capacity;emissions;quality_score;reliability;lead_time_variance;\n"
+        "1;2;1;100;80;0.85;0.92;0.8;\n"   # dominated by 3 everywhere
+        "2;1;0.8;30;40;0.80;0.88;0.7;\n"  # dominates 1 but only covers demand 20
+        "3;1;0.9;200;60;0.80;0.90;0.9;\n"
+        "4;1;0.9;200;60;0.80;0.90;0.9;\n"  # twin of 3
+        "5;9;0.2;250;15;0.60;0.65;3.5;\n"
+        "6;1;0.1;999;1;0.99;0.99;0.1;\n",  # beyond NB_SUPP, never considered
+        encoding="utf-8",
+    )
+
+    bom = read_bom(data_dir / "bom_supemis_t3.csv")
+    assert bom["aih_cost"].tolist() == [0.25] * 4
+    nb_nodes, _, headers, eligibility = read_supplier_list(data_dir / "supp_list_t3.csv")
+    assert nb_nodes == 3 and eligibility[3] == [1, 2, 3, 4, 5]
+    details = read_supplier_details(data_dir / "supp_details_supeco.csv")
+
+    pruning = prune_instance(bom, eligibility, details, 5, "EMISTAXE")
+    assert pruning["kept"][2] == [2, 5]
+    assert pruning["removed"][2] == {1: 2, 3: 2, 4: 2}
+    # At node 3 supplier 2 cannot absorb the demand of 100, so it dominates nobody.
+    assert pruning["kept"][3] == [2, 3, 5]
+    assert pruning["removed"][3] == {1: 3, 4: 3}
+    assert pruning["original_supplier_ids"] == [2, 3, 5]
+
+    # Quality and reliability make supplier 1 worth keeping under the attribute penalty.
+    penalty = prune_instance(bom, eligibility, details, 5, "ATTRIBUTE_PENALTY")
+    assert 1 in penalty["kept"][3] and 4 not in penalty["kept"][3]
+
+    mapping = {"nb_supp_original": 5, "nb_supp_reduced": 3, "original_supplier_ids": [2, 3, 5]}
+    reduced_z = [0, 0, 0,  0, 0, 0,  1, 0, 0,  0, 1, 1]
+    assert expand_allocation(reduced_z, mapping, nb_nodes) == [
+        0, 0, 0, 0, 0,
+        0, 0, 0, 0, 0,
+        0, 1, 0, 0, 0,
+        0, 0, 1, 0, 1,
+    ]
+    assert expand_deliveries(["S1=>P2", "S3=>P3 "], mapping) == ["S2=>P2", "S5=>P3"]
+
+    registry_instance = {"id": "bom_t3", "file": "bom_supemis_t3.csv", "nodes": 3}
+    out_dir = Path(temp_dir) / "pruned"
+    pruner = SupplierDominancePruner(str(out_dir), data_dir=str(data_dir), nb_supp=5)
+    row = pruner.prune(registry_instance, "EMISCAP")
+    assert row["suppliers_reduced"] == 3
+    assert row["eligible_pairs_original"] == 10 and row["eligible_pairs_reduced"] == 5
+    assert row["allocation_vars_original"] == 60 and row["allocation_vars_reduced"] == 36
+
+    reduced_list = (out_dir / "supp_list_t3_EMISCAP_pruned.csv").read_text(encoding="utf-8").splitlines()
+    assert reduced_list[:3] == [headers[0], "3;3;", headers[2]]
+    assert reduced_list[3:] == ["2;1,3", "3;1,2,3"]
+    reduced_details = read_supplier_details(out_dir / "supp_details_t3_EMISCAP_pruned.csv")
+    assert reduced_details["id_supp"].tolist() == [1, 2, 3]
+    assert reduced_details["capacity"].tolist() == [30, 200, 250]
+    saved = json.loads((out_dir / "supplier_map_t3_EMISCAP_pruned.json").read_text(encoding="utf-8"))
+    assert saved["original_supplier_ids"] == [2, 3, 5]
+    assert saved["removed"]["3"] == {"1": 3, "4": 3}
+
+    # run_model reads the output like CplexRunner::parse: on SCAL-150, #E hit the int32
+    # clamp and the emissions come from the #Result tuple; the solve time has a decimal comma.
+    log = (repo / "logs" / "final_campaign_20260118_134900" / "logs" / "SCAL-150.log").read_text(encoding="utf-8")
+    recorded = Path(temp_dir) / "scal150.out"
+    recorded.write_text(log.split("[_raw_output] => \n", 1)[1].rsplit("\n)", 1)[0], encoding="utf-8")
+    oplrun = Path(temp_dir) / "oplrun"
+    oplrun.write_text(f"#!{sys.executable}\nimport sys\nsys.stdout.write(open({str(recorded)!r}).read())\n",
+                      encoding="utf-8")
+    oplrun.chmod(0o755)
+    run = run_model(str(oplrun), "RUNS_SupEmis_Cplex_PLM_Tax.mod", {}, Path(temp_dir), "SCAL-150")
+    assert run["status"] == "OPTIMAL" and run["mip_gap"] == 0.0
+    assert run["emissions"] == 2.508e10 and run["objective"] == 3.7172e6 and run["runtime_sec"] == 0.34
+
+print("Supplier dominance pruning tests passed.")
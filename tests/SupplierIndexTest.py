@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from SupplierDominancePruner import DATA_DIR, read_supplier_list
+from SupplierIndex import SupplierIndex, parse_eligibility
+
+
+# The real instance reads back exactly as the OPL models fill su[i][j] (ids <= NB_SUPP).
+index = SupplierIndex.from_files(DATA_DIR / "supp_list_13.csv", DATA_DIR / "supp_details_supeco.csv",
+                                 nb_supp=10, cache_dir=None)
+expected = {node: sorted(set(s for s in suppliers if 0 < s <= 10))
+            for node, suppliers in read_supplier_list(DATA_DIR / "supp_list_13.csv")[3].items()}
+assert index.eligibility() == {node: suppliers for node, suppliers in expected.items() if suppliers}
+
+details = pd.DataFrame({"id_supp": [3, 1, 2, 4], "delay": [1, 5, 2, 1], "price": [1.0, 2.0, 1.0, 0.5],
+                        "capacity": [50, 100, 30, 10], "emissions": [9, 1, 4, 2]})
+nodes = np.array([1, 1, 1, 1, 2, 2, 3])
+suppliers = np.array([2, 3, 3, 7, 1, 0, 4])
+small = SupplierIndex.build(3, nodes, suppliers, details, nb_supp=4)
+assert small.eligible(1).tolist() == [2, 3] and small.eligible(2).tolist() == [1]
+assert small.eligible(0).tolist() == [] and small.eligible(99).tolist() == []
+# Price ties (suppliers 2 and 3) go to the lowest id.
+assert small.cheapest().tolist() == [-1, 2, 1, 4]
+assert small.lowest_emission().tolist() == [-1, 2, 1, 4]
+assert small.best("capacity", maximize=True).tolist() == [-1, 3, 1, 4]
+assert small.capacity_sum().tolist() == [0, 80, 100, 10]
+assert np.isnan(small.minimum("delay")[0]) and small.minimum("delay")[1] == 1
+
+# 40 units at node 1: 30 from supplier 2 (emissions 4), 10 from supplier 3 (emissions 9).
+bound = small.fill_bound([0, 40, 100, 20], "emissions")
+assert bound[0] == 0 and bound[1] == 30 * 4 + 10 * 9 and bound[2] == 100 and np.isinf(bound[3])
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    supp_list = Path(temp_dir) / "supp_list_test.csv"
+    supp_list.write_text("nb_nodes;nb_suppliers; # test\n3;4;\nid_nodes;list_suppliers;\n"
+                         "1;2,3,,3,7\n2;1\n3;\n", encoding="utf-8")
+    supp_details = Path(temp_dir) / "supp_details_test.csv"
+    details.to_csv(supp_details, sep=";", index=False)
+    nb_nodes, node_ids, supplier_ids = parse_eligibility(supp_list)
+    assert nb_nodes == 3 and node_ids.tolist() == [1, 1, 1, 1, 2] and supplier_ids.tolist() == [2, 3, 3, 7, 1]
+
+    cache_dir = Path(temp_dir) / "cache"
+    first = SupplierIndex.from_files(supp_list, supp_details, nb_supp=4, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("*.npz"))) == 1
+    cached = SupplierIndex.from_files(supp_list, supp_details, nb_supp=4, cache_dir=cache_dir)
+    assert cached.eligibility() == first.eligibility() == {1: [2, 3], 2: [1]}
+    assert np.array_equal(cached.attributes["price"], first.attributes["price"])
+    # A different NB_SUPP is a different index.
+    SupplierIndex.from_files(supp_list, supp_details, nb_supp=2, cache_dir=cache_dir)
+    assert len(list(cache_dir.glob("*.npz"))) == 2
+
+tool = repo / "src" / "SupplierIndex.py"
+bounds = subprocess.run([sys.executable, str(tool), "bounds", "bom_13"], capture_output=True, text=True)
+assert bounds.returncode == 0, bounds.stderr
+assert "raw_cost_lb" in bounds.stdout
+
+print("Supplier index tests passed.")
@@ -0,0 +1,172 @@
+import hashlib
+import subprocess
+import sys
+import tempfile
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from SupplierDominancePruner import DATA_DIR, MODELS_DIR, read_supplier_details
+from SupplierSensitivityDOE import (
+    ALPHA_PLACEHOLDER,
+    DesignSpace,
+    SupplierFile,
+    SupplierSensitivityDOE,
+    latin_hypercube,
+    morris_design,
+    morris_indices,
+    penalty_model,
+    saltelli_design,
+    sobol_indices,
+)
+
+
+rng = np.random.default_rng(7)
+lhs = latin_hypercube(50, 3, rng)
+assert ((lhs >= 0) & (lhs < 1)).all()
+assert all(sorted(np.floor(lhs[:, j] * 50).astype(int)) == list(range(50)) for j in range(3))
+
+# Ishigami function: S1 = (0.314, 0.442, 0), ST = (0.558, 0.442, 0.244).
+n = 8192
+unit = saltelli_design(n, [[0], [1], [2]], 3, rng)
+assert unit.shape == (n * 5, 3)
+x = np.pi * (2 * unit - 1)
+y = np.sin(x[:, 0]) + 7 * np.sin(x[:, 1]) ** 2 + 0.1 * x[:, 2] ** 4 * np.sin(x[:, 0])
+found = sobol_indices(y[:, None], n, 3, rng=rng)
+assert np.allclose(found["S1"][:, 0], [0.314, 0.442, 0.0], atol=0.03), found["S1"]
+assert np.allclose(found["ST"][:, 0], [0.558, 0.442, 0.244], atol=0.03), found["ST"]
+assert (found["S1_conf"] > 0).all() and found["samples"] == n
+
+# Grouped factors: a group's index covers all its columns; missing runs drop their sample.
+unit = saltelli_design(512, [[0, 1], [2]], 3, rng)
+y = (unit[:, 0] + unit[:, 1] + 0 * unit[:, 2])[:, None].repeat(2, axis=1)
+y[:, 1] = 5.0
+y[3, 0] = np.nan
+found = sobol_indices(y, 512, 2, bootstrap=0)
+assert found["samples"] == 511 and np.isnan(found["S1_conf"]).all()
+assert abs(found["ST"][0, 0] - 1) < 0.05 and abs(found["ST"][1, 0]) < 1e-12
+assert np.isnan(found["S1"][:, 1]).all()  # a constant output has no variance to share
+with warnings.catch_warnings():
+    warnings.simplefilter("error")
+    found = sobol_indices(y, 512, 2, rng=rng)
+assert np.isnan(found["S1_conf"][:, 1]).all() and found["S1_conf"][0, 0] > 0
+
+# Morris: the elementary effects of a linear function are its group slopes.
+groups = [np.array([0, 1]), np.array([2]), np.array([3])]
+points, moved, direction, delta = morris_design(30, groups, 4, 4, rng)
+assert points.shape == (30 * 4, 4) and ((points >= 0) & (points <= 1 + 1e-12)).all()
+assert sorted(moved[0]) == [0, 1, 2]
+y = (2 * points[:, 0] + points[:, 1] - 4 * points[:, 2])[:, None]
+found = morris_indices(y, moved, direction, delta)
+assert np.allclose(found["mu"][:, 0], [3, -4, 0]) and np.allclose(found["mu_star"][:, 0], [3, 4, 0])
+assert np.allclose(found["sigma"][:, 0], 0)
+
+# The model edits are those of the benchmark's variant C, alpha left as a placeholder.
+model = penalty_model((MODELS_DIR / "RUNS_SupEmis_Cplex_PLM_Tax.mod").read_text())
+assert "float sup[S][1..7];" in model and "sup[index][6] = det[6];" in model
+assert f"QualityPenalty = {ALPHA_PLACEHOLDER} *" in model
+assert "TotalCostCS = RawMCostWithPenalties + InventCost;" in model
+
+# Perturbed supplier files: only the rows the model reads change, unit attributes stay in [0, 1].
+space = DesignSpace(["price", "reliability"], nb_supp=10, spread=0.5)
+source = SupplierFile(DATA_DIR / "supp_details_supeco.csv")
+multipliers, alpha = space.scale(np.array([[1.0] * 20 + [0.5], [0.5] * 20 + [0.0]]))
+assert alpha.tolist() == [0.25, 0.0]
+values = source.perturbed(space.attributes, multipliers)
+with tempfile.TemporaryDirectory() as temp_dir:
+    path = Path(temp_dir) / "details.csv"
+    path.write_text(source.text(values[0]))
+    details = read_supplier_details(path)
+    original = read_supplier_details(DATA_DIR / "supp_details_supeco.csv")
+    assert np.allclose(details["price"].iloc[:10], 1.5 * original["price"].iloc[:10])
+    assert details["reliability"].iloc[:10].max() == 1.0
+    assert details.iloc[10:].equals(original.iloc[10:])
+    path.write_text(source.text(values[1]))
+    assert read_supplier_details(path).equals(original)  # multipliers of 1
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    temp = Path(temp_dir)
+    calls = temp / "calls.txt"
+    # A stand-in for oplrun pricing the leaves of its supplier file in closed form.
+    fake = temp / "oplrun"
+    fake.write_text(f"""#!{sys.executable}
+import re, sys
+model = open(sys.argv[1]).read()
+alpha = float(re.search(r'QualityPenalty = ([^ ]+) \\*', model).group(1))
+details = re.search(r'string suppDetailsFile = "([^"]+)"', model).group(1)
+rows = [line.split(';') for line in open(details).read().splitlines()[1:11]]
+price = sum(float(r[2]) for r in rows)
+emissions = sum(float(r[4]) for r in rows)
+penalty = alpha * sum(2 - float(r[5]) - float(r[6]) for r in rows)
+cost = 1000 * price + 500 * penalty
+open({str(calls)!r}, 'a').write(details + '\\n')
+print('Total (root+branch&cut) =    0.02 sec. (1.00 ticks)')
+print('xxxx')
+print('#Result <fct_obj, tot_cst, tot_ldt, Emiss>: <%s %s 2 %s>#TS:%s#E: %s#DELIVER:' % (cost + 2, cost, emissions, cost, emissions))
+print('S1=>P2')
+print('S3=>P4')
+print('xxxx')
+""")
+    fake.chmod(0o755)
+    out = temp / "doe"
+    command = [sys.executable, str(repo / "src" / "SupplierSensitivityDOE.py"), str(out), "--oplrun", str(fake),
+               "--instances", "bom_13", "--samples", "16", "--workers", "3"]
+    done = subprocess.run(command, capture_output=True, text=True)
+    assert done.returncode == 0, done.stderr
+    designs = pd.read_csv(out / "designs.csv")
+    runs = pd.read_csv(out / "runs.csv")
+    assert len(designs) == 16 * 8 and len(runs) == len(designs) and (runs["status"] == "OPTIMAL").all()
+    assert (runs["suppliers_used"] == 2).all() and runs["runtime_sec"].eq(0.02).all()
+    # Every file is named by the hash of its content.
+    files = sorted((out / "designs").glob("supp_details_*.csv"))
+    assert files and all(hashlib.sha256(f.read_bytes()).hexdigest()[:16] in f.name for f in files)
+    # The alpha-only rows of the Saltelli design reuse the files of their base design.
+    assert len(files) == runs["supp_details_sha256"].nunique() < len(runs)
+
+    report = pd.read_csv(out / "sensitivity_indices.csv").set_index(["output", "factor"])
+    emissions = report.loc["total_emissions"]
+    assert emissions.loc["emissions", "S1"] > 0.5 and (emissions.drop("emissions")[["S1", "ST"]] == 0).all().all()
+    cost = report.loc["total_cost"]
+    assert cost.loc["price", "ST"] > 0.1 and cost.loc["alpha", "ST"] > 0.1
+    assert cost.loc["lead_time_variance", "ST"] == 0 and cost.loc["capacity", "ST"] == 0
+    assert report.loc["suppliers_used", "ST"].isna().all()
+
+    # A rerun in the same directory solves nothing; a Morris design reuses the directory.
+    solved = len(calls.read_text().splitlines())
+    assert subprocess.run(command, capture_output=True, text=True).returncode == 0
+    assert len(calls.read_text().splitlines()) == solved
+    morris = subprocess.run(command[:-4] + ["--method", "morris", "--trajectories", "6"],
+                            capture_output=True, text=True)
+    assert morris.returncode == 0, morris.stderr
+    report = pd.read_csv(out / "sensitivity_indices.csv")
+    assert len(report) == 4 * 6 and (report["method"] == "morris").all() and (report["samples"] == 6).all()
+    assert report.set_index(["output", "factor"]).loc[("total_emissions", "emissions"), "mu_star"] > 0
+
+# Runs that are not comparison-admissible are missing values: their samples are dropped and counted.
+with tempfile.TemporaryDirectory() as temp_dir:
+    def solve(task):
+        alpha = task["alpha"]
+        status, gap = ("TIMEOUT", None) if alpha < 0.02 else ("FEASIBLE", 5.0) if alpha > 0.48 else ("FEASIBLE", 0.5)
+        return {"status": status, "mip_gap": gap, "objective": 1e6 * alpha, "total_cost": 1e6 * alpha,
+                "total_emissions": 1.0, "suppliers_used": 2, "runtime_sec": 0.0}
+
+    doe = SupplierSensitivityDOE(temp_dir, solve, ["bom_13"], DesignSpace(["price"]), workers=1)
+    design = doe.design("sobol", 50, 0, 0, seed=3)
+    tasks = doe.materialise(design["unit"])
+    runs = doe.execute(tasks)
+    results = tasks.merge(runs[["run_key", "status", "mip_gap"]], on="run_key").sort_values("design_id")
+    bad = ~(((results["status"] == "FEASIBLE") & (results["mip_gap"] <= 1.0)).to_numpy().reshape(4, 50).all(axis=0))
+    assert 0 < bad.sum() < 50
+    report = doe.indices("sobol", design, tasks, runs, np.random.default_rng(0))
+    assert (report["samples"] == 50 - bad.sum()).all() and (report["dropped"] == bad.sum()).all()
+    doe.gap_threshold = 10.0
+    report = doe.indices("sobol", design, tasks, runs, np.random.default_rng(0))
+    assert (report["dropped"] < bad.sum()).all()
+
+print("Supplier sensitivity DOE tests passed.")
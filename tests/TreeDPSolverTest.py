@@ -0,0 +1,127 @@
+from itertools import product
+import subprocess
+import tempfile
+from pathlib import Path
+import sys
+
+import pandas as pd
+
+
+repo = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(repo / "src"))
+
+from SupplierDominancePruner import DATA_DIR, read_bom, read_supplier_details, read_supplier_list
+from TreeDPSolver import (
+    TreeInstance,
+    evaluate_plan,
+    read_deliveries,
+    solve_strategy,
+    solve_tree,
+    to_campaign_result,
+    verdict,
+)
+
+
+def node(ind, parent, t_process, unit_price, rqtf, facility, inventory, trsp):
+    return {"ind": ind, "t_process": t_process, "parent": parent, "unit_price": unit_price,
+            "rqtf": rqtf, "aih_cost": 0.25, "var_factor": 0.5, "lt_factor": 0.8, "cycle": 1,
+            "minOrder": 0, "facility_emis": facility, "inventory_emis": inventory, "trsp_emis": trsp}
+
+
+# 0 -> 1 -> {2, 3}; 3 -> 4. Leaves 2 and 4 buy from suppliers 1..3.
+bom = pd.DataFrame([
+    node(0, -1, 0, 0, 0, 0, 0, 0),
+    node(1, 0, 2, 700, 1, 7000, 700, 1500),
+    node(2, 1, 4, 165, 1, 5000, 500, 1500),
+    node(3, 1, 3, 100, 2, 3500, 350, 1500),
+    node(4, 3, 1, 25, 3, 3000, 300, 1500),
+])
+details = pd.DataFrame({
+    "id_supp": [1, 2, 3, 4], "delay": [1, 4, 8, 1], "price": [1.0, 0.6, 0.2, 0.1],
+    "capacity": [500, 500, 500, 500], "emissions": [90, 40, 15, 1],
+}).set_index("id_supp", drop=False)
+instance = TreeInstance(bom, {2: [1, 2, 3, 4], 4: [1, 2, 3]}, details, nb_supp=3)
+assert instance.leaves == [2, 4] and instance.eligible[2] == [1, 2, 3]  # supplier 4 > NB_SUPP
+assert instance.supplier_capacity_slack()
+
+
+def brute_force(tax, service_t):
+    """Enumerate buffers and suppliers; the cheapest lead times are the tightest ones."""
+    best = None
+    for x in product((0, 1), repeat=5):
+        for k2, k4 in product((1, 2, 3), repeat=2):
+            delay = details["delay"]
+            a = [0] * 5
+            a[4] = 1 + delay[k4]
+            a[2] = 4 + delay[k2]
+            a[3] = 3 + (0 if x[4] else a[4])
+            a[1] = 2 + max(0 if x[2] else a[2], 0 if x[3] else a[3])
+            a[0] = 0 + (0 if x[1] else a[1])
+            if a[0] > service_t:
+                continue
+            plan = evaluate_plan(instance, x, a, {2: k2, 4: k4}, tax)
+            if best is None or plan["objective"] < best["objective"] - 1e-9:
+                best = plan
+    return best
+
+
+for tax, service_t in [(0.0, 1), (50.0, 1), (400.0, 1), (50.0, 3), (50.0, 20)]:
+    expected = brute_force(tax, service_t)
+    result = solve_tree(instance, tax, service_t)
+    assert result["status"] == "OPTIMAL"
+    assert abs(result["objective"] - expected["objective"]) < 1e-6, (tax, service_t)
+    assert result["A"][0] <= service_t
+
+# Fixing the suppliers restricts the leaves; the plan must stay consistent.
+fixed = solve_tree(instance, 50.0, 1, suppliers={2: 1, 4: 1})
+assert fixed["suppliers"] == {2: 1, 4: 1}
+assert fixed["objective"] >= solve_tree(instance, 50.0, 1)["objective"] - 1e-9
+replay = evaluate_plan(instance, fixed["X"], fixed["A"], fixed["suppliers"], 50.0)
+assert abs(replay["objective"] - fixed["objective"]) < 1e-9
+
+# A service time below the root's processing time is infeasible.
+late = TreeInstance(bom.assign(t_process=[2, 2, 4, 3, 1]), {2: [1], 4: [1]}, details, nb_supp=3)
+assert solve_tree(late, 0.0, 1)["status"] == "INFEASIBLE"
+
+# Caps: a slack cap keeps the tax-0 optimum, a tight one is left to CPLEX.
+free = solve_strategy(instance, "EMISCAP", cap=1e12)
+assert free["status"] == "OPTIMAL" and free["objective"] == free["TotalCostCS"] + free["DIO"]
+assert solve_strategy(instance, "EMISCAP", cap=1.0)["status"] == "CAP_BINDING"
+
+# Capacity below a leaf's order makes the free DP only a single-sourcing bound.
+tight = TreeInstance(bom, {2: [1, 2, 3], 4: [1, 2, 3]}, details.assign(capacity=[500, 500, 40, 0]), 3)
+assert solve_strategy(tight, "EMISTAXE", 50.0)["status"] == "SINGLE_SOURCING_BOUND"
+assert solve_strategy(tight, "EMISTAXE", 50.0, suppliers={2: 1, 4: 1})["status"] == "OPTIMAL"
+
+# Recorded CPLEX optimum of COMP-bom_5-EMISTAXE-PLM (large-capacity suppliers, tax 50).
+_, _, _, eligibility = read_supplier_list(DATA_DIR / "supp_list_5.csv")
+bom_5 = TreeInstance(read_bom(DATA_DIR / "bom_supemis_5.csv"), eligibility,
+                     read_supplier_details(DATA_DIR / "supp_details_supeco_grdCapacity.csv"))
+cplex = solve_strategy(bom_5, "EMISTAXE", 50.0)
+assert cplex["status"] == "OPTIMAL"
+assert abs(cplex["TotalCostTS"] - 48412.015) < 1e-6 and cplex["Emis"] == 2640300 and cplex["DIO"] == 29
+campaign = to_campaign_result(cplex)
+assert campaign["TS"] == cplex["TotalCostTS"] and campaign["DELIVER"] == ["S10=>P2", "S10=>P4", "S10=>P5"]
+
+assert verdict("OPTIMAL", "OPTIMAL", 0.0, 48441.015) == "AGREE"
+assert verdict("OPTIMAL", "FEASIBLE", -500.0, 48441.015) == "CPLEX_SUBOPTIMAL"
+assert verdict("OPTIMAL", "OPTIMAL", 3.0, 48441.015) == "MISMATCH"
+assert verdict("CAP_BINDING", "OPTIMAL", None, 48441.015) == "NOT_COMPARABLE"
+
+with tempfile.TemporaryDirectory() as temp_dir:
+    log = Path(temp_dir) / "TAX-bom_13-50.00.log"
+    log.write_text("[DELIVER] => Array\n(\n [0] => S9=>P7\n [1] => S10=>P8\n [2] => S3=>P8\n)\n",
+                   encoding="utf-8")
+    assert read_deliveries(log) == {7: [9], 8: [3, 10]}
+    assert read_deliveries(Path(temp_dir) / "missing.log") == {}
+
+    # verify reports next to the caller, never inside the reference campaign.
+    campaign_dir = repo / "logs" / "final_campaign_20260605_061305"
+    report = Path(temp_dir) / "tree_dp_verification.csv"
+    checked = subprocess.run([sys.executable, str(repo / "src" / "TreeDPSolver.py"), "verify", str(campaign_dir),
+                              "--output", str(report)], capture_output=True, text=True)
+    assert checked.returncode == 0, checked.stderr
+    assert "MISMATCH" not in set(pd.read_csv(report)["verdict"])
+    assert not (campaign_dir / "tree_dp_verification.csv").exists()
+
+print("Tree DP solver tests passed.")